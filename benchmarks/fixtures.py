@@ -0,0 +1,213 @@
+"""
+Synthetic story databases for the benchmarks.
+
+build_story_database writes a finished story of a given number of scenes
+with the rows the scene pipeline reads and writes: story configuration,
+characters and relationships, locations, world elements, plot threads,
+chapters with outlines and summaries, and scenes with content, summaries,
+character states, character knowledge, plot thread developments and plot
+progressions. story_state returns the matching chapter plan as it appears
+in the graph state, so context builders see the same scene specifications
+as during generation.
+
+The content is deterministic, so results are comparable across commits.
+"""
+
+# Standard library imports
+import json
+from typing import Any
+
+# Local imports
+from storyteller_lib.persistence.database import StoryDatabaseManager
+
+SCENES_PER_CHAPTER = 5
+CHARACTERS = 12
+LOCATIONS = 8
+PLOT_THREADS = 6
+KNOWLEDGE_PER_SCENE = 4
+WORDS_PER_SCENE = 1500
+WORLD_CATEGORIES = ("geography", "history", "culture", "politics", "magic")
+
+WORDS = (
+    "the lantern road bent north past the old mill where rain gathered in "
+    "the ruts and the ferryman waited with his hands folded over the oar"
+).split()
+
+
+def scene_positions(num_scenes: int) -> list[tuple[int, int]]:
+    """Get the (chapter, scene) numbers of a story with num_scenes scenes."""
+    return [
+        (index // SCENES_PER_CHAPTER + 1, index % SCENES_PER_CHAPTER + 1)
+        for index in range(num_scenes)
+    ]
+
+
+def scene_text(chapter: int, scene: int, words: int = WORDS_PER_SCENE) -> str:
+    """Build deterministic prose for one scene."""
+    offset = chapter * 7 + scene
+    body = " ".join(WORDS[(offset + i) % len(WORDS)] for i in range(words))
+    return f"Chapter {chapter}, scene {scene}. {body}."
+
+
+def story_state(num_scenes: int) -> dict[str, Any]:
+    """
+    Build the graph state chapter plan for a synthetic story.
+
+    Args:
+        num_scenes: Number of scenes in the story
+
+    Returns:
+        State with the chapters plan and story-level fields
+    """
+    chapters: dict[str, Any] = {}
+    for chapter, scene in scene_positions(num_scenes):
+        chapter_plan = chapters.setdefault(
+            str(chapter),
+            {
+                "title": f"Chapter {chapter}",
+                "outline": f"Theme: courage. The company reaches waypoint {chapter}.",
+                "scenes": {},
+            },
+        )
+        chapter_plan["scenes"][str(scene)] = {
+            "description": f"The company crosses the river at waypoint {chapter}.{scene}",
+            "required_characters": [
+                f"char_{(chapter + scene + i) % CHARACTERS}" for i in range(4)
+            ],
+            "plot_progressions": [f"progression_{chapter}_{scene}"],
+            "character_learns": [f"char_{scene % CHARACTERS} learns of the ford"],
+            "dramatic_purpose": "development",
+            "tension_level": 5,
+            "ends_with": "transition",
+            "pov_character": f"char_{chapter % CHARACTERS}",
+            "scene_type": "exploration",
+            "location": f"loc_{scene % LOCATIONS}",
+        }
+    return {
+        "chapters": chapters,
+        "characters": {},
+        "world_elements": {},
+        "plot_threads": {},
+        "author_style_guidance": "",
+        "current_chapter": "",
+        "current_scene": "",
+    }
+
+
+def build_story_database(db_path: str, num_scenes: int) -> StoryDatabaseManager:
+    """
+    Write a synthetic story database.
+
+    Args:
+        db_path: Path of the database file to create
+        num_scenes: Number of scenes in the story
+
+    Returns:
+        A database manager for the new story
+    """
+    manager = StoryDatabaseManager(db_path)
+    db = manager._db
+    db.initialize_story_config(
+        "Benchmark Story",
+        "fantasy",
+        "epic",
+        global_story="# Benchmark Story\n\nA company crosses a drowned country.",
+    )
+
+    character_ids = [
+        db.create_character(
+            f"char_{i}",
+            f"Character {i}",
+            role="protagonist" if i == 0 else "supporting",
+            backstory=f"Character {i} grew up by the river.",
+            personality=json.dumps({"traits": ["stubborn"], "desires": ["to win"]}),
+        )
+        for i in range(CHARACTERS)
+    ]
+    for i in range(1, CHARACTERS):
+        db.create_relationship(character_ids[0], character_ids[i], "ally")
+    for i in range(LOCATIONS):
+        db.create_location(
+            f"loc_{i}", f"Location {i}", description="A flooded market town."
+        )
+    for category in WORLD_CATEGORIES:
+        for i in range(3):
+            db.create_world_element(
+                category, f"{category}_{i}", {"description": f"{category} lore {i}"}
+            )
+
+    with db._get_connection() as conn:
+        for i in range(PLOT_THREADS):
+            conn.execute(
+                """INSERT INTO plot_threads
+                (name, description, thread_type, importance, status)
+                VALUES (?, ?, ?, ?, 'developing')""",
+                (
+                    f"thread_{i}",
+                    f"Thread {i} description",
+                    "main_plot" if i == 0 else "subplot",
+                    "major" if i % 2 else "minor",
+                ),
+            )
+
+        chapter_ids: dict[int, int] = {}
+        for index, (chapter, scene) in enumerate(scene_positions(num_scenes)):
+            if chapter not in chapter_ids:
+                chapter_ids[chapter] = conn.execute(
+                    """INSERT INTO chapters (chapter_number, title, outline, summary)
+                    VALUES (?, ?, ?, ?)""",
+                    (
+                        chapter,
+                        f"Chapter {chapter}",
+                        f"Theme: courage. The company reaches waypoint {chapter}.",
+                        f"Summary of chapter {chapter}.",
+                    ),
+                ).lastrowid
+
+            scene_id = conn.execute(
+                """INSERT INTO scenes
+                (chapter_id, scene_number, description, content, summary)
+                VALUES (?, ?, ?, ?, ?)""",
+                (
+                    chapter_ids[chapter],
+                    scene,
+                    f"The company crosses the river at waypoint {chapter}.{scene}",
+                    scene_text(chapter, scene),
+                    f"Summary of chapter {chapter}, scene {scene}.",
+                ),
+            ).lastrowid
+            conn.executemany(
+                """INSERT INTO character_states (character_id, scene_id, emotional_state)
+                VALUES (?, ?, ?)""",
+                [(cid, scene_id, '{"current": "tense"}') for cid in character_ids],
+            )
+            conn.executemany(
+                """INSERT INTO character_knowledge
+                (character_id, scene_id, knowledge_type, knowledge_content)
+                VALUES (?, ?, 'fact', ?)""",
+                [
+                    (cid, scene_id, f"fact {scene_id}.{k}")
+                    for cid in character_ids
+                    for k in range(KNOWLEDGE_PER_SCENE)
+                ],
+            )
+            conn.execute(
+                """INSERT INTO plot_thread_developments
+                (plot_thread_id, scene_id, development_type, description)
+                VALUES (?, ?, 'advanced', ?)""",
+                (index % PLOT_THREADS + 1, scene_id, f"Development {scene_id}"),
+            )
+            conn.execute(
+                """INSERT INTO plot_progressions
+                (progression_key, chapter_number, scene_number, description)
+                VALUES (?, ?, ?, ?)""",
+                (
+                    f"progression_{chapter}_{scene}",
+                    chapter,
+                    scene,
+                    f"Progression {chapter}.{scene}",
+                ),
+            )
+        conn.commit()
+
+    return manager
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Benchmark a complete story generation run against the stub LLM.
+
+Generates a story with the offline stub provider (MODEL_PROVIDER=stub) in
+a temporary database and reports, per graph node: how often it ran, its
+wall time, the SQL statements it executed with their execution time, the
+prompt templates it rendered with their render time, and the process RSS
+after the node. It also reports the time to compile the finished story,
+the peak RSS of the run (sampled in the background) and the RSS before and
+after it as measured by log_memory_usage. log_memory_usage runs a full
+garbage collection, which would stall the other scene analysis branches,
+so it is not called between nodes.
+
+With the default zero stub latency the node times are the pipeline's own
+overhead; --latency adds a fixed delay per LLM call to approximate a real
+provider.
+
+Usage:
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --pages 20 --latency 0.05 --json
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+# Third party imports
+import psutil
+from langchain_core.callbacks import BaseCallbackHandler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+OUTSIDE_NODES = "(outside nodes)"
+
+
+class NodeRecorder:
+    """Collects timings and attributes them to the node running on a thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: dict[int, list[str]] = {}
+        self.nodes: dict[str, dict[str, Any]] = defaultdict(
+            lambda: {
+                "runs": 0,
+                "seconds": 0.0,
+                "max_seconds": 0.0,
+                "queries": 0,
+                "query_seconds": 0.0,
+                "renders": 0,
+                "render_seconds": 0.0,
+                "rss_mb": 0.0,
+            }
+        )
+        self.templates: dict[str, dict[str, Any]] = defaultdict(
+            lambda: {"renders": 0, "seconds": 0.0}
+        )
+
+    def current_node(self) -> str:
+        stack = self._active.get(threading.get_ident())
+        return stack[-1] if stack else OUTSIDE_NODES
+
+    def enter(self, node: str) -> None:
+        with self._lock:
+            self._active.setdefault(threading.get_ident(), []).append(node)
+
+    def leave(self, node: str, seconds: float, rss_mb: float) -> None:
+        with self._lock:
+            stack = self._active.get(threading.get_ident(), [])
+            if node in stack:
+                stack.reverse()
+                stack.remove(node)
+                stack.reverse()
+            stats = self.nodes[node]
+            stats["runs"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["rss_mb"] = max(stats["rss_mb"], rss_mb)
+
+    def record_query(self, seconds: float) -> None:
+        node = self.current_node()
+        with self._lock:
+            self.nodes[node]["queries"] += 1
+            self.nodes[node]["query_seconds"] += seconds
+
+    def record_render(self, template_name: str, seconds: float) -> None:
+        node = self.current_node()
+        with self._lock:
+            self.nodes[node]["renders"] += 1
+            self.nodes[node]["render_seconds"] += seconds
+            self.templates[template_name]["renders"] += 1
+            self.templates[template_name]["seconds"] += seconds
+
+
+recorder = NodeRecorder()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports the execution time of every statement."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            recorder.record_query(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            recorder.record_query(time.perf_counter() - start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            recorder.record_query(time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including implicit ones, are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Times graph node runs; LangGraph names a node's run after the node."""
+
+    def __init__(self):
+        self._starts: dict[Any, tuple[str, float]] = {}
+        self._process = psutil.Process(os.getpid())
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            recorder.enter(node)
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def _finish(self, run_id) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return
+        node, start = started
+        seconds = time.perf_counter() - start
+        recorder.leave(node, seconds, self._process.memory_info().rss / 1024 / 1024)
+
+
+class PeakMemorySampler:
+    """Samples the process RSS in the background and keeps the maximum."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self) -> None:
+        rss_mb = self._process.memory_info().rss / 1024 / 1024
+        self.peak_mb = max(self.peak_mb, rss_mb)
+
+    def __enter__(self) -> "PeakMemorySampler":
+        self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def instrument_prompt_rendering() -> None:
+    """Time every template render, whichever module imported render_prompt."""
+    from storyteller_lib.prompts.renderer import PromptTemplateManager
+
+    render = PromptTemplateManager.render
+
+    def timed_render(self, template_name: str, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return render(self, template_name, **kwargs)
+        finally:
+            recorder.record_render(template_name, time.perf_counter() - start)
+
+    PromptTemplateManager.render = timed_render
+
+
+def run(pages: int, latency: float, genre: str, tone: str) -> dict[str, Any]:
+    """Generate one story with the stub LLM and collect the measurements."""
+    # The library prints progress; keep stdout for the results
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        # The library reads its configuration at import time
+        os.environ.update(
+            {
+                "MODEL_PROVIDER": "stub",
+                "CACHE_TYPE": "none",
+                "STUB_LLM_LATENCY": str(latency),
+                "STORY_DATABASE_PATH": str(Path(tmp) / "story.db"),
+                "STORY_CHECKPOINT_PATH": str(Path(tmp) / "checkpoints.db"),
+            }
+        )
+
+        from storyteller_lib.persistence.connection import ConnectionManager
+
+        ConnectionManager.connection_factory = TimedConnection
+
+        from storyteller_lib.core.logger import setup_logging
+
+        setup_logging(level="WARNING")
+
+        from storyteller_lib import reset_progress_tracking, set_progress_callback
+        from storyteller_lib.api.storyteller import generate_story_simplified
+        from storyteller_lib.core.config import log_memory_usage
+        from storyteller_lib.persistence.database import get_db_manager
+
+        instrument_prompt_rendering()
+
+        # Node results reach the database through the progress callback
+        def save_progress(node_name: str, state: dict[str, Any]) -> None:
+            db_manager = get_db_manager()
+            if db_manager:
+                db_manager.save_node_state(node_name, state)
+
+        reset_progress_tracking()
+        set_progress_callback(save_progress)
+
+        start_memory = log_memory_usage("benchmark start")
+        with PeakMemorySampler() as memory:
+            start = time.perf_counter()
+            story, state = generate_story_simplified(
+                genre=genre,
+                tone=tone,
+                target_pages=pages,
+                recursion_limit=1000,
+                callbacks=[NodeTimer()],
+            )
+            total_seconds = time.perf_counter() - start
+
+            db_manager = get_db_manager()
+            start = time.perf_counter()
+            db_manager.compile_story()
+            compile_seconds = time.perf_counter() - start
+            db_manager.close()
+        end_memory = log_memory_usage("benchmark end")
+
+    return {
+        "pages": pages,
+        "stub_latency_s": latency,
+        "completed": bool(state.get("completed")),
+        "words": len(story.split()),
+        "total_s": round(total_seconds, 3),
+        "compile_story_ms": round(compile_seconds * 1000, 3),
+        "start_rss_mb": round(start_memory["rss_mb"], 1),
+        "end_rss_mb": round(end_memory["rss_mb"], 1),
+        "peak_rss_mb": round(memory.peak_mb, 1),
+        "nodes": {
+            node: {
+                "runs": stats["runs"],
+                "total_ms": round(stats["seconds"] * 1000, 2),
+                "mean_ms": (
+                    round(stats["seconds"] / stats["runs"] * 1000, 3)
+                    if stats["runs"]
+                    else 0.0
+                ),
+                "max_ms": round(stats["max_seconds"] * 1000, 3),
+                "queries": stats["queries"],
+                "query_ms": round(stats["query_seconds"] * 1000, 2),
+                "renders": stats["renders"],
+                "render_ms": round(stats["render_seconds"] * 1000, 2),
+                "rss_mb": round(stats["rss_mb"], 1),
+            }
+            for node, stats in sorted(
+                recorder.nodes.items(), key=lambda item: -item[1]["seconds"]
+            )
+        },
+        "templates": {
+            name: {
+                "renders": stats["renders"],
+                "total_ms": round(stats["seconds"] * 1000, 2),
+                "mean_ms": round(stats["seconds"] / stats["renders"] * 1000, 3),
+            }
+            for name, stats in sorted(
+                recorder.templates.items(), key=lambda item: -item[1]["seconds"]
+            )
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stub LLM seconds per call"
+    )
+    parser.add_argument("--genre", default="fantasy")
+    parser.add_argument("--tone", default="epic")
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.latency, args.genre, args.tone)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{results['words']} words in {results['total_s']:.2f}s "
+        f"(completed: {results['completed']}), compile_story "
+        f"{results['compile_story_ms']:.1f} ms, RSS {results['start_rss_mb']} -> "
+        f"{results['end_rss_mb']} MB (peak {results['peak_rss_mb']} MB)"
+    )
+    print()
+    print(
+        f"{'node':<40} {'runs':>5} {'total ms':>10} {'max ms':>9} "
+        f"{'queries':>8} {'query ms':>9} {'renders':>8} {'render ms':>10} {'rss MB':>7}"
+    )
+    for node, row in results["nodes"].items():
+        print(
+            f"{node:<40} {row['runs']:>5} {row['total_ms']:>10.1f} "
+            f"{row['max_ms']:>9.1f} {row['queries']:>8} {row['query_ms']:>9.1f} "
+            f"{row['renders']:>8} {row['render_ms']:>10.1f} {row['rss_mb']:>7.1f}"
+        )
+    print()
+    print(f"{'template':<40} {'renders':>8} {'total ms':>10} {'mean ms':>9}")
+    for name, row in results["templates"].items():
+        print(
+            f"{name:<40} {row['renders']:>8} {row['total_ms']:>10.2f} "
+            f"{row['mean_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
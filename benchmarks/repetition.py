@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local repetition engine on stories of increasing length.
+
+Scenes are the stub provider's filler prose, whose small vocabulary makes
+them far more repetitive than real prose, so the times are an upper bound.
+Each story is analyzed as a list of scenes, which includes the cross-scene
+theme counts, and its first scene is also analyzed on its own.
+
+Usage:
+    python benchmarks/repetition.py
+    python benchmarks/repetition.py --words 10000 100000 --repeat 5 --json
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS_PER_SCENE = 2500
+
+
+def median_ms(func, repeat: int) -> float:
+    """Run func repeat times and return the median wall time in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def measure(words: int, repeat: int) -> dict[str, Any]:
+    """Time the analysis of one story length."""
+    from storyteller_lib.analysis.ngrams import analyze_repetition
+    from storyteller_lib.core.stub_llm import synthesize_text
+
+    scenes = [
+        synthesize_text(random.Random(f"scene-{i}"), WORDS_PER_SCENE)
+        for i in range(max(1, words // WORDS_PER_SCENE))
+    ]
+    analysis = analyze_repetition(scenes)
+    return {
+        "words": sum(len(scene.split()) for scene in scenes),
+        "scenes": len(scenes),
+        "story_ms": median_ms(lambda: analyze_repetition(scenes), repeat),
+        "scene_ms": median_ms(lambda: analyze_repetition(scenes[0]), repeat),
+        "elements": sum(
+            len(value) for value in analysis.values() if isinstance(value, list)
+        ),
+        "score": analysis["overall_repetition_score"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    # The library prints progress, also on import; keep stdout for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = [measure(words, args.repeat) for words in args.words]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'words':>8} {'scenes':>7} {'story ms':>9} {'scene ms':>9} {'score':>6}")
+    for row in results:
+        print(
+            f"{row['words']:>8} {row['scenes']:>7} {row['story_ms']:>9.1f} "
+            f"{row['scene_ms']:>9.2f} {row['score']:>6}"
+        )
+    print("median of --repeat runs")
+
+
+if __name__ == "__main__":
+    main()
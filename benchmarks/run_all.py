@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite and collect the results in one JSON document.
+
+Every benchmark runs in its own interpreter with --json. The document
+records the git commit, the time and the Python version next to each
+benchmark's results, so runs from different commits can be compared. A
+benchmark that fails is recorded with its error instead of its results.
+
+Usage:
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/run_all.py --only pipeline story_operations
+"""
+
+# Standard library imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARK_DIR.parent
+
+# (name, arguments); each is benchmarks/<name>.py
+BENCHMARKS = [
+    ("pipeline", []),
+    ("story_operations", ["--scenes", "10", "50", "200"]),
+    ("scene_context_cache", ["--scenes", "10", "50", "200"]),
+    ("scene_context_queries", []),
+    ("startup_time", []),
+    ("repetition", []),
+]
+
+
+def git_commit() -> str | None:
+    """Get the commit being benchmarked, marking uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run_benchmark(name: str, args: list[str]) -> dict[str, Any]:
+    """Run one benchmark script and parse its JSON output."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK_DIR / f"{name}.py"), *args, "--json"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    entry: dict[str, Any] = {
+        "args": args,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    try:
+        if result.returncode != 0:
+            raise ValueError(f"exit status {result.returncode}")
+        entry["results"] = json.loads(result.stdout)
+    except ValueError as e:
+        stderr = result.stderr.strip().splitlines()
+        entry["error"] = stderr[-1] if stderr else str(e)
+    return entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[name for name, _ in BENCHMARKS],
+        help="Run only these benchmarks",
+    )
+    parser.add_argument("--output", help="Write the results to this file")
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    for name, benchmark_args in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        report["benchmarks"][name] = run_benchmark(name, benchmark_args)
+        if "error" in report["benchmarks"][name]:
+            print(f"  failed: {report['benchmarks'][name]['error']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
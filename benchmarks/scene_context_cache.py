@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental scene-context snapshots against story length.
+
+Writes a synthetic story scene by scene and loads each scene's context
+before writing it, once with the snapshot cache and once rebuilding the
+story-wide state from scratch. With the cache, the cost of a scene's
+context depends on what the previous scene wrote rather than on how long
+the story already is.
+
+Usage:
+    python benchmarks/scene_context_cache.py
+    python benchmarks/scene_context_cache.py --scenes 10 50 200 --json
+"""
+
+# Standard library imports
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Local imports
+from storyteller_lib.generation.scene import context
+from storyteller_lib.persistence.database import StoryDatabaseManager
+
+SCENES_PER_CHAPTER = 5
+CHARACTERS = 12
+PLOT_THREADS = 6
+KNOWLEDGE_PER_SCENE = 4
+
+
+def write_story(db_path: str, num_scenes: int, cached: bool) -> list[float]:
+    """Write a story scene by scene, timing each scene's context load."""
+    context.CONTEXT_CACHE_ENABLED = cached
+    manager = StoryDatabaseManager(db_path)
+    db = manager._db
+    db.initialize_story_config("Benchmark Story", "fantasy", "epic")
+    character_ids = [
+        db.create_character(f"char_{i}", f"Character {i}", role="supporting")
+        for i in range(CHARACTERS)
+    ]
+    required = [f"char_{i}" for i in range(4)]
+
+    timings = []
+    with db._get_connection() as conn:
+        for i in range(PLOT_THREADS):
+            conn.execute(
+                """INSERT INTO plot_threads (name, description, importance, status)
+                VALUES (?, ?, ?, 'developing')""",
+                (f"thread_{i}", "A thread", "major" if i % 2 else "minor"),
+            )
+        conn.commit()
+
+        chapter_id = None
+        for index in range(num_scenes):
+            chapter, scene = divmod(index, SCENES_PER_CHAPTER)
+            chapter, scene = chapter + 1, scene + 1
+            if scene == 1:
+                chapter_id = conn.execute(
+                    "INSERT INTO chapters (chapter_number, title) VALUES (?, ?)",
+                    (chapter, f"Chapter {chapter}"),
+                ).lastrowid
+                conn.commit()
+
+            start = time.perf_counter()
+            context.load_scene_context_data(manager, chapter, scene, required)
+            timings.append(time.perf_counter() - start)
+
+            scene_id = conn.execute(
+                """INSERT INTO scenes (chapter_id, scene_number, content)
+                VALUES (?, ?, ?)""",
+                (chapter_id, scene, "word " * 1500),
+            ).lastrowid
+            conn.executemany(
+                """INSERT INTO character_states (character_id, scene_id, emotional_state)
+                VALUES (?, ?, ?)""",
+                [(cid, scene_id, '{"current": "tense"}') for cid in character_ids],
+            )
+            conn.executemany(
+                """INSERT INTO character_knowledge
+                (character_id, scene_id, knowledge_type, knowledge_content)
+                VALUES (?, ?, 'fact', ?)""",
+                [
+                    (cid, scene_id, f"fact {scene_id}.{k}")
+                    for cid in character_ids
+                    for k in range(KNOWLEDGE_PER_SCENE)
+                ],
+            )
+            conn.execute(
+                """INSERT INTO plot_thread_developments
+                (plot_thread_id, scene_id, development_type, description)
+                VALUES (?, ?, 'advanced', ?)""",
+                (index % PLOT_THREADS + 1, scene_id, f"Development {scene_id}"),
+            )
+            conn.execute(
+                """INSERT INTO plot_progressions
+                (progression_key, chapter_number, scene_number) VALUES (?, ?, ?)""",
+                (f"progression_{scene_id}", chapter, scene),
+            )
+            conn.commit()
+
+    manager.close()
+    return timings
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    """Summarize per-scene context load timings in milliseconds."""
+    tail = timings[-max(1, len(timings) // 10) :]
+    return {
+        "total_ms": round(sum(timings) * 1000, 2),
+        "last_scenes_ms": round(sum(tail) / len(tail) * 1000, 3),
+    }
+
+
+def run(scene_counts: list[int]) -> list[dict[str, Any]]:
+    """Run the benchmark for each story length."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in scene_counts:
+            cached = summarize(
+                write_story(str(Path(tmp) / f"c{count}.db"), count, True)
+            )
+            rebuilt = summarize(
+                write_story(str(Path(tmp) / f"r{count}.db"), count, False)
+            )
+            results.append(
+                {
+                    "scenes": count,
+                    "cached_total_ms": cached["total_ms"],
+                    "cached_last_scenes_ms": cached["last_scenes_ms"],
+                    "rebuilt_total_ms": rebuilt["total_ms"],
+                    "rebuilt_last_scenes_ms": rebuilt["last_scenes_ms"],
+                }
+            )
+    context.CONTEXT_CACHE_ENABLED = True
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    results = run(args.scenes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'scenes':>7} {'cached total':>13} {'cached last*':>13} "
+        f"{'rebuilt total':>14} {'rebuilt last*':>14}"
+    )
+    for row in results:
+        print(
+            f"{row['scenes']:>7} {row['cached_total_ms']:>13.2f} "
+            f"{row['cached_last_scenes_ms']:>13.3f} {row['rebuilt_total_ms']:>14.2f} "
+            f"{row['rebuilt_last_scenes_ms']:>14.3f}"
+        )
+    print("* mean context load time (ms) over the last 10% of scenes")
+
+
+if __name__ == "__main__":
+    main()
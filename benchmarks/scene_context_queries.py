@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark scene context loading against the number of required characters.
+
+Builds a synthetic story database per cast size, then measures how many SQL
+statements and how much wall time it takes to load a scene's context with
+load_scene_context_data, compared with the previous per-character
+(N+1) query pattern. The bulk loader's statement count does not grow with
+the cast: nine statements (eight for a single character, which needs no
+relationship query), counting the snapshot cache's story version check.
+Applying pending revisions to cached snapshots adds up to two more.
+
+Usage:
+    python benchmarks/scene_context_queries.py
+    python benchmarks/scene_context_queries.py --sizes 1 5 10 20 40 --json
+"""
+
+# Standard library imports
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Local imports
+from storyteller_lib.generation.scene.context import load_scene_context_data
+from storyteller_lib.persistence.database import StoryDatabaseManager
+
+CHAPTERS = 5
+SCENES_PER_CHAPTER = 6
+
+
+def build_database(db_path: str, num_characters: int) -> StoryDatabaseManager:
+    """Create a synthetic story with the given cast size."""
+    manager = StoryDatabaseManager(db_path)
+    db = manager._db
+    db.initialize_story_config(
+        "Benchmark Story", "fantasy", "epic", global_story="A premise.\n\nDetails."
+    )
+
+    character_ids = [
+        db.create_character(
+            f"char_{i}",
+            f"Character {i}",
+            role="supporting",
+            personality=json.dumps({"desires": ["to win"]}),
+        )
+        for i in range(num_characters)
+    ]
+    for i in range(1, num_characters):
+        db.create_relationship(character_ids[0], character_ids[i], "ally")
+
+    with db._get_connection() as conn:
+        for ch in range(1, CHAPTERS + 1):
+            cursor = conn.execute(
+                "INSERT INTO chapters (chapter_number, title, outline) VALUES (?, ?, ?)",
+                (ch, f"Chapter {ch}", "Theme: courage"),
+            )
+            chapter_id = cursor.lastrowid
+            for sc in range(1, SCENES_PER_CHAPTER + 1):
+                cursor = conn.execute(
+                    """INSERT INTO scenes
+                    (chapter_id, scene_number, description, content, scene_type)
+                    VALUES (?, ?, ?, ?, ?)""",
+                    (chapter_id, sc, f"Scene {sc}", "word " * 1500, "action"),
+                )
+                scene_id = cursor.lastrowid
+                conn.executemany(
+                    """INSERT INTO character_states (character_id, scene_id, emotional_state)
+                    VALUES (?, ?, ?)""",
+                    [(cid, scene_id, '{"current": "tense"}') for cid in character_ids],
+                )
+                conn.executemany(
+                    """INSERT INTO character_knowledge
+                    (character_id, scene_id, knowledge_type, knowledge_content)
+                    VALUES (?, ?, 'fact', ?)""",
+                    [(cid, scene_id, f"fact {scene_id}") for cid in character_ids],
+                )
+        conn.commit()
+
+    return manager
+
+
+def legacy_character_queries(
+    manager: StoryDatabaseManager, required: list[str]
+) -> None:
+    """Replay the previous per-character query pattern for comparison."""
+    db = manager._db
+    for identifier in required:
+        with db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT c.id, cs.emotional_state FROM characters c
+                LEFT JOIN character_states cs ON c.id = cs.character_id
+                WHERE c.identifier = ? OR c.name = ?
+                ORDER BY cs.scene_id DESC LIMIT 1
+                """,
+                (identifier, identifier),
+            )
+            row = cursor.fetchone()
+            cursor.execute(
+                """
+                SELECT knowledge_content FROM character_knowledge
+                WHERE character_id = ? ORDER BY scene_id DESC LIMIT 5
+                """,
+                (row["id"],),
+            )
+            cursor.fetchall()
+    for identifier in required:
+        with db._get_connection() as conn:
+            conn.execute(
+                """
+                SELECT l.identifier FROM character_locations cl
+                JOIN locations l ON cl.location_id = l.id
+                JOIN characters c ON cl.character_id = c.id
+                WHERE c.identifier = ?
+                """,
+                (identifier,),
+            ).fetchall()
+
+
+def measure(manager: StoryDatabaseManager, func, repeat: int) -> dict[str, Any]:
+    """Count statements and time a loader function."""
+    statements = []
+    with manager._db._get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            func()
+            query_count = len(statements)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            elapsed = (time.perf_counter() - start) / repeat
+        finally:
+            conn.set_trace_callback(None)
+
+    return {"queries": query_count, "latency_ms": round(elapsed * 1000, 3)}
+
+
+def run(sizes: list[int], repeat: int) -> list[dict[str, Any]]:
+    """Run the benchmark for each cast size."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            manager = build_database(str(Path(tmp) / f"bench_{size}.db"), size)
+            required = [f"char_{i}" for i in range(size)]
+            chapter, scene = CHAPTERS, SCENES_PER_CHAPTER
+
+            bulk = measure(
+                manager,
+                lambda m=manager, r=required, c=chapter, s=scene: (
+                    load_scene_context_data(m, c, s, r)
+                ),
+                repeat,
+            )
+            legacy = measure(
+                manager,
+                lambda m=manager, r=required: legacy_character_queries(m, r),
+                repeat,
+            )
+            results.append(
+                {
+                    "characters": size,
+                    "bulk_queries": bulk["queries"],
+                    "bulk_latency_ms": bulk["latency_ms"],
+                    "legacy_character_queries": legacy["queries"],
+                    "legacy_character_latency_ms": legacy["latency_ms"],
+                }
+            )
+            manager.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20, 40])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'chars':>6} {'bulk q':>7} {'bulk ms':>9} "
+        f"{'legacy q*':>10} {'legacy ms*':>11}"
+    )
+    for row in results:
+        print(
+            f"{row['characters']:>6} {row['bulk_queries']:>7} "
+            f"{row['bulk_latency_ms']:>9.3f} {row['legacy_character_queries']:>10} "
+            f"{row['legacy_character_latency_ms']:>11.3f}"
+        )
+    print("* legacy columns cover only the per-character queries that were replaced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start time of the storyteller entry points.
+
+Each entry point is imported in a fresh interpreter several times. The
+"lazy" column is the import as it happens today; the "eager" column also
+resolves the default LLM right after the import, which is what importing
+storyteller_lib.core.config used to do unconditionally. The difference is
+the provider SDK import and client construction cost that entry points no
+longer pay unless they actually call an LLM.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 10 --json
+"""
+
+# Standard library imports
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# (label, statement importing the entry point)
+ENTRY_POINTS = [
+    ("core.config", "import storyteller_lib.core.config"),
+    ("analysis.statistics", "import storyteller_lib.analysis.statistics"),
+    ("worldbuilding_dump.py", "import worldbuilding_dump"),
+    ("generate_audiobook.py", "import generate_audiobook"),
+    ("run_storyteller.py", "import run_storyteller"),
+]
+
+PROVIDER_MODULES = [
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_community",
+]
+
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+if {eager}:
+    from storyteller_lib.core.config import llm
+    llm.resolve()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "providers": [m for m in {providers!r} if m in sys.modules],
+}}))
+"""
+
+
+def time_entry_point(statement: str, eager: bool, env: dict[str, str]) -> dict:
+    """Import an entry point in a fresh interpreter and time it."""
+    code = CHILD_TEMPLATE.format(
+        statement=statement, eager=eager, providers=PROVIDER_MODULES
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"error": error}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int) -> list[dict[str, Any]]:
+    """Time every entry point lazily and eagerly."""
+    results = []
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ)
+        env.update(
+            {
+                "HOME": home,
+                "PYTHONPATH": str(REPO_ROOT),
+                "MODEL_PROVIDER": "openai",
+                "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "benchmark-key"),
+                "CACHE_TYPE": "none",
+            }
+        )
+        for label, statement in ENTRY_POINTS:
+            row: dict[str, Any] = {"entry_point": label}
+            for mode, eager in (("lazy", False), ("eager", True)):
+                samples = [time_entry_point(statement, eager, env) for _ in range(runs)]
+                errors = [s["error"] for s in samples if "error" in s]
+                if errors:
+                    row[f"{mode}_error"] = errors[0]
+                    continue
+                row[f"{mode}_ms"] = round(
+                    statistics.median(s["seconds"] for s in samples) * 1000, 1
+                )
+                row[f"{mode}_providers"] = samples[-1]["providers"]
+            results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'entry point':<24} {'lazy ms':>9} {'eager ms':>9}  providers (lazy)")
+    for row in results:
+        if "lazy_error" in row:
+            print(f"{row['entry_point']:<24} error: {row['lazy_error']}")
+            continue
+        eager = row.get("eager_ms")
+        print(
+            f"{row['entry_point']:<24} {row['lazy_ms']:>9.1f} "
+            f"{eager if eager is not None else 'error':>9}  "
+            f"{', '.join(row['lazy_providers']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
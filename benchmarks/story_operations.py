@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark story-length dependent operations on synthetic story databases.
+
+For each story length a fixture database is written with
+fixtures.build_story_database and the following are timed for the last
+scene of the story:
+
+- load_scene_context_data, cold (fresh snapshot cache) and warm
+- build_comprehensive_scene_context, the full context a scene is written
+  from (the worldbuilding selection it asks the LLM for is answered by the
+  stub provider)
+- rendering the scene writing prompt
+- compile_story over the whole story
+
+Usage:
+    python benchmarks/story_operations.py
+    python benchmarks/story_operations.py --scenes 10 50 200 --repeat 5 --json
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Answer LLM calls locally; the library reads this at import time
+os.environ["MODEL_PROVIDER"] = "stub"
+os.environ["CACHE_TYPE"] = "none"
+
+
+def median_ms(func, repeat: int) -> float:
+    """Run func repeat times and return the median wall time in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def measure(db_path: str, num_scenes: int, repeat: int) -> dict[str, Any]:
+    """Build one fixture database and time the operations on it."""
+    from fixtures import build_story_database, scene_positions, story_state
+
+    from storyteller_lib.generation.scene import context
+    from storyteller_lib.persistence import database
+    from storyteller_lib.prompts.renderer import render_prompt
+
+    start = time.perf_counter()
+    manager = build_story_database(db_path, num_scenes)
+    build_seconds = time.perf_counter() - start
+
+    # The context builders use the global database manager
+    database._db_manager = manager
+    state = story_state(num_scenes)
+    chapter, scene = scene_positions(num_scenes)[-1]
+    state["current_chapter"], state["current_scene"] = str(chapter), str(scene)
+    required = state["chapters"][str(chapter)]["scenes"][str(scene)][
+        "required_characters"
+    ]
+
+    start = time.perf_counter()
+    context.load_scene_context_data(manager, chapter, scene, required)
+    cold_seconds = time.perf_counter() - start
+    warm_ms = median_ms(
+        lambda: context.load_scene_context_data(manager, chapter, scene, required),
+        repeat,
+    )
+
+    scene_context = context.build_comprehensive_scene_context(chapter, scene, state)
+    build_ms = median_ms(
+        lambda: context.build_comprehensive_scene_context(chapter, scene, state),
+        repeat,
+    )
+
+    instructions = json.dumps(scene_context.__dict__, default=str)
+    render_ms = median_ms(
+        lambda: render_prompt(
+            "scene_writing_intelligent",
+            language=scene_context.language or "english",
+            book_instructions=instructions,
+            scene_instructions=instructions,
+            chapter=chapter,
+            scene=scene,
+        ),
+        repeat,
+    )
+
+    story = manager.compile_story()
+    compile_ms = median_ms(manager.compile_story, repeat)
+
+    manager.close()
+    database._db_manager = None
+    return {
+        "scenes": num_scenes,
+        "database_kb": round(os.path.getsize(db_path) / 1024, 1),
+        "fixture_build_ms": round(build_seconds * 1000, 1),
+        "context_load_cold_ms": round(cold_seconds * 1000, 3),
+        "context_load_warm_ms": warm_ms,
+        "context_build_ms": build_ms,
+        "prompt_render_ms": render_ms,
+        "compile_story_ms": compile_ms,
+        "story_words": len(story.split()),
+    }
+
+
+def run(scene_counts: list[int], repeat: int) -> list[dict[str, Any]]:
+    """Run the benchmark for each story length."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in scene_counts:
+            results.append(measure(str(Path(tmp) / f"story{count}.db"), count, repeat))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit JSON results")
+    args = parser.parse_args()
+
+    # The library prints progress, also on import; keep stdout for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run(args.scenes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'scenes':>7} {'load cold':>10} {'load warm':>10} {'context':>9} "
+        f"{'render':>8} {'compile':>9} {'words':>8}"
+    )
+    for row in results:
+        print(
+            f"{row['scenes']:>7} {row['context_load_cold_ms']:>10.2f} "
+            f"{row['context_load_warm_ms']:>10.2f} {row['context_build_ms']:>9.2f} "
+            f"{row['prompt_render_ms']:>8.2f} {row['compile_story_ms']:>9.2f} "
+            f"{row['story_words']:>8}"
+        )
+    print("times in ms for the last scene of the story (median of --repeat runs)")
+
+
+if __name__ == "__main__":
+    main()
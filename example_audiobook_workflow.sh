@@ -44,39 +44,16 @@ echo
 echo "Step 2: Generate audio files from SSML..."
 echo
 
-# Step 2: Generate audio files
+# Step 2: Generate audio files, then join them into chapter and book files
 nix develop -c python generate_audiobook.py \
     --output-dir audiobook_output \
-    --format mp3
-
-echo
-echo "Step 3: (Optional) Concatenate audio files..."
-echo
-
-# Check if ffmpeg is available
-if command -v ffmpeg &> /dev/null; then
-    read -p "Do you want to concatenate all scenes into one audiobook? (y/n): " concat_choice
-    
-    if [ "$concat_choice" = "y" ] || [ "$concat_choice" = "Y" ]; then
-        cd audiobook_output/scenes
-        
-        # Create file list
-        ls *.mp3 | sort > filelist.txt
-        
-        # Concatenate files
-        echo "Concatenating audio files..."
-        ffmpeg -f concat -safe 0 -i filelist.txt -c copy ../full_audiobook.mp3
-        
-        echo "Full audiobook created: audiobook_output/full_audiobook.mp3"
-        cd ../..
-    fi
-else
-    echo "ffmpeg not found. To concatenate audio files, install ffmpeg."
-fi
+    --format mp3 \
+    --concatenate
 
 echo
 echo "=== Audiobook generation complete! ==="
-echo "Audio files are in: audiobook_output/scenes/"
+echo "Audio files are in: audiobook_output/<story title>/"
+echo "Chapter files are in its chapters/ folder, the full book in book/"
 echo
 echo "Next steps:"
 echo "1. Listen to the generated audio files"
@@ -7,17 +7,29 @@ audio files using Azure Cognitive Services Speech SDK.
 """
 
 import argparse
+import hashlib
 import os
 import sys
-import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import azure.cognitiveservices.speech as speechsdk
 from dotenv import load_dotenv
 
-from storyteller_lib.database.models import StoryDatabase
-from storyteller_lib.logger import get_logger
-from storyteller_lib.ssml_repair import SSMLRepair
+from storyteller_lib.audiobook.audio.concat import Section, concatenate_audio
+from storyteller_lib.audiobook.ssml.repair import SSMLRepair
+from storyteller_lib.audiobook.voice.azure_tts import (
+    TTS_CACHE_DIR,
+    TTS_WORKERS,
+    AdaptiveRateLimiter,
+    AudioCache,
+    ReusableSynthesizer,
+    link_or_copy,
+)
+from storyteller_lib.core.logger import get_logger
+from storyteller_lib.persistence.models import StoryDatabase
 
 logger = get_logger(__name__)
 
@@ -61,11 +73,22 @@ else:
     logger.warning("Azure SDK installation not found in site packages")
 
 
+def _ssml_hash(ssml: str) -> str:
+    """Hash the SSML a scene's audio is synthesized from."""
+    return hashlib.sha256(ssml.encode()).hexdigest()
+
+
 class AudiobookGenerator:
     """Generates audiobook files from SSML content using Azure TTS."""
 
     def __init__(
-        self, speech_key: str, speech_region: str, db_path: str, output_dir: str
+        self,
+        speech_key: str,
+        speech_region: str,
+        db_path: str,
+        output_dir: str,
+        workers: int = TTS_WORKERS,
+        cache_dir: str = TTS_CACHE_DIR,
     ):
         """
         Initialize the audiobook generator.
@@ -75,14 +98,30 @@ class AudiobookGenerator:
             speech_region: Azure Speech Service region
             db_path: Path to the story database
             output_dir: Directory for output audio files
+            workers: Number of scenes synthesized concurrently
+            cache_dir: Directory of the content-addressed audio cache
         """
         self.speech_key = speech_key
         self.speech_region = speech_region
         self.db = StoryDatabase(db_path)
+        self.workers = max(1, workers)
+
+        # Shared by all workers; the synthesizer is rebuilt when the voice
+        # or output format changes
+        self.limiter = AdaptiveRateLimiter(self.workers)
+        self._synthesizer: ReusableSynthesizer | None = None
+        self._synthesizer_format: str | None = None
+        self._repair_module: SSMLRepair | None = None
+        self._lock = threading.Lock()
+
+        # Scenes are rebuilt only when their SSML, voice or format changed
+        self.audio_cache = AudioCache(Path(cache_dir))
+        self.build_counts: Counter[str] = Counter()
 
         # Get story title and create output directory
         story_config = self.db.get_story_config()
         story_title = story_config.get("title", "Untitled Story")
+        self.story_title = story_title
         # Clean title for folder name (remove special characters)
         clean_title = "".join(
             c for c in story_title if c.isalnum() or c in (" ", "-", "_")
@@ -125,15 +164,43 @@ class AudiobookGenerator:
             # English voices (default)
             self.speech_config.speech_synthesis_voice_name = "en-US-JennyNeural"
 
+        self._synthesizer = None
         logger.info(f"Using voice: {self.speech_config.speech_synthesis_voice_name}")
 
+    def _get_synthesizer(self, format: str) -> ReusableSynthesizer:
+        """Get the synthesizer for an output format, shared by all workers."""
+        with self._lock:
+            if self._synthesizer is None or self._synthesizer_format != format:
+                self.speech_config.set_speech_synthesis_output_format(
+                    speechsdk.SpeechSynthesisOutputFormat.Audio24Khz96KBitRateMonoMp3
+                    if format.lower() == "mp3"
+                    else speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm
+                )
+                self._synthesizer = ReusableSynthesizer(
+                    self.speech_config, self.limiter
+                )
+                self._synthesizer_format = format
+            return self._synthesizer
+
+    def _get_repair_module(self) -> SSMLRepair:
+        """Get the SSML repair module, created on first use."""
+        with self._lock:
+            if self._repair_module is None:
+                self._repair_module = SSMLRepair(db_path=self.db.db_path)
+            return self._repair_module
+
     def _create_audio_filename(
-        self, chapter_num: int, scene_num: int, chapter_title: str, format: str = "mp3"
+        self,
+        chapter_num: int,
+        scene_num: int | None,
+        chapter_title: str,
+        format: str = "mp3",
     ) -> str:
         """Create a standardized filename for audio files.
 
         Format: 03-04-chapter_title.mp3
-        where 03 is chapter number, 04 is scene number
+        where 03 is chapter number, 04 is scene number (omitted for the
+        chapter file when scene_num is None)
         """
         # Clean chapter title for filename (remove special characters)
         clean_title = "".join(
@@ -141,6 +208,8 @@ class AudiobookGenerator:
         ).strip()
         clean_title = clean_title.replace(" ", "_").lower()
 
+        if scene_num is None:
+            return f"{chapter_num:02d}-{clean_title}.{format}"
         return f"{chapter_num:02d}-{scene_num:02d}-{clean_title}.{format}"
 
     def _fix_ssml_language(self, ssml: str) -> str:
@@ -156,12 +225,18 @@ class AudiobookGenerator:
 
         return ssml
 
-    def _should_regenerate_audio(self, output_path: Path) -> bool:
+    def _should_regenerate_audio(
+        self, scene_id: int, output_path: Path, ssml: str, voice: str, format: str
+    ) -> bool:
         """
         Check if audio file needs to be regenerated.
 
         Args:
+            scene_id: Database scene ID
             output_path: Path to the audio file
+            ssml: The SSML the scene would be synthesized from
+            voice: The synthesis voice
+            format: Audio format (mp3, wav)
 
         Returns:
             True if file should be regenerated, False if it can be skipped
@@ -175,11 +250,50 @@ class AudiobookGenerator:
             logger.warning(f"Found 0-byte file: {output_path.name} - will regenerate")
             return True
 
+        build = self.db.get_scene_audio(scene_id)
+        if build is None:
+            # Generated before builds were recorded; assume it is current
+            logger.info(f"Recording existing audio file: {output_path.name}")
+            self._record_build(scene_id, ssml, voice, format, output_path)
+            return False
+
+        changes = [
+            name
+            for name, recorded, current in [
+                ("SSML", build["ssml_hash"], _ssml_hash(ssml)),
+                ("voice", build["voice"], voice),
+                ("format", build["output_format"], format),
+                ("file", build["audio_path"], str(output_path)),
+            ]
+            if recorded != current
+        ]
+        if changes:
+            logger.info(f"{', '.join(changes)} changed for {output_path.name}")
+            return True
+
         logger.info(
-            f"Skipping existing audio file: {output_path.name} ({file_size / 1024:.1f} KB)"
+            f"Skipping up-to-date audio file: {output_path.name} ({file_size / 1024:.1f} KB)"
         )
         return False
 
+    def _record_build(
+        self, scene_id: int, ssml: str, voice: str, format: str, output_path: Path
+    ) -> None:
+        """Record what a scene's audio file was built from."""
+        self.db.save_scene_audio(
+            scene_id,
+            _ssml_hash(ssml),
+            voice,
+            format,
+            str(output_path),
+            output_path.stat().st_size,
+        )
+
+    def _count(self, outcome: str) -> None:
+        """Count a scene build outcome."""
+        with self._lock:
+            self.build_counts[outcome] += 1
+
     def _get_lang_code(self) -> str:
         """Get the appropriate language code for SSML."""
         if self.language == "german":
@@ -208,7 +322,7 @@ class AudiobookGenerator:
             chapter_title: Chapter title for filename
             content_ssml: SSML-formatted content
             format: Audio format (mp3, wav)
-            force_regenerate: Force regeneration even if file exists
+            force_regenerate: Force regeneration even if the audio is up to date
             max_repair_attempts: Maximum number of repair attempts
 
         Returns:
@@ -218,13 +332,27 @@ class AudiobookGenerator:
             chapter_num, scene_num, chapter_title, format
         )
         output_path = self.output_dir / filename
-
-        # Check if we should skip this file
-        if not force_regenerate and not self._should_regenerate_audio(output_path):
-            return str(output_path)
-
-        # Initialize SSML repair module
-        repair_module = SSMLRepair(db_path=self.db.db_path)
+        voice = self.speech_config.speech_synthesis_voice_name
+        ssml = self._fix_ssml_language(content_ssml)
+
+        if not force_regenerate:
+            # Skip scenes whose SSML, voice and format are unchanged
+            if not self._should_regenerate_audio(
+                scene_id, output_path, ssml, voice, format
+            ):
+                self._count("up_to_date")
+                return str(output_path)
+
+            # Reuse audio synthesized earlier from the same content
+            cached_file = self.audio_cache.get_cached_file(ssml, voice, format)
+            if cached_file:
+                link_or_copy(cached_file, output_path)
+                self._record_build(scene_id, ssml, voice, format, output_path)
+                self._count("cached")
+                logger.info(f"Reused cached audio for {filename}")
+                return str(output_path)
+
+        synthesizer = self._get_synthesizer(format)
 
         # Try synthesis with repair loop
         current_ssml = content_ssml
@@ -234,34 +362,20 @@ class AudiobookGenerator:
             current_ssml = self._fix_ssml_language(current_ssml)
 
             try:
-                # Configure audio output
-                if format.lower() == "mp3":
-                    audio_config = speechsdk.audio.AudioOutputConfig(
-                        filename=str(output_path), use_default_speaker=False
-                    )
-                    self.speech_config.set_speech_synthesis_output_format(
-                        speechsdk.SpeechSynthesisOutputFormat.Audio24Khz96KBitRateMonoMp3
-                    )
-                else:  # WAV format
-                    audio_config = speechsdk.audio.AudioOutputConfig(
-                        filename=str(output_path), use_default_speaker=False
-                    )
-                    self.speech_config.set_speech_synthesis_output_format(
-                        speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm
-                    )
-
-                # Create synthesizer
-                synthesizer = speechsdk.SpeechSynthesizer(
-                    speech_config=self.speech_config, audio_config=audio_config
-                )
-
-                # Synthesize SSML
+                # Synthesize SSML (throttled requests are retried inside)
                 logger.debug(
                     f"Starting synthesis for scene {scene_id}, attempt {attempt + 1}"
                 )
-                result = synthesizer.speak_ssml_async(current_ssml).get()
+                result = synthesizer.synthesize(current_ssml, output_path)
 
                 if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+                    self.audio_cache.save_to_cache(
+                        current_ssml, voice, output_path, format
+                    )
+                    self._record_build(
+                        scene_id, current_ssml, voice, format, output_path
+                    )
+                    self._count("synthesized")
                     file_size = output_path.stat().st_size
                     logger.info(
                         f"Generated audio for Chapter {chapter_num}, Scene {scene_num}: "
@@ -292,7 +406,7 @@ class AudiobookGenerator:
                             )
 
                             # Repair SSML
-                            repaired_ssml = repair_module.repair_ssml(
+                            repaired_ssml = self._get_repair_module().repair_ssml(
                                 scene_id=scene_id,
                                 original_ssml=current_ssml,
                                 error_message=error_details,
@@ -324,7 +438,7 @@ class AudiobookGenerator:
                             f"Attempting SSML repair after exception, attempt {attempt + 1}/{max_repair_attempts}"
                         )
 
-                        repaired_ssml = repair_module.repair_ssml(
+                        repaired_ssml = self._get_repair_module().repair_ssml(
                             scene_id=scene_id,
                             original_ssml=current_ssml,
                             error_message=error_msg,
@@ -485,25 +599,25 @@ class AudiobookGenerator:
             )
 
             scenes = cursor.fetchall()
-            total_scenes = len(scenes)
 
-            if total_scenes == 0:
-                logger.warning("No scenes with SSML content found in database")
-                print("No scenes with SSML content found. Run SSML conversion first.")
-                return []
+        total_scenes = len(scenes)
 
-            print(f"\nGenerating audio for {total_scenes} scenes...")
-            print("=" * 60)
+        if total_scenes == 0:
+            logger.warning("No scenes with SSML content found in database")
+            print("No scenes with SSML content found. Run SSML conversion first.")
+            return []
 
-            for idx, scene in enumerate(scenes, 1):
-                print(
-                    f"\n[{idx}/{total_scenes}] Chapter {scene['chapter_number']}, "
-                    f"Scene {scene['scene_number']}...",
-                    end="",
-                    flush=True,
-                )
+        print(
+            f"\nGenerating audio for {total_scenes} scenes "
+            f"({self.workers} concurrent)..."
+        )
+        print("=" * 60)
 
-                audio_path = self.generate_scene_audio(
+        # The rate limiter paces the requests; scenes are reported as they finish
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    self.generate_scene_audio,
                     scene_id=scene["id"],
                     chapter_num=scene["chapter_number"],
                     scene_num=scene["scene_number"],
@@ -511,50 +625,170 @@ class AudiobookGenerator:
                     content_ssml=scene["content_ssml"],
                     format=format,
                     force_regenerate=force_regenerate,
+                ): scene
+                for scene in scenes
+            }
+            for idx, future in enumerate(as_completed(futures), 1):
+                scene = futures[future]
+                try:
+                    audio_path = future.result()
+                except Exception as e:
+                    logger.error(f"Error generating audio for scene {scene['id']}: {e}")
+                    audio_path = None
+
+                status = " ✓" if audio_path else " ✗ Failed"
+                print(
+                    f"[{idx}/{total_scenes}] Chapter {scene['chapter_number']}, "
+                    f"Scene {scene['scene_number']}...{status}",
+                    flush=True,
                 )
-
                 if audio_path:
                     generated_files.append(audio_path)
-                    print(" ✓")
-                else:
-                    print(" ✗ Failed")
 
-                # Small delay to avoid rate limiting
-                if idx < total_scenes:
-                    time.sleep(0.5)
+        # Keep the files in reading order
+        generated_files.sort()
 
         print("\n" + "=" * 60)
         print(
             f"Audio generation complete: {len(generated_files)}/{total_scenes} successful"
         )
+        print(
+            f"Synthesized: {self.build_counts['synthesized']}, "
+            f"reused from cache: {self.build_counts['cached']}, "
+            f"up to date: {self.build_counts['up_to_date']}"
+        )
+        self.audio_cache.evict()
+        if self.limiter.throttle_count:
+            print(f"Throttled requests retried: {self.limiter.throttle_count}")
 
         return generated_files
 
+    def _chapter_label(self, chapter_num: int, chapter_title: str) -> str:
+        """Name a chapter for markers and metadata."""
+        word = "Kapitel" if self.language == "german" else "Chapter"
+        return f"{word} {chapter_num}: {chapter_title}"
+
+    def _get_chapter_audio_files(self, format: str) -> list[tuple[int, str, list[str]]]:
+        """
+        Find the generated scene audio files of each chapter.
+
+        Returns:
+            Chapter number, title and scene files in reading order, for the
+            chapters with at least one generated scene
+        """
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT s.scene_number, c.chapter_number, c.title as chapter_title
+                FROM scenes s
+                JOIN chapters c ON s.chapter_id = c.id
+                WHERE s.content_ssml IS NOT NULL
+                ORDER BY c.chapter_number, s.scene_number
+            """
+            )
+            scenes = cursor.fetchall()
+
+        chapters: dict[int, tuple[str, list[str]]] = {}
+        for scene in scenes:
+            path = self.output_dir / self._create_audio_filename(
+                scene["chapter_number"],
+                scene["scene_number"],
+                scene["chapter_title"],
+                format,
+            )
+            if not path.exists():
+                logger.warning(f"Missing scene audio, not joined: {path.name}")
+                continue
+            chapters.setdefault(scene["chapter_number"], (scene["chapter_title"], []))[
+                1
+            ].append(str(path))
+
+        return [(num, title, files) for num, (title, files) in chapters.items()]
+
     def concatenate_chapter_audio(
-        self, chapter_num: int, scene_files: list[str], format: str = "mp3"
+        self,
+        chapter_num: int,
+        scene_files: list[str],
+        format: str = "mp3",
+        chapter_title: str = "",
     ) -> str | None:
         """
         Concatenate scene audio files into a single chapter file.
 
-        Note: This is a placeholder. Actual implementation would require
-        audio processing library like pydub or ffmpeg.
+        The files are joined without decoding (see
+        storyteller_lib.audiobook.audio.concat), with a pause between scenes.
 
         Args:
             chapter_num: Chapter number
             scene_files: List of scene audio file paths
             format: Output format
+            chapter_title: Chapter title for the filename and metadata
 
         Returns:
             Path to concatenated chapter audio or None
         """
-        # TODO: Implement audio concatenation
-        # This would require additional dependencies like pydub or ffmpeg-python
-        logger.warning(
-            "Chapter concatenation not yet implemented. "
-            "Consider using ffmpeg command line tool to merge scene files."
+        chapters_dir = self.output_dir / "chapters"
+        chapters_dir.mkdir(exist_ok=True)
+        output_path = chapters_dir / self._create_audio_filename(
+            chapter_num, None, chapter_title, format
         )
+        label = self._chapter_label(chapter_num, chapter_title)
 
-        return None
+        try:
+            concatenate_audio(
+                [Section(label, [Path(f) for f in scene_files])], output_path, label
+            )
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to join chapter {chapter_num}: {e}")
+            return None
+
+        return str(output_path)
+
+    def concatenate_book(self, format: str = "mp3") -> str | None:
+        """
+        Join the scene audio into chapter files and one book file.
+
+        The book file has a chapter marker at the start of each chapter.
+
+        Args:
+            format: Audio format (mp3, wav)
+
+        Returns:
+            Path to the book audio or None if failed
+        """
+        chapters = self._get_chapter_audio_files(format)
+        if not chapters:
+            print("No scene audio files to join. Generate the scene audio first.")
+            return None
+
+        print(f"\nJoining {len(chapters)} chapters...")
+        for chapter_num, chapter_title, scene_files in chapters:
+            chapter_path = self.concatenate_chapter_audio(
+                chapter_num, scene_files, format, chapter_title
+            )
+            status = "✓" if chapter_path else "✗ Failed"
+            print(f"Chapter {chapter_num} ({len(scene_files)} scenes) {status}")
+
+        book_dir = self.output_dir / "book"
+        book_dir.mkdir(exist_ok=True)
+        book_path = book_dir / f"{self.output_dir.name}.{format}"
+        try:
+            duration = concatenate_audio(
+                [
+                    Section(self._chapter_label(num, title), [Path(f) for f in files])
+                    for num, title, files in chapters
+                ],
+                book_path,
+                self.story_title,
+            )
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to join the book: {e}")
+            print(f"✗ Failed to join the book: {e}")
+            return None
+
+        print(f"Book: {book_path} ({duration / 60:.1f} minutes)")
+        return str(book_path)
 
     def get_statistics(self) -> dict[str, any]:
         """Get statistics about the audiobook generation."""
@@ -635,6 +869,29 @@ def main():
         help="Azure Speech Service region (or set SPEECH_REGION env var)",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=TTS_WORKERS,
+        help=(
+            "Scenes synthesized concurrently; backs off automatically when "
+            f"throttled (default: {TTS_WORKERS}, or set TTS_WORKERS)"
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=TTS_CACHE_DIR,
+        help=f"Directory of the shared audio cache (default: {TTS_CACHE_DIR})",
+    )
+
+    parser.add_argument(
+        "--concatenate",
+        action="store_true",
+        help="Also join the scene audio into chapter files and one book file with chapter markers",
+    )
+
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -650,7 +907,7 @@ def main():
     parser.add_argument(
         "--force-regenerate",
         action="store_true",
-        help="Force regeneration of all audio files, even if they already exist",
+        help="Force regeneration of all audio files, even if they are up to date",
     )
 
     args = parser.parse_args()
@@ -700,6 +957,8 @@ def main():
             speech_region=speech_region,
             db_path=args.db_path,
             output_dir=args.output_dir,
+            workers=args.workers,
+            cache_dir=args.cache_dir,
         )
 
         if args.stats:
@@ -749,6 +1008,9 @@ def main():
                     # Show final statistics
                     stats = generator.get_statistics()
                     print(f"\nTotal audio size: {stats['total_audio_size_mb']:.1f} MB")
+
+                    if args.concatenate:
+                        generator.concatenate_book(format=args.format)
                 else:
                     print("\n✗ No audio files were generated")
 
@@ -0,0 +1,492 @@
+#!/usr/bin/env python
+"""
+Generate a catalog of books in one batch.
+
+The job file has one JSON object per line, each describing one book:
+
+    {"job_id": "dragons-01", "genre": "fantasy", "tone": "epic", "pages": 120}
+
+Request files with ``title`` and ``body`` fields are accepted as well; the
+two make up the story idea of a job without an ``idea`` and are ignored
+when it has one.
+
+Every job runs in its own worker process with its own story database,
+checkpoints, log and output under ``<output-dir>/<job_id>/``, so a book that
+fails - or takes its process down - does not affect the others. The workers
+share the LLM response cache (SQLite in WAL mode) and one budget of
+concurrent LLM requests. Completed jobs are skipped when the batch is run
+again; failed jobs continue from their checkpoint.
+
+The script does not import storyteller_lib itself: the library reads its
+database paths when it is first imported, which each worker does only
+after pointing them at its job directory.
+"""
+
+# Standard library imports
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any
+
+# Third party imports
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "2"))
+BATCH_LLM_CONCURRENCY = int(os.environ.get("BATCH_LLM_CONCURRENCY", "8"))
+
+# Job fields and their defaults (the same as run_storyteller.py's options)
+JOB_DEFAULTS: dict[str, Any] = {
+    "genre": "fantasy",
+    "tone": "epic",
+    "author": "",
+    "language": None,
+    "idea": "",
+    "structure": "auto",
+    "pages": None,
+    "research_worldbuilding": False,
+    "model_provider": None,
+    "model": None,
+    "recursion_limit": None,
+}
+JOB_ID_FIELDS = ("job_id", "request_id", "id")
+# Fields joined into the idea of jobs that have none (e.g. request files)
+IDEA_FIELDS = ("title", "body")
+
+RESULT_FILE = "result.json"
+REPORT_FILE = "batch_report.json"
+
+
+def load_jobs(path: str) -> list[dict[str, Any]]:
+    """
+    Read and validate a job file.
+
+    Args:
+        path: JSONL file with one job per line (blank lines and # comments are skipped)
+
+    Returns:
+        Jobs with defaults filled in and a unique ``job_id``
+
+    Raises:
+        ValueError: If a line is not a valid job
+    """
+    jobs = []
+    seen: set[str] = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+            if not isinstance(entry, dict):
+                raise ValueError(f"{path}:{line_number}: a job must be a JSON object")
+
+            raw_id = next(
+                (entry.pop(f) for f in JOB_ID_FIELDS if f in entry),
+                f"job-{line_number:03d}",
+            )
+            # Consumed either way, so they never count as unknown fields
+            parts = [str(entry.pop(f)).strip() for f in IDEA_FIELDS if f in entry]
+            if not entry.get("idea") and any(parts):
+                entry["idea"] = "\n\n".join(part for part in parts if part)
+            unknown = set(entry) - set(JOB_DEFAULTS) - set(JOB_ID_FIELDS)
+            if unknown:
+                raise ValueError(
+                    f"{path}:{line_number}: unknown job fields: {', '.join(sorted(unknown))}"
+                )
+
+            job_id = sanitize_job_id(str(raw_id))
+            if job_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate job id '{job_id}'")
+            seen.add(job_id)
+            jobs.append({**JOB_DEFAULTS, **entry, "job_id": job_id})
+    return jobs
+
+
+def sanitize_job_id(job_id: str) -> str:
+    """Make a job ID usable as a directory name."""
+    job_id = re.sub(r"[^\w\-.]+", "_", job_id, flags=re.UNICODE).strip("._")
+    return job_id or "job"
+
+
+def read_result(job_dir: str) -> dict[str, Any] | None:
+    """Read the result a worker wrote for its job, if any."""
+    try:
+        with open(os.path.join(job_dir, RESULT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write JSON atomically so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def run_job(
+    job: dict[str, Any], job_dir: str, restart: bool, budget: Any, held: Any
+) -> None:
+    """
+    Worker process entry point: generate one book.
+
+    The outcome is written to ``result.json`` in the job directory; all
+    output of the process goes to ``job.log`` there.
+
+    Args:
+        job: Job from load_jobs
+        job_dir: Directory for the job's database, checkpoints and output
+        restart: Start from scratch even if the job has checkpoints
+        budget: Semaphore limiting concurrent LLM requests of all workers
+        held: Shared counter of the budget slots this worker holds
+    """
+    os.makedirs(job_dir, exist_ok=True)
+    log = open(os.path.join(job_dir, "job.log"), "a", buffering=1, encoding="utf-8")
+    os.dup2(log.fileno(), sys.stdout.fileno())
+    os.dup2(log.fileno(), sys.stderr.fileno())
+    sys.stdout.reconfigure(line_buffering=True)
+
+    start_time = time.time()
+    result: dict[str, Any] = {"job_id": job["job_id"], "status": "failed"}
+    print(f"=== Job {job['job_id']} started {time.ctime(start_time)} ===")
+
+    try:
+        # Point the library at this job before importing it
+        database_path = os.path.join(job_dir, "story_database.db")
+        checkpoint_path = os.path.join(job_dir, "story_checkpoints.db")
+        resume = not restart and os.path.exists(checkpoint_path)
+        if not resume:
+            for path in (database_path, checkpoint_path):
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(path + suffix):
+                        os.unlink(path + suffix)
+        os.environ["STORY_DATABASE_PATH"] = database_path
+        os.environ["STORY_CHECKPOINT_PATH"] = checkpoint_path
+        if job["model_provider"]:
+            os.environ["MODEL_PROVIDER"] = job["model_provider"]
+        if job["model"]:
+            os.environ["DEFAULT_MODEL"] = job["model"]
+
+        from storyteller_lib.core.logger import setup_logging
+
+        setup_logging(level="INFO", log_file=os.path.join(job_dir, "storyteller.log"))
+
+        from storyteller_lib.core.llm_engine import set_shared_concurrency_budget
+
+        set_shared_concurrency_budget(budget, held)
+
+        from storyteller_lib import reset_progress_tracking, set_progress_callback
+        from storyteller_lib.api.storyteller import (
+            generate_story_simplified,
+            new_thread_id,
+            resume_story_simplified,
+        )
+        from storyteller_lib.core.config import (
+            DEFAULT_LANGUAGE,
+            get_cache_stats,
+            setup_cache,
+        )
+        from storyteller_lib.persistence.database import get_db_manager
+        from storyteller_lib.utils.info import save_story_info
+
+        setup_cache(os.environ.get("CACHE_TYPE", "sqlite"))
+
+        # Node results reach the database through the progress callback
+        def save_progress(node_name: str, state: dict[str, Any]) -> None:
+            db_manager = get_db_manager()
+            if db_manager:
+                db_manager.save_node_state(node_name, state)
+
+        reset_progress_tracking()
+        set_progress_callback(save_progress)
+
+        recursion_limit = job["recursion_limit"] or int(
+            os.environ.get("LANGGRAPH_RECURSION_LIMIT", "200")
+        )
+        progress_log_path = os.path.join(job_dir, "progress.log")
+
+        if resume:
+            print("Resuming from checkpoint")
+            story, state = resume_story_simplified(
+                recursion_limit=recursion_limit, progress_log_path=progress_log_path
+            )
+        else:
+            story, state = generate_story_simplified(
+                genre=job["genre"],
+                tone=job["tone"],
+                author=job["author"],
+                language=job["language"] or DEFAULT_LANGUAGE,
+                initial_idea=job["idea"],
+                progress_log_path=progress_log_path,
+                narrative_structure=job["structure"],
+                target_pages=job["pages"],
+                recursion_limit=recursion_limit,
+                research_worldbuilding=job["research_worldbuilding"],
+                thread_id=new_thread_id(job["genre"], job["tone"]),
+            )
+
+        output_path = os.path.join(job_dir, "story.md")
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(story)
+        try:
+            save_story_info(state, output_path)
+        except Exception as info_err:
+            print(f"Error saving story information: {info_err}")
+
+        title = None
+        db_manager = get_db_manager()
+        if db_manager and db_manager._db:
+            try:
+                title = db_manager._db.get_story_config().get("title")
+            except Exception:
+                pass
+
+        cache_stats = get_cache_stats()
+        # A failed run returns the part of the story that was written
+        result.update(
+            {
+                "status": "completed" if state.get("completed") else "partial",
+                "resumed": resume,
+                "title": title,
+                "output": output_path,
+                "words": len(story.split()),
+                "chapters": sum(
+                    1 for line in story.splitlines() if line.startswith("## ")
+                ),
+                "cache_hit_rate": cache_stats.get("hit_rate"),
+            }
+        )
+        if result["status"] == "partial":
+            result["error"] = "Generation stopped early, see job.log"
+    except BaseException as e:
+        traceback.print_exc()
+        result.update({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        result["seconds"] = round(time.time() - start_time, 1)
+        _write_json(os.path.join(job_dir, RESULT_FILE), result)
+        print(f"=== Job {job['job_id']} {result['status']} ===")
+
+
+def run_batch(
+    jobs: list[dict[str, Any]],
+    output_dir: str,
+    workers: int = BATCH_WORKERS,
+    llm_budget: int = BATCH_LLM_CONCURRENCY,
+    timeout: float = 0,
+    force: bool = False,
+    restart: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Run jobs in parallel worker processes, one process per job.
+
+    Args:
+        jobs: Jobs from load_jobs
+        output_dir: Directory holding one subdirectory per job
+        workers: Maximum number of books generated at the same time
+        llm_budget: Maximum concurrent LLM requests across all workers
+        timeout: Seconds after which a job is stopped (0 = no limit)
+        force: Run jobs again that already completed
+        restart: Ignore the checkpoints of unfinished jobs and start them over
+
+    Returns:
+        One result per job, in job order
+    """
+    # Fresh interpreters: nothing from this process leaks into a job
+    context = multiprocessing.get_context("spawn")
+    budget = context.BoundedSemaphore(max(1, llm_budget))
+
+    results: dict[str, dict[str, Any]] = {}
+    pending = deque()
+    for job in jobs:
+        job_dir = os.path.join(output_dir, job["job_id"])
+        previous = read_result(job_dir)
+        if not force and previous and previous.get("status") == "completed":
+            results[job["job_id"]] = {**previous, "status": "skipped"}
+            print(f"[{job['job_id']}] already completed, skipping")
+        else:
+            pending.append((job, job_dir))
+
+    running: dict[int, tuple[dict[str, Any], str, Any, Any, float]] = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            job, job_dir = pending.popleft()
+            os.makedirs(job_dir, exist_ok=True)
+            # Discard the result of a previous run of this job
+            if os.path.exists(os.path.join(job_dir, RESULT_FILE)):
+                os.unlink(os.path.join(job_dir, RESULT_FILE))
+            held = context.Value("i", 0)
+            process = context.Process(
+                target=run_job,
+                args=(job, job_dir, restart or force, budget, held),
+                name=f"book-{job['job_id']}",
+            )
+            process.start()
+            running[process.sentinel] = (job, job_dir, process, held, time.time())
+            print(f"[{job['job_id']}] started (pid {process.pid})")
+
+        wait(list(running), timeout=5.0)
+
+        now = time.time()
+        for sentinel, (job, job_dir, process, held, started) in list(running.items()):
+            timed_out = timeout and now - started > timeout
+            if process.is_alive() and not timed_out:
+                continue
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            del running[sentinel]
+
+            # A worker that died mid-request cannot return its budget slots
+            for _ in range(held.value):
+                try:
+                    budget.release()
+                except ValueError:
+                    break
+
+            result = read_result(job_dir)
+            if result is None:
+                reason = (
+                    f"timed out after {timeout:.0f}s"
+                    if timed_out
+                    else f"worker exited with code {process.exitcode}"
+                )
+                result = {
+                    "job_id": job["job_id"],
+                    "status": "timeout" if timed_out else "crashed",
+                    "error": reason,
+                    "seconds": round(now - started, 1),
+                }
+                _write_json(os.path.join(job_dir, RESULT_FILE), result)
+            results[job["job_id"]] = result
+            print(f"[{job['job_id']}] {result['status']} in {result['seconds']:.0f}s")
+
+    return [results[job["job_id"]] for job in jobs]
+
+
+def print_summary(results: list[dict[str, Any]]) -> None:
+    """Print one line per job and the totals."""
+    print(f"\n{'Job':<24} {'Status':<10} {'Time':>8} {'Words':>8}  Title / Error")
+    for result in results:
+        detail = result.get("title") or ""
+        if result["status"] not in ("completed", "skipped"):
+            detail = result.get("error", "")
+        words = result.get("words")
+        print(
+            f"{result['job_id'][:24]:<24} {result['status']:<10} "
+            f"{result.get('seconds', 0):>7.0f}s "
+            f"{words if words is not None else '-':>8}  {detail[:60]}"
+        )
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print("\n" + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate several books in parallel from a JSONL job file"
+    )
+    parser.add_argument(
+        "jobs",
+        help="JSONL file with one job per line (fields: job_id, "
+        + ", ".join(JOB_DEFAULTS)
+        + ")",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="batch_output",
+        help="Directory for the per-job databases, logs and stories (default: batch_output)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BATCH_WORKERS,
+        help=f"Books generated at the same time (default: {BATCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--llm-budget",
+        type=int,
+        default=BATCH_LLM_CONCURRENCY,
+        help=f"Concurrent LLM requests across all workers (default: {BATCH_LLM_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=0,
+        help="Stop a job after this many seconds (default: no limit)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every job from scratch, including completed ones",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start unfinished jobs over instead of resuming their checkpoints",
+    )
+    args = parser.parse_args()
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+    if not jobs:
+        print(f"No jobs in {args.jobs}")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(
+        f"Running {len(jobs)} jobs with {args.workers} workers "
+        f"and an LLM budget of {args.llm_budget} concurrent requests"
+    )
+
+    start_time = time.time()
+    results = run_batch(
+        jobs,
+        args.output_dir,
+        workers=max(1, args.workers),
+        llm_budget=args.llm_budget,
+        timeout=args.timeout,
+        force=args.force,
+        restart=args.restart,
+    )
+
+    report_path = os.path.join(args.output_dir, REPORT_FILE)
+    _write_json(
+        report_path,
+        {
+            "job_file": os.path.abspath(args.jobs),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(start_time)),
+            "seconds": round(time.time() - start_time, 1),
+            "workers": args.workers,
+            "llm_budget": args.llm_budget,
+            "jobs": results,
+        },
+    )
+
+    print_summary(results)
+    print(f"Report saved to {report_path}")
+
+    if any(r["status"] not in ("completed", "skipped") for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
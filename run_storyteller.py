@@ -17,7 +17,11 @@ from dotenv import load_dotenv
 # Local imports
 from storyteller_lib import reset_progress_tracking, set_progress_callback
 from storyteller_lib.analysis.statistics import display_progress_report
-from storyteller_lib.api.storyteller import generate_story_simplified
+from storyteller_lib.api.storyteller import (
+    generate_story_simplified,
+    new_thread_id,
+    resume_story_simplified,
+)
 from storyteller_lib.core.config import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
 from storyteller_lib.core.logger import setup_logging
 from storyteller_lib.persistence.progress import (
@@ -1006,6 +1010,42 @@ def progress_callback(node_name: str, state: dict[str, Any]) -> None:
                 sys.stdout.flush()
 
 
+def report_tracing(tracer: Any, export_path: str | None) -> None:
+    """
+    Print a summary of the recorded spans and optionally export them.
+
+    Args:
+        tracer: The enabled tracer
+        export_path: Chrome trace JSON file to write, if any
+    """
+    from storyteller_lib.core.tracing import export_chrome_trace, summarize_telemetry
+
+    tracer.flush()
+    summary = summarize_telemetry(tracer.db_path, tracer.run_id)
+    kinds = summary.get("kinds", {})
+    if kinds:
+        print(f"Tracing ({summary['run_id']}, {summary['wall_seconds']:.0f}s):")
+        for kind in ("node", "llm", "db"):
+            if kind not in kinds:
+                continue
+            stats = kinds[kind]
+            line = f"  {kind}: {stats['count']} spans, {stats['seconds']:.1f}s"
+            if kind == "llm":
+                line += (
+                    f", {stats['prompt_tokens']} prompt / "
+                    f"{stats['completion_tokens']} completion tokens, "
+                    f"{stats['cache_hits']} cache hits"
+                )
+            slowest = ", ".join(
+                f"{entry['name']} {entry['seconds']:.1f}s"
+                for entry in stats["names"][:3]
+            )
+            print(f"{line}; slowest: {slowest}")
+    if export_path:
+        count = export_chrome_trace(tracer.db_path, export_path, tracer.run_id)
+        print(f"Trace with {count} spans written to {export_path}")
+
+
 def get_story_title_from_db() -> str | None:
     """Get the story title from the database."""
     try:
@@ -1143,14 +1183,49 @@ def main() -> None:
         action="store_true",
         help="Use web research to create more authentic world building (requires TAVILY_API_KEY)",
     )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        nargs="?",
+        const="latest",
+        metavar="THREAD_ID",
+        help="Resume an interrupted story from its checkpoint (default: the most recent one)",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record per-node, per-LLM-call and per-query spans in the telemetry table",
+    )
+    parser.add_argument(
+        "--trace-export",
+        type=str,
+        metavar="PATH",
+        help="Write the run's spans as Chrome trace JSON to PATH (implies --trace)",
+    )
+    parser.add_argument(
+        "--cost-report",
+        action="store_true",
+        help="Show the LLM token and cost ledger of the existing story and exit",
+    )
     args = parser.parse_args()
 
+    if args.cost_report:
+        from storyteller_lib.analysis.statistics import display_cost_report
+        from storyteller_lib.core.config import DATABASE_PATH
+        from storyteller_lib.persistence.database import initialize_db_manager
+
+        if not os.path.exists(DATABASE_PATH):
+            print(f"Error: No story database found at {DATABASE_PATH}")
+            return
+        display_cost_report(initialize_db_manager(DATABASE_PATH))
+        return
+
     # Import config to check API keys
 
     # Check if API key is set for the selected provider
     provider = args.model_provider
     api_key_env = MODEL_CONFIGS[provider]["env_key"]
-    if not os.environ.get(api_key_env):
+    if api_key_env and not os.environ.get(api_key_env):
         print(
             f"Error: {api_key_env} environment variable is not set for the {provider} provider."
         )
@@ -1165,6 +1240,9 @@ def main() -> None:
         print("Get your API key at: https://app.tavily.com/")
         return
 
+    # LLM instances are created lazily and read the provider from the environment
+    os.environ["MODEL_PROVIDER"] = provider
+
     # Create progress manager
     global progress_manager
     progress_manager = create_progress_manager(
@@ -1188,6 +1266,13 @@ def main() -> None:
 
     print(f"Database persistence: {DATABASE_PATH}")
 
+    # Record spans if requested (or enabled via STORY_TRACING)
+    from storyteller_lib.core.tracing import get_tracer
+
+    tracer = get_tracer()
+    if (args.trace or args.trace_export) and not tracer.enabled:
+        tracer.enable()
+
     # Handle SSML conversion for existing story (if audio-book flag is set without generating new story)
     if args.audio_book and not any([args.genre, args.tone, args.idea]):
         # User wants to convert existing story to audiobook
@@ -1233,14 +1318,17 @@ def main() -> None:
             return
 
     try:
-        # Single story mode - always starts fresh
-
-        # Delete existing database to ensure a fresh start
+        # Single story mode - starts fresh unless resuming
         from storyteller_lib.core.config import DATABASE_PATH
 
-        if os.path.exists(DATABASE_PATH):
-            os.unlink(DATABASE_PATH)
-            print("Removed existing database to start fresh")
+        if not args.resume:
+            # Delete existing database and checkpoints to ensure a fresh start
+            from storyteller_lib.persistence.checkpoint import remove_checkpoints
+
+            if os.path.exists(DATABASE_PATH):
+                os.unlink(DATABASE_PATH)
+                print("Removed existing database to start fresh")
+            remove_checkpoints()
 
         # Reinitialize database manager with fresh database
         from storyteller_lib.persistence.database import initialize_db_manager
@@ -1261,9 +1349,12 @@ def main() -> None:
         provider_config = MODEL_CONFIGS[args.model_provider]
         model_name = args.model or provider_config["default_model"]
 
-        print(
-            f"Generating a {args.tone} {args.genre} story{author_str}{language_str}..."
-        )
+        if args.resume:
+            print(f"Resuming story from {DATABASE_PATH}...")
+        else:
+            print(
+                f"Generating a {args.tone} {args.genre} story{author_str}{language_str}..."
+            )
         print(f"Using {args.model_provider.upper()} model: {model_name}")
         print("This will take some time. Progress updates will be displayed below:")
 
@@ -1283,23 +1374,61 @@ def main() -> None:
             # Get recursion limit from environment
             recursion_limit = int(os.environ.get("LANGGRAPH_RECURSION_LIMIT", "200"))
 
-            story, state = generate_story_simplified(
-                genre=args.genre,
-                tone=args.tone,
-                author=args.author,
-                initial_idea=args.idea,
-                language=args.language,
-                progress_log_path=args.progress_log,
-                narrative_structure=args.structure,
-                target_pages=args.pages,
-                recursion_limit=recursion_limit,
-                research_worldbuilding=args.research_worldbuilding,
-            )
+            if args.resume:
+                story, state = resume_story_simplified(
+                    thread_id=None if args.resume == "latest" else args.resume,
+                    recursion_limit=recursion_limit,
+                    progress_log_path=args.progress_log,
+                )
+            else:
+                thread_id = new_thread_id(args.genre, args.tone)
+                print(
+                    f"Checkpoint thread: {thread_id} (resume with --resume {thread_id})"
+                )
+                story, state = generate_story_simplified(
+                    genre=args.genre,
+                    tone=args.tone,
+                    author=args.author,
+                    initial_idea=args.idea,
+                    language=args.language,
+                    progress_log_path=args.progress_log,
+                    narrative_structure=args.structure,
+                    target_pages=args.pages,
+                    recursion_limit=recursion_limit,
+                    research_worldbuilding=args.research_worldbuilding,
+                    thread_id=thread_id,
+                )
 
             # Show completion message
             elapsed_str = progress_manager.state.get_elapsed_time()
             print(f"[{elapsed_str}] Story generation complete!")
 
+            # Report how effective the LLM cache was for this run
+            from storyteller_lib.core.config import get_cache_stats
+
+            cache_stats = get_cache_stats()
+            if cache_stats:
+                print(
+                    f"LLM cache: {cache_stats['hit_rate']:.0%} hit rate "
+                    f"({cache_stats['memory_hits']} memory, "
+                    f"{cache_stats['disk_hits']} disk, {cache_stats['misses']} misses), "
+                    f"{cache_stats['disk_entries']} entries / "
+                    f"{cache_stats['disk_bytes'] / 1024 / 1024:.1f} MB on disk"
+                )
+
+            # Report what the run's LLM requests cost
+            from storyteller_lib.core.ledger import get_usage_ledger
+
+            ledger = get_usage_ledger()
+            if ledger:
+                usage = ledger.totals()
+                print(
+                    f"LLM cost: ${usage['cost_usd']:.4f} ({usage['requests']} requests, "
+                    f"{usage['input_tokens']:,} input / {usage['output_tokens']:,} output tokens), "
+                    f"${usage['saved_usd']:.4f} saved by the cache "
+                    "(details: --cost-report)"
+                )
+
             # If using default output filename, try to use the story title
             if args.output == "story.md":
                 story_title = get_story_title_from_db()
@@ -1344,6 +1473,10 @@ def main() -> None:
             except Exception as recovery_err:
                 print(f"Could not recover partial story: {str(recovery_err)}")
 
+        # Report where the time went, also for a failed run
+        if tracer.enabled:
+            report_tracing(tracer, args.trace_export)
+
         # Ensure we have a story to save
         if story is None:
             print("No story was generated. Please check the error messages above.")
@@ -41,8 +41,13 @@ def track_progress(node_func: Callable) -> Callable:
             _node_counts[node_name] = 0
         _node_counts[node_name] += 1
 
-        # Execute the node function
-        result = node_func(state)
+        # Execute the node function, recording a span if tracing is enabled
+        # and attributing its LLM requests in the usage ledger
+        from storyteller_lib.core.ledger import ledger_node
+        from storyteller_lib.core.tracing import trace_node
+
+        with trace_node(node_name), ledger_node(node_name, state):
+            result = node_func(state)
 
         # Report progress if callback is set
         if _progress_callback:
@@ -85,12 +90,32 @@ def reset_progress_tracking() -> None:
     _node_counts = {}
 
 
-# Export public API - maintain backward compatibility
-from storyteller_lib.api.storyteller import generate_story_simplified as generate_story
-from storyteller_lib.output.corrections.scene import (
-    correct_scene,
-    correct_scene_with_validation,
-)
+# Export public API - maintain backward compatibility. The exports are
+# resolved on first access so that importing a submodule (e.g. for the
+# statistics report) does not load the whole workflow and its LLM stack.
+_LAZY_EXPORTS = {
+    "generate_story": (
+        "storyteller_lib.api.storyteller",
+        "generate_story_simplified",
+    ),
+    "correct_scene": ("storyteller_lib.output.corrections.scene", "correct_scene"),
+    "correct_scene_with_validation": (
+        "storyteller_lib.output.corrections.scene",
+        "correct_scene_with_validation",
+    ),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        module_name, attribute = _LAZY_EXPORTS[name]
+        value = getattr(importlib.import_module(module_name), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "generate_story",
@@ -56,6 +56,61 @@ class SceneConsistencyCheck(BaseModel):
     )
 
 
+# Most relevant world elements given to the consistency check
+MAX_WORLD_ELEMENTS = 30
+
+
+def _relevant_world_elements(
+    db: Any, scene_content: str, language: str
+) -> dict[str, dict[str, str]]:
+    """
+    Get the world elements that share the most words with a scene.
+
+    The full-text index ranks the elements by the scene's content words, so
+    the check no longer reads every element into the prompt. Without the
+    index, for languages written without spaces, or when nothing matches,
+    all elements are used.
+
+    Args:
+        db: The StoryDatabase
+        scene_content: The scene text
+        language: Language of the scene
+
+    Returns:
+        Element values by category and key
+    """
+    from storyteller_lib.analysis.ngrams import STOPWORDS, tokenize
+
+    rows: list[dict[str, Any]] = []
+    if db.fts_enabled and language not in ("japanese", "chinese"):
+        stopwords = STOPWORDS.get(language, frozenset())
+        words = {
+            word
+            for word in map(str.lower, tokenize(scene_content, language))
+            if len(word) > 2 and word not in stopwords
+        }
+        rows = db.search(
+            "world_elements", " ".join(sorted(words)), MAX_WORLD_ELEMENTS, "any"
+        )
+    if not rows:
+        with db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT category, element_key, element_value
+                FROM world_elements
+            """
+            )
+            rows = cursor.fetchall()
+
+    world_elements: dict[str, dict[str, str]] = {}
+    for row in rows:
+        world_elements.setdefault(row["category"], {})[row["element_key"]] = row[
+            "element_value"
+        ]
+    return world_elements
+
+
 def check_scene_consistency(
     state: StoryState, scene_content: str = None, language: str = DEFAULT_LANGUAGE
 ) -> dict[str, Any]:
@@ -115,23 +170,12 @@ def check_scene_consistency(
                     ),
                 }
 
-    # Get world elements from database
+    # Get the world elements the scene touches
     world_elements = {}
     if db_manager and db_manager._db:
-        with db_manager._db._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT category, element_key, element_value
-                FROM world_elements
-            """
-            )
-            for row in cursor.fetchall():
-                if row["category"] not in world_elements:
-                    world_elements[row["category"]] = {}
-                world_elements[row["category"]][row["element_key"]] = row[
-                    "element_value"
-                ]
+        world_elements = _relevant_world_elements(
+            db_manager._db, scene_content, language
+        )
 
     # Get previous events
     previous_events = []
@@ -0,0 +1,421 @@
+"""
+StoryCraft Agent - Local n-gram repetition engine.
+
+Finds repetition in prose without an LLM: the text is tokenized, repeated
+word n-grams within sentences are counted with stopword filtering for the
+story language, overused words are found with a sliding window over each
+scene, and word pairs recurring across scenes (or paragraphs) are counted
+as themes. The result has the shape of the LLM repetition analysis, with
+empty alternatives.
+
+Languages written without spaces (Japanese, Chinese) are tokenized by
+character. Languages without a stopword list are analyzed without
+stopword filtering.
+"""
+
+# Standard library imports
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any
+
+# Local imports
+from storyteller_lib.core.config import DEFAULT_LANGUAGE
+
+# Phrase lengths in words (characters for character-tokenized languages)
+MIN_PHRASE_WORDS = 3
+MAX_PHRASE_WORDS = 8
+MIN_PHRASE_CHARS = 4
+MAX_PHRASE_CHARS = 12
+
+# Occurrences before a phrase is repetitive; longer phrases stand out sooner
+MIN_SHORT_PHRASE_COUNT = 3
+MIN_LONG_PHRASE_COUNT = 2
+
+# A word used again within this many words of its last use is a close repeat
+PROXIMITY_WINDOW = 120
+MIN_CLOSE_REPEATS = 2
+MIN_WORD_LENGTH = 4
+
+# Share of scenes (paragraphs for a single scene) a theme must recur in
+MIN_THEME_SEGMENTS = 3
+MIN_THEME_SHARE = 0.25
+
+# Elements reported per category
+MAX_ELEMENTS = 10
+
+_WORD = re.compile(r"\w+(?:['’]\w+)*")
+_CHARACTER = re.compile(r"[^\W\d_]")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"[.!?;…。！？；\n]+")
+
+_CHARACTER_LANGUAGES = {"japanese", "chinese"}
+
+# Languages whose nouns are capitalized, so capitalization does not mark names
+_CAPITALIZED_NOUN_LANGUAGES = {"german"}
+
+STOPWORDS: dict[str, frozenset[str]] = {
+    "english": frozenset(
+        """a about above after again against all also am an and any are as at
+        back be because been before being below between both but by can could
+        did do does doing down during each even ever few for from further had
+        has have having he her here hers herself him himself his how i if in
+        into is it its itself just like me more most much must my myself no
+        nor not now of off on once one only or other our ours ourselves out
+        over own same she should so some still such than that the their
+        theirs them themselves then there these they this those through to
+        too under until up upon us very was we were what when where which
+        while who whom why will with would yet you your yours yourself
+        yourselves said says don't didn't wasn't couldn't won't can't it's
+        i'm he's she's that's there's""".split()
+    ),
+    "german": frozenset(
+        """aber alle allem allen aller alles als also am an ander andere auch
+        auf aus bei bin bis bist da damit dann das dass dein deine dem den
+        denn der des dich dir doch dort du durch ein eine einem einen einer
+        eines er es etwas euch euer für gegen gewesen hab habe haben hat hatte
+        hatten hier hin hinter ich ihm ihn ihnen ihr ihre ihrem ihren ihrer
+        im in indem ins ist ja jede jedem jeden jeder jetzt kann kein keine
+        können konnte man manche mein meine mich mir mit muss musste nach
+        nicht nichts noch nun nur ob oder ohne sehr sein seine seinem seinen
+        seiner sich sie sind so solche soll sollte sondern über um und uns
+        unser unter viel vom von vor war waren warst was weil welche wenn wer
+        werde werden wie wieder will wir wird wo wollen wollte würde zu zum
+        zur zwischen sagte""".split()
+    ),
+    "spanish": frozenset(
+        """a al algo algunos ante antes como con contra cual cuando de del
+        desde donde durante e el ella ellas ellos en entre era eran es esa
+        esas ese eso esos esta estaba estas este esto estos fue fueron ha
+        había han hasta hay la las le les lo los más me mi mis mucho muy nada
+        ni no nos nosotros o os otra otro para pero poco por porque que quien
+        se sea ser si sin sobre su sus también te tenía tiene todo tu tus un
+        una uno unos y ya yo dijo""".split()
+    ),
+    "french": frozenset(
+        """à au aux avec avait avoir c ce cela ces cet cette comme d dans de
+        des du elle elles en est et été être eu il ils j je l la le les leur
+        leurs lui m ma mais me même mes moi mon n ne nos notre nous on ou où
+        par pas plus pour qu que qui s sa sans se ses si son sont sur t ta te
+        tes toi ton tout très tu un une vers vos votre vous y était étaient
+        dit""".split()
+    ),
+    "italian": frozenset(
+        """a ad al alla alle agli ai anche che chi ci come con così da dal
+        dalla dei del della delle di e è ed era erano essere gli ha hanno ho
+        i il in io la le lei li lo loro lui ma mi mia mio ne nei nel nella
+        noi non o per più quando quella quello questa questo se si sono su
+        sua suo tra tu un una uno voi disse""".split()
+    ),
+    "portuguese": frozenset(
+        """a ao aos as até com como da das de dela dele do dos e é ela elas
+        ele eles em entre era eram essa esse esta este eu foi for há isso já
+        lhe mais mas me meu minha muito na nas não nem no nos o os ou para
+        pela pelo por quando que quem se sem seu sua são também te tem tinha
+        um uma você disse""".split()
+    ),
+    "japanese": frozenset("のにはをがでとてたしもなかれるだいうこそあ"),
+    "chinese": frozenset("的了是在我他她你们这那不一有和也就都人着说上个"),
+}
+
+# Subject words that start a character's mannerism ("she ran a hand ...")
+SUBJECT_WORDS: dict[str, frozenset[str]] = {
+    "english": frozenset({"he", "she", "they", "i", "we", "his", "her", "their"}),
+    "german": frozenset({"er", "sie", "ich", "wir", "sein", "seine", "ihre"}),
+    "spanish": frozenset({"él", "ella", "ellos", "ellas", "yo", "su", "sus"}),
+    "french": frozenset({"il", "elle", "ils", "elles", "je", "sa", "son", "ses"}),
+    "italian": frozenset({"lui", "lei", "loro", "io", "sua", "suo"}),
+    "portuguese": frozenset({"ele", "ela", "eles", "elas", "eu", "sua", "seu"}),
+}
+
+
+def tokenize(text: str, language: str = DEFAULT_LANGUAGE) -> list[str]:
+    """
+    Split text into words, or characters for languages written without spaces.
+
+    Args:
+        text: The text to tokenize
+        language: The language of the text
+
+    Returns:
+        The words of the text in their original case
+    """
+    if language in _CHARACTER_LANGUAGES:
+        return _CHARACTER.findall(text)
+    return _WORD.findall(text)
+
+
+def element_pattern(element: str, language: str = DEFAULT_LANGUAGE) -> re.Pattern:
+    """
+    Build a pattern matching a reported element where it occurs in the text.
+
+    Elements are lowercased tokens joined by spaces (nothing for languages
+    written without spaces), while the text may have other case and
+    punctuation between the tokens, e.g. "she said, quietly".
+
+    Args:
+        element: A phrase, word or theme from analyze_repetition
+        language: The language of the text
+
+    Returns:
+        A case-insensitive pattern for the element
+    """
+    tokens = [re.escape(token) for token in tokenize(element, language)]
+    if language in _CHARACTER_LANGUAGES:
+        return re.compile(r"[\W\d_]*".join(tokens), re.IGNORECASE)
+    return re.compile(r"(?<!\w)" + r"\W+".join(tokens) + r"(?!\w)", re.IGNORECASE)
+
+
+def _repeated_ngrams(
+    segments: list[list[str]], min_n: int, max_n: int
+) -> dict[tuple[str, ...], int]:
+    """
+    Count every n-gram of min_n to max_n tokens that occurs more than once.
+
+    Longer n-grams are only counted where their prefix repeats, so the work
+    shrinks quickly with n.
+
+    Returns:
+        Occurrences of each repeated n-gram
+    """
+    # The shortest n-grams are counted in C; only repeated ones are extended
+    counts: Counter[tuple[str, ...]] = Counter()
+    for tokens in segments:
+        counts.update(zip(*(tokens[k:] for k in range(min_n)), strict=False))
+    repeated = {gram: count for gram, count in counts.items() if count > 1}
+    candidates = [
+        (s, i)
+        for s, tokens in enumerate(segments)
+        for i, gram in enumerate(zip(*(tokens[k:] for k in range(min_n)), strict=False))
+        if gram in repeated
+    ]
+
+    for n in range(min_n + 1, max_n + 1):
+        grams = [
+            (s, i, tuple(segments[s][i : i + n]))
+            for s, i in candidates
+            if i + n <= len(segments[s])
+        ]
+        counts = Counter(gram for _, _, gram in grams)
+        candidates = [(s, i) for s, i, gram in grams if counts[gram] > 1]
+        if not candidates:
+            break
+        repeated.update((gram, count) for gram, count in counts.items() if count > 1)
+    return repeated
+
+
+def _close_repeats(positions: list[int], window: int) -> int:
+    """Count the uses of a word within window tokens of its previous use."""
+    return sum(
+        1 for a, b in zip(positions, positions[1:], strict=False) if b - a <= window
+    )
+
+
+def _element(element: str, occurrences: int) -> dict[str, Any]:
+    return {"element": element, "occurrences": occurrences, "alternatives": []}
+
+
+def analyze_repetition(
+    text: str | list[str], language: str = DEFAULT_LANGUAGE
+) -> dict[str, Any]:
+    """
+    Detect repeated phrases, overused words, mannerisms and themes.
+
+    Args:
+        text: The text to analyze, or the scenes of a story to also count
+            repetition across scenes
+        language: The language of the text
+
+    Returns:
+        A dictionary in the shape of the repetition analysis, with empty
+        alternatives
+    """
+    language = (language or DEFAULT_LANGUAGE).lower()
+    if isinstance(text, str):
+        scenes = [text]
+        # Themes of a single scene are ideas restated across its paragraphs
+        theme_texts = [p for p in _PARAGRAPH.split(text) if p.strip()]
+    else:
+        scenes = [scene for scene in text if scene and scene.strip()]
+        theme_texts = scenes
+
+    stopwords = STOPWORDS.get(language, frozenset())
+    subjects = SUBJECT_WORDS.get(language, frozenset())
+    by_character = language in _CHARACTER_LANGUAGES
+    joiner = "" if by_character else " "
+
+    # Phrases are counted within sentences, everything else within scenes
+    sentences = [
+        [tokenize(sentence, language) for sentence in _SENTENCE.split(scene)]
+        for scene in scenes
+    ]
+    words = [[w for sentence in scene for w in sentence] for scene in sentences]
+    segments = [[word.lower() for word in scene_words] for scene_words in words]
+
+    # Words never written in lowercase are mostly character and place names
+    names: set[str] = set()
+    if not by_character and language not in _CAPITALIZED_NOUN_LANGUAGES:
+        lowercase = {w for scene_words in words for w in scene_words if w.islower()}
+        names = {t for tokens in segments for t in tokens} - lowercase - stopwords
+
+    total_tokens = sum(len(tokens) for tokens in segments)
+    if not total_tokens:
+        return {
+            "repetitive_phrases": [],
+            "repetitive_descriptions": [],
+            "repetitive_character_traits": [],
+            "repetitive_themes": [],
+            "overall_repetition_score": 10,
+            "recommendations": [],
+        }
+
+    word_counts = Counter(token for tokens in segments for token in tokens)
+    content_words = {
+        token for token in word_counts if token not in stopwords and not token.isdigit()
+    }
+
+    # Repeated phrases, split into mannerisms (starting with a character)
+    # and other phrases
+    min_n, max_n = (
+        (MIN_PHRASE_CHARS, MAX_PHRASE_CHARS)
+        if by_character
+        else (MIN_PHRASE_WORDS, MAX_PHRASE_WORDS)
+    )
+    phrases = []
+    sentence_tokens = [
+        [word.lower() for word in sentence]
+        for scene in sentences
+        for sentence in scene
+        if len(sentence) >= min_n
+    ]
+    for gram, count in _repeated_ngrams(sentence_tokens, min_n, max_n).items():
+        if count < (
+            MIN_SHORT_PHRASE_COUNT if len(gram) == min_n else MIN_LONG_PHRASE_COUNT
+        ):
+            continue
+        if gram[-1] not in content_words:
+            continue
+        content = sum(1 for token in gram if token in content_words)
+        if content < 2:
+            continue
+        phrases.append((gram, count, (count - 1) * content))
+
+    # Drop phrases that only occur as part of a longer repeated phrase
+    phrases.sort(key=lambda p: len(p[0]), reverse=True)
+    kept: list[tuple[tuple[str, ...], int, int]] = []
+    covered: dict[tuple[str, ...], int] = {}
+    for gram, count, weight in phrases:
+        if covered.get(gram, 0) >= count:
+            continue
+        kept.append((gram, count, weight))
+        for size in range(min_n, len(gram)):
+            for start in range(len(gram) - size + 1):
+                part = gram[start : start + size]
+                covered[part] = max(covered.get(part, 0), count)
+
+    traits = []
+    other_phrases = []
+    for phrase in kept:
+        first = phrase[0][0]
+        (traits if first in subjects or first in names else other_phrases).append(
+            phrase
+        )
+    phrase_penalty = sum(weight for _, _, weight in kept)
+
+    # Words used again and again within a few sentences
+    close_repeats: Counter[str] = Counter()
+    if not by_character:
+        descriptive = {
+            token for token in content_words - names if len(token) >= MIN_WORD_LENGTH
+        }
+        for tokens in segments:
+            positions: dict[str, list[int]] = defaultdict(list)
+            for i, token in enumerate(tokens):
+                if token in descriptive:
+                    positions[token].append(i)
+            for token, token_positions in positions.items():
+                close = _close_repeats(token_positions, PROXIMITY_WINDOW)
+                if close >= MIN_CLOSE_REPEATS:
+                    close_repeats[token] += close
+    descriptions = [
+        (token, word_counts[token], close) for token, close in close_repeats.items()
+    ]
+    description_penalty = sum(close_repeats.values())
+
+    # Word pairs recurring across scenes (or the paragraphs of one scene)
+    themes = []
+    if not by_character and len(theme_texts) >= MIN_THEME_SEGMENTS:
+        min_segments = max(
+            MIN_THEME_SEGMENTS, math.ceil(MIN_THEME_SHARE * len(theme_texts))
+        )
+        themeable = content_words - names
+        theme_segments: Counter[tuple[str, str]] = Counter()
+        theme_counts: Counter[tuple[str, str]] = Counter()
+        theme_tokens = (
+            segments
+            if theme_texts is scenes
+            else [[w.lower() for w in tokenize(t, language)] for t in theme_texts]
+        )
+        for tokens in theme_tokens:
+            pairs = [
+                pair
+                for pair in zip(tokens, tokens[1:], strict=False)
+                if pair[0] in themeable and pair[1] in themeable
+            ]
+            theme_counts.update(pairs)
+            theme_segments.update(set(pairs))
+        reported = {
+            gram[i : i + 2] for gram, _, _ in kept for i in range(len(gram) - 1)
+        }
+        themes = [
+            (" ".join(pair), theme_counts[pair], segment_count)
+            for pair, segment_count in theme_segments.items()
+            if segment_count >= min_segments and pair not in reported
+        ]
+
+    # Score by repetitions per thousand words; 10 means no repetition
+    penalty = (phrase_penalty + 0.25 * description_penalty) / total_tokens * 1000
+    score = max(1, min(10, round(10 - penalty / 4)))
+
+    def top(items, weight_index):
+        return sorted(items, key=lambda item: item[weight_index], reverse=True)[
+            :MAX_ELEMENTS
+        ]
+
+    analysis = {
+        "repetitive_phrases": [
+            _element(joiner.join(gram), count)
+            for gram, count, _ in top(other_phrases, 2)
+        ],
+        "repetitive_descriptions": [
+            _element(token, count) for token, count, _ in top(descriptions, 2)
+        ],
+        "repetitive_character_traits": [
+            _element(joiner.join(gram), count) for gram, count, _ in top(traits, 2)
+        ],
+        "repetitive_themes": [
+            _element(element, count) for element, count, _ in top(themes, 2)
+        ],
+        "overall_repetition_score": score,
+    }
+    analysis["recommendations"] = _recommendations(analysis)
+    return analysis
+
+
+def _recommendations(analysis: dict[str, Any]) -> list[str]:
+    """Turn the most repeated element of each category into advice."""
+    advice = {
+        "repetitive_phrases": 'Reword repeated phrases such as "{element}" '
+        "({occurrences} times) so each use reads fresh",
+        "repetitive_descriptions": 'Vary descriptive words like "{element}", '
+        "which recurs within a few sentences",
+        "repetitive_character_traits": "Show characters through new gestures and "
+        'actions instead of repeating "{element}" ({occurrences} times)',
+        "repetitive_themes": 'Restate recurring ideas like "{element}" only when '
+        "it moves the story forward",
+    }
+    return [
+        template.format(**analysis[category][0])
+        for category, template in advice.items()
+        if analysis[category]
+    ]
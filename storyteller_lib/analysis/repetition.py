@@ -9,88 +9,115 @@ from typing import Any
 
 from langchain_core.messages import HumanMessage
 
+from storyteller_lib.analysis.ngrams import analyze_repetition, element_pattern
 from storyteller_lib.core.config import DEFAULT_LANGUAGE, llm
 from storyteller_lib.core.models import StoryState
 
+REPETITION_CATEGORIES = {
+    "repetitive_phrases": "phrase",
+    "repetitive_descriptions": "description",
+    "repetitive_character_traits": "character mannerism",
+    "repetitive_themes": "theme",
+}
 
-def detect_repetition(text: str, language: str = DEFAULT_LANGUAGE) -> dict[str, Any]:
+# Characters of text shown around an element when asking for alternatives
+ALTERNATIVES_CONTEXT_CHARS = 150
+
+
+def detect_repetition(
+    text: str | list[str], language: str = DEFAULT_LANGUAGE
+) -> dict[str, Any]:
     """
     Detect repetitive phrases, descriptions, and themes in text.
 
+    The repetition is found locally by the n-gram engine; the LLM is only
+    asked for alternatives when something repetitive was found.
+
     Args:
-        text: The text to analyze
+        text: The text to analyze, or the scenes of a story to also count
+            repetition across scenes
         language: The language for analysis
 
     Returns:
         A dictionary with repetition analysis results
     """
-    # Use template system
-    from storyteller_lib.prompts.renderer import render_prompt
+    repetition_analysis = analyze_repetition(text, language)
+    if any(repetition_analysis[category] for category in REPETITION_CATEGORIES):
+        full_text = text if isinstance(text, str) else "\n\n".join(text)
+        suggest_alternatives(repetition_analysis, full_text, language)
+    return repetition_analysis
 
-    # Render the repetition detection prompt
-    prompt = render_prompt("repetition_detection", language=language, text=text)
 
-    try:
-        # Define Pydantic models for structured output
+def suggest_alternatives(
+    repetition_analysis: dict[str, Any], text: str, language: str = DEFAULT_LANGUAGE
+) -> None:
+    """
+    Fill in the alternatives of the repetitive elements with one LLM request.
 
-        from pydantic import BaseModel, Field
+    Args:
+        repetition_analysis: The repetition analysis to complete in place
+        text: The analyzed text, for the context of each element
+        language: The language for the alternatives
+    """
+    from pydantic import BaseModel, Field
 
-        class RepetitiveElement(BaseModel):
-            """A repetitive element in the text."""
+    from storyteller_lib.prompts.renderer import render_prompt
 
-            element: str = Field(
-                description="The repeated phrase, description, or theme"
-            )
-            occurrences: int = Field(description="Number of times it appears")
-            alternatives: list[str] = Field(
-                default_factory=list, description="Suggested alternatives for variation"
-            )
+    class ElementAlternatives(BaseModel):
+        """Alternatives for one repetitive element."""
 
-        class RepetitionAnalysis(BaseModel):
-            """Analysis of repetition in text."""
+        element: str = Field(description="The repetitive element, as given")
+        alternatives: list[str] = Field(
+            default_factory=list, description="Suggested alternatives for variation"
+        )
 
-            repetitive_phrases: list[RepetitiveElement] = Field(
-                default_factory=list, description="Repeated phrases or expressions"
-            )
-            repetitive_descriptions: list[RepetitiveElement] = Field(
-                default_factory=list, description="Overused descriptive elements"
-            )
-            repetitive_character_traits: list[RepetitiveElement] = Field(
-                default_factory=list,
-                description="Redundant character traits or mannerisms",
-            )
-            repetitive_themes: list[RepetitiveElement] = Field(
-                default_factory=list, description="Repetitive thematic statements"
-            )
-            overall_repetition_score: int = Field(
-                ge=1,
-                le=10,
-                description="Overall repetition score (1=highly repetitive, 10=excellent variation)",
-            )
-            recommendations: list[str] = Field(
-                default_factory=list,
-                description="General recommendations for reducing repetition",
+    class RepetitionAlternatives(BaseModel):
+        """Alternatives for the repetitive elements of a text."""
+
+        elements: list[ElementAlternatives] = Field(default_factory=list)
+
+    language = (language or DEFAULT_LANGUAGE).lower()
+    elements = []
+    for category, element_type in REPETITION_CATEGORIES.items():
+        for element in repetition_analysis[category]:
+            match = element_pattern(element["element"], language).search(text)
+            index = match.start() if match else 0
+            start = max(index - ALTERNATIVES_CONTEXT_CHARS, 0)
+            elements.append(
+                {
+                    "element": element["element"],
+                    "type": element_type,
+                    "occurrences": element["occurrences"],
+                    "context": " ".join(
+                        text[start : index + ALTERNATIVES_CONTEXT_CHARS].split()
+                    ),
+                }
             )
 
-        # Create a structured LLM that outputs a RepetitionAnalysis
-        structured_llm = llm.with_structured_output(RepetitionAnalysis)
-
-        # Use the structured LLM to detect repetition
-        repetition_analysis = structured_llm.invoke(prompt)
-
-        # Convert Pydantic model to dictionary
-        return repetition_analysis.dict()
+    prompt = render_prompt(
+        "repetition_alternatives", language=language, elements=elements
+    )
 
+    try:
+        structured_llm = llm.with_structured_output(RepetitionAlternatives)
+        suggestions = structured_llm.invoke(prompt)
     except Exception as e:
-        print(f"Error detecting repetition: {str(e)}")
-        return {
-            "repetitive_phrases": [],
-            "repetitive_descriptions": [],
-            "repetitive_character_traits": [],
-            "repetitive_themes": [],
-            "overall_repetition_score": 5,
-            "recommendations": ["Error detecting repetition"],
-        }
+        print(f"Error suggesting alternatives: {str(e)}")
+        return
+
+    # Match suggestions by element, falling back to the numbered order
+    by_element = {
+        suggestion.element.strip().lower(): suggestion.alternatives
+        for suggestion in suggestions.elements
+    }
+    index = 0
+    for category in REPETITION_CATEGORIES:
+        for element in repetition_analysis[category]:
+            if element["element"] in by_element:
+                element["alternatives"] = by_element[element["element"]]
+            elif index < len(suggestions.elements):
+                element["alternatives"] = suggestions.elements[index].alternatives
+            index += 1
 
 
 def reduce_repetition(
@@ -184,14 +211,16 @@ def track_story_repetition(state: StoryState) -> dict[str, Any]:
     chapters = state["chapters"]
 
     # Collect all scene content
-    all_content = ""
+    scenes = []
     for _chapter_num, chapter in chapters.items():
         for _scene_num, scene in chapter["scenes"].items():
             if "content" in scene:
-                all_content += scene["content"] + "\n\n"
+                scenes.append(scene["content"])
 
-    # Analyze repetition across the story
-    repetition_analysis = detect_repetition(all_content)
+    # Analyze repetition within and across the scenes of the story
+    repetition_analysis = detect_repetition(
+        scenes, state.get("language", DEFAULT_LANGUAGE)
+    )
 
     return {"story_repetition_analysis": repetition_analysis}
 
@@ -279,3 +279,147 @@ def display_progress_report(db_manager=None) -> None:
         print(report)
     except Exception as e:
         print(f"[Warning] Could not generate progress report: {e}")
+
+
+def calculate_cost_stats(db_manager=None) -> dict:
+    """
+    Aggregate the LLM usage ledger of the story.
+
+    Args:
+        db_manager: The story database manager
+
+    Returns:
+        Dict with the totals and the usage per scene, per node and per model
+    """
+    if not db_manager or not getattr(db_manager, "_db", None):
+        return {}
+
+    columns = """COUNT(*) AS requests,
+        COALESCE(SUM(input_tokens), 0) AS input_tokens,
+        COALESCE(SUM(output_tokens), 0) AS output_tokens,
+        COALESCE(SUM(cache_hit), 0) AS cache_hits,
+        COALESCE(SUM(cost_usd), 0) AS cost_usd,
+        COALESCE(SUM(saved_usd), 0) AS saved_usd,
+        COALESCE(SUM(tokens_estimated), 0) AS estimated,
+        COALESCE(SUM(cost_usd IS NULL), 0) AS unpriced"""
+
+    with db_manager._db._get_connection() as conn:
+        totals = dict(conn.execute(f"SELECT {columns} FROM llm_usage").fetchone())
+        per_scene = [
+            dict(row)
+            for row in conn.execute(
+                f"""SELECT chapter_number, scene_number, {columns}
+                FROM llm_usage
+                WHERE chapter_number IS NOT NULL AND scene_number IS NOT NULL
+                GROUP BY chapter_number, scene_number
+                ORDER BY chapter_number, scene_number"""
+            )
+        ]
+        setup = dict(
+            conn.execute(
+                f"""SELECT {columns} FROM llm_usage
+                WHERE chapter_number IS NULL OR scene_number IS NULL"""
+            ).fetchone()
+        )
+        per_node = [
+            dict(row)
+            for row in conn.execute(
+                f"""SELECT COALESCE(node, '(outside nodes)') AS node, {columns}
+                FROM llm_usage GROUP BY node ORDER BY cost_usd DESC, requests DESC"""
+            )
+        ]
+        per_model = [
+            dict(row)
+            for row in conn.execute(
+                f"""SELECT model, {columns}
+                FROM llm_usage GROUP BY model ORDER BY cost_usd DESC"""
+            )
+        ]
+
+    return {
+        "totals": totals,
+        "setup": setup,
+        "per_scene": per_scene,
+        "per_node": per_node,
+        "per_model": per_model,
+    }
+
+
+def format_cost_report(stats: dict) -> str:
+    """
+    Format the LLM usage ledger into a readable cost report.
+
+    Args:
+        stats: Dictionary from calculate_cost_stats
+
+    Returns:
+        Formatted cost report string
+    """
+    totals = stats.get("totals") or {}
+    if not totals.get("requests"):
+        return "\nNo LLM requests recorded for this story.\n"
+
+    def usage(row: dict) -> str:
+        return (
+            f"{row['requests']:>5} requests, {row['input_tokens']:>9,} in / "
+            f"{row['output_tokens']:>8,} out tokens, ${row['cost_usd']:>8.4f}"
+        )
+
+    report = []
+    report.append("\n" + "=" * 60)
+    report.append("💰 LLM COST REPORT")
+    report.append("=" * 60)
+
+    report.append("\n📊 Totals:")
+    report.append(f"  • {usage(totals)}")
+    lookups = totals["requests"]
+    report.append(
+        f"  • Cache: {totals['cache_hits']} hits "
+        f"({totals['cache_hits'] / lookups:.0%}), ${totals['saved_usd']:.4f} saved"
+    )
+    if totals["estimated"]:
+        report.append(
+            f"  • {totals['estimated']} requests without provider token counts "
+            "(estimated from text length)"
+        )
+    if totals["unpriced"]:
+        report.append(f"  • {totals['unpriced']} requests to models without a price")
+
+    report.append("\n🧩 Per Node:")
+    for row in stats["per_node"]:
+        saved = f", ${row['saved_usd']:.4f} saved" if row["cache_hits"] else ""
+        report.append(f"  • {row['node']:<36} {usage(row)}{saved}")
+
+    report.append("\n🤖 Per Model:")
+    for row in stats["per_model"]:
+        report.append(f"  • {row['model']:<36} {usage(row)}")
+
+    report.append("\n📖 Per Scene:")
+    if stats["setup"]["requests"]:
+        report.append(f"  • {'Story setup':<12} {usage(stats['setup'])}")
+    for row in stats["per_scene"]:
+        position = f"Ch {row['chapter_number']}, Sc {row['scene_number']}"
+        report.append(f"  • {position:<12} {usage(row)}")
+    if stats["per_scene"]:
+        scene_costs = [row["cost_usd"] for row in stats["per_scene"]]
+        report.append(
+            f"  • Average per scene: ${sum(scene_costs) / len(scene_costs):.4f}"
+        )
+
+    report.append("=" * 60 + "\n")
+
+    return "\n".join(report)
+
+
+def display_cost_report(db_manager=None) -> None:
+    """Calculate and display the LLM cost report to stdout."""
+    try:
+        from storyteller_lib.core.ledger import get_usage_ledger
+
+        # Include requests of this process not written yet
+        ledger = get_usage_ledger()
+        if ledger:
+            ledger.flush()
+        print(format_cost_report(calculate_cost_stats(db_manager)))
+    except Exception as e:
+        print(f"[Warning] Could not generate cost report: {e}")
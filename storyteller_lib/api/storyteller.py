@@ -5,14 +5,31 @@ This provides the main entry point for story generation with reduced complexity.
 
 import time
 
+from storyteller_lib.core.exceptions import DatabaseError
 from storyteller_lib.core.logger import get_logger
 from storyteller_lib.core.models import StoryState
+from storyteller_lib.persistence.checkpoint import latest_thread_id, open_checkpointer
 from storyteller_lib.persistence.database import get_db_manager
+from storyteller_lib.persistence.models import DatabaseStateAdapter
 from storyteller_lib.workflow.graph import create_simplified_graph
 
 logger = get_logger(__name__)
 
 
+def new_thread_id(genre: str, tone: str) -> str:
+    """
+    Create the checkpoint thread ID for a new story.
+
+    Args:
+        genre: Story genre
+        tone: Story tone
+
+    Returns:
+        Thread ID to pass to generate_story_simplified and resume_story_simplified
+    """
+    return f"story_{genre}_{tone}_{int(time.time())}"
+
+
 def generate_story_simplified(
     genre: str,
     tone: str,
@@ -28,6 +45,8 @@ def generate_story_simplified(
     target_pages: int | None = None,
     recursion_limit: int = 200,
     research_worldbuilding: bool = False,
+    thread_id: str | None = None,
+    callbacks: list | None = None,
 ) -> tuple[str, StoryState]:
     """
     Generate a story using the simplified workflow.
@@ -47,6 +66,8 @@ def generate_story_simplified(
         target_pages: Target number of pages for the story (None = auto-determine based on complexity)
         recursion_limit: Maximum recursion depth for the LangGraph workflow (default: 200)
         research_worldbuilding: Enable research-driven world building (requires TAVILY_API_KEY)
+        thread_id: Checkpoint thread ID (default: generated with new_thread_id)
+        callbacks: Optional LangChain callback handlers for the graph run
 
     Returns:
         Tuple of (compiled story markdown, final state)
@@ -109,53 +130,177 @@ def generate_story_simplified(
         )
         logger.info("Initialized story configuration in database")
 
-    # Create and run the simplified graph
-    graph = create_simplified_graph()
+    # Create and run the simplified graph, checkpointing every step
+    with open_checkpointer() as checkpointer:
+        graph = create_simplified_graph(checkpointer)
 
-    # Configure with recursion limit
-    config = {
-        "recursion_limit": recursion_limit,  # Use the provided recursion limit
-        "configurable": {"thread_id": f"story_{genre}_{tone}_{int(time.time())}"},
-    }
+        # Configure with recursion limit
+        thread_id = thread_id or new_thread_id(genre, tone)
+        config = {
+            "recursion_limit": recursion_limit,  # Use the provided recursion limit
+            "configurable": {"thread_id": thread_id},
+        }
+        if callbacks:
+            config["callbacks"] = callbacks
+        logger.info(f"Checkpoint thread: {thread_id}")
 
-    try:
-        # Run the graph
-        logger.info("Executing simplified story generation graph...")
-        result = graph.invoke(initial_state, config)
-
-        # Get the compiled story
-        db_manager = get_db_manager()
-        if db_manager:
-            story = db_manager.compile_story()
+        try:
+            # Run the graph
+            logger.info("Executing simplified story generation graph...")
+            result = graph.invoke(initial_state, config)
+            return _compile_story(result, start_time), result
+
+        except Exception as e:
+            logger.error(
+                f"Error during simplified story generation: {str(e)}", exc_info=True
+            )
+
+            # Try to recover partial story
+            try:
+                db_manager = get_db_manager()
+                if db_manager:
+                    partial_story = db_manager.compile_story()
+                    if partial_story:
+                        logger.info("Partial story recovered from database")
+                        return partial_story, initial_state
+            except Exception as recovery_error:
+                logger.error(f"Failed to recover partial story: {str(recovery_error)}")
+
+            raise
+
+
+def resume_story_simplified(
+    thread_id: str | None = None,
+    recursion_limit: int = 200,
+    progress_log_path: str | None = None,
+) -> tuple[str, StoryState]:
+    """
+    Continue an interrupted story from its checkpoint.
+
+    The graph continues from the last completed step of the thread. If the
+    thread has no checkpoint, or the story database is behind it, the
+    state is rehydrated from the database with DatabaseStateAdapter and
+    generation continues at the first unfinished scene. Either way, work
+    already stored is not regenerated.
+
+    Args:
+        thread_id: Checkpoint thread ID (default: the most recent thread)
+        recursion_limit: Maximum recursion depth for the LangGraph workflow
+        progress_log_path: Optional path for progress log file
+
+    Returns:
+        Tuple of (compiled story markdown, final state)
+
+    Raises:
+        ValueError: If there is nothing to resume, or neither a checkpoint
+            nor the plan of the next scene is stored
+    """
+    start_time = time.time()
+
+    if progress_log_path:
+        from storyteller_lib.utils.progress_logger import initialize_progress_logger
+
+        initialize_progress_logger(progress_log_path)
+
+    db_manager = get_db_manager()
+    if not db_manager or not db_manager._db:
+        raise ValueError("Story database not available - cannot resume")
+    adapter = DatabaseStateAdapter(db_manager._db)
+
+    with open_checkpointer() as checkpointer:
+        thread_id = thread_id or latest_thread_id(checkpointer)
+        if not thread_id:
+            # No checkpoints at all; continue the story in the database
+            try:
+                story_config = db_manager._db.get_story_config()
+            except DatabaseError as e:
+                raise ValueError("No story found to resume") from e
+            thread_id = new_thread_id(story_config["genre"], story_config["tone"])
+
+        graph = create_simplified_graph(checkpointer)
+        config = {
+            "recursion_limit": recursion_limit,
+            "configurable": {"thread_id": thread_id},
+        }
+        db_position = adapter.resume_position()
+
+        snapshot = graph.get_state(config)
+        checkpoint_state = snapshot.values
+        if not checkpoint_state:
+            # No checkpoint: rebuild the working state from the database
+            logger.info(f"No checkpoint for {thread_id}; rehydrating from database")
+            state = adapter.load_from_database()
+            if not state["chapters"]:
+                raise ValueError(
+                    "The story has no planned chapters yet and no checkpoint - "
+                    "start a new story instead"
+                )
+            # Without the plan, scenes would be written without their
+            # characters and plot progressions (and without any plans, the
+            # scenes still to write are unknown)
+            if not adapter.has_scene_plan(*(db_position or ())):
+                raise ValueError(
+                    "There is no checkpoint and the scene plans are not stored "
+                    "in the database - the story cannot be resumed"
+                )
+            graph.update_state(
+                config, state, as_node="advance_to_next_scene_or_chapter"
+            )
+        elif _is_behind(db_position, checkpoint_state):
+            # Writes after db_position were lost; rewind to the database
+            logger.info(
+                f"Database is behind checkpoint {thread_id}; "
+                f"continuing from Chapter {db_position[0]}, Scene {db_position[1]}"
+            )
+            graph.update_state(
+                config,
+                {
+                    "current_chapter": str(db_position[0]),
+                    "current_scene": str(db_position[1]),
+                    "completed": False,
+                },
+                as_node="advance_to_next_scene_or_chapter",
+            )
+        elif not snapshot.next:
+            logger.info(f"Story {thread_id} already completed")
+            return _compile_story(checkpoint_state, start_time), checkpoint_state
         else:
-            story = result.get("compiled_story", "")
+            logger.info(f"Resuming {thread_id} before {', '.join(snapshot.next)}")
+
+        result = graph.invoke(None, config)
+        return _compile_story(result, start_time), result
 
-        elapsed_time = time.time() - start_time
-        logger.info(f"Story generation completed in {elapsed_time:.2f} seconds")
 
-        # Log statistics
-        word_count = len(story.split())
-        logger.info(
-            f"Generated story statistics: {word_count} words, "
-            f"{len(result.get('chapters', {}))} chapters"
+def _is_behind(db_position: tuple[int, int] | None, state: StoryState) -> bool:
+    """Check whether the database is at an earlier scene than the checkpoint."""
+    if db_position is None:
+        return False
+    try:
+        checkpoint_position = (
+            int(state.get("current_chapter")),
+            int(state.get("current_scene")),
         )
+    except (TypeError, ValueError):
+        # Checkpoint is still in story setup, before any scene
+        return False
+    return db_position < checkpoint_position
 
-        return story, result
 
-    except Exception as e:
-        logger.error(
-            f"Error during simplified story generation: {str(e)}", exc_info=True
-        )
+def _compile_story(result: StoryState, start_time: float) -> str:
+    """Compile the finished story from the database and log statistics."""
+    db_manager = get_db_manager()
+    if db_manager:
+        story = db_manager.compile_story()
+    else:
+        story = result.get("compiled_story", "")
 
-        # Try to recover partial story
-        try:
-            db_manager = get_db_manager()
-            if db_manager:
-                partial_story = db_manager.compile_story()
-                if partial_story:
-                    logger.info("Partial story recovered from database")
-                    return partial_story, initial_state
-        except Exception as recovery_error:
-            logger.error(f"Failed to recover partial story: {str(recovery_error)}")
-
-        raise
+    elapsed_time = time.time() - start_time
+    logger.info(f"Story generation completed in {elapsed_time:.2f} seconds")
+
+    # Log statistics
+    word_count = len(story.split())
+    logger.info(
+        f"Generated story statistics: {word_count} words, "
+        f"{len(result.get('chapters', {}))} chapters"
+    )
+    return story
@@ -0,0 +1,538 @@
+"""
+Concatenation of scene audio into chapter and book files without decoding.
+
+MP3 files are joined at the frame level: ID3 tags and Xing/Info/VBRI
+header frames are stripped from each input and the frames are copied as
+they are. Gaps are filled with silent frames that have the stream's
+parameters and empty side information. WAV files are joined by merging
+their data chunks behind a single RIFF header, with gaps of zero samples.
+
+Section starts (chapters in a book) are written as markers: ID3v2.4
+CHAP/CTOC frames for MP3, and a cue chunk with labels for WAV.
+
+Each input is first scanned to find its audio byte range and duration,
+then copied in fixed-size blocks. Memory use stays constant however long
+the book is.
+"""
+
+# Standard library imports
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+# Local imports
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Silence between the scenes of a chapter and between chapters, in seconds
+SCENE_GAP_SECONDS = 1.5
+CHAPTER_GAP_SECONDS = 3.0
+
+_COPY_BLOCK_SIZE = 1024 * 1024
+
+# MPEG audio Layer III tables, indexed by the header fields
+_MPEG1 = 3
+_BITRATES_KBPS = {
+    _MPEG1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    # MPEG 2 and 2.5
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    0: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {
+    _MPEG1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+@dataclass
+class Section:
+    """Consecutive audio files that start with a marker, e.g. a chapter."""
+
+    title: str
+    files: list[Path]
+
+
+@dataclass
+class _MpegFrame:
+    """The parameters of an MPEG audio Layer III frame header."""
+
+    version: int
+    protected: bool
+    bitrate: int
+    sample_rate: int
+    padding: int
+    mono: bool
+
+    @property
+    def length(self) -> int:
+        """Frame length in bytes, including the header."""
+        coefficient = 144 if self.version == _MPEG1 else 72
+        return coefficient * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def samples(self) -> int:
+        """Samples per channel in the frame."""
+        return 1152 if self.version == _MPEG1 else 576
+
+    @property
+    def side_info_size(self) -> int:
+        """Size of the side information following the header and CRC."""
+        if self.version == _MPEG1:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+    @property
+    def stream_format(self) -> tuple[int, int, bool]:
+        """Parameters that must match to join two streams."""
+        return self.version, self.sample_rate, self.mono
+
+
+@dataclass
+class _AudioRange:
+    """The audio of an input file: a byte range and its duration."""
+
+    path: Path
+    start: int
+    length: int
+    samples: int
+
+
+def _parse_mpeg_header(header: bytes) -> _MpegFrame | None:
+    """Parse a 4-byte MPEG audio Layer III frame header."""
+    if len(header) < 4:
+        return None
+    value = int.from_bytes(header[:4], "big")
+    version = (value >> 19) & 3
+    layer = (value >> 17) & 3
+    bitrate_index = (value >> 12) & 15
+    sample_rate_index = (value >> 10) & 3
+    if (
+        value >> 21 != 0x7FF
+        or version == 1
+        or layer != 1
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return None
+    return _MpegFrame(
+        version=version,
+        protected=not (value >> 16) & 1,
+        bitrate=_BITRATES_KBPS[version][bitrate_index] * 1000,
+        sample_rate=_SAMPLE_RATES[version][sample_rate_index],
+        padding=(value >> 9) & 1,
+        mono=(value >> 6) & 3 == 3,
+    )
+
+
+def _is_info_frame(frame: _MpegFrame, data: bytes) -> bool:
+    """Check whether a frame holds a Xing, Info or VBRI header."""
+    offset = 4 + (2 if frame.protected else 0) + frame.side_info_size
+    return data[offset : offset + 4] in (b"Xing", b"Info") or data[36:40] == b"VBRI"
+
+
+def _scan_mp3(path: Path) -> tuple[_AudioRange, _MpegFrame]:
+    """
+    Find the MPEG frames of an MP3 file.
+
+    Args:
+        path: The MP3 file
+
+    Returns:
+        The byte range of its frames and the header of its first frame
+
+    Raises:
+        ValueError: If the file has no MPEG audio Layer III frames
+    """
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        start = 0
+        tag = f.read(10)
+        if tag[:3] == b"ID3":
+            size = _synchsafe_decode(tag[6:10])
+            footer = 10 if tag[5] & 0x10 else 0
+            start = 10 + size + footer
+
+        first = None
+        position = start
+        frames = 0
+        while True:
+            f.seek(position)
+            data = f.read(64)
+            frame = _parse_mpeg_header(data)
+            if frame is None or position + frame.length > file_size:
+                break
+            if first is None:
+                if _is_info_frame(frame, data):
+                    position += frame.length
+                    start = position
+                    continue
+                first = frame
+            elif frame.stream_format != first.stream_format:
+                raise ValueError(f"{path} changes its sample rate or channels")
+            position += frame.length
+            frames += 1
+
+    if first is None:
+        raise ValueError(f"{path} contains no MPEG audio Layer III frames")
+
+    # A trailing ID3v1 or APE tag ends the frames; other data would be lost
+    trailing = file_size - position
+    if trailing > 128:
+        logger.warning(f"Ignoring {trailing} bytes after the last frame of {path}")
+    return _AudioRange(path, start, position - start, frames * first.samples), first
+
+
+def _silent_mp3_frame(frame: _MpegFrame) -> bytes:
+    """
+    Build a frame that decodes to silence.
+
+    All side information is zero, so the frame has no main data and does
+    not reference the bit reservoir of the frames around it.
+    """
+    silent = _MpegFrame(
+        frame.version, False, frame.bitrate, frame.sample_rate, 0, frame.mono
+    )
+    bitrate_index = _BITRATES_KBPS[frame.version].index(frame.bitrate // 1000)
+    sample_rate_index = _SAMPLE_RATES[frame.version].index(frame.sample_rate)
+    header = (
+        (0x7FF << 21)
+        | (frame.version << 19)
+        | (1 << 17)
+        | (1 << 16)  # no CRC
+        | (bitrate_index << 12)
+        | (sample_rate_index << 10)
+        | ((3 if frame.mono else 1) << 6)  # mono or joint stereo
+    )
+    return header.to_bytes(4, "big") + bytes(silent.length - 4)
+
+
+def _synchsafe_decode(data: bytes) -> int:
+    """Decode a 28-bit ID3v2 synchsafe integer."""
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _synchsafe_encode(value: int) -> bytes:
+    """Encode a 28-bit ID3v2 synchsafe integer."""
+    return bytes((value >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def _id3_frame(frame_id: str, data: bytes) -> bytes:
+    """Build an ID3v2.4 frame."""
+    return frame_id.encode() + _synchsafe_encode(len(data)) + b"\0\0" + data
+
+
+def _id3_text(frame_id: str, text: str) -> bytes:
+    """Build an ID3v2.4 text frame in UTF-8."""
+    return _id3_frame(frame_id, b"\x03" + text.encode())
+
+
+def _id3_tag(title: str | None, markers: list[tuple[str, int, int]]) -> bytes:
+    """
+    Build an ID3v2.4 tag with a title and chapter frames.
+
+    Args:
+        title: Title of the file
+        markers: Title, start and end in milliseconds of each section
+
+    Returns:
+        The tag
+    """
+    frames = []
+    if title:
+        frames.append(_id3_text("TIT2", title))
+    if markers:
+        frames.append(_id3_text("TLEN", str(markers[-1][2])))
+
+        # A table of contents holds at most 255 entries
+        element_ids = [f"chp{i}".encode() for i in range(len(markers))][:255]
+        frames.append(
+            _id3_frame(
+                "CTOC",
+                b"toc\0\x03"  # top-level, ordered
+                + bytes([len(element_ids)])
+                + b"".join(element_id + b"\0" for element_id in element_ids),
+            )
+        )
+        for i, (marker_title, start_ms, end_ms) in enumerate(markers):
+            frames.append(
+                _id3_frame(
+                    "CHAP",
+                    f"chp{i}".encode()
+                    + b"\0"
+                    + struct.pack(">IIII", start_ms, end_ms, 0xFFFFFFFF, 0xFFFFFFFF)
+                    + _id3_text("TIT2", marker_title),
+                )
+            )
+
+    body = b"".join(frames)
+    return b"ID3\x04\x00\x00" + _synchsafe_encode(len(body)) + body
+
+
+def _scan_wav(path: Path) -> tuple[_AudioRange, bytes]:
+    """
+    Find the data chunk of a WAV file.
+
+    Args:
+        path: The WAV file
+
+    Returns:
+        The byte range of its samples and its fmt chunk
+
+    Raises:
+        ValueError: If the file is not a PCM RIFF/WAVE file
+    """
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"{path} is not a RIFF/WAVE file")
+
+        fmt = None
+        position = 12
+        while position + 8 <= file_size:
+            f.seek(position)
+            chunk_id, size = struct.unpack("<4sI", f.read(8))
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    break
+                # Streamed files may not fill in the data size
+                size = min(size, file_size - position - 8)
+                block_align = struct.unpack("<H", fmt[12:14])[0]
+                size -= size % block_align
+                return (
+                    _AudioRange(path, position + 8, size, size // block_align),
+                    fmt,
+                )
+            position += 8 + size + (size & 1)
+
+    raise ValueError(f"{path} has no fmt chunk before its data chunk")
+
+
+def _copy_range(source: Path, start: int, length: int, target: BinaryIO) -> None:
+    """Copy a byte range of a file in fixed-size blocks."""
+    with open(source, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(length, _COPY_BLOCK_SIZE))
+            if not block:
+                raise ValueError(f"{source} ended while being copied")
+            target.write(block)
+            length -= len(block)
+
+
+def _write_repeated(target: BinaryIO, unit: bytes, count: int) -> None:
+    """Write a byte string count times in fixed-size blocks."""
+    per_block = max(1, _COPY_BLOCK_SIZE // len(unit))
+    while count > 0:
+        n = min(count, per_block)
+        target.write(unit * n)
+        count -= n
+
+
+def _layout(
+    sections: list[Section],
+    sample_rate: int,
+    ranges: dict[Path, _AudioRange],
+    unit: int = 1,
+) -> tuple[list[tuple[str, int, int]], list[Path | int]]:
+    """
+    Plan the output: audio files and silences in order.
+
+    Args:
+        sections: The sections to join
+        sample_rate: Samples per second
+        ranges: The scanned audio of each file
+        unit: Samples the silences must be a multiple of (one MP3 frame)
+
+    Returns:
+        Each section's title with its start and end sample, and the parts
+        to write: file paths, and numbers of silent samples
+    """
+    scene_gap = round(SCENE_GAP_SECONDS * sample_rate / unit) * unit
+    chapter_gap = round(CHAPTER_GAP_SECONDS * sample_rate / unit) * unit
+    markers = []
+    parts: list[Path | int] = []
+    position = 0
+    for section_index, section in enumerate(sections):
+        if section_index:
+            parts.append(chapter_gap)
+            position += chapter_gap
+        start = position
+        for file_index, path in enumerate(section.files):
+            if file_index:
+                parts.append(scene_gap)
+                position += scene_gap
+            parts.append(path)
+            position += ranges[path].samples
+        markers.append((section.title, start, position))
+    return markers, parts
+
+
+def _concatenate_mp3(
+    sections: list[Section], output: BinaryIO, title: str | None
+) -> float:
+    """Join MP3 files frame by frame; returns the duration in seconds."""
+    ranges = {}
+    reference = None
+    for section in sections:
+        for path in section.files:
+            ranges[path], frame = _scan_mp3(path)
+            if reference is None:
+                reference = frame
+            elif frame.stream_format != reference.stream_format:
+                raise ValueError(
+                    f"{path} has a different sample rate or channel count than "
+                    f"{sections[0].files[0]}; it cannot be joined without decoding"
+                )
+
+    sample_rate = reference.sample_rate
+    silence = _silent_mp3_frame(reference)
+    markers, parts = _layout(sections, sample_rate, ranges, reference.samples)
+
+    output.write(
+        _id3_tag(
+            title,
+            [
+                (name, start * 1000 // sample_rate, end * 1000 // sample_rate)
+                for name, start, end in markers
+            ],
+        )
+    )
+    for part in parts:
+        if isinstance(part, int):
+            _write_repeated(output, silence, part // reference.samples)
+        else:
+            _copy_range(part, ranges[part].start, ranges[part].length, output)
+
+    return markers[-1][2] / sample_rate
+
+
+def _concatenate_wav(
+    sections: list[Section], output: BinaryIO, title: str | None
+) -> float:
+    """Join WAV files into one data chunk; returns the duration in seconds."""
+    ranges = {}
+    fmt = None
+    for section in sections:
+        for path in section.files:
+            ranges[path], file_fmt = _scan_wav(path)
+            if fmt is None:
+                fmt = file_fmt
+            elif file_fmt[:16] != fmt[:16]:
+                raise ValueError(
+                    f"{path} has a different sample format than "
+                    f"{sections[0].files[0]}; it cannot be joined without decoding"
+                )
+
+    sample_rate, _, block_align, bits_per_sample = struct.unpack("<IIHH", fmt[4:16])
+    markers, parts = _layout(sections, sample_rate, ranges)
+    data_size = markers[-1][2] * block_align
+
+    chunks = [b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"\0" * (len(fmt) & 1)]
+    if title:
+        chunks.append(_riff_list(b"INFO", [(b"INAM", title)]))
+    if markers:
+        cues = b"".join(
+            struct.pack("<II4sIII", i + 1, start, b"data", 0, 0, start)
+            for i, (_, start, _) in enumerate(markers)
+        )
+        chunks.append(b"cue " + struct.pack("<II", 4 + len(cues), len(markers)) + cues)
+        chunks.append(
+            _riff_list(
+                b"adtl",
+                [(b"labl", name) for name, _, _ in markers],
+                numbered=True,
+            )
+        )
+    header_size = sum(len(chunk) for chunk in chunks)
+    riff_size = 4 + header_size + 8 + data_size + (data_size & 1)
+    if riff_size > 0xFFFFFFFF:
+        raise ValueError("The joined audio exceeds the 4 GB limit of WAV files")
+
+    output.write(b"RIFF" + struct.pack("<I", riff_size) + b"WAVE")
+    output.writelines(chunks)
+    output.write(b"data" + struct.pack("<I", data_size))
+
+    # 8-bit PCM is unsigned, so its silence is the midpoint
+    silent_sample = (b"\x80" if bits_per_sample == 8 else b"\0") * block_align
+    for part in parts:
+        if isinstance(part, int):
+            _write_repeated(output, silent_sample, part)
+        else:
+            _copy_range(part, ranges[part].start, ranges[part].length, output)
+    if data_size & 1:
+        output.write(b"\0")
+
+    return markers[-1][2] / sample_rate
+
+
+def _riff_list(
+    list_type: bytes, entries: list[tuple[bytes, str]], numbered: bool = False
+) -> bytes:
+    """
+    Build a RIFF LIST chunk of text subchunks.
+
+    Args:
+        list_type: INFO or adtl
+        entries: Subchunk id and text of each entry
+        numbered: Prefix each text with its 1-based cue point id
+
+    Returns:
+        The chunk
+    """
+    body = list_type
+    for i, (chunk_id, text) in enumerate(entries, 1):
+        data = (struct.pack("<I", i) if numbered else b"") + text.encode() + b"\0"
+        body += chunk_id + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)
+    return b"LIST" + struct.pack("<I", len(body)) + body
+
+
+def concatenate_audio(
+    sections: list[Section], output_path: Path, title: str | None = None
+) -> float:
+    """
+    Join audio files into one file with a marker at each section.
+
+    Files within a section are separated by SCENE_GAP_SECONDS of silence,
+    sections by CHAPTER_GAP_SECONDS. All files must share the output's
+    format (by its suffix, mp3 or wav), sample rate and channel count.
+
+    Args:
+        sections: The files to join, grouped into marked sections
+        output_path: The file to write; replaced only once complete
+        title: Title stored in the file's metadata
+
+    Returns:
+        Duration of the joined audio in seconds
+
+    Raises:
+        ValueError: If there is nothing to join or the files can't be joined
+    """
+    sections = [section for section in sections if section.files]
+    if not sections:
+        raise ValueError("No audio files to join")
+
+    output_format = output_path.suffix.lower().lstrip(".")
+    if output_format not in ("mp3", "wav"):
+        raise ValueError(f"Unsupported audio format: {output_format}")
+    concatenate = _concatenate_mp3 if output_format == "mp3" else _concatenate_wav
+
+    partial_path = output_path.with_name(output_path.name + ".part")
+    try:
+        with open(partial_path, "wb") as output:
+            duration = concatenate(sections, output, title)
+        os.replace(partial_path, output_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+    logger.info(
+        f"Joined {sum(len(section.files) for section in sections)} files into "
+        f"{output_path.name} ({duration / 60:.1f} minutes)"
+    )
+    return duration
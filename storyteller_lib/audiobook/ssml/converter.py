@@ -5,8 +5,11 @@ This module provides functionality to convert story scenes and complete books
 to SSML (Speech Synthesis Markup Language) format for audiobook generation.
 """
 
+import hashlib
+import json
 import os
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
@@ -16,6 +19,9 @@ from storyteller_lib.persistence.models.models import StoryDatabase
 
 logger = get_logger(__name__)
 
+# Scenes converted concurrently (each conversion is one LLM call)
+SSML_WORKERS = int(os.environ.get("SSML_WORKERS", "4"))
+
 
 class SSMLConverter:
     """Converts story content to SSML format for audiobook generation."""
@@ -85,23 +91,40 @@ class SSMLConverter:
         Returns:
             SSML-formatted scene content
         """
+        ssml_content = self._convert_scene(
+            scene_content=scene_content,
+            chapter_number=chapter_number,
+            scene_number=scene_number,
+            scene_description=scene_description,
+            genre=genre,
+            tone=tone,
+            chapter_title=chapter_title,
+            book_title=book_title,
+            is_first_scene_in_chapter=is_first_scene_in_chapter,
+            is_first_scene_in_book=is_first_scene_in_book,
+        )
+        if ssml_content is None:
+            # Return a basic SSML wrapper as fallback
+            return self._create_fallback_ssml(scene_content)
+        return ssml_content
+
+    def _convert_scene(self, scene_content: str, **prompt_args) -> str | None:
+        """
+        Convert a scene to SSML with the LLM.
+
+        Args:
+            scene_content: The scene text content
+            **prompt_args: The other arguments of scene_to_ssml
+
+        Returns:
+            SSML-formatted scene content, or None if the conversion failed
+        """
         try:
             # Load the template
             template = self.env.get_template("scene_to_ssml.jinja2")
 
             # Render the prompt
-            prompt = template.render(
-                scene_content=scene_content,
-                chapter_number=chapter_number,
-                scene_number=scene_number,
-                scene_description=scene_description,
-                genre=genre,
-                tone=tone,
-                chapter_title=chapter_title,
-                book_title=book_title,
-                is_first_scene_in_chapter=is_first_scene_in_chapter,
-                is_first_scene_in_book=is_first_scene_in_book,
-            )
+            prompt = template.render(scene_content=scene_content, **prompt_args)
 
             # Generate SSML using LLM
             response = self.llm.invoke(prompt)
@@ -135,14 +158,13 @@ class SSMLConverter:
             # Validate the final SSML
             if not self._validate_ssml(ssml_content):
                 logger.warning("Generated SSML failed validation, using fallback")
-                return self._create_fallback_ssml(scene_content)
+                return None
 
             return ssml_content
 
         except Exception as e:
             logger.error(f"Error converting scene to SSML: {str(e)}")
-            # Return a basic SSML wrapper as fallback
-            return self._create_fallback_ssml(scene_content)
+            return None
 
     def _get_lang_code(self) -> str:
         """Get the appropriate language code for SSML."""
@@ -248,13 +270,52 @@ class SSMLConverter:
 
         return True
 
-    def convert_book_to_ssml(self, db_path: str, output_path: str) -> None:
+    def _content_hash(self, prompt_args: dict) -> str:
+        """Hash everything a scene's SSML is converted from."""
+        content = json.dumps([self.language, prompt_args], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @staticmethod
+    def _extract_scene_body(scene_ssml: str) -> str:
+        """Extract the content of a scene's <speak> and <voice> tags."""
+        if "<speak" not in scene_ssml or "</speak>" not in scene_ssml:
+            return scene_ssml
+
+        start = scene_ssml.find(">") + 1
+        end = scene_ssml.rfind("</speak>")
+        scene_content = scene_ssml[start:end]
+
+        # Also remove any nested voice tags
+        if "<voice" in scene_content:
+            voice_start = scene_content.find("<voice")
+            voice_tag_end = scene_content.find(">", voice_start) + 1
+            scene_content = scene_content[voice_tag_end:]
+            voice_end = scene_content.rfind("</voice>")
+            if voice_end > 0:
+                scene_content = scene_content[:voice_end]
+        return scene_content
+
+    def convert_book_to_ssml(
+        self,
+        db_path: str,
+        output_path: str,
+        max_workers: int = SSML_WORKERS,
+        force: bool = False,
+    ) -> None:
         """
         Convert the entire book to SSML format and save to file.
 
+        Scenes are converted concurrently and each one is stored in the
+        database as soon as it is done, with a hash of its content and the
+        other prompt inputs. Scenes whose hash is unchanged are skipped, so
+        an interrupted conversion resumes where it stopped and a revision
+        only converts the revised scenes.
+
         Args:
             db_path: Path to the story database
             output_path: Path where the SSML book should be saved
+            max_workers: Number of scenes converted concurrently
+            force: Convert every scene, even if it is unchanged
         """
         try:
             logger.info("Starting full book SSML conversion")
@@ -268,35 +329,9 @@ class SSMLConverter:
             tone = story_config.get("tone", "neutral")
             title = story_config.get("title", "Untitled Story")
 
-            # Start building the SSML book
-            ssml_parts = []
-            ssml_parts.append(
-                f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{self._get_lang_code()}">'
-            )
-            ssml_parts.append(f'<voice name="{self._get_voice_name()}">')
-
-            # Add title with dramatic pause
-            ssml_parts.append(f'<emphasis level="strong">{title}</emphasis>')
-            ssml_parts.append('<break time="2000ms"/>')
-
             # Get all chapters and scenes
             with db._get_connection() as conn:
                 cursor = conn.cursor()
-
-                # First, get total count for progress tracking
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as total_scenes
-                    FROM scenes s
-                    JOIN chapters c ON s.chapter_id = c.id
-                    WHERE s.content IS NOT NULL
-                """
-                )
-                total_scenes = cursor.fetchone()["total_scenes"]
-
-                print(f"Converting {total_scenes} scenes to SSML format...")
-                print("This may take several minutes depending on the story length.\n")
-
                 cursor.execute(
                     """
                     SELECT c.chapter_number, c.title as chapter_title,
@@ -307,91 +342,130 @@ class SSMLConverter:
                     ORDER BY c.chapter_number, s.scene_number
                 """
                 )
+                scenes = cursor.fetchall()
+
+            # Skip the scenes converted from the same inputs before
+            converted = {} if force else db.get_scene_ssml_hashes()
+            jobs = []
+            for row in scenes:
+                is_first_scene_in_book = (
+                    row["chapter_number"] == 1 and row["scene_number"] == 1
+                )
+                prompt_args = {
+                    "scene_content": row["content"],
+                    "chapter_number": row["chapter_number"],
+                    "scene_number": row["scene_number"],
+                    "scene_description": row["description"] or "",
+                    "genre": genre,
+                    "tone": tone,
+                    "chapter_title": row["chapter_title"],
+                    "book_title": title if is_first_scene_in_book else None,
+                    "is_first_scene_in_chapter": row["scene_number"] == 1,
+                    "is_first_scene_in_book": is_first_scene_in_book,
+                }
+                content_hash = self._content_hash(prompt_args)
+                if converted.get(row["scene_id"]) != content_hash:
+                    jobs.append((row, prompt_args, content_hash))
+
+            total_scenes = len(scenes)
+            print(
+                f"Converting {len(jobs)} of {total_scenes} scenes to SSML format "
+                f"({total_scenes - len(jobs)} unchanged)..."
+            )
+            if jobs:
+                print("This may take several minutes depending on the story length.\n")
 
-                current_chapter = None
-                scene_count = 0
-
-                for row in cursor.fetchall():
-                    # Add chapter header if new chapter
-                    if row["chapter_number"] != current_chapter:
-                        current_chapter = row["chapter_number"]
-                        if current_chapter > 1:
-                            # Add longer pause between chapters
-                            ssml_parts.append('<break time="3000ms"/>')
-                        ssml_parts.append(
-                            f'<emphasis level="moderate">Chapter {current_chapter}: {row["chapter_title"]}</emphasis>'
-                        )
-                        ssml_parts.append('<break time="1500ms"/>')
-
-                    # Update progress
-                    scene_count += 1
-                    print(
-                        f"Converting scene {scene_count}/{total_scenes}: Chapter {row['chapter_number']}, Scene {row['scene_number']}...",
-                        end="",
-                        flush=True,
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {
+                    executor.submit(self._convert_scene, **prompt_args): (
+                        row,
+                        content_hash,
                     )
-
-                    # Determine if this is the first scene in chapter/book
-                    is_first_scene_in_chapter = row["scene_number"] == 1
-                    is_first_scene_in_book = (
-                        row["chapter_number"] == 1 and row["scene_number"] == 1
+                    for row, prompt_args, content_hash in jobs
+                }
+                for scene_count, future in enumerate(as_completed(futures), 1):
+                    row, content_hash = futures[future]
+                    scene_ssml = future.result()
+                    status = "✓"
+                    if scene_ssml is None:
+                        # Stored without a hash, so the next run retries it
+                        scene_ssml = self._create_fallback_ssml(row["content"])
+                        content_hash = None
+                        status = "✗ (plain text fallback)"
+
+                    # Commit each scene right away so an interruption loses
+                    # only the scenes in flight
+                    db.save_scene_ssml_conversion(
+                        row["scene_id"], scene_ssml, content_hash
                     )
-
-                    # Convert scene to SSML
-                    scene_ssml = self.scene_to_ssml(
-                        scene_content=row["content"],
-                        chapter_number=row["chapter_number"],
-                        scene_number=row["scene_number"],
-                        scene_description=row["description"] or "",
-                        genre=genre,
-                        tone=tone,
-                        chapter_title=row["chapter_title"],
-                        book_title=title if is_first_scene_in_book else None,
-                        is_first_scene_in_chapter=is_first_scene_in_chapter,
-                        is_first_scene_in_book=is_first_scene_in_book,
+                    print(
+                        f"Converted scene {scene_count}/{len(jobs)}: Chapter "
+                        f"{row['chapter_number']}, Scene {row['scene_number']} {status}"
                     )
 
-                    print(" ✓")
+            print(f"\nWriting SSML audiobook to {output_path}...")
+            self._write_book_ssml(db, title, output_path)
 
-                    # Extract just the content between <speak> tags to avoid nesting
-                    if "<speak" in scene_ssml and "</speak>" in scene_ssml:
-                        start = scene_ssml.find(">") + 1
-                        end = scene_ssml.rfind("</speak>")
-                        scene_content = scene_ssml[start:end]
+            print(f"✓ SSML conversion complete! All {total_scenes} scenes processed.")
+            logger.info(f"SSML book successfully saved to {output_path}")
 
-                        # Also remove any nested voice tags
-                        if "<voice" in scene_content:
-                            voice_start = scene_content.find("<voice")
-                            voice_tag_end = scene_content.find(">", voice_start) + 1
-                            scene_content = scene_content[voice_tag_end:]
-                            voice_end = scene_content.rfind("</voice>")
-                            if voice_end > 0:
-                                scene_content = scene_content[:voice_end]
-                    else:
-                        scene_content = scene_ssml
+        except Exception as e:
+            logger.error(f"Error converting book to SSML: {str(e)}")
+            raise
 
-                    ssml_parts.append(scene_content)
+    def _write_book_ssml(self, db: StoryDatabase, title: str, output_path: str) -> None:
+        """
+        Write the SSML of all scenes as one book, streaming from the database.
 
-                    # Update database with SSML content (already has smart quotes fixed)
-                    db.update_scene_ssml(row["scene_id"], scene_ssml)
+        Args:
+            db: The story database
+            title: Book title
+            output_path: Path where the SSML book should be saved
+        """
+        partial_path = f"{output_path}.part"
+        with (
+            open(partial_path, "w", encoding="utf-8") as f,
+            db._get_connection() as conn,
+        ):
+            f.write(
+                f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{self._get_lang_code()}">\n'
+            )
+            f.write(f'<voice name="{self._get_voice_name()}">\n')
 
-                    # Add pause between scenes
-                    ssml_parts.append('<break time="1500ms"/>')
+            # Add title with dramatic pause
+            f.write(f'<emphasis level="strong">{title}</emphasis>\n')
+            f.write('<break time="2000ms"/>\n')
 
-            # Close SSML document
-            ssml_parts.append("</voice>")
-            ssml_parts.append("</speak>")
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT c.chapter_number, c.title as chapter_title, s.content_ssml
+                FROM chapters c
+                JOIN scenes s ON s.chapter_id = c.id
+                WHERE s.content IS NOT NULL AND s.content_ssml IS NOT NULL
+                ORDER BY c.chapter_number, s.scene_number
+            """
+            )
 
-            # Write the complete SSML book
-            full_ssml = "\n".join(ssml_parts)
+            current_chapter = None
+            for row in cursor:
+                # Add chapter header if new chapter
+                if row["chapter_number"] != current_chapter:
+                    if current_chapter is not None:
+                        # Add longer pause between chapters
+                        f.write('<break time="3000ms"/>\n')
+                    current_chapter = row["chapter_number"]
+                    f.write(
+                        f'<emphasis level="moderate">Chapter {current_chapter}: {row["chapter_title"]}</emphasis>\n'
+                    )
+                    f.write('<break time="1500ms"/>\n')
 
-            print(f"\nWriting SSML audiobook to {output_path}...")
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(full_ssml)
+                # Extract just the content between <speak> tags to avoid nesting
+                f.write(self._extract_scene_body(row["content_ssml"]) + "\n")
 
-            print(f"✓ SSML conversion complete! All {scene_count} scenes processed.")
-            logger.info(f"SSML book successfully saved to {output_path}")
+                # Add pause between scenes
+                f.write('<break time="1500ms"/>\n')
 
-        except Exception as e:
-            logger.error(f"Error converting book to SSML: {str(e)}")
-            raise
+            # Close SSML document
+            f.write("</voice>\n</speak>")
+        os.replace(partial_path, output_path)
@@ -0,0 +1,605 @@
+"""
+SSML Normalizer Module
+
+Rule-based repair of SSML for Azure TTS. The SSML is parsed once and
+rebuilt in a single walk over the tree, checking every element and
+attribute against a schema of what Azure accepts:
+
+- All content is moved into <voice> elements directly under <speak>;
+  nested <voice> elements are unwrapped
+- Unsupported elements are unwrapped and unsupported attributes dropped
+- Attribute values are normalized (e.g. rate="very slow" -> "x-slow",
+  time="2 seconds" -> "2000ms") or dropped if they cannot be read
+- Elements that only take text lose their markup, and empty elements
+  such as <break> lose their content
+
+Before parsing, common text-level problems of LLM output are fixed:
+markdown code fences, unescaped ampersands, HTML entities, smart quotes
+around attribute values and undeclared namespace prefixes.
+"""
+
+import html
+import re
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape, quoteattr
+
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SYNTHESIS_NS = "http://www.w3.org/2001/10/synthesis"
+MSTTS_NS = "http://www.w3.org/2001/mstts"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+DEFAULT_LANG = "en-US"
+
+# Voice used when a <voice> has no name or an unsupported one, by language
+DEFAULT_VOICES = {
+    "de": "de-DE-SeraphinaMultilingualNeural",
+    "en": "en-US-JennyNeural",
+}
+
+# Longest <break> Azure accepts
+MAX_BREAK_MS = 20000
+
+
+@dataclass(frozen=True)
+class ElementRule:
+    """What Azure accepts for one SSML element."""
+
+    # Attribute name -> function returning the normalized value, or None
+    # if the value is invalid
+    attributes: dict[str, Callable[[str], str | None]]
+    # "mixed" (text and elements), "text" (text only) or "empty"
+    content: str = "mixed"
+    # Attributes without which the element is unwrapped
+    required: tuple[str, ...] = ()
+
+
+@dataclass
+class NormalizedSSML:
+    """Result of normalizing SSML."""
+
+    ssml: str
+    # Descriptions of what was changed; empty if the SSML was already valid
+    fixes: list[str] = field(default_factory=list)
+
+
+def _any(value: str) -> str | None:
+    """Accept any non-empty value."""
+    return value.strip() or None
+
+
+def _keyword(*keywords: str, **synonyms: str) -> Callable[[str], str | None]:
+    """
+    Accept one of a set of keywords.
+
+    Keywords are matched case-insensitively, and "very", "extra" and
+    "x " prefixes are read as "x-". Synonyms use underscores for hyphens.
+
+    Args:
+        *keywords: The valid keywords
+        **synonyms: Other words and the keyword they stand for
+
+    Returns:
+        An attribute value normalizer
+    """
+    synonyms = {word.replace("_", "-"): keyword for word, keyword in synonyms.items()}
+
+    def normalize(value: str) -> str | None:
+        word = re.sub(r"[\s_]+", "-", value.strip().lower())
+        word = re.sub(r"^(?:very|extra|x)-?(?=[a-z])", "x-", word)
+        word = synonyms.get(word, word)
+        return word if word in keywords else None
+
+    return normalize
+
+
+def _number(value: str) -> tuple[str, float, str] | None:
+    """Split a value into sign, number and unit."""
+    match = re.fullmatch(r"\s*([+-]?)\s*(\d+(?:\.\d+)?|\.\d+)\s*([a-zA-Z%]*)\s*", value)
+    if not match:
+        return None
+    return match.group(1), float(match.group(2)), match.group(3).lower()
+
+
+def _format(sign: str, number: float, unit: str) -> str:
+    """Format a number without a trailing .0."""
+    return f"{sign}{number:g}{'Hz' if unit == 'hz' else unit}"
+
+
+def _time(value: str) -> str | None:
+    """Accept a duration in milliseconds or seconds, up to MAX_BREAK_MS."""
+    if re.fullmatch(r"\d+(?:\.\d+)?m?s", value):
+        milliseconds = (
+            float(value[:-2]) if value.endswith("ms") else float(value[:-1]) * 1000
+        )
+        if milliseconds <= MAX_BREAK_MS:
+            return value
+    parts = _number(value)
+    if not parts or parts[0] == "-":
+        return None
+    _, number, unit = parts
+    if unit in ("", "ms", "msec", "millisecond", "milliseconds"):
+        milliseconds = number
+    elif unit in ("s", "sec", "secs", "second", "seconds"):
+        milliseconds = number * 1000
+    else:
+        return None
+    return f"{round(min(milliseconds, MAX_BREAK_MS))}ms"
+
+
+def _relative(
+    keywords: Callable[[str], str | None],
+    units: tuple[str, ...],
+    default_unit: str,
+    percent_range: tuple[float, float] | None,
+    relative_range: tuple[float, float],
+    absolute: Callable[[float, str], str | None] | None = None,
+) -> Callable[[str], str | None]:
+    """
+    Accept a keyword or a relative change such as "+10%" or "-2st".
+
+    Args:
+        keywords: Normalizer for the keyword values
+        units: Units of relative changes
+        default_unit: Unit added to relative changes without one
+        percent_range: Range of unsigned percentages, if they are valid
+        relative_range: Range of signed percentages
+        absolute: Normalizer for unsigned numbers (number, unit)
+
+    Returns:
+        An attribute value normalizer
+    """
+
+    def normalize(value: str) -> str | None:
+        keyword = keywords(value)
+        if keyword:
+            return keyword
+        parts = _number(value)
+        if not parts:
+            return None
+        sign, number, unit = parts
+        if not sign:
+            if unit == "%" and percent_range:
+                low, high = percent_range
+                return _format("", min(max(number, low), high), "%")
+            return absolute(number, unit) if absolute else None
+        unit = unit or default_unit
+        if unit not in units:
+            return None
+        if unit == "%":
+            low, high = relative_range
+            signed = number if sign == "+" else -number
+            signed = min(max(signed, low), high)
+            return _format("+" if signed >= 0 else "-", abs(signed), "%")
+        return _format(sign, number, unit)
+
+    return normalize
+
+
+def _rate_multiplier(number: float, unit: str) -> str | None:
+    """Accept a speaking rate multiplier from 0.5 to 2."""
+    if unit:
+        return None
+    return _format("", min(max(number, 0.5), 2.0), "")
+
+
+def _absolute_pitch(number: float, unit: str) -> str | None:
+    """Accept an absolute pitch in Hz."""
+    return _format("", number, "Hz") if unit in ("hz", "") else None
+
+
+def _absolute_volume(number: float, unit: str) -> str | None:
+    """Accept an absolute volume from 0 to 100."""
+    return _format("", min(number, 100.0), "") if unit in ("", "%") else None
+
+
+def _style_degree(value: str) -> str | None:
+    """Accept a style intensity from 0.01 to 2."""
+    parts = _number(value)
+    if not parts or parts[0] == "-" or parts[2]:
+        return None
+    return _format("", min(max(parts[1], 0.01), 2.0), "")
+
+
+def _language(value: str) -> str | None:
+    """Accept a locale such as en-US, completing bare language codes."""
+    match = re.fullmatch(r"\s*([a-zA-Z]{2,3})(?:[-_]([a-zA-Z]{2}))?\s*", value)
+    if not match:
+        return None
+    language = match.group(1).lower()
+    if not match.group(2):
+        voice = DEFAULT_VOICES.get(language)
+        return voice[: voice.index("-", 3)] if voice else None
+    return f"{language}-{match.group(2).upper()}"
+
+
+_pitch_keywords = _keyword(
+    "x-low", "low", "medium", "high", "x-high", "default", normal="medium"
+)
+_pitch = _relative(
+    _pitch_keywords,
+    units=("hz", "st", "%"),
+    default_unit="%",
+    percent_range=None,
+    relative_range=(-50, 50),
+    absolute=_absolute_pitch,
+)
+
+# Elements and attributes Azure accepts, by element name ("mstts:" for
+# Microsoft's extensions)
+SCHEMA: dict[str, ElementRule] = {
+    "speak": ElementRule({"version": _any, "xml:lang": _language}),
+    "voice": ElementRule({"name": _any, "effect": _any}),
+    "lang": ElementRule({"xml:lang": _language}, required=("xml:lang",)),
+    "p": ElementRule({}),
+    "s": ElementRule({}),
+    "prosody": ElementRule(
+        {
+            "rate": _relative(
+                _keyword(
+                    "x-slow",
+                    "slow",
+                    "medium",
+                    "fast",
+                    "x-fast",
+                    "default",
+                    normal="medium",
+                ),
+                units=("%",),
+                default_unit="%",
+                percent_range=(50, 200),
+                relative_range=(-50, 100),
+                absolute=_rate_multiplier,
+            ),
+            "pitch": _pitch,
+            "range": _pitch,
+            "volume": _relative(
+                _keyword(
+                    "silent",
+                    "x-soft",
+                    "soft",
+                    "medium",
+                    "loud",
+                    "x-loud",
+                    "default",
+                    quiet="soft",
+                    x_quiet="x-soft",
+                    whisper="x-soft",
+                    normal="medium",
+                ),
+                units=("%", ""),
+                default_unit="",
+                percent_range=None,
+                relative_range=(-100, 100),
+                absolute=_absolute_volume,
+            ),
+            "contour": _any,
+        }
+    ),
+    "emphasis": ElementRule(
+        {
+            "level": _keyword(
+                "reduced",
+                "none",
+                "moderate",
+                "strong",
+                x_strong="strong",
+                high="strong",
+                medium="moderate",
+                low="reduced",
+                weak="reduced",
+            )
+        }
+    ),
+    "break": ElementRule(
+        {
+            "time": _time,
+            "strength": _keyword(
+                "none", "x-weak", "weak", "medium", "strong", "x-strong"
+            ),
+        },
+        content="empty",
+    ),
+    "say-as": ElementRule(
+        {"interpret-as": _any, "format": _any, "detail": _any},
+        content="text",
+        required=("interpret-as",),
+    ),
+    "phoneme": ElementRule(
+        {
+            "alphabet": _keyword("ipa", "sapi", "ups", "x-sampa", sampa="x-sampa"),
+            "ph": _any,
+        },
+        content="text",
+        required=("ph",),
+    ),
+    "sub": ElementRule({"alias": _any}, content="text", required=("alias",)),
+    "audio": ElementRule({"src": _any}, required=("src",)),
+    "bookmark": ElementRule({"mark": _any}, content="empty", required=("mark",)),
+    "lexicon": ElementRule({"uri": _any}, content="empty", required=("uri",)),
+    "mstts:express-as": ElementRule(
+        {"style": _any, "styledegree": _style_degree, "role": _any},
+        required=("style",),
+    ),
+    "mstts:silence": ElementRule(
+        {"type": _any, "value": _time},
+        content="empty",
+        required=("type", "value"),
+    ),
+    "mstts:backgroundaudio": ElementRule(
+        {"src": _any, "volume": _any, "fadein": _any, "fadeout": _any},
+        content="empty",
+        required=("src",),
+    ),
+    "mstts:viseme": ElementRule({"type": _any}, content="empty", required=("type",)),
+    "mstts:audioduration": ElementRule(
+        {"value": _time}, content="empty", required=("value",)
+    ),
+}
+
+# Entities XML knows without a DTD
+_XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+
+
+def default_voice(lang: str) -> str:
+    """Get the default voice for a locale such as en-US."""
+    return DEFAULT_VOICES.get(lang.split("-")[0].lower(), DEFAULT_VOICES["en"])
+
+
+def _prepare(ssml: str, fixes: list[str]) -> str:
+    """Fix the text-level problems that would make the SSML unparsable."""
+    text = ssml.strip()
+
+    # Markdown code fences and commentary around the SSML
+    fenced = re.fullmatch(r"```[\w-]*\s*(.*?)\s*```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+        fixes.append("removed code fence")
+    start = text.find("<speak")
+    end = text.rfind("</speak>")
+    if start > 0 and not text.startswith("<?xml"):
+        text = text[start:]
+        fixes.append("removed text before <speak>")
+        end = text.rfind("</speak>")
+    if end != -1 and text[end + len("</speak>") :].strip():
+        text = text[: end + len("</speak>")]
+        fixes.append("removed text after </speak>")
+    if start == -1:
+        text = f"<speak>{text}</speak>"
+        fixes.append("added <speak>")
+
+    # HTML entities and unescaped ampersands
+    def entity(match: re.Match) -> str:
+        if match.group(1) in _XML_ENTITIES:
+            return match.group(0)
+        fixes.append(f"replaced entity {match.group(0)}")
+        return escape(html.unescape(match.group(0)))
+
+    text = re.sub(r"&([a-zA-Z][a-zA-Z0-9]*);", entity, text)
+    text, count = re.subn(
+        r"&(?!(?:[a-zA-Z][a-zA-Z0-9]*|#\d+|#x[0-9a-fA-F]+);)", "&amp;", text
+    )
+    if count:
+        fixes.append("escaped ampersands")
+
+    # Smart quotes around attribute values
+    text, count = re.subn(r"=\s*[“”„«»‘’]([^“”„«»‘’\"<>]*)[“”„«»‘’]", r'="\1"', text)
+    if count:
+        fixes.append("replaced smart quotes around attribute values")
+
+    # Microsoft's extensions used without declaring their namespace
+    if re.search(r"</?mstts:", text) and "xmlns:mstts" not in text:
+        text = re.sub(r"<speak\b", f'<speak xmlns:mstts="{MSTTS_NS}"', text, count=1)
+        fixes.append("declared the mstts namespace")
+
+    return text
+
+
+class _TreeWalk:
+    """Rebuilds a parsed SSML tree in a single walk."""
+
+    def __init__(self, fixes: list[str]):
+        self.fixes = fixes
+        self.uses_mstts = False
+
+    @staticmethod
+    def name(element: ET.Element) -> str | None:
+        """Get the schema name of an element, or None if it is not SSML."""
+        tag = element.tag
+        if not isinstance(tag, str):
+            return None
+        namespace, _, local = (
+            tag[1:].rpartition("}") if tag[0] == "{" else ("", "", tag)
+        )
+        if namespace in ("", SYNTHESIS_NS):
+            return local if local in SCHEMA else None
+        if namespace == MSTTS_NS and f"mstts:{local}" in SCHEMA:
+            return f"mstts:{local}"
+        return None
+
+    def attributes(self, element: ET.Element, name: str) -> dict[str, str] | None:
+        """
+        Normalize the attributes of an element.
+
+        Returns:
+            The valid attributes, or None if a required one is missing
+        """
+        rule = SCHEMA[name]
+        valid = {}
+        for key, value in element.attrib.items():
+            attribute = "xml:lang" if key == f"{{{XML_NS}}}lang" else key.split("}")[-1]
+            normalize = rule.attributes.get(attribute)
+            if normalize is None:
+                self.fixes.append(f"removed unsupported attribute {name}@{attribute}")
+                continue
+            normalized = normalize(value)
+            if normalized is None:
+                self.fixes.append(f"removed invalid {name}@{attribute}={value!r}")
+                continue
+            if normalized != value:
+                self.fixes.append(
+                    f"changed {name}@{attribute} from {value!r} to {normalized!r}"
+                )
+            valid[attribute] = normalized
+        for attribute in rule.required:
+            if attribute not in valid:
+                self.fixes.append(f"unwrapped <{name}> without {attribute}")
+                return None
+        return valid
+
+    def tag(self, name: str, attributes: dict[str, str], content: str | None) -> str:
+        """Serialize an element."""
+        if name.startswith("mstts:"):
+            self.uses_mstts = True
+        attrs = "".join(
+            f" {key}={quoteattr(value)}" for key, value in attributes.items()
+        )
+        if content is None:
+            return f"<{name}{attrs}/>"
+        return f"<{name}{attrs}>{content}</{name}>"
+
+    def content(self, element: ET.Element) -> str:
+        """Serialize the content of an element."""
+        parts = [escape(element.text or "")]
+        for child in element:
+            parts.append(self.element(child))
+            parts.append(escape(child.tail or ""))
+        return "".join(parts)
+
+    def element(self, element: ET.Element) -> str:
+        """Serialize an element inside a <voice>."""
+        name = self.name(element)
+        if name is None:
+            self.fixes.append(f"unwrapped unsupported element <{element.tag}>")
+            return self.content(element)
+        if name in ("speak", "voice"):
+            self.fixes.append(f"unwrapped nested <{name}>")
+            return self.content(element)
+        if name == "mstts:backgroundaudio":
+            self.fixes.append("removed <mstts:backgroundaudio> outside <speak>")
+            return escape("".join(element.itertext()))
+
+        attributes = self.attributes(element, name)
+        if attributes is None:
+            return self.content(element)
+
+        rule = SCHEMA[name]
+        if rule.content == "empty":
+            text = "".join(element.itertext())
+            if text or len(element):
+                self.fixes.append(f"moved content out of <{name}>")
+            return self.tag(name, attributes, None) + escape(text)
+        if rule.content == "text" and len(element):
+            self.fixes.append(f"removed markup inside <{name}>")
+            return self.tag(name, attributes, escape("".join(element.itertext())))
+        return self.tag(name, attributes, self.content(element))
+
+
+def normalize_ssml(ssml: str, reset_voices: bool = False) -> NormalizedSSML | None:
+    """
+    Repair SSML for Azure TTS with rules.
+
+    Args:
+        ssml: The SSML content
+        reset_voices: Replace every voice with the default voice for the
+            language, e.g. after Azure rejected a voice name
+
+    Returns:
+        The normalized SSML and what was fixed, or None if the SSML cannot
+        be parsed even after the text-level fixes
+    """
+    fixes: list[str] = []
+    text = _prepare(ssml, fixes)
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
+        logger.debug(f"SSML cannot be parsed for rule-based repair: {e}")
+        return None
+
+    walk = _TreeWalk(fixes)
+    if walk.name(root) != "speak":
+        fixes.append(f"wrapped <{root.tag}> in <speak>")
+        speak = ET.Element("speak")
+        speak.append(root)
+        root = speak
+
+    elif not root.tag.startswith(f"{{{SYNTHESIS_NS}}}"):
+        fixes.append("set the SSML namespace")
+
+    speak_attributes = walk.attributes(root, "speak") or {}
+    if speak_attributes.get("version") != "1.0":
+        fixes.append("set speak@version to 1.0")
+    lang = speak_attributes.get("xml:lang")
+    if lang is None:
+        lang = DEFAULT_LANG
+        for voice in root.iter():
+            name = voice.get("name", "")
+            if walk.name(voice) == "voice" and _language(name[:5]):
+                lang = _language(name[:5])
+                break
+        fixes.append(f"set speak@xml:lang to {lang}")
+
+    # The voice used for content outside any <voice>: the first one found
+    # anywhere, so <prosody><voice> keeps its voice when turned inside out
+    fallback_voice = next(
+        (
+            element.get("name")
+            for element in root.iter()
+            if walk.name(element) == "voice" and element.get("name")
+        ),
+        None,
+    )
+
+    background = []
+    voices: list[tuple[dict[str, str], list[str]]] = []
+    pending: list[str] = []
+
+    def add_outside_content(content: str) -> None:
+        if not content.strip():
+            return
+        fixes.append("moved content outside <voice> into a <voice>")
+        if voices:
+            voices[-1][1].append(content)
+        else:
+            pending.append(content)
+
+    add_outside_content(escape(root.text or ""))
+    for child in root:
+        name = walk.name(child)
+        if name == "voice":
+            attributes = walk.attributes(child, "voice") or {}
+            voices.append((attributes, [*pending, walk.content(child)]))
+            pending = []
+        elif name == "mstts:backgroundaudio":
+            attributes = walk.attributes(child, name)
+            if attributes is not None:
+                background.append(walk.tag(name, attributes, None))
+        else:
+            add_outside_content(walk.element(child))
+        add_outside_content(escape(child.tail or ""))
+    if pending:
+        voices.append(({"name": fallback_voice} if fallback_voice else {}, pending))
+
+    for attributes, _ in voices:
+        name = attributes.get("name")
+        if reset_voices or not name:
+            attributes["name"] = default_voice(lang)
+            if attributes["name"] != name:
+                fixes.append(f"set voice@name to {attributes['name']}")
+
+    body = "".join(
+        walk.tag("voice", attributes, "".join(content))
+        for attributes, content in voices
+    )
+    namespaces = f' xmlns="{SYNTHESIS_NS}"'
+    if walk.uses_mstts or background:
+        namespaces += f' xmlns:mstts="{MSTTS_NS}"'
+    normalized = (
+        f'<speak version="1.0"{namespaces} xml:lang={quoteattr(lang)}>'
+        f'{"".join(background)}{body}</speak>'
+    )
+    return NormalizedSSML(ssml=normalized, fixes=list(dict.fromkeys(fixes)))
@@ -2,13 +2,14 @@
 SSML Repair Module
 
 This module provides functionality to repair SSML content based on Azure TTS error messages.
-It uses LLM to intelligently fix common SSML errors and validates the repaired content.
+Known error classes are fixed offline by the rule-based normalizer; the LLM is only used
+for SSML the rules cannot fix, and its output is normalized and validated the same way.
 """
 
 import re
-import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 
+from storyteller_lib.audiobook.ssml.normalizer import normalize_ssml
 from storyteller_lib.core.config import get_llm
 from storyteller_lib.core.logger import get_logger
 from storyteller_lib.persistence.models.models import StoryDatabase
@@ -57,6 +58,11 @@ class SSMLRepair:
         },
     }
 
+    # Rule-based repair is skipped for an error code once Azure rejected most
+    # of its logged rule-based repairs, starting from RULES_MIN_REPAIRS repairs
+    RULES_MIN_REPAIRS = 3
+    RULES_MIN_RESOLVED_RATE = 0.5
+
     def __init__(self, db_path: str, model_provider: str = None, model: str = None):
         """
         Initialize the SSML repair module.
@@ -110,18 +116,29 @@ class SSMLRepair:
                 f"Repairing SSML for scene {scene_id}, error code: {error.code}, attempt: {attempt}"
             )
 
-            # Try specific repair strategy first
-            if error.code in self.ERROR_PATTERNS:
-                strategy = self.ERROR_PATTERNS[error.code]["repair_strategy"]
-                repaired_ssml = self._apply_repair_strategy(
-                    original_ssml, error, strategy, attempt
-                )
-            else:
-                # Use general LLM repair for unknown errors
-                repaired_ssml = self._repair_with_llm(original_ssml, error, attempt)
-
-            # Validate repaired SSML
-            if repaired_ssml and self._validate_ssml(repaired_ssml):
+            # Fix known error classes with rules first, without the LLM
+            repaired_ssml = None
+            if self._rules_resolve(error.code):
+                repaired_ssml = self._repair_with_rules(original_ssml, error)
+            repair_method = "rules" if repaired_ssml else "llm"
+
+            llm_ssml = None
+            if repaired_ssml is None:
+                # Try specific repair strategy first
+                if error.code in self.ERROR_PATTERNS:
+                    strategy = self.ERROR_PATTERNS[error.code]["repair_strategy"]
+                    llm_ssml = self._apply_repair_strategy(
+                        original_ssml, error, strategy, attempt
+                    )
+                else:
+                    # Use general LLM repair for unknown errors
+                    llm_ssml = self._repair_with_llm(original_ssml, error, attempt)
+
+                # Validate the LLM output and fix what the rules can
+                normalized = normalize_ssml(llm_ssml) if llm_ssml else None
+                repaired_ssml = normalized.ssml if normalized else None
+
+            if repaired_ssml:
                 # Log repair attempt
                 self._log_repair_attempt(
                     scene_id=scene_id,
@@ -131,6 +148,7 @@ class SSMLRepair:
                     original_ssml=original_ssml,
                     repaired_ssml=repaired_ssml,
                     successful=True,
+                    repair_method=repair_method,
                 )
                 return repaired_ssml
             else:
@@ -141,8 +159,9 @@ class SSMLRepair:
                     error_message=error_message,
                     repair_attempt=attempt,
                     original_ssml=original_ssml,
-                    repaired_ssml=repaired_ssml or "",
+                    repaired_ssml=llm_ssml or "",
                     successful=False,
+                    repair_method=repair_method,
                 )
                 return None
 
@@ -150,6 +169,69 @@ class SSMLRepair:
             logger.error(f"Error repairing SSML for scene {scene_id}: {str(e)}")
             return None
 
+    def _repair_with_rules(self, ssml: str, error: AzureError) -> str | None:
+        """
+        Repair SSML with the rule-based normalizer.
+
+        Args:
+            ssml: SSML content Azure rejected
+            error: Parsed Azure error
+
+        Returns:
+            Repaired SSML, or None if the rules found nothing to fix
+        """
+        unsupported_voice = "unsupported voice" in (error.details or "").lower()
+        result = normalize_ssml(ssml, reset_voices=unsupported_voice)
+        if result is None or not result.fixes:
+            return None
+        logger.info(f"Repaired SSML with rules: {'; '.join(result.fixes)}")
+        return result.ssml
+
+    def _rules_resolve(self, error_code: int) -> bool:
+        """
+        Check in the repair log whether rule-based repairs resolve an error code.
+
+        A repair counts as resolved unless the scene failed again with the
+        repaired SSML, i.e. a later repair of the scene started from it.
+
+        Args:
+            error_code: Azure error code
+
+        Returns:
+            False if Azure rejected most rule-based repairs of this error code
+        """
+        try:
+            with self.db._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT COUNT(*) AS repairs,
+                        SUM(NOT EXISTS (
+                            SELECT 1 FROM ssml_repair_log later
+                            WHERE later.scene_id = r.scene_id AND later.id > r.id
+                            AND later.original_ssml = r.repaired_ssml
+                        )) AS resolved
+                    FROM ssml_repair_log r
+                    WHERE r.error_code = ? AND r.repair_method = 'rules'
+                    AND r.repair_successful
+                """,
+                    (error_code,),
+                )
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Failed to read repair history: {str(e)}")
+            return True
+
+        if row["repairs"] < self.RULES_MIN_REPAIRS:
+            return True
+        if row["resolved"] / row["repairs"] < self.RULES_MIN_RESOLVED_RATE:
+            logger.info(
+                f"Rules resolved {row['resolved']}/{row['repairs']} repairs of error "
+                f"{error_code}, using the LLM"
+            )
+            return False
+        return True
+
     def _apply_repair_strategy(
         self, ssml: str, error: AzureError, strategy: str, attempt: int
     ) -> str | None:
@@ -362,30 +444,6 @@ Repaired SSML:"""
         response = self.llm.invoke(prompt)
         return response.content if hasattr(response, "content") else str(response)
 
-    def _validate_ssml(self, ssml: str) -> bool:
-        """Validate that the SSML is well-formed XML."""
-        try:
-            # Parse the XML to check if it's valid
-            root = ET.fromstring(ssml)
-
-            # Check root element
-            tag_name = root.tag.split("}")[-1] if "}" in root.tag else root.tag
-            if tag_name != "speak":
-                logger.error(f"SSML root element is <{tag_name}>, not <speak>")
-                return False
-
-            # Check for required attributes
-            if "version" not in root.attrib:
-                logger.warning("SSML missing version attribute")
-
-            return True
-        except ET.ParseError as e:
-            logger.error(f"SSML XML validation failed: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error validating SSML: {e}")
-            return False
-
     def _log_repair_attempt(
         self,
         scene_id: int,
@@ -395,6 +453,7 @@ Repaired SSML:"""
         original_ssml: str,
         repaired_ssml: str,
         successful: bool,
+        repair_method: str = "llm",
     ) -> None:
         """Log repair attempt to database."""
         try:
@@ -404,8 +463,8 @@ Repaired SSML:"""
                     """
                     INSERT INTO ssml_repair_log
                     (scene_id, error_code, error_message, repair_attempt,
-                     original_ssml, repaired_ssml, repair_successful)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                     original_ssml, repaired_ssml, repair_successful, repair_method)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         scene_id,
@@ -415,6 +474,7 @@ Repaired SSML:"""
                         original_ssml,
                         repaired_ssml,
                         successful,
+                        repair_method,
                     ),
                 )
                 conn.commit()
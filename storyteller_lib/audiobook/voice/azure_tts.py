@@ -2,15 +2,20 @@
 Azure Text-to-Speech utilities for batch processing and advanced features.
 
 This module provides enhanced functionality for Azure TTS including:
-- Batch synthesis for large volumes
+- Batch synthesis for large volumes, with concurrent workers
+- Adaptive rate limiting that backs off when the service throttles
 - Progress callbacks
 - Error recovery
 - Voice configuration management
 """
 
 import hashlib
+import os
+import shutil
+import threading
 import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -21,6 +26,24 @@ from storyteller_lib.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Concurrent synthesis requests (the limiter lowers this while throttled)
+TTS_WORKERS = int(os.environ.get("TTS_WORKERS", "4"))
+
+# Attempts per item when the service keeps throttling
+TTS_MAX_RETRIES = int(os.environ.get("TTS_MAX_RETRIES", "6"))
+
+# Content-addressed audio cache shared by all stories
+TTS_CACHE_DIR = os.environ.get(
+    "TTS_CACHE_DIR", str(Path.home() / ".storyteller" / "cache" / "audio")
+)
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+# Cancellation codes meaning "slow down" rather than a bad request
+_THROTTLE_ERRORS = {
+    speechsdk.CancellationErrorCode.TooManyRequests,
+    speechsdk.CancellationErrorCode.ServiceUnavailable,
+}
+
 
 @dataclass
 class VoiceConfig:
@@ -99,10 +122,194 @@ class VoiceManager:
         return "en-US-JennyNeural"  # Ultimate fallback
 
 
+def is_throttled(result: speechsdk.SpeechSynthesisResult) -> bool:
+    """Check whether a synthesis was canceled because of rate limiting."""
+    if result.reason != speechsdk.ResultReason.Canceled:
+        return False
+    details = result.cancellation_details
+    return details.error_code in _THROTTLE_ERRORS or "429" in (
+        details.error_details or ""
+    )
+
+
+class AdaptiveRateLimiter:
+    """
+    Limits concurrent synthesis requests and backs off when throttled.
+
+    Concurrency grows by one after a full round of successful requests, up
+    to max_concurrency, and halves when a request is throttled, which also
+    pauses all new requests for an exponentially growing backoff. Requests
+    sent before that reaction don't halve it again. This
+    replaces fixed sleeps between requests: the workers run at full speed
+    until the service pushes back.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = TTS_WORKERS,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight
+            initial_backoff: Pause in seconds after the first throttled request
+            max_backoff: Longest pause in seconds
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.throttle_count = 0
+        self._active = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> int:
+        """
+        Wait until a request may be sent.
+
+        Returns:
+            A ticket to pass to release()
+        """
+        with self._condition:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self._active < self.concurrency:
+                    self._active += 1
+                    return self._generation
+                else:
+                    self._condition.wait()
+
+    def release(self, ticket: int, throttled: bool = False) -> None:
+        """
+        Report a finished request.
+
+        Args:
+            ticket: The ticket acquire() returned for the request
+            throttled: Whether the service rejected it for rate limiting
+        """
+        with self._condition:
+            self._active -= 1
+            if throttled:
+                self.throttle_count += 1
+            if throttled and ticket == self._generation:
+                self._generation += 1
+                self.concurrency = max(1, self.concurrency // 2)
+                self.backoff = min(
+                    self.max_backoff, self.backoff * 2 or self.initial_backoff
+                )
+                self._resume_at = time.monotonic() + self.backoff
+                self._successes = 0
+                logger.warning(
+                    f"TTS throttled, pausing {self.backoff:.1f}s with "
+                    f"{self.concurrency} concurrent requests"
+                )
+            elif not throttled:
+                self.backoff /= 2
+                self._successes += 1
+                if (
+                    self._successes >= self.concurrency
+                    and self.concurrency < self.max_concurrency
+                ):
+                    self.concurrency += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class ReusableSynthesizer:
+    """
+    Synthesizes SSML to files, reusing one SpeechSynthesizer per thread.
+
+    The synthesizers keep the audio in memory instead of writing to a file
+    output, so each thread's synthesizer and its service connection serve
+    every request. Audio is written to a temporary file and renamed, so an
+    interrupted run never leaves a truncated file that looks complete.
+    """
+
+    def __init__(
+        self,
+        speech_config: speechsdk.SpeechConfig,
+        limiter: AdaptiveRateLimiter | None = None,
+        max_retries: int = TTS_MAX_RETRIES,
+    ):
+        """
+        Initialize the synthesizer.
+
+        Args:
+            speech_config: Configured speech service, with voice and output
+                format set; later changes to it are not picked up
+            limiter: Rate limiter shared by all threads
+            max_retries: Attempts per request while throttled
+        """
+        self.speech_config = speech_config
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self._local = threading.local()
+
+    def _synthesizer(self) -> speechsdk.SpeechSynthesizer:
+        """Get the current thread's synthesizer."""
+        synthesizer = getattr(self._local, "synthesizer", None)
+        if synthesizer is None:
+            synthesizer = speechsdk.SpeechSynthesizer(
+                speech_config=self.speech_config, audio_config=None
+            )
+            self._local.synthesizer = synthesizer
+        return synthesizer
+
+    def synthesize(
+        self, ssml: str, output_path: Path
+    ) -> speechsdk.SpeechSynthesisResult:
+        """
+        Synthesize SSML to a file, retrying throttled requests.
+
+        Args:
+            ssml: The SSML to speak
+            output_path: File for the audio, written only on success
+
+        Returns:
+            The last synthesis result
+        """
+        for attempt in range(1, self.max_retries + 1):
+            ticket = self.limiter.acquire()
+            throttled = False
+            try:
+                result = self._synthesizer().speak_ssml_async(ssml).get()
+                throttled = is_throttled(result)
+            finally:
+                self.limiter.release(ticket, throttled)
+
+            if not throttled:
+                break
+            logger.info(
+                f"Retrying {output_path.name} after throttling "
+                f"(attempt {attempt}/{self.max_retries})"
+            )
+
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            partial_path = output_path.with_name(output_path.name + ".part")
+            partial_path.write_bytes(result.audio_data)
+            os.replace(partial_path, output_path)
+        return result
+
+
 class BatchSynthesizer:
     """Handles batch synthesis of multiple SSML texts."""
 
-    def __init__(self, speech_key: str, speech_region: str, output_format: str = "mp3"):
+    def __init__(
+        self,
+        speech_key: str,
+        speech_region: str,
+        output_format: str = "mp3",
+        max_workers: int = TTS_WORKERS,
+    ):
         """
         Initialize batch synthesizer.
 
@@ -110,10 +317,12 @@ class BatchSynthesizer:
             speech_key: Azure Speech Service key
             speech_region: Azure Speech Service region
             output_format: Audio format (mp3, wav)
+            max_workers: Number of concurrent synthesis requests
         """
         self.speech_key = speech_key
         self.speech_region = speech_region
         self.output_format = output_format
+        self.max_workers = max(1, max_workers)
 
         # Configure speech service
         self.speech_config = speechsdk.SpeechConfig(
@@ -130,21 +339,48 @@ class BatchSynthesizer:
                 speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm
             )
 
+        self.synthesizer = ReusableSynthesizer(
+            self.speech_config, AdaptiveRateLimiter(self.max_workers)
+        )
+
+    def _synthesize_item(self, item: dict[str, Any], output_dir: Path) -> dict:
+        """Synthesize one item and describe the outcome."""
+        output_path = output_dir / item["filename"]
+        result = self.synthesizer.synthesize(item["ssml"], output_path)
+
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            error_msg = f"Synthesis failed: {result.reason}"
+            if result.reason == speechsdk.ResultReason.Canceled:
+                error_msg += f" - {result.cancellation_details.error_details}"
+            raise RuntimeError(error_msg)
+
+        return {
+            "id": item["id"],
+            "filename": item["filename"],
+            "path": str(output_path),
+            "size_bytes": output_path.stat().st_size,
+        }
+
     def synthesize_batch(
         self,
         ssml_items: list[dict[str, Any]],
         output_dir: Path,
         progress_callback: Callable[[int, int], None] | None = None,
         error_callback: Callable[[str, Exception], None] | None = None,
+        skip_existing: bool = True,
     ) -> dict[str, Any]:
         """
-        Synthesize a batch of SSML texts.
+        Synthesize a batch of SSML texts concurrently.
+
+        Files are only written once complete, so an interrupted batch can be
+        resumed by running it again: items whose file exists are skipped.
 
         Args:
             ssml_items: List of dicts with 'id', 'ssml', and 'filename' keys
             output_dir: Directory for output files
             progress_callback: Optional callback for progress updates
             error_callback: Optional callback for errors
+            skip_existing: Skip items whose output file already exists
 
         Returns:
             Dictionary with results and statistics
@@ -152,85 +388,71 @@ class BatchSynthesizer:
         results = {
             "successful": [],
             "failed": [],
+            "skipped": [],
             "total_duration_seconds": 0,
             "total_size_bytes": 0,
+            "throttled_requests": 0,
         }
 
         total_items = len(ssml_items)
         start_time = time.time()
-
-        for idx, item in enumerate(ssml_items):
-            try:
-                output_path = output_dir / item["filename"]
-
-                # Configure audio output
-                audio_config = speechsdk.audio.AudioOutputConfig(
-                    filename=str(output_path), use_default_speaker=False
+        done = 0
+
+        pending = []
+        for item in ssml_items:
+            output_path = output_dir / item["filename"]
+            if skip_existing and output_path.exists():
+                results["skipped"].append(
+                    {"id": item["id"], "filename": item["filename"]}
                 )
+                done += 1
+            else:
+                pending.append(item)
 
-                # Create synthesizer
-                synthesizer = speechsdk.SpeechSynthesizer(
-                    speech_config=self.speech_config, audio_config=audio_config
-                )
-
-                # Synthesize SSML
-                result = synthesizer.speak_ssml_async(item["ssml"]).get()
-
-                if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                    file_size = output_path.stat().st_size
-                    results["successful"].append(
-                        {
-                            "id": item["id"],
-                            "filename": item["filename"],
-                            "path": str(output_path),
-                            "size_bytes": file_size,
-                        }
-                    )
-                    results["total_size_bytes"] += file_size
+        if done:
+            logger.info(f"Skipping {done} items synthesized by an earlier run")
+            if progress_callback:
+                progress_callback(done, total_items)
+
+        # Callbacks run on this thread, in completion order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._synthesize_item, item, output_dir): item
+                for item in pending
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    success = future.result()
+                    results["successful"].append(success)
+                    results["total_size_bytes"] += success["size_bytes"]
 
                     logger.info(
-                        f"Synthesized: {item['filename']} ({file_size / 1024:.1f} KB)"
+                        f"Synthesized: {item['filename']} "
+                        f"({success['size_bytes'] / 1024:.1f} KB)"
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Error synthesizing {item.get('filename', 'unknown')}: {str(e)}"
                     )
-                else:
-                    error_msg = f"Synthesis failed: {result.reason}"
-                    if result.reason == speechsdk.ResultReason.Canceled:
-                        error_msg += f" - {result.cancellation_details.error_details}"
-
                     results["failed"].append(
                         {
-                            "id": item["id"],
-                            "filename": item["filename"],
-                            "error": error_msg,
+                            "id": item.get("id"),
+                            "filename": item.get("filename"),
+                            "error": str(e),
                         }
                     )
 
                     if error_callback:
-                        error_callback(item["id"], Exception(error_msg))
+                        error_callback(item.get("id"), e)
 
-            except Exception as e:
-                logger.error(
-                    f"Error synthesizing {item.get('filename', 'unknown')}: {str(e)}"
-                )
-                results["failed"].append(
-                    {
-                        "id": item.get("id"),
-                        "filename": item.get("filename"),
-                        "error": str(e),
-                    }
-                )
-
-                if error_callback:
-                    error_callback(item.get("id"), e)
-
-            # Progress callback
-            if progress_callback:
-                progress_callback(idx + 1, total_items)
-
-            # Small delay to avoid rate limiting
-            if idx < total_items - 1:
-                time.sleep(0.3)
+                # Progress callback
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total_items)
 
         results["total_duration_seconds"] = time.time() - start_time
+        results["throttled_requests"] = self.synthesizer.limiter.throttle_count
 
         return results
 
@@ -307,39 +529,107 @@ class SSMLEnhancer:
         return f'<break time="{duration_ms}ms"/>'
 
 
+def link_or_copy(source: Path, target: Path) -> None:
+    """
+    Make target a hardlink to source, or a copy across filesystems.
+
+    The target is replaced atomically; a file previously linked at target
+    is left untouched.
+    """
+    partial_path = target.with_name(f"{target.name}.{threading.get_ident()}.part")
+    partial_path.unlink(missing_ok=True)
+    try:
+        os.link(source, partial_path)
+    except OSError:
+        shutil.copy2(source, partial_path)
+    os.replace(partial_path, target)
+
+
 class AudioCache:
-    """Simple cache for generated audio to avoid regenerating identical content."""
+    """
+    Content-addressed cache of synthesized audio.
+
+    Files are named by the hash of the SSML, voice and output format they
+    were synthesized from, and shared with the audiobook output through
+    hardlinks, so caching costs no extra disk space while the output
+    exists. Each hit refreshes the file's modification time, and evict()
+    removes the least recently used files once the cache outgrows its
+    size limit.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        """
+        Initialize cache with directory.
 
-    def __init__(self, cache_dir: Path):
-        """Initialize cache with directory."""
-        self.cache_dir = cache_dir
+        Args:
+            cache_dir: Directory of the cached files
+            max_bytes: Size above which evict() removes files
+        """
+        self.cache_dir = cache_dir.expanduser()
+        self.max_bytes = max_bytes
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-    def get_cache_key(self, ssml: str, voice: str) -> str:
-        """Generate cache key from SSML and voice."""
-        content = f"{ssml}|{voice}"
+    def get_cache_key(self, ssml: str, voice: str, output_format: str = "mp3") -> str:
+        """Generate cache key from SSML, voice and output format."""
+        content = f"{ssml}|{voice}|{output_format}"
         return hashlib.sha256(content.encode()).hexdigest()
 
-    def get_cached_file(self, ssml: str, voice: str) -> Path | None:
+    def _cache_file(self, ssml: str, voice: str, output_format: str) -> Path:
+        """Path of the cached audio for this content."""
+        cache_key = self.get_cache_key(ssml, voice, output_format)
+        return self.cache_dir / f"{cache_key}.{output_format}"
+
+    def get_cached_file(
+        self, ssml: str, voice: str, output_format: str = "mp3"
+    ) -> Path | None:
         """Check if audio for this SSML exists in cache."""
-        cache_key = self.get_cache_key(ssml, voice)
-        cache_file = self.cache_dir / f"{cache_key}.mp3"
+        cache_file = self._cache_file(ssml, voice, output_format)
 
-        if cache_file.exists():
-            logger.debug(f"Cache hit for key: {cache_key}")
-            return cache_file
+        try:
+            # Mark as recently used for eviction
+            os.utime(cache_file)
+        except FileNotFoundError:
+            return None
 
-        return None
+        logger.debug(f"Cache hit for key: {cache_file.stem}")
+        return cache_file
 
-    def save_to_cache(self, ssml: str, voice: str, audio_path: Path) -> Path:
+    def save_to_cache(
+        self, ssml: str, voice: str, audio_path: Path, output_format: str = "mp3"
+    ) -> Path:
         """Save audio file to cache."""
-        cache_key = self.get_cache_key(ssml, voice)
-        cache_file = self.cache_dir / f"{cache_key}.mp3"
+        cache_file = self._cache_file(ssml, voice, output_format)
+        link_or_copy(audio_path, cache_file)
 
-        # Copy file to cache
-        import shutil
+        logger.debug(f"Saved to cache: {cache_file.stem}")
+        return cache_file
 
-        shutil.copy2(audio_path, cache_file)
+    def evict(self) -> int:
+        """
+        Remove the least recently used files until the cache fits max_bytes.
 
-        logger.debug(f"Saved to cache: {cache_key}")
-        return cache_file
+        Returns:
+            Number of files removed
+        """
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.suffix == ".part":
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(
+                f"Evicted {removed} files from the audio cache "
+                f"({total / 1024 / 1024:.1f} MB left)"
+            )
+        return removed
@@ -8,19 +8,19 @@ including LLM initialization, memory store setup, and other shared resources.
 # Standard library imports
 import gc
 import os
+import threading
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 # Third party imports
 import psutil
 from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
-from langchain_community.cache import SQLiteCache
-from langchain_core.caches import BaseCache
-from langchain_core.globals import set_llm_cache
-from langchain_core.language_models import BaseChatModel
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+
+# LangChain and the provider SDKs are imported lazily, on first LLM use, so
+# that importing this module stays cheap and works without API keys
+if TYPE_CHECKING:
+    from langchain_core.caches import BaseCache
+    from langchain_core.language_models import BaseChatModel
 
 # Local imports
 from storyteller_lib.core.logger import config_logger as logger
@@ -32,7 +32,7 @@ load_dotenv()
 
 # LLM Configuration
 # Model provider options
-MODEL_PROVIDER_OPTIONS = ["openai", "anthropic", "gemini"]
+MODEL_PROVIDER_OPTIONS = ["openai", "anthropic", "gemini", "stub"]
 DEFAULT_PROVIDER = "openai"  # Changed from gemini to avoid timeout issues
 
 # Model configurations for each provider
@@ -52,13 +52,19 @@ MODEL_CONFIGS = {
         "env_key": "GEMINI_API_KEY",
         "max_tokens": 1000000,
     },
+    # Offline provider for benchmarks and profiling (see core/stub_llm.py)
+    "stub": {
+        "default_model": "stub",
+        "env_key": None,
+        "max_tokens": 32768,
+    },
 }
 
 # Default settings
 DEFAULT_MODEL_PROVIDER = os.environ.get("DEFAULT_MODEL_PROVIDER", DEFAULT_PROVIDER)
 DEFAULT_MODEL = os.environ.get("DEFAULT_MODEL", None)  # Specific model override
 DEFAULT_TEMPERATURE = 0.7
-DEFAULT_CACHE_TYPE = "sqlite"  # Only sqlite cache is supported
+DEFAULT_CACHE_TYPE = "sqlite"  # sqlite (memory + disk), memory or none
 CACHE_LOCATION = os.environ.get(
     "CACHE_PATH",
     os.environ.get(
@@ -81,6 +87,12 @@ DATABASE_PATH = os.environ.get(
     "STORY_DATABASE_PATH", str(Path.home() / ".storyteller" / "story_database.db")
 )
 
+# LangGraph checkpoints are stored next to the story database
+CHECKPOINT_PATH = os.environ.get(
+    "STORY_CHECKPOINT_PATH",
+    str(Path(DATABASE_PATH).with_name("story_checkpoints.db")),
+)
+
 # Initialize database manager and memory manager
 db_manager = initialize_db_manager(DATABASE_PATH)
 memory_manager = MemoryManager(db_manager)
@@ -105,32 +117,65 @@ SUPPORTED_LANGUAGES = {
 }
 
 
-def setup_cache(cache_type: str = DEFAULT_CACHE_TYPE) -> BaseCache | None:
+def setup_cache(cache_type: str = DEFAULT_CACHE_TYPE) -> "BaseCache | None":
     """
     Set up the LLM cache based on the specified type.
 
+    Both cached types use a TieredLLMCache: "sqlite" backs the in-memory LRU
+    with a bounded SQLite store at CACHE_LOCATION, "memory" keeps only the LRU.
+
     Args:
-        cache_type: The type of cache to use ("sqlite" or "none")
+        cache_type: The type of cache to use ("sqlite", "memory" or "none")
 
     Returns:
         The configured cache instance
     """
-    if cache_type.lower() == "none":
+    global cache, _cache_configured
+    from langchain_core.globals import set_llm_cache
+
+    from storyteller_lib.core.llm_cache import TieredLLMCache
+
+    _cache_configured = True
+    if cache is not None:
+        cache.close()
+
+    cache_type = cache_type.lower()
+    if cache_type == "none":
         logger.info("LLM caching disabled")
+        set_llm_cache(None)
+        cache = None
         return None
 
-    # Create parent directories for cache if needed
-    cache_path = Path(CACHE_LOCATION)
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-
-    cache = SQLiteCache(database_path=CACHE_LOCATION)
+    if cache_type == "memory":
+        cache = TieredLLMCache()
+    else:
+        if cache_type != "sqlite":
+            logger.warning(f"Unknown cache type '{cache_type}'. Using sqlite.")
+        cache = TieredLLMCache(database_path=CACHE_LOCATION)
     set_llm_cache(cache)
 
     return cache
 
 
-# Initialize the cache
-cache = setup_cache()
+def get_cache_stats() -> dict[str, Any]:
+    """
+    Get hit/miss and size statistics of the LLM cache.
+
+    Returns:
+        Cache statistics, or an empty dictionary if caching is disabled
+    """
+    if cache is None:
+        return {}
+    return cache.stats()
+
+
+# The cache is set up together with the first LLM instance
+cache = None
+_cache_configured = False
+
+# Registry of LLM instances keyed by (provider, model, temperature, max_tokens)
+_llm_registry: dict[tuple[str, str, float, int | None], "BaseChatModel"] = {}
+_llm_registry_lock = threading.Lock()
 
 
 def get_llm(
@@ -138,10 +183,13 @@ def get_llm(
     model: str | None = None,
     temperature: float | None = None,
     max_tokens: int | None = None,
-) -> BaseChatModel:
+) -> "BaseChatModel":
     """
     Get an instance of the LLM with the specified parameters.
 
+    Instances are created on first request and shared by every caller asking
+    for the same provider, model, temperature and token limit.
+
     Args:
         provider: The model provider to use (openai, anthropic, gemini)
         model: The model name to use (defaults to provider's default model)
@@ -168,10 +216,10 @@ def get_llm(
     # Use model parameter, then DEFAULT_MODEL env var, then provider's default
     model_name = model or DEFAULT_MODEL or provider_config["default_model"]
     api_key_env = provider_config["env_key"]
-    api_key = os.environ.get(api_key_env)
+    api_key = os.environ.get(api_key_env) if api_key_env else None
 
-    # Check if API key is available
-    if not api_key:
+    # Check if API key is available (the stub provider needs none)
+    if api_key_env and not api_key:
         logger.warning(
             f"No API key found for {provider} (env: {api_key_env}). Falling back to {DEFAULT_PROVIDER}."
         )
@@ -189,34 +237,110 @@ def get_llm(
     # Use provided max_tokens or get from provider config
     tokens = max_tokens or provider_config.get("max_tokens")
 
-    # Create the appropriate LLM instance based on provider
+    key = (provider, model_name, temp, tokens)
+    with _llm_registry_lock:
+        instance = _llm_registry.get(key)
+        if instance is None:
+            if not _cache_configured:
+                setup_cache(os.environ.get("CACHE_TYPE", DEFAULT_CACHE_TYPE))
+            instance = _create_llm(provider, model_name, temp, api_key, tokens)
+            from storyteller_lib.core.llm_engine import get_llm_callbacks
+
+            callbacks = get_llm_callbacks()
+            if callbacks:
+                instance.callbacks = callbacks
+            _llm_registry[key] = instance
+            logger.debug(f"Created LLM instance {provider}/{model_name} (t={temp})")
+    return instance
+
+
+def _create_llm(
+    provider: str,
+    model_name: str,
+    temperature: float,
+    api_key: str,
+    max_tokens: int | None,
+) -> "BaseChatModel":
+    """Import the provider package and construct its chat model."""
     if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=model_name,
-            temperature=temp,
+            temperature=temperature,
             openai_api_key=api_key,
-            max_tokens=tokens,
+            max_tokens=max_tokens,
         )
     elif provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+
         return ChatAnthropic(
             model=model_name,
-            temperature=temp,
+            temperature=temperature,
             anthropic_api_key=api_key,
-            max_tokens=tokens,
+            max_tokens=max_tokens,
         )
     elif provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
             model=model_name,
-            temperature=temp,
+            temperature=temperature,
             google_api_key=api_key,
-            max_tokens=tokens,
+            max_tokens=max_tokens,
+        )
+    elif provider == "stub":
+        from storyteller_lib.core.stub_llm import StubChatModel
+
+        return StubChatModel(
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
 
 
-# Initialize the default LLM instance
-llm = get_llm()
+class LazyLLM:
+    """
+    Proxy for an LLM instance that is only created when first used.
+
+    Attribute access (``invoke``, ``with_structured_output``, ...) resolves
+    the underlying instance through get_llm, so the provider, model and API
+    key are read at first use rather than at import time.
+    """
+
+    def __init__(self, **llm_kwargs: Any):
+        """
+        Initialize the proxy.
+
+        Args:
+            **llm_kwargs: Arguments passed to get_llm on first use
+        """
+        self._llm_kwargs = llm_kwargs
+        self._instance: BaseChatModel | None = None
+
+    def resolve(self) -> "BaseChatModel":
+        """Create (or return) the underlying LLM instance."""
+        if self._instance is None:
+            self._instance = get_llm(**self._llm_kwargs)
+        return self._instance
+
+    def reset(self) -> None:
+        """Forget the resolved instance so the next use re-reads the config."""
+        self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return "<LazyLLM (unresolved)>"
+        return f"<LazyLLM {self._instance!r}>"
+
+
+# The default LLM instance, created on first use
+llm = LazyLLM()
 
 # Track the current provider for Gemini-specific handling
 _current_provider = None
@@ -236,7 +360,7 @@ def get_llm_with_structured_output(
     model: str | None = None,
     temperature: float | None = None,
     max_tokens: int | None = None,
-) -> BaseChatModel:
+) -> "BaseChatModel":
     """
     Get an LLM instance configured for structured output using LangChain's with_structured_output.
 
@@ -406,9 +530,6 @@ def cleanup_old_state(
 
 
 # Translation utility for guidance text
-from langchain_core.messages import HumanMessage
-
-
 def translate_guidance(guidance_text: str, target_language: str) -> str:
     """
     Translate guidance text to the target language using LLM.
@@ -434,6 +555,8 @@ def translate_guidance(guidance_text: str, target_language: str) -> str:
     language_name = SUPPORTED_LANGUAGES[target_language.lower()]
 
     # Use template system
+    from langchain_core.messages import HumanMessage
+
     from storyteller_lib.prompts.renderer import render_prompt
 
     prompt = render_prompt(
@@ -0,0 +1,328 @@
+"""
+StoryCraft Agent - Token and cost ledger of LLM requests.
+
+Every LLM request made by a model from ``get_llm`` is written to the
+``llm_usage`` table of the story database with its input and output
+tokens, estimated cost and latency, attributed to the graph node that made
+it and the chapter and scene the story was at. Requests answered by the
+LLM cache cost nothing; the cost they would have had is recorded as saved.
+
+Token counts come from the provider's usage metadata. When a provider
+reports none (e.g. the stub provider), they are estimated from the text
+length and the entry is marked as estimated. Prices are list prices in USD
+per million tokens, matched by model name prefix, and can be overridden
+with LLM_PRICES, e.g. ``LLM_PRICES='{"gpt-4.1-mini": [0.4, 1.6]}'``.
+
+Entries are buffered and written when a node finishes, so the ledger adds
+one batched insert per node.
+"""
+
+# Standard library imports
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from uuid import UUID
+
+# Third party imports
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Local imports
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+LEDGER_ENABLED = os.environ.get("STORY_LLM_LEDGER", "true").lower() == "true"
+
+# List prices in USD per million (input, output) tokens, by model name prefix
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "claude-opus-4": (15.00, 75.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash-preview-05-20": (0.15, 0.60),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "stub": (0.0, 0.0),
+}
+MODEL_PRICES.update(
+    {
+        model: (float(prices[0]), float(prices[1]))
+        for model, prices in json.loads(os.environ.get("LLM_PRICES", "{}")).items()
+    }
+)
+
+# Characters per token used when a provider reports no usage
+CHARS_PER_TOKEN = 4
+
+# (node, chapter, scene) of the graph node running in this context
+_position: contextvars.ContextVar[tuple[str, int | None, int | None] | None] = (
+    contextvars.ContextVar("storyteller_ledger_position", default=None)
+)
+
+
+def model_price(model: str) -> tuple[float, float] | None:
+    """
+    Look up the price of a model.
+
+    Args:
+        model: Model name as reported by the provider
+
+    Returns:
+        USD per million (input, output) tokens, or None if unknown
+    """
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def response_usage(response: Any) -> dict[str, Any]:
+    """
+    Read token usage and the cache flag from an LLMResult.
+
+    Args:
+        response: The LLMResult passed to on_llm_end
+
+    Returns:
+        input_tokens and output_tokens (None if the provider reported no
+        usage), cache_hit and the response text
+    """
+    input_tokens = output_tokens = 0
+    found = False
+    cache_hit = False
+    text = []
+    for generations in response.generations:
+        for generation in generations:
+            text.append(getattr(generation, "text", "") or "")
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None) or {}
+            # LangChain zeroes the cost of responses served from the cache
+            if usage.get("total_cost") == 0:
+                cache_hit = True
+            if "input_tokens" in usage:
+                found = True
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+            elif message is not None and getattr(message, "tool_calls", None):
+                text.append(json.dumps([c["args"] for c in message.tool_calls]))
+    if not found:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            found = True
+            input_tokens = token_usage.get("prompt_tokens", 0)
+            output_tokens = token_usage.get("completion_tokens", 0)
+    return {
+        "input_tokens": input_tokens if found else None,
+        "output_tokens": output_tokens if found else None,
+        "cache_hit": cache_hit,
+        "text": "".join(text),
+    }
+
+
+@contextmanager
+def ledger_position(
+    node: str, chapter: Any = None, scene: Any = None
+) -> Iterator[None]:
+    """
+    Attribute the LLM requests made in a block to a node and story position.
+
+    Args:
+        node: Graph node name
+        chapter: Current chapter number (ignored if not a number)
+        scene: Current scene number (ignored if not a number)
+    """
+    token = _position.set((node, _as_int(chapter), _as_int(scene)))
+    try:
+        yield
+    finally:
+        _position.reset(token)
+
+
+def _as_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class UsageLedger(BaseCallbackHandler):
+    """Collects a ledger entry per LLM request of the models it is attached to."""
+
+    def __init__(self):
+        """Initialize an empty ledger."""
+        self._pending: dict[UUID, dict[str, Any]] = {}
+        self._entries: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._totals = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_hits": 0,
+            "cost_usd": 0.0,
+            "saved_usd": 0.0,
+        }
+
+    def _start(self, run_id: UUID, model: str, prompt_chars: int) -> None:
+        node, chapter, scene = _position.get() or (None, None, None)
+        with self._lock:
+            self._pending[run_id] = {
+                "node": node,
+                "chapter_number": chapter,
+                "scene_number": scene,
+                "model": model,
+                "prompt_chars": prompt_chars,
+                "start": time.monotonic(),
+            }
+
+    @staticmethod
+    def _model_name(serialized: dict[str, Any], kwargs: dict[str, Any]) -> str:
+        params = kwargs.get("invocation_params") or {}
+        return (
+            params.get("model")
+            or params.get("model_name")
+            or (serialized or {}).get("name")
+            or "unknown"
+        )
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        self._start(run_id, self._model_name(serialized, kwargs), chars)
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs
+    ) -> None:
+        chars = sum(len(p) for p in prompts)
+        self._start(run_id, self._model_name(serialized, kwargs), chars)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+
+        usage = response_usage(response)
+        estimated = usage["input_tokens"] is None
+        if estimated:
+            input_tokens = pending["prompt_chars"] // CHARS_PER_TOKEN
+            output_tokens = len(usage["text"]) // CHARS_PER_TOKEN
+        else:
+            input_tokens, output_tokens = usage["input_tokens"], usage["output_tokens"]
+
+        price = model_price(pending["model"])
+        cost = (
+            (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+            if price
+            else None
+        )
+        entry = {
+            "node": pending["node"],
+            "chapter_number": pending["chapter_number"],
+            "scene_number": pending["scene_number"],
+            "model": pending["model"],
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tokens_estimated": estimated,
+            "cache_hit": usage["cache_hit"],
+            "cost_usd": 0.0 if usage["cache_hit"] and cost is not None else cost,
+            "saved_usd": cost if usage["cache_hit"] else None,
+            "latency": time.monotonic() - pending["start"],
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._totals["requests"] += 1
+            self._totals["input_tokens"] += input_tokens
+            self._totals["output_tokens"] += output_tokens
+            self._totals["cache_hits"] += int(usage["cache_hit"])
+            self._totals["cost_usd"] += entry["cost_usd"] or 0.0
+            self._totals["saved_usd"] += entry["saved_usd"] or 0.0
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def flush(self) -> int:
+        """
+        Write the buffered entries to the story database.
+
+        Returns:
+            Number of entries written
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+
+        from storyteller_lib.persistence.database import get_db_manager
+
+        db_manager = get_db_manager()
+        if not db_manager or not db_manager._db:
+            return 0
+        try:
+            db_manager._db.save_llm_usage(entries)
+        except Exception as e:
+            logger.warning(f"Could not write {len(entries)} LLM ledger entries: {e}")
+            return 0
+        return len(entries)
+
+    def totals(self) -> dict[str, Any]:
+        """
+        Get the totals of this process's requests.
+
+        Returns:
+            Requests, input and output tokens, cache hits, cost and savings
+        """
+        with self._lock:
+            return dict(self._totals)
+
+
+_ledger: UsageLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger | None:
+    """
+    Get the process-wide ledger.
+
+    Returns:
+        The shared UsageLedger, or None if STORY_LLM_LEDGER is false
+    """
+    global _ledger
+    if not LEDGER_ENABLED:
+        return None
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger()
+            atexit.register(_ledger.flush)
+        return _ledger
+
+
+@contextmanager
+def ledger_node(node: str, state: dict[str, Any]) -> Iterator[None]:
+    """
+    Attribute a node's LLM requests and write them when the node finishes.
+
+    Args:
+        node: Node name
+        state: Story state the node runs on
+    """
+    with ledger_position(
+        node, state.get("current_chapter"), state.get("current_scene")
+    ):
+        try:
+            yield
+        finally:
+            if _ledger is not None:
+                _ledger.flush()
@@ -0,0 +1,402 @@
+"""
+StoryCraft Agent - Two-tier LLM response cache.
+
+This module provides the LangChain cache installed by ``setup_cache``:
+
+- an in-process LRU holding deserialized responses for hot prompts
+  (structured-output retries, reflection re-runs)
+- a bounded SQLite store behind it (WAL, pooled connections) holding
+  zlib-compressed payloads, evicted by age and by total size
+
+Hit, miss and byte counters for both tiers are available through
+``TieredLLMCache.stats()``.
+"""
+
+# Standard library imports
+import hashlib
+import os
+import threading
+import time
+import warnings
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+# Third party imports
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+# Local imports
+from storyteller_lib.core.logger import get_logger
+from storyteller_lib.persistence.connection import (
+    close_connection_manager,
+    get_connection_manager,
+)
+
+logger = get_logger(__name__)
+
+# Cached payloads are produced by this module; silence the beta and
+# allowed_objects warnings langchain_core.load.loads emits for every read
+warnings.filterwarnings("ignore", module=r"storyteller_lib\.core\.llm_cache")
+
+# Cache limits (overridable through the environment)
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "512"))
+LLM_CACHE_MAX_AGE_DAYS = float(os.environ.get("LLM_CACHE_MAX_AGE_DAYS", "90"))
+LLM_CACHE_COMPRESSION_LEVEL = int(os.environ.get("LLM_CACHE_COMPRESSION_LEVEL", "6"))
+
+# Eviction trims the store to this fraction of the size limit
+EVICTION_LOW_WATER = 0.9
+# Age-based pruning runs every this many writes
+PRUNE_EVERY_WRITES = 256
+# Access times are refreshed at most this often per entry (seconds)
+TOUCH_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_accessed
+ON llm_response_cache(accessed_at);
+"""
+
+
+class TieredLLMCache(BaseCache):
+    """
+    LangChain cache with an in-memory LRU in front of a bounded SQLite store.
+
+    Lookups check the LRU first and fall back to SQLite, promoting disk hits
+    into the LRU. Updates are written through to both tiers. When the store
+    exceeds ``max_bytes`` the least recently accessed entries are evicted;
+    entries not accessed for ``max_age_days`` are pruned periodically.
+    """
+
+    def __init__(
+        self,
+        database_path: str | None = None,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_bytes: int | None = None,
+        max_age_days: float = LLM_CACHE_MAX_AGE_DAYS,
+        compression_level: int = LLM_CACHE_COMPRESSION_LEVEL,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            database_path: SQLite file for the persistent tier (None for memory only)
+            memory_entries: Number of responses kept in the in-memory LRU
+            max_bytes: Size limit of the persistent tier (compressed payload bytes)
+            max_age_days: Entries not accessed for this long are pruned
+            compression_level: zlib compression level for stored payloads
+        """
+        self.database_path = (
+            str(Path(database_path).expanduser()) if database_path else None
+        )
+        self.memory_entries = max(0, memory_entries)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else int(LLM_CACHE_MAX_MB * 1024 * 1024)
+        )
+        self.max_age_days = max_age_days
+        self.compression_level = compression_level
+
+        self._memory: OrderedDict[str, RETURN_VAL_TYPE] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._disk_entries = 0
+        self._disk_bytes = 0
+        self._counters = dict.fromkeys(
+            [
+                "memory_hits",
+                "disk_hits",
+                "misses",
+                "writes",
+                "evictions",
+                "bytes_read",
+                "bytes_written",
+                "errors",
+            ],
+            0,
+        )
+
+        self._pool = None
+        if self.database_path:
+            Path(self.database_path).parent.mkdir(parents=True, exist_ok=True)
+            self._pool = get_connection_manager(self.database_path)
+            self._init_db()
+
+    def _init_db(self) -> None:
+        """Create the cache table and load the current store size."""
+        try:
+            with self._pool.connection() as conn:
+                conn.executescript(SCHEMA)
+                row = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache"
+                ).fetchone()
+                self._disk_entries, self._disk_bytes = row[0], row[1]
+            self.prune()
+            self._evict_to_limit()
+        except Exception as e:
+            logger.error(f"Error initializing LLM cache at {self.database_path}: {e}")
+            self._counters["errors"] += 1
+
+    @staticmethod
+    def _cache_key(prompt: str, llm_string: str) -> str:
+        """Hash the prompt and model configuration into a stable key."""
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode())
+        digest.update(b"\0")
+        digest.update(prompt.encode())
+        return digest.hexdigest()
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        """Insert a response into the LRU (lock must be held)."""
+        if not self.memory_entries:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: Serialized prompt
+            llm_string: Serialized model configuration
+
+        Returns:
+            The cached generations, or None on a miss
+        """
+        key = self._cache_key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return value
+
+        if self._pool is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        try:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT payload, accessed_at FROM llm_response_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    with self._lock:
+                        self._counters["misses"] += 1
+                    return None
+
+                now = time.time()
+                if now - row["accessed_at"] > TOUCH_INTERVAL:
+                    conn.execute(
+                        "UPDATE llm_response_cache SET accessed_at = ? WHERE cache_key = ?",
+                        (now, key),
+                    )
+                    conn.commit()
+
+            value = loads(zlib.decompress(row["payload"]).decode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Error reading LLM cache entry: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+                self._counters["misses"] += 1
+            return None
+
+        with self._lock:
+            self._counters["disk_hits"] += 1
+            self._counters["bytes_read"] += len(row["payload"])
+            self._remember(key, value)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            prompt: Serialized prompt
+            llm_string: Serialized model configuration
+            return_val: Generations to cache
+        """
+        key = self._cache_key(prompt, llm_string)
+        with self._lock:
+            self._remember(key, return_val)
+            self._counters["writes"] += 1
+
+        if self._pool is None:
+            return
+
+        try:
+            payload = zlib.compress(
+                dumps(list(return_val)).encode("utf-8"), self.compression_level
+            )
+            now = time.time()
+            with self._pool.connection() as conn:
+                previous = conn.execute(
+                    "SELECT size FROM llm_response_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_response_cache
+                    (cache_key, payload, size, created_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    (key, payload, len(payload), now, now),
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Error writing LLM cache entry: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+            return
+
+        with self._lock:
+            self._counters["bytes_written"] += len(payload)
+            self._disk_bytes += len(payload) - (previous["size"] if previous else 0)
+            self._disk_entries += 0 if previous else 1
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= PRUNE_EVERY_WRITES
+
+        if prune:
+            self.prune()
+        if self._disk_bytes > self.max_bytes:
+            self._evict_to_limit()
+
+    def prune(self) -> int:
+        """
+        Delete entries that have not been accessed for ``max_age_days``.
+
+        Also re-reads the size of the store, which other processes sharing
+        the cache file change without this instance noticing.
+
+        Returns:
+            Number of entries deleted
+        """
+        if self._pool is None:
+            return 0
+
+        cutoff = time.time() - self.max_age_days * 86400
+        try:
+            with self._pool.connection() as conn:
+                row = (0, 0)
+                if self.max_age_days > 0:
+                    row = conn.execute(
+                        """
+                        SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache
+                        WHERE accessed_at < ?
+                    """,
+                        (cutoff,),
+                    ).fetchone()
+                if row[0]:
+                    conn.execute(
+                        "DELETE FROM llm_response_cache WHERE accessed_at < ?",
+                        (cutoff,),
+                    )
+                    conn.commit()
+                size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache"
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"Error pruning LLM cache: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+            return 0
+
+        with self._lock:
+            self._writes_since_prune = 0
+            self._disk_entries, self._disk_bytes = size[0], size[1]
+            self._counters["evictions"] += row[0]
+        if row[0]:
+            logger.info(
+                f"Pruned {row[0]} LLM cache entries older than {self.max_age_days} days"
+            )
+        return row[0]
+
+    def _evict_to_limit(self) -> int:
+        """Evict least recently accessed entries until under the size limit."""
+        if self._pool is None or self._disk_bytes <= self.max_bytes:
+            return 0
+
+        target = self._disk_bytes - int(self.max_bytes * EVICTION_LOW_WATER)
+        try:
+            with self._pool.connection() as conn:
+                victims = []
+                freed = 0
+                for row in conn.execute(
+                    "SELECT cache_key, size FROM llm_response_cache ORDER BY accessed_at"
+                ):
+                    victims.append((row["cache_key"],))
+                    freed += row["size"]
+                    if freed >= target:
+                        break
+                conn.executemany(
+                    "DELETE FROM llm_response_cache WHERE cache_key = ?", victims
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Error evicting LLM cache entries: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+            return 0
+
+        with self._lock:
+            self._disk_entries -= len(victims)
+            self._disk_bytes -= freed
+            self._counters["evictions"] += len(victims)
+        logger.info(
+            f"Evicted {len(victims)} LLM cache entries ({freed / 1024 / 1024:.1f} MB)"
+        )
+        return len(victims)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self._pool is None:
+            return
+        try:
+            with self._pool.connection() as conn:
+                conn.execute("DELETE FROM llm_response_cache")
+                conn.commit()
+            with self._lock:
+                self._disk_entries = 0
+                self._disk_bytes = 0
+            logger.info("Cleared LLM cache")
+        except Exception as e:
+            logger.error(f"Error clearing LLM cache: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get hit/miss and size statistics for both tiers.
+
+        Returns:
+            Dictionary of counters, current sizes and the overall hit rate
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._disk_entries
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        stats["database_path"] = self.database_path
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def close(self) -> None:
+        """Close the pooled connections of the persistent tier."""
+        if self.database_path:
+            close_connection_manager(self.database_path)
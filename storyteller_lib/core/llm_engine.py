@@ -0,0 +1,677 @@
+"""
+StoryCraft Agent - Bounded-concurrency LLM execution engine.
+
+This module runs LLM calls built by ``get_llm`` and
+``get_llm_with_structured_output`` through a shared engine that enforces,
+per provider:
+
+- a concurrency limit (in-flight requests)
+- token-bucket rate limits for requests and tokens per minute
+- retries of transient failures (rate limits, timeouts, 5xx) with
+  exponentially growing, fully jittered backoff
+
+Independent prompts can be submitted as a batch and gathered concurrently,
+from async code (``abatch``) or from the synchronous graph nodes (``batch``).
+Synchronous calls run the model's blocking ``invoke`` on the calling
+thread (batches on worker threads) rather than on a throwaway event loop,
+as the provider SDKs' pooled async HTTP clients are bound to the loop that
+opened them. The limiters are thread-safe and not bound to an event loop,
+so the budget is shared by every thread and loop in the process. Processes that must
+share one budget (the batch runner's workers) can additionally install a
+process-shared semaphore with ``set_shared_concurrency_budget``.
+"""
+
+# Standard library imports
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+# Third party imports
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Local imports
+from storyteller_lib.core.config import (
+    get_current_provider,
+    get_llm,
+    get_llm_with_structured_output,
+)
+from storyteller_lib.core.exceptions import LLMConnectionError, LLMQuotaError
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Engine defaults (overridable through the environment, optionally per
+# provider, e.g. LLM_MAX_CONCURRENCY_ANTHROPIC=2)
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.environ.get("LLM_RETRY_MAX_DELAY", "60.0"))
+# Completion tokens reserved per request before the actual usage is known
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.environ.get("LLM_OUTPUT_TOKEN_ESTIMATE", "1000"))
+
+# How often waiters poll for a free concurrency slot (seconds)
+SLOT_POLL_INTERVAL = 0.05
+
+# HTTP status codes and exception names that indicate a transient failure
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+RATE_LIMIT_STATUS_CODES = {429, 529}
+RETRYABLE_ERROR_NAMES = (
+    "RateLimit",
+    "ResourceExhausted",
+    "Timeout",
+    "APIConnection",
+    "ServiceUnavailable",
+    "InternalServer",
+    "Overloaded",
+)
+
+
+def _provider_setting(name: str, provider: str, default: float) -> float:
+    """Read a per-provider override such as LLM_MAX_CONCURRENCY_OPENAI."""
+    value = os.environ.get(f"{name}_{provider.upper()}")
+    return type(default)(value) if value is not None else default
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """
+    Roughly estimate the number of tokens in a prompt.
+
+    Args:
+        prompt: Prompt string or list of messages
+
+    Returns:
+        Estimated token count (about four characters per token)
+    """
+    if isinstance(prompt, str):
+        text_length = len(prompt)
+    elif isinstance(prompt, list | tuple):
+        text_length = sum(
+            len(str(getattr(message, "content", message))) for message in prompt
+        )
+    else:
+        text_length = len(str(prompt))
+    return max(1, text_length // 4)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``per_minute / 60``.
+
+    A limit of 0 disables the bucket. Requests larger than the bucket's
+    capacity are clamped to it so they can still proceed.
+    """
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute: Capacity and refill amount per minute (0 = unlimited)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Take tokens if available.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        if self.capacity <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+    def wait(self, amount: float) -> float:
+        """
+        Block until tokens are available and take them.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while (delay := self.try_acquire(amount)) > 0:
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire(self, amount: float) -> float:
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while (delay := self.try_acquire(amount)) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+
+class ProviderLimiter:
+    """Concurrency slots and rate limits for one provider."""
+
+    def __init__(self, provider: str):
+        """
+        Initialize the limiter from the environment.
+
+        Args:
+            provider: Provider name (openai, anthropic, gemini)
+        """
+        self.provider = provider
+        self.max_concurrency = max(
+            1, _provider_setting("LLM_MAX_CONCURRENCY", provider, LLM_MAX_CONCURRENCY)
+        )
+        self.requests = TokenBucket(
+            _provider_setting(
+                "LLM_REQUESTS_PER_MINUTE", provider, LLM_REQUESTS_PER_MINUTE
+            )
+        )
+        self.tokens = TokenBucket(
+            _provider_setting("LLM_TOKENS_PER_MINUTE", provider, LLM_TOKENS_PER_MINUTE)
+        )
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    async def acquire_slot(self) -> float:
+        """Wait for a free concurrency slot; returns seconds spent waiting."""
+        start = time.monotonic()
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(SLOT_POLL_INTERVAL)
+        return time.monotonic() - start
+
+    def wait_slot(self) -> float:
+        """Block until a concurrency slot is free; returns seconds spent waiting."""
+        start = time.monotonic()
+        self._slots.acquire()
+        return time.monotonic() - start
+
+    def release_slot(self) -> None:
+        """Release a concurrency slot."""
+        self._slots.release()
+
+
+class SharedConcurrencyBudget(BaseCallbackHandler):
+    """
+    Caps in-flight LLM requests across processes.
+
+    Attached as a callback to every model created by ``get_llm``, it holds
+    a slot of a process-shared semaphore from the start of each request
+    until its end or error, so requests made directly through a model and
+    requests made through the engine are counted alike.
+    """
+
+    def __init__(self, semaphore: Any, held: Any = None):
+        """
+        Initialize the budget.
+
+        Args:
+            semaphore: multiprocessing semaphore shared by the processes
+            held: Optional shared integer (multiprocessing.Value) kept equal
+                to the number of slots this process holds, so a parent can
+                return them if the process dies
+        """
+        self.semaphore = semaphore
+        self.held = held
+        self._held: set[UUID] = set()
+        self._lock = threading.Lock()
+
+    def _acquire(self, run_id: UUID) -> None:
+        self.semaphore.acquire()
+        with self._lock:
+            self._held.add(run_id)
+            if self.held is not None:
+                self.held.value += 1
+
+    def _release(self, run_id: UUID) -> None:
+        with self._lock:
+            if run_id not in self._held:
+                return
+            self._held.discard(run_id)
+            if self.held is not None:
+                self.held.value -= 1
+        self.semaphore.release()
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        self._acquire(run_id)
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs
+    ) -> None:
+        self._acquire(run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs) -> None:
+        self._release(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._release(run_id)
+
+
+_shared_budget: SharedConcurrencyBudget | None = None
+
+
+def set_shared_concurrency_budget(semaphore: Any, held: Any = None) -> None:
+    """
+    Share an LLM concurrency budget with other processes.
+
+    Must be called before the first ``get_llm`` call of the process; models
+    created afterwards hold a slot of ``semaphore`` for every request.
+
+    Args:
+        semaphore: multiprocessing semaphore (None removes the budget)
+        held: Optional shared counter of the slots held by this process
+    """
+    global _shared_budget
+    _shared_budget = (
+        SharedConcurrencyBudget(semaphore, held) if semaphore is not None else None
+    )
+
+
+def get_llm_callbacks() -> list[BaseCallbackHandler]:
+    """
+    Get the callbacks to attach to newly created models.
+
+    Returns:
+        The shared concurrency budget, the response recorder, the tracing
+        callback and the usage ledger, if enabled
+    """
+    from storyteller_lib.core.ledger import get_usage_ledger
+    from storyteller_lib.core.stub_llm import get_response_recorder
+    from storyteller_lib.core.tracing import get_tracing_callback
+
+    callbacks: list[BaseCallbackHandler] = []
+    if _shared_budget is not None:
+        callbacks.append(_shared_budget)
+    recorder = get_response_recorder()
+    if recorder is not None:
+        callbacks.append(recorder)
+    tracing = get_tracing_callback()
+    if tracing is not None:
+        callbacks.append(tracing)
+    ledger = get_usage_ledger()
+    if ledger is not None:
+        callbacks.append(ledger)
+    return callbacks
+
+
+@dataclass
+class LLMRequest:
+    """One prompt to run through the engine."""
+
+    prompt: Any
+    response_schema: Any = None
+    provider: str | None = None
+    model: str | None = None
+    temperature: float | None = None
+    max_tokens: int | None = None
+
+
+class LLMEngine:
+    """
+    Runs LLM requests with per-provider concurrency and rate limits.
+
+    Use the module-level ``get_llm_engine()`` to share one engine (and its
+    limits) across the process.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            max_retries: Retries of a transient failure before giving up
+            base_delay: Backoff delay cap for the first retry (seconds)
+            max_delay: Upper bound of the backoff delay cap (seconds)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._limiters: dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ["requests", "retries", "failures", "tokens", "wait_seconds"], 0
+        )
+
+    def limiter(self, provider: str | None = None) -> ProviderLimiter:
+        """
+        Get the limiter for a provider.
+
+        Args:
+            provider: Provider name (defaults to the current provider)
+
+        Returns:
+            The shared ProviderLimiter
+        """
+        provider = provider or get_current_provider()
+        with self._lock:
+            limiter = self._limiters.get(provider)
+            if limiter is None:
+                limiter = ProviderLimiter(provider)
+                self._limiters[provider] = limiter
+            return limiter
+
+    @staticmethod
+    def _status_code(error: Exception) -> int | None:
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        response = getattr(error, "response", None)
+        if status is None and response is not None:
+            status = getattr(response, "status_code", None)
+        return status if isinstance(status, int) else None
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Decide whether a failure is transient and worth retrying.
+
+        Args:
+            error: Exception raised by the provider client
+
+        Returns:
+            True for rate limits, timeouts, connection errors and 5xx responses
+        """
+        if isinstance(error, asyncio.TimeoutError | TimeoutError | ConnectionError):
+            return True
+        if self._status_code(error) in RETRYABLE_STATUS_CODES:
+            return True
+        name = type(error).__name__
+        return any(marker in name for marker in RETRYABLE_ERROR_NAMES)
+
+    def _is_rate_limit(self, error: Exception) -> bool:
+        name = type(error).__name__
+        return (
+            self._status_code(error) in RATE_LIMIT_STATUS_CODES
+            or "RateLimit" in name
+            or "ResourceExhausted" in name
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff delay.
+
+        Args:
+            attempt: Zero-based retry attempt
+
+        Returns:
+            Seconds to sleep before the next attempt
+        """
+        cap = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0, cap)
+
+    def _build_runnable(self, request: LLMRequest) -> Any:
+        if request.response_schema is not None:
+            return get_llm_with_structured_output(
+                request.response_schema,
+                request.provider,
+                request.model,
+                request.temperature,
+                request.max_tokens,
+            )
+        return get_llm(
+            request.provider, request.model, request.temperature, request.max_tokens
+        )
+
+    def _record(self, **counts: float) -> None:
+        with self._lock:
+            for key, value in counts.items():
+                self._stats[key] += value
+
+    async def arun(self, request: LLMRequest) -> Any:
+        """
+        Run one request under the provider's limits, retrying transient errors.
+
+        Args:
+            request: The request to run
+
+        Returns:
+            The model response (message or structured output)
+
+        Raises:
+            LLMQuotaError: If rate limiting persists after all retries
+            LLMConnectionError: If another transient error persists after all retries
+        """
+        limiter = self.limiter(request.provider)
+        runnable = self._build_runnable(request)
+        reserved = estimate_tokens(request.prompt) + LLM_OUTPUT_TOKEN_ESTIMATE
+
+        attempt = 0
+        while True:
+            waited = await limiter.requests.acquire(1)
+            waited += await limiter.tokens.acquire(reserved)
+            waited += await limiter.acquire_slot()
+            try:
+                result = await runnable.ainvoke(request.prompt)
+            except Exception as e:
+                limiter.release_slot()
+                delay = self._retry_delay(limiter, e, attempt, waited)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            return self._settle(limiter, result, reserved, waited)
+
+    def run(self, request: LLMRequest) -> Any:
+        """
+        Run one request on the calling thread; the blocking variant of arun.
+
+        Args:
+            request: The request to run
+
+        Returns:
+            The model response (message or structured output)
+
+        Raises:
+            LLMQuotaError: If rate limiting persists after all retries
+            LLMConnectionError: If another transient error persists after all retries
+        """
+        limiter = self.limiter(request.provider)
+        runnable = self._build_runnable(request)
+        reserved = estimate_tokens(request.prompt) + LLM_OUTPUT_TOKEN_ESTIMATE
+
+        attempt = 0
+        while True:
+            waited = limiter.requests.wait(1)
+            waited += limiter.tokens.wait(reserved)
+            waited += limiter.wait_slot()
+            try:
+                result = runnable.invoke(request.prompt)
+            except Exception as e:
+                limiter.release_slot()
+                delay = self._retry_delay(limiter, e, attempt, waited)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            return self._settle(limiter, result, reserved, waited)
+
+    def _retry_delay(
+        self, limiter: ProviderLimiter, error: Exception, attempt: int, waited: float
+    ) -> float:
+        """Raise a failed attempt's error, or return the backoff before a retry."""
+        self._record(wait_seconds=waited)
+        if not self.is_retryable(error) or attempt >= self.max_retries:
+            self._record(failures=1)
+            if not self.is_retryable(error):
+                raise error
+            error_class = (
+                LLMQuotaError if self._is_rate_limit(error) else LLMConnectionError
+            )
+            raise error_class(
+                f"LLM request to {limiter.provider} failed after "
+                f"{attempt + 1} attempts: {error}",
+                {"provider": limiter.provider, "attempts": attempt + 1},
+            ) from error
+
+        delay = self.backoff_delay(attempt)
+        self._record(retries=1)
+        logger.warning(
+            f"Transient {type(error).__name__} from {limiter.provider}, "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+        )
+        return delay
+
+    def _settle(
+        self, limiter: ProviderLimiter, result: Any, reserved: int, waited: float
+    ) -> Any:
+        """Release the slot of a successful attempt and account for its usage."""
+        limiter.release_slot()
+        usage = getattr(result, "usage_metadata", None) or {}
+        used = usage.get("total_tokens", reserved)
+        # Settle the token reservation against the actual usage
+        limiter.tokens.adjust(reserved - used)
+        self._record(requests=1, tokens=used, wait_seconds=waited)
+        return result
+
+    async def ainvoke(self, prompt: Any, **kwargs: Any) -> Any:
+        """
+        Run a single prompt.
+
+        Args:
+            prompt: Prompt string or list of messages
+            **kwargs: LLMRequest fields (response_schema, provider, model, ...)
+
+        Returns:
+            The model response
+        """
+        return await self.arun(LLMRequest(prompt=prompt, **kwargs))
+
+    async def abatch(
+        self,
+        prompts: list[Any],
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """
+        Run several prompts concurrently and gather the results in order.
+
+        Args:
+            prompts: Prompts or LLMRequest objects
+            return_exceptions: Return failures in place instead of raising the first
+            **kwargs: LLMRequest fields applied to plain prompts
+
+        Returns:
+            Responses in the order of ``prompts``
+        """
+        requests = [
+            p if isinstance(p, LLMRequest) else LLMRequest(prompt=p, **kwargs)
+            for p in prompts
+        ]
+        return await asyncio.gather(
+            *(self.arun(request) for request in requests),
+            return_exceptions=return_exceptions,
+        )
+
+    def invoke(self, prompt: Any, **kwargs: Any) -> Any:
+        """Synchronous counterpart of ainvoke, run on the calling thread."""
+        return self.run(LLMRequest(prompt=prompt, **kwargs))
+
+    def batch(
+        self, prompts: list[Any], return_exceptions: bool = False, **kwargs: Any
+    ) -> list[Any]:
+        """
+        Synchronous counterpart of abatch, run on worker threads.
+
+        The provider limiter bounds how many of the requests are in flight.
+        """
+        requests = [
+            p if isinstance(p, LLMRequest) else LLMRequest(prompt=p, **kwargs)
+            for p in prompts
+        ]
+        if not requests:
+            return []
+        # More workers than the limiters admit would only wait for a slot.
+        # Workers run in copies of the caller's context (ledger and tracing
+        # attribution)
+        workers = max(
+            self.limiter(request.provider).max_concurrency for request in requests
+        )
+        with ThreadPoolExecutor(max_workers=min(workers, len(requests))) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.run, request)
+                for request in requests
+            ]
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            results.append(error if error is not None else future.result())
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get engine counters.
+
+        Returns:
+            Requests, retries, failures, tokens used and time spent waiting
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["providers"] = {
+                name: limiter.max_concurrency
+                for name, limiter in self._limiters.items()
+            }
+        return stats
+
+
+_engine: LLMEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_llm_engine() -> LLMEngine:
+    """
+    Get the process-wide LLM engine.
+
+    Returns:
+        The shared LLMEngine instance
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LLMEngine()
+        return _engine
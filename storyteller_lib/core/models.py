@@ -6,7 +6,7 @@ StoryCraft Agent - Data models and state definitions.
 from typing import Annotated, Any
 
 # Third party imports
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
@@ -36,6 +36,24 @@ def merge_dicts(existing: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]
     return result
 
 
+def merge_messages(existing: list[Any], new: Any) -> list[Any]:
+    """Merge messages like add_messages, ignoring removals of missing messages.
+
+    Nodes that run in parallel each remove the messages they saw; once the
+    first update has removed them, the other removals are no-ops instead of
+    errors.
+    """
+    if not isinstance(new, list):
+        new = [new]
+    existing_ids = {getattr(msg, "id", None) for msg in existing or []}
+    new = [
+        msg
+        for msg in new
+        if not isinstance(msg, RemoveMessage) or msg.id in existing_ids
+    ]
+    return add_messages(existing, new)
+
+
 def merge_characters(
     existing: CharacterProfileDict, new: CharacterProfileDict
 ) -> CharacterProfileDict:
@@ -421,8 +439,8 @@ class StoryState(TypedDict):
     All persistent story data (genre, tone, characters, etc.) is stored in the database.
     """
 
-    # Use built-in add_messages for chat messages
-    messages: Annotated[list[HumanMessage | AIMessage], add_messages]
+    # add_messages semantics, tolerant of removals from parallel nodes
+    messages: Annotated[list[HumanMessage | AIMessage], merge_messages]
 
     # Working data that gets updated during generation
     chapters: Annotated[
@@ -0,0 +1,524 @@
+"""
+StoryCraft Agent - Offline stub LLM provider.
+
+The "stub" provider (``MODEL_PROVIDER=stub`` or ``--model-provider stub``)
+answers every request locally, so the whole story graph can be run and
+profiled without network access or API keys:
+
+- responses recorded from real runs (``LLM_RECORD_PATH``) are replayed,
+  keyed by a hash of the prompt messages (``STUB_LLM_RECORDINGS``)
+- prompts without a recording get deterministic synthetic text, or for
+  ``with_structured_output`` models a schema-valid object built from the
+  schema, seeded by the prompt hash
+- an artificial latency can be added per request, optionally with jitter
+
+Runs are reproducible: the same prompt always gets the same response and
+the same latency.
+"""
+
+# Standard library imports
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+# Third party imports
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel
+
+# Local imports
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stub provider settings
+STUB_LLM_LATENCY = float(os.environ.get("STUB_LLM_LATENCY", "0.0"))
+STUB_LLM_LATENCY_JITTER = float(os.environ.get("STUB_LLM_LATENCY_JITTER", "0.0"))
+STUB_LLM_RESPONSE_WORDS = int(os.environ.get("STUB_LLM_RESPONSE_WORDS", "300"))
+STUB_LLM_LIST_ITEMS = int(os.environ.get("STUB_LLM_LIST_ITEMS", "3"))
+STUB_LLM_CHAPTERS = int(os.environ.get("STUB_LLM_CHAPTERS", "6"))
+STUB_LLM_SCENES_PER_CHAPTER = int(os.environ.get("STUB_LLM_SCENES_PER_CHAPTER", "2"))
+STUB_LLM_RECORDINGS = os.environ.get("STUB_LLM_RECORDINGS")
+STUB_LLM_STRICT = os.environ.get("STUB_LLM_STRICT", "false").lower() == "true"
+# Responses of real providers are appended here when set
+LLM_RECORD_PATH = os.environ.get("LLM_RECORD_PATH")
+
+# List separators named in the descriptions of flattened schema fields
+SEPARATORS = {"pipe": " | ", "comma": ", ", "semicolon": "; "}
+
+# Vocabulary of the synthetic text
+WORDS = (
+    "the a of and to in with from under over across beyond before after "
+    "river stone shadow light storm tower harbor forest city mountain road "
+    "lantern letter secret promise memory voice window door garden bridge "
+    "captain stranger sister healer scholar merchant guard child elder thief "
+    "walked whispered remembered carried waited watched opened followed "
+    "trembled listened answered crossed gathered hid returned burned "
+    "quiet ancient bright cold hidden broken silver distant narrow restless"
+).split()
+
+
+def prompt_key(messages: list[BaseMessage] | str) -> str:
+    """
+    Hash prompt messages into the key used for recordings.
+
+    Args:
+        messages: Prompt messages (or a plain prompt string)
+
+    Returns:
+        Hex digest of the message types and contents
+    """
+    if isinstance(messages, str):
+        payload: Any = [["human", messages]]
+    else:
+        payload = [[message.type, message.content] for message in messages]
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def synthesize_text(rng: random.Random, words: int) -> str:
+    """
+    Build deterministic filler prose.
+
+    Args:
+        rng: Seeded random generator
+        words: Approximate number of words
+
+    Returns:
+        Paragraphs of sentences made from a fixed vocabulary
+    """
+    paragraphs = []
+    sentences: list[str] = []
+    remaining = max(1, words)
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 16))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length))
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        remaining -= length
+        if len(sentences) == 5:
+            paragraphs.append(" ".join(sentences))
+            sentences = []
+    if sentences:
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def synthesize_value(
+    schema: dict[str, Any],
+    rng: random.Random,
+    definitions: dict[str, Any] | None = None,
+    name: str = "value",
+    index: int | None = None,
+) -> Any:
+    """
+    Build a value that satisfies a JSON schema.
+
+    Supports the subset produced by Pydantic models: objects, arrays,
+    scalars, enums and consts, ``$ref``/``$defs``, ``anyOf``/``oneOf``/
+    ``allOf`` and numeric, length and item-count bounds. Objects listed in
+    an array are numbered: their ``number`` / ``*_number`` properties hold
+    the position in the array, starting at 1.
+
+    Args:
+        schema: JSON schema of the value
+        rng: Seeded random generator
+        definitions: ``$defs`` of the root schema
+        name: Property name, used in synthesized strings
+        index: Position of the value in its array
+
+    Returns:
+        A JSON-compatible value
+    """
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+
+    if "$ref" in schema:
+        reference = schema["$ref"].rsplit("/", 1)[-1]
+        builder = STRUCTURED_BUILDERS.get(reference)
+        if builder is not None:
+            return builder(definitions[reference], rng, definitions)
+        return synthesize_value(definitions[reference], rng, definitions, name, index)
+    if "title" in schema and schema["title"] in STRUCTURED_BUILDERS:
+        return STRUCTURED_BUILDERS[schema["title"]](schema, rng, definitions)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            options = [o for o in schema[combinator] if o.get("type") != "null"]
+            return synthesize_value(
+                options[0] if options else {"type": "null"},
+                rng,
+                definitions,
+                name,
+                index,
+            )
+
+    schema_type = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+
+    if schema_type == "object":
+        properties = schema.get("properties")
+        if properties is None:
+            value_schema = schema.get("additionalProperties")
+            if not isinstance(value_schema, dict):
+                return {}
+            return {
+                f"{name}_{i + 1}": synthesize_value(
+                    value_schema, rng, definitions, f"{name}_{i + 1}"
+                )
+                for i in range(STUB_LLM_LIST_ITEMS)
+            }
+        value = {}
+        for key, prop in properties.items():
+            if index is not None and (key == "number" or key.endswith("_number")):
+                value[key] = (
+                    str(index + 1) if prop.get("type") == "string" else index + 1
+                )
+            else:
+                value[key] = synthesize_value(prop, rng, definitions, key)
+        return value
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), STUB_LLM_LIST_ITEMS)
+        count = min(count, schema.get("maxItems", count))
+        item_schema = schema.get("items", {"type": "string"})
+        return [
+            synthesize_value(item_schema, rng, definitions, name, i)
+            for i in range(count)
+        ]
+    if schema_type in ("integer", "number"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0) + 1)
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 10) - 1)
+        if schema_type == "integer":
+            return rng.randint(int(low), max(int(low), int(high)))
+        return round(rng.uniform(low, max(low, high)), 2)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema_type == "null":
+        return None
+
+    text = synthesize_string(schema.get("description", ""), rng, name)
+    if "maxLength" in schema:
+        text = text[: schema["maxLength"]]
+    return text.ljust(schema.get("minLength", 0), ".")
+
+
+def synthesize_string(description: str, rng: random.Random, name: str) -> str:
+    """
+    Build a string field value that follows its description.
+
+    Flattened schemas describe lists packed into strings ("Pipe-separated
+    list of comma-separated revelation levels (1-5)"); such fields get
+    separated items, numeric where the description gives a range.
+
+    Args:
+        description: Field description from the schema
+        rng: Seeded random generator
+        name: Property name
+
+    Returns:
+        The string value
+    """
+    description = description.lower()
+    separators = [
+        SEPARATORS[match]
+        for match in re.findall(r"(pipe|comma|semicolon)[- ]separated", description)
+    ]
+    if not separators and name.endswith("_csv"):
+        separators = [", "]
+    value_range = re.search(r"\((\d+)\s*-\s*(\d+)\)", description)
+
+    def item() -> str:
+        if value_range:
+            return str(rng.randint(int(value_range[1]), int(value_range[2])))
+        if separators:
+            return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        return f"{name.replace('_', ' ')}: {synthesize_text(rng, rng.randint(4, 12))}"
+
+    def build(level: int) -> str:
+        if level == len(separators):
+            return item()
+        return separators[level].join(
+            build(level + 1) for _ in range(STUB_LLM_LIST_ITEMS)
+        )
+
+    return build(0)
+
+
+def _chapter_plan(
+    schema: dict[str, Any], rng: random.Random, definitions: dict[str, Any]
+) -> dict[str, Any]:
+    """Build a chapter plan whose scenes belong to its chapters."""
+    chapter_schema = definitions["FlatChapter"]
+    scene_schema = definitions["FlatSceneSpec"]
+    chapters = []
+    scenes = []
+    for chapter in range(1, STUB_LLM_CHAPTERS + 1):
+        chapters.append(
+            {
+                **synthesize_value(chapter_schema, rng, definitions, "chapter"),
+                "number": str(chapter),
+                "scene_count": STUB_LLM_SCENES_PER_CHAPTER,
+            }
+        )
+        for scene in range(1, STUB_LLM_SCENES_PER_CHAPTER + 1):
+            scenes.append(
+                {
+                    **synthesize_value(scene_schema, rng, definitions, "scene"),
+                    "chapter_number": str(chapter),
+                    "scene_number": scene,
+                }
+            )
+    return {"chapters": chapters, "total_scenes": scenes}
+
+
+# Schemas whose parts depend on each other, by schema title
+STRUCTURED_BUILDERS = {"FlatChapterPlan": _chapter_plan}
+
+
+def _json_schema(schema: dict[str, Any] | type) -> dict[str, Any]:
+    """Get the JSON schema of a Pydantic model or JSON schema dict."""
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        return schema.model_json_schema()
+    if not isinstance(schema, dict):
+        raise ValueError(f"Unsupported structured output schema: {schema!r}")
+    return schema
+
+
+class _Recordings:
+    """Recorded responses loaded from a JSONL file, keyed by prompt hash."""
+
+    def __init__(self, path: str | None):
+        self.path = os.path.expanduser(path) if path else None
+        self._responses: dict[str, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        if self.path is None:
+            return None
+        with self._lock:
+            if self._responses is None:
+                self._responses = {}
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json.loads(line)
+                                self._responses[entry["key"]] = entry
+                    logger.info(
+                        f"Loaded {len(self._responses)} recorded LLM responses "
+                        f"from {self.path}"
+                    )
+                except (OSError, json.JSONDecodeError, KeyError) as e:
+                    logger.error(f"Error loading LLM recordings {self.path}: {e}")
+        return self._responses.get(key)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model answering from recordings or with synthetic responses.
+
+    Structured output is requested by binding a JSON schema; the response
+    is then a JSON document matching it.
+    """
+
+    model_name: str = "stub"
+    temperature: float = 0.7
+    max_tokens: int | None = None
+    latency: float = STUB_LLM_LATENCY
+    latency_jitter: float = STUB_LLM_LATENCY_JITTER
+    response_words: int = STUB_LLM_RESPONSE_WORDS
+    recordings_path: str | None = STUB_LLM_RECORDINGS
+    strict: bool = STUB_LLM_STRICT
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "temperature": self.temperature,
+            "recordings_path": self.recordings_path,
+        }
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = prompt_key(messages)
+        time.sleep(self._delay(key))
+        return self._respond(key, kwargs.get("response_schema"), messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = prompt_key(messages)
+        await asyncio.sleep(self._delay(key))
+        return self._respond(key, kwargs.get("response_schema"), messages)
+
+    def _delay(self, key: str) -> float:
+        jitter = random.Random(key).uniform(-1.0, 1.0) * self.latency_jitter
+        return max(0.0, self.latency + jitter)
+
+    def _respond(
+        self,
+        key: str,
+        response_schema: dict[str, Any] | None,
+        messages: list[BaseMessage],
+    ) -> ChatResult:
+        recording = _get_recordings(self.recordings_path).get(key)
+        if recording is not None:
+            if response_schema is not None and recording.get("tool_calls"):
+                content = json.dumps(recording["tool_calls"][0]["args"])
+            else:
+                content = recording.get("content", "")
+        elif self.strict:
+            raise KeyError(f"No recorded LLM response for prompt {key[:12]}")
+        else:
+            rng = random.Random(f"{key}:{json.dumps(response_schema, sort_keys=True)}")
+            if response_schema is not None:
+                content = json.dumps(synthesize_value(response_schema, rng))
+            else:
+                content = synthesize_text(rng, self.response_words)
+
+        usage = {
+            "input_tokens": sum(len(str(m.content)) for m in messages) // 4,
+            "output_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(
+        self, schema: dict[str, Any] | type, *, include_raw: bool = False, **kwargs
+    ) -> Runnable:
+        """
+        Return a runnable producing objects that match ``schema``.
+
+        Args:
+            schema: Pydantic model class or JSON schema dict
+            include_raw: Return the raw message alongside the parsed object
+
+        Returns:
+            Runnable yielding a model instance (Pydantic schema) or a dict
+        """
+        json_schema = _json_schema(schema)
+
+        def parse(message: AIMessage) -> Any:
+            data = json.loads(message.content)
+            if isinstance(schema, type):
+                data = schema.model_validate(data)
+            if include_raw:
+                return {"raw": message, "parsed": data, "parsing_error": None}
+            return data
+
+        return self.bind(response_schema=json_schema) | RunnableLambda(parse)
+
+
+_recordings: dict[str | None, _Recordings] = {}
+_recordings_lock = threading.Lock()
+
+
+def _get_recordings(path: str | None) -> _Recordings:
+    """Get the shared recordings loaded from ``path``."""
+    with _recordings_lock:
+        if path not in _recordings:
+            _recordings[path] = _Recordings(path)
+        return _recordings[path]
+
+
+class ResponseRecorder(BaseCallbackHandler):
+    """
+    Appends each LLM response to a JSONL file for later replay.
+
+    Each line holds the prompt key, the response text and any tool calls
+    (which is how providers return structured output).
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: JSONL file the responses are appended to
+        """
+        self.path = os.path.expanduser(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._keys: dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        **kwargs,
+    ) -> None:
+        with self._lock:
+            self._keys[run_id] = prompt_key(messages[0])
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            key = self._keys.pop(run_id, None)
+        if key is None or not response.generations or not response.generations[0]:
+            return
+        message = getattr(response.generations[0][0], "message", None)
+        if message is None:
+            return
+        entry = {
+            "key": key,
+            "content": message.content,
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"]}
+                for call in getattr(message, "tool_calls", [])
+            ],
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        with self._lock:
+            self._keys.pop(run_id, None)
+
+
+_recorder: ResponseRecorder | None = None
+
+
+def get_response_recorder() -> ResponseRecorder | None:
+    """
+    Get the recorder for LLM_RECORD_PATH.
+
+    Returns:
+        The shared ResponseRecorder, or None if recording is disabled
+    """
+    global _recorder
+    if LLM_RECORD_PATH and _recorder is None:
+        with _recordings_lock:
+            if _recorder is None:
+                _recorder = ResponseRecorder(LLM_RECORD_PATH)
+    return _recorder
@@ -0,0 +1,597 @@
+"""
+StoryCraft Agent - Span tracing of graph nodes, LLM calls and database queries.
+
+When tracing is enabled (STORY_TRACING=true or ``--trace``), every graph
+node run, LLM request and SQL statement is recorded as a span with its
+start time, duration and thread. LLM spans also carry prompt and
+completion tokens and whether the response came from the LLM cache. Spans
+nest: an LLM call or query made while a node runs has that node as its
+parent.
+
+Spans are buffered in memory and written to the ``telemetry`` table of the
+story database whenever a node finishes (and at exit) over a connection of
+their own, so a run that is interrupted keeps the spans of its completed
+nodes and the writes are not traced themselves. They can be summarized
+per node/model/statement with ``summarize_telemetry`` and exported as a
+Chrome trace (chrome://tracing, Perfetto) with ``export_chrome_trace``.
+"""
+
+# Standard library imports
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+# Third party imports
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Local imports
+from storyteller_lib.core.ledger import response_usage
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRACING_ENABLED = os.environ.get("STORY_TRACING", "false").lower() == "true"
+TRACING_DB_QUERIES = (
+    os.environ.get("STORY_TRACING_DB_QUERIES", "true").lower() == "true"
+)
+
+# Longest SQL text kept with a query span
+MAX_SQL_LENGTH = 300
+
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+([\w.]+)", re.IGNORECASE)
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "storyteller_current_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """One timed operation."""
+
+    span_id: int
+    parent_id: int | None
+    kind: str
+    name: str
+    thread: str
+    start_time: float
+    duration: float = 0.0
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cache_hit: bool | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+def query_name(sql: str) -> str:
+    """
+    Name a SQL statement by its verb and main table, e.g. "SELECT scenes".
+
+    Args:
+        sql: The statement
+
+    Returns:
+        Span name used to group queries
+    """
+    words = sql.split(None, 1)
+    if not words:
+        return "EMPTY"
+    verb = words[0].upper()
+    match = _TABLE_PATTERN.search(sql)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+class Tracer:
+    """
+    Records spans and persists them to the telemetry table.
+
+    Until enable() is called the tracer records nothing, and tracing a
+    node costs one attribute check.
+    """
+
+    def __init__(self):
+        """Initialize a disabled tracer."""
+        self.enabled = False
+        self.db_path: str | None = None
+        self.run_id = ""
+        self._buffer: list[Span] = []
+        self._pending: dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._conn: sqlite3.Connection | None = None
+        self._atexit_registered = False
+
+    def enable(self, db_path: str | None = None, trace_queries: bool = True) -> None:
+        """
+        Start recording spans for a new run.
+
+        Args:
+            db_path: Database the spans are written to (default: the story
+                database)
+            trace_queries: Also record a span per SQL statement (requires
+                TRACING_DB_QUERIES)
+        """
+        if db_path is None:
+            from storyteller_lib.core.config import DATABASE_PATH
+
+            db_path = DATABASE_PATH
+        self.db_path = os.path.expanduser(db_path)
+        self.run_id = time.strftime("run_%Y%m%d_%H%M%S") + f"_{os.getpid()}"
+        self.enabled = True
+
+        if trace_queries and TRACING_DB_QUERIES:
+            from storyteller_lib.persistence.connection import set_connection_factory
+
+            set_connection_factory(TracedConnection)
+
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        logger.info(f"Tracing enabled (run {self.run_id}, telemetry in {self.db_path})")
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attributes) -> Iterator[Span | None]:
+        """
+        Context manager timing a block as a span.
+
+        Args:
+            kind: Span kind (node, llm, db, ...)
+            name: Span name
+            **attributes: Extra data stored with the span
+
+        Yields:
+            The span (None when tracing is disabled)
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(kind, name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+            # Persist at node boundaries, where the node's transactions are
+            # finished, so an interrupted run keeps its spans
+            if kind == "node":
+                self.flush()
+
+    def start_span(self, kind: str, name: str, **attributes) -> Span:
+        """
+        Start a span; its parent is the span active in the calling context.
+
+        Args:
+            kind: Span kind
+            name: Span name
+            **attributes: Extra data stored with the span
+
+        Returns:
+            The started span, to be passed to end_span
+        """
+        parent = _current_span.get()
+        return Span(
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            name=name,
+            thread=threading.current_thread().name,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span) -> None:
+        """
+        Finish a span and queue it for writing.
+
+        Args:
+            span: Span returned by start_span
+        """
+        span.duration = time.time() - span.start_time
+        with self._lock:
+            self._buffer.append(span)
+
+    def record_query(self, sql: str, start_time: float, duration: float) -> None:
+        """
+        Record an executed SQL statement.
+
+        Args:
+            sql: The statement
+            start_time: Unix time the statement started
+            duration: Execution time in seconds
+        """
+        parent = _current_span.get()
+        span = Span(
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            kind="db",
+            name=query_name(sql),
+            thread=threading.current_thread().name,
+            start_time=start_time,
+            duration=duration,
+            attributes={"sql": " ".join(sql.split())[:MAX_SQL_LENGTH]},
+        )
+        with self._lock:
+            self._buffer.append(span)
+
+    def flush(self) -> int:
+        """
+        Write buffered spans to the telemetry table.
+
+        Returns:
+            Number of spans written
+        """
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans or not self.db_path:
+            return 0
+
+        rows = [
+            (
+                self.run_id,
+                s.span_id,
+                s.parent_id,
+                s.kind,
+                s.name,
+                s.thread,
+                s.start_time,
+                s.duration,
+                s.prompt_tokens,
+                s.completion_tokens,
+                s.cache_hit,
+                json.dumps(s.attributes, default=str) if s.attributes else None,
+            )
+            for s in spans
+        ]
+        with self._flush_lock:
+            try:
+                conn = self._connection()
+                conn.executemany(
+                    """INSERT INTO telemetry
+                    (run_id, span_id, parent_id, kind, name, thread, start_time,
+                     duration, prompt_tokens, completion_tokens, cache_hit, attributes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    rows,
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not write {len(rows)} telemetry spans: {e}")
+                return 0
+        return len(rows)
+
+    def _connection(self) -> sqlite3.Connection:
+        # A plain connection of its own, so telemetry writes are not traced
+        # and do not interfere with the pooled connections' transactions
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False
+            )
+        return self._conn
+
+    def start_llm_span(self, run_id: UUID, name: str) -> None:
+        """
+        Start the span of an LLM request (called from TracingCallback).
+
+        Args:
+            run_id: LangChain run ID of the request
+            name: Model name
+        """
+        if not self.enabled:
+            return
+        span = self.start_span("llm", name)
+        with self._lock:
+            self._pending[run_id] = span
+
+    def end_llm_span(
+        self, run_id: UUID, response: Any = None, error: BaseException | None = None
+    ) -> None:
+        """
+        Finish the span of an LLM request.
+
+        Args:
+            run_id: LangChain run ID of the request
+            response: The LLMResult, if the request succeeded
+            error: The exception, if it failed
+        """
+        with self._lock:
+            span = self._pending.pop(run_id, None)
+        if span is None:
+            return
+        if error is not None:
+            span.attributes["error"] = type(error).__name__
+        elif response is not None:
+            usage = response_usage(response)
+            span.prompt_tokens = usage["input_tokens"]
+            span.completion_tokens = usage["output_tokens"]
+            span.cache_hit = usage["cache_hit"]
+        self.end_span(span)
+
+
+class TracingCallback(BaseCallbackHandler):
+    """Records a span per LLM request of the models it is attached to."""
+
+    def __init__(self, tracer: Tracer):
+        """
+        Initialize the callback.
+
+        Args:
+            tracer: Tracer the spans are recorded with
+        """
+        self.tracer = tracer
+
+    @staticmethod
+    def _model_name(serialized: dict[str, Any], kwargs: dict[str, Any]) -> str:
+        params = kwargs.get("invocation_params") or {}
+        return (
+            params.get("model")
+            or params.get("model_name")
+            or (serialized or {}).get("name")
+            or "llm"
+        )
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        self.tracer.start_llm_span(run_id, self._model_name(serialized, kwargs))
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs
+    ) -> None:
+        self.tracer.start_llm_span(run_id, self._model_name(serialized, kwargs))
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs) -> None:
+        self.tracer.end_llm_span(run_id, response=response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self.tracer.end_llm_span(run_id, error=error)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor recording a span per executed statement with the tracer."""
+
+    def execute(self, sql, parameters=()):
+        start_time, start = time.time(), time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _tracer.record_query(sql, start_time, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start_time, start = time.time(), time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _tracer.record_query(sql, start_time, time.perf_counter() - start)
+
+    def executescript(self, sql_script):
+        start_time, start = time.time(), time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _tracer.record_query(sql_script, start_time, time.perf_counter() - start)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors, including implicit ones, are TracedCursors."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        The shared Tracer, enabled if STORY_TRACING is set
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+            if TRACING_ENABLED:
+                _tracer.enable()
+        return _tracer
+
+
+def trace_node(name: str):
+    """
+    Context manager recording a graph node run, if tracing is enabled.
+
+    Args:
+        name: Node name
+
+    Returns:
+        A context manager for the node's body
+    """
+    tracer = get_tracer()
+    return tracer.span("node", name) if tracer.enabled else nullcontext()
+
+
+def get_tracing_callback() -> TracingCallback | None:
+    """
+    Get the callback that records LLM spans.
+
+    Returns:
+        The callback, or None when tracing is disabled
+    """
+    tracer = get_tracer()
+    return TracingCallback(tracer) if tracer.enabled else None
+
+
+def summarize_telemetry(db_path: str, run_id: str | None = None) -> dict[str, Any]:
+    """
+    Aggregate the spans of a run per kind and name.
+
+    Args:
+        db_path: Database holding the telemetry table
+        run_id: Run to summarize (default: the most recent run)
+
+    Returns:
+        Run ID, wall time and, per kind, the spans grouped by name with
+        their count, total and maximum seconds, tokens and cache hits,
+        slowest first
+    """
+    conn = sqlite3.connect(os.path.expanduser(db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        run_id = run_id or _latest_run(conn)
+        if run_id is None:
+            return {}
+        rows = conn.execute(
+            """SELECT kind, name, COUNT(*) AS count, SUM(duration) AS seconds,
+                MAX(duration) AS max_seconds,
+                SUM(prompt_tokens) AS prompt_tokens,
+                SUM(completion_tokens) AS completion_tokens,
+                SUM(cache_hit) AS cache_hits
+            FROM telemetry WHERE run_id = ?
+            GROUP BY kind, name ORDER BY seconds DESC""",
+            (run_id,),
+        ).fetchall()
+        bounds = conn.execute(
+            """SELECT MIN(start_time), MAX(start_time + duration)
+            FROM telemetry WHERE run_id = ?""",
+            (run_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+
+    summary: dict[str, Any] = {
+        "run_id": run_id,
+        "wall_seconds": (bounds[1] - bounds[0]) if bounds[0] is not None else 0.0,
+        "kinds": {},
+    }
+    for row in rows:
+        kind = summary["kinds"].setdefault(
+            row["kind"],
+            {
+                "count": 0,
+                "seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cache_hits": 0,
+                "names": [],
+            },
+        )
+        entry = dict(row)
+        del entry["kind"]
+        kind["names"].append(entry)
+        kind["count"] += row["count"]
+        kind["seconds"] += row["seconds"] or 0.0
+        kind["prompt_tokens"] += row["prompt_tokens"] or 0
+        kind["completion_tokens"] += row["completion_tokens"] or 0
+        kind["cache_hits"] += row["cache_hits"] or 0
+    return summary
+
+
+def export_chrome_trace(
+    db_path: str, output_path: str, run_id: str | None = None
+) -> int:
+    """
+    Write the spans of a run as a Chrome trace event file.
+
+    Args:
+        db_path: Database holding the telemetry table
+        output_path: JSON file to write
+        run_id: Run to export (default: the most recent run)
+
+    Returns:
+        Number of spans exported
+    """
+    conn = sqlite3.connect(os.path.expanduser(db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        run_id = run_id or _latest_run(conn)
+        rows = conn.execute(
+            "SELECT * FROM telemetry WHERE run_id = ? ORDER BY start_time",
+            (run_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    threads: dict[str, int] = {}
+    events: list[dict[str, Any]] = []
+    origin = rows[0]["start_time"] if rows else 0.0
+    for row in rows:
+        tid = threads.setdefault(row["thread"] or "", len(threads) + 1)
+        args: dict[str, Any] = {"span_id": row["span_id"]}
+        if row["parent_id"] is not None:
+            args["parent_id"] = row["parent_id"]
+        for column in ("prompt_tokens", "completion_tokens"):
+            if row[column] is not None:
+                args[column] = row[column]
+        if row["cache_hit"] is not None:
+            args["cache_hit"] = bool(row["cache_hit"])
+        if row["attributes"]:
+            args.update(json.loads(row["attributes"]))
+        events.append(
+            {
+                "name": row["name"],
+                "cat": row["kind"],
+                "ph": "X",
+                "ts": round((row["start_time"] - origin) * 1_000_000, 1),
+                "dur": round(row["duration"] * 1_000_000, 1),
+                "pid": 1,
+                "tid": tid,
+                "args": args,
+            }
+        )
+    for name, tid in threads.items():
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": tid,
+                "args": {"name": name},
+            }
+        )
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"run_id": run_id},
+            },
+            f,
+        )
+    return len(rows)
+
+
+def _latest_run(conn: sqlite3.Connection) -> str | None:
+    try:
+        row = conn.execute(
+            "SELECT run_id FROM telemetry ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # No telemetry table yet
+        return None
+    return row[0] if row else None
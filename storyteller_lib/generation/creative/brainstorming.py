@@ -444,7 +444,7 @@ Convert this information into a properly formatted JSON object with this structu
     )
 
     # Create the LangChain chain
-    chain = prompt | llm | json_parser
+    chain = prompt | llm.resolve() | json_parser
 
     try:
         # Execute the chain with our input parameters
@@ -479,7 +479,7 @@ The output should be a JSON object without any additional text or comments.""",
         )
 
         # Create a new chain with the simplified prompt
-        simplified_chain = simplified_prompt | llm | json_parser
+        simplified_chain = simplified_prompt | llm.resolve() | json_parser
 
         try:
             # Execute the simplified chain
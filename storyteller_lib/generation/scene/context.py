@@ -4,7 +4,12 @@ for scene writing and reflection. This ensures scenes are properly connected
 to the overall story, characters, world, and plot progression.
 """
 
-from dataclasses import dataclass
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 
 from storyteller_lib.core.logger import get_logger
@@ -69,6 +74,586 @@ class ComprehensiveSceneContext:
     style_guide: dict[str, Any]
 
 
+@dataclass
+class SceneContextData:
+    """Raw database rows needed to assemble the context of one scene.
+
+    Loaded by load_scene_context_data with a fixed number of set-based
+    queries, independent of how many characters the scene requires.
+    """
+
+    story_config: dict[str, Any] | None
+    chapter: dict[str, Any] | None
+    previous_scenes: list[dict[str, Any]]
+    previous_scene_content: str | None
+    plot_progression_keys: list[str]
+    active_threads: list[dict[str, Any]]
+    characters: list[dict[str, Any]]
+    knowledge: dict[int, list[dict[str, Any]]]
+    relationships: list[dict[str, Any]]
+    character_locations: dict[int, list[dict[str, Any]]]
+    locations: list[dict[str, Any]]
+    overused_phrases: list[str]
+    query_count: int = 0
+
+
+# Scene-level tables folded into story snapshots
+SNAPSHOT_TABLES = (
+    "character_states",
+    "character_knowledge",
+    "plot_thread_developments",
+    "plot_progressions",
+)
+KNOWLEDGE_PER_CHARACTER = 5
+DEVELOPMENTS_PER_THREAD = 5
+
+# Snapshot cache configuration (overridable through the environment)
+CONTEXT_CACHE_ENABLED = os.environ.get("STORY_CONTEXT_CACHE", "true").lower() == "true"
+CONTEXT_CACHE_SNAPSHOTS = int(os.environ.get("STORY_CONTEXT_CACHE_SNAPSHOTS", "8"))
+
+
+@dataclass
+class StorySnapshot:
+    """Story-wide state derived from the scene-level tables.
+
+    Holds the latest state and most recent knowledge of every character,
+    the most recent developments of every plot thread and the plot
+    progressions that already occurred. ``watermarks`` records the highest
+    row id folded in per table, so a snapshot can be brought up to date by
+    applying only the rows written after it.
+    """
+
+    chapter: int
+    scene: int
+    watermarks: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(SNAPSHOT_TABLES, 0)
+    )
+    # character_id -> (scene_id, emotional_state)
+    character_states: dict[int, tuple[int, str | None]] = field(default_factory=dict)
+    # character_id -> [(scene_id, row_id, content, type)], newest first
+    knowledge: dict[int, list[tuple]] = field(default_factory=dict)
+    # plot_thread_id -> [(scene_id, row_id, description)], newest first
+    developments: dict[int, list[tuple]] = field(default_factory=dict)
+    progression_keys: set[str] = field(default_factory=set)
+
+    def derive(self, chapter: int, scene: int) -> "StorySnapshot":
+        """Copy this snapshot as the starting point for another scene."""
+        return StorySnapshot(
+            chapter=chapter,
+            scene=scene,
+            watermarks=dict(self.watermarks),
+            character_states=dict(self.character_states),
+            knowledge={k: list(v) for k, v in self.knowledge.items()},
+            developments={k: list(v) for k, v in self.developments.items()},
+            progression_keys=set(self.progression_keys),
+        )
+
+    def apply_deltas(self, cursor) -> tuple[int, int]:
+        """
+        Fold every row written after the watermarks into the snapshot.
+
+        Args:
+            cursor: Cursor on the story database
+
+        Returns:
+            Tuple of (queries issued, delta rows applied)
+        """
+        # One statement for all four tables; rows of each table keep their
+        # id order, which the state and watermark updates rely on
+        cursor.execute(
+            """
+            SELECT 'character_states' as source, id, character_id as owner_id,
+                scene_id, emotional_state as content, NULL as kind
+            FROM character_states WHERE id > ?
+            UNION ALL
+            SELECT 'character_knowledge', id, character_id, scene_id,
+                knowledge_content, knowledge_type
+            FROM character_knowledge WHERE id > ?
+            UNION ALL
+            SELECT 'plot_thread_developments', id, plot_thread_id, scene_id,
+                description, NULL
+            FROM plot_thread_developments WHERE id > ?
+            UNION ALL
+            SELECT 'plot_progressions', id, NULL, NULL, progression_key, NULL
+            FROM plot_progressions WHERE id > ?
+            ORDER BY source, id
+        """,
+            tuple(self.watermarks[table] for table in SNAPSHOT_TABLES),
+        )
+        rows = cursor.fetchall()
+
+        touched_characters = set()
+        touched_threads = set()
+        for row in rows:
+            source = row["source"]
+            if source == "character_states":
+                current = self.character_states.get(row["owner_id"])
+                if current is None or row["scene_id"] >= current[0]:
+                    self.character_states[row["owner_id"]] = (
+                        row["scene_id"],
+                        row["content"],
+                    )
+            elif source == "character_knowledge":
+                self.knowledge.setdefault(row["owner_id"], []).append(
+                    (row["scene_id"], row["id"], row["content"], row["kind"])
+                )
+                touched_characters.add(row["owner_id"])
+            elif source == "plot_thread_developments":
+                self.developments.setdefault(row["owner_id"], []).append(
+                    (row["scene_id"], row["id"], row["content"])
+                )
+                touched_threads.add(row["owner_id"])
+            else:
+                self.progression_keys.add(row["content"])
+            self.watermarks[source] = row["id"]
+
+        for character_id in touched_characters:
+            entries = sorted(self.knowledge[character_id], reverse=True)
+            self.knowledge[character_id] = entries[:KNOWLEDGE_PER_CHARACTER]
+        for thread_id in touched_threads:
+            entries = sorted(self.developments[thread_id], reverse=True)
+            self.developments[thread_id] = entries[:DEVELOPMENTS_PER_THREAD]
+
+        return 1, len(rows)
+
+
+def table_watermarks(cursor, tables: tuple[str, ...]) -> dict[str, int]:
+    """
+    Read the highest row id of each of a set of tables in one query.
+
+    Args:
+        cursor: Cursor on the story database
+        tables: Table names
+
+    Returns:
+        Dict mapping each table to its highest id (0 when empty)
+    """
+    columns = ", ".join(
+        f"(SELECT COALESCE(MAX(id), 0) FROM {table}) as {table}" for table in tables
+    )
+    cursor.execute(f"SELECT {columns}")
+    return dict(cursor.fetchone())
+
+
+class SceneContextCache:
+    """
+    Per-scene cache of story snapshots for one database.
+
+    The context for a new scene is derived from the newest cached snapshot
+    by applying only the rows written since it was taken, so assembling it
+    costs O(delta) instead of O(story). Snapshots are keyed by the story
+    version, the highest row id of every snapshot table plus the last entry
+    of the ``context_revisions`` log. When a row that a snapshot already
+    folded in is revised or deleted, the triggers behind that log record
+    it and exactly the snapshots that contain the row are dropped; older
+    snapshots survive and are rolled forward instead. Log entries are
+    deleted once they have been applied, except the newest, whose id is
+    part of the story version.
+    """
+
+    def __init__(self, max_snapshots: int = CONTEXT_CACHE_SNAPSHOTS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_snapshots: Number of per-scene snapshots to keep
+        """
+        self.max_snapshots = max(1, max_snapshots)
+        self._snapshots: OrderedDict[tuple[int, int], StorySnapshot] = OrderedDict()
+        self._revision = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.derived = 0
+        self.rebuilds = 0
+        self.invalidated = 0
+        self.delta_rows = 0
+
+    def snapshot(self, cursor, chapter: int, scene: int) -> tuple[StorySnapshot, int]:
+        """
+        Get an up-to-date snapshot for a scene.
+
+        Args:
+            cursor: Cursor on the story database
+            chapter: Chapter number
+            scene: Scene number
+
+        Returns:
+            Tuple of (snapshot, queries issued); the snapshot must not be mutated
+        """
+        with self._lock:
+            version = self._story_version(cursor)
+            queries = 1 + self._apply_revisions(cursor, version)
+
+            base = next(reversed(self._snapshots.values()), None)
+            if base and any(
+                base.watermarks[table] > version[table] for table in SNAPSHOT_TABLES
+            ):
+                # Rows disappeared from under the cache (e.g. a new story file)
+                logger.debug("Story database was reset; dropping context snapshots")
+                self._snapshots.clear()
+                base = None
+
+            cached = self._snapshots.get((chapter, scene))
+            if cached and all(
+                cached.watermarks[table] == version[table] for table in SNAPSHOT_TABLES
+            ):
+                self.hits += 1
+                self._snapshots.move_to_end((chapter, scene))
+                return cached, queries
+
+            if base is None:
+                snapshot = StorySnapshot(chapter=chapter, scene=scene)
+                self.rebuilds += 1
+            else:
+                snapshot = base.derive(chapter, scene)
+                self.derived += 1
+            delta_queries, rows = snapshot.apply_deltas(cursor)
+            self.delta_rows += rows
+
+            self._snapshots[(chapter, scene)] = snapshot
+            self._snapshots.move_to_end((chapter, scene))
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+            logger.debug(
+                f"Context snapshot for Chapter {chapter}, Scene {scene} "
+                f"{'rebuilt' if base is None else 'derived'} from {rows} rows"
+            )
+            return snapshot, queries + delta_queries
+
+    def _story_version(self, cursor) -> dict[str, int]:
+        """Read the current story version (highest row id per table)."""
+        return table_watermarks(cursor, (*SNAPSHOT_TABLES, "context_revisions"))
+
+    def _apply_revisions(self, cursor, version: dict[str, int]) -> int:
+        """Drop snapshots containing rows revised since the last check."""
+        if version["context_revisions"] < self._revision:
+            self._snapshots.clear()
+            self._revision = 0
+        if version["context_revisions"] == self._revision:
+            return 0
+
+        cursor.execute(
+            """
+            SELECT table_name, MIN(row_id) as row_id FROM context_revisions
+            WHERE id > ? GROUP BY table_name
+        """,
+            (self._revision,),
+        )
+        earliest = {row["table_name"]: row["row_id"] for row in cursor.fetchall()}
+        self._revision = version["context_revisions"]
+        queries = 1
+
+        # Applied entries are no longer needed by any snapshot. Only prune
+        # outside a caller's transaction, which the commit would end early
+        if not cursor.connection.in_transaction:
+            cursor.execute(
+                "DELETE FROM context_revisions WHERE id < ?", (self._revision,)
+            )
+            cursor.connection.commit()
+            queries += 1
+
+        stale = [
+            key
+            for key, snapshot in self._snapshots.items()
+            if any(
+                snapshot.watermarks.get(table, 0) >= row_id
+                for table, row_id in earliest.items()
+            )
+        ]
+        for key in stale:
+            del self._snapshots[key]
+        self.invalidated += len(stale)
+        if stale:
+            logger.info(
+                f"Invalidated {len(stale)} context snapshot(s) after revisions "
+                f"to {', '.join(sorted(earliest))}"
+            )
+        return queries
+
+    def stats(self) -> dict[str, int]:
+        """Return cache counters."""
+        return {
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "derived": self.derived,
+            "rebuilds": self.rebuilds,
+            "invalidated": self.invalidated,
+            "delta_rows": self.delta_rows,
+        }
+
+
+# One cache per pooled database, dropped together with its connections
+_context_caches: "weakref.WeakKeyDictionary[Any, SceneContextCache]" = (
+    weakref.WeakKeyDictionary()
+)
+_context_caches_lock = threading.Lock()
+
+
+def get_scene_context_cache(db_manager) -> SceneContextCache:
+    """
+    Get the snapshot cache for the database behind a manager.
+
+    Args:
+        db_manager: The story database manager
+
+    Returns:
+        The SceneContextCache shared by all users of that database
+    """
+    pool = db_manager._db._pool
+    with _context_caches_lock:
+        cache = _context_caches.get(pool)
+        if cache is None:
+            cache = SceneContextCache()
+            _context_caches[pool] = cache
+        return cache
+
+
+def load_scene_context_data(
+    db_manager, chapter: int, scene: int, required_chars: list[str]
+) -> SceneContextData:
+    """
+    Load everything the scene context helpers need in one pass.
+
+    All data is fetched on a single pooled connection using IN (...) batches
+    for per-character lookups, so the number of queries does not grow with
+    the cast size. Character states, knowledge, plot thread developments and
+    plot progressions come from a story snapshot that is rolled forward from
+    the previous scene's snapshot (see SceneContextCache).
+
+    Args:
+        db_manager: The story database manager
+        chapter: Chapter number
+        scene: Scene number
+        required_chars: Character identifiers or names required in the scene
+
+    Returns:
+        SceneContextData with the raw rows for the scene
+    """
+    queries = 0
+    with db_manager._db._get_connection() as conn:
+        cursor = conn.cursor()
+
+        # 1. Story configuration
+        cursor.execute(
+            """
+            SELECT title, genre, tone, author, language, initial_idea, global_story
+            FROM story_config WHERE id = 1
+        """
+        )
+        row = cursor.fetchone()
+        story_config = dict(row) if row else None
+        queries += 1
+
+        # 2. Current and previous chapter with their scenes; content is only
+        # materialized for the scene that directly precedes this one
+        cursor.execute(
+            """
+            SELECT c.id as chapter_id, c.chapter_number, c.title, c.outline,
+                s.scene_number, s.description, s.scene_type,
+                CASE
+                    WHEN c.chapter_number = ? AND s.scene_number = ? THEN s.content
+                    WHEN c.chapter_number = ? AND ? = 1 AND s.scene_number = (
+                        SELECT MAX(s2.scene_number) FROM scenes s2
+                        WHERE s2.chapter_id = c.id
+                    ) THEN s.content
+                END as content
+            FROM chapters c
+            LEFT JOIN scenes s ON s.chapter_id = c.id
+            WHERE c.chapter_number IN (?, ?)
+            ORDER BY c.chapter_number, s.scene_number
+        """,
+            (chapter, scene - 1, chapter - 1, scene, chapter, chapter - 1),
+        )
+        chapter_row = None
+        previous_scenes = []
+        previous_scene_content = None
+        for row in cursor.fetchall():
+            if row["chapter_number"] == chapter:
+                chapter_row = chapter_row or {
+                    "title": row["title"],
+                    "outline": row["outline"],
+                }
+                if row["scene_number"] is not None and row["scene_number"] < scene:
+                    previous_scenes.append(dict(row))
+            if row["content"] is not None:
+                previous_scene_content = row["content"]
+        queries += 1
+
+        # 3. Story-wide state, derived incrementally from cached snapshots
+        if CONTEXT_CACHE_ENABLED:
+            snapshot, snapshot_queries = get_scene_context_cache(db_manager).snapshot(
+                cursor, chapter, scene
+            )
+        else:
+            snapshot = StorySnapshot(chapter=chapter, scene=scene)
+            snapshot_queries, _ = snapshot.apply_deltas(cursor)
+        plot_progression_keys = list(snapshot.progression_keys)
+        queries += snapshot_queries
+
+        # 4. Active plot threads with their latest developments
+        cursor.execute(
+            """
+            SELECT id, name, description, importance, status
+            FROM plot_threads
+            WHERE status IN ('introduced', 'developing')
+            AND importance IN ('major', 'minor')
+        """
+        )
+        thread_rows = []
+        for row in cursor.fetchall():
+            for scene_id, _, development in snapshot.developments.get(
+                row["id"], [(None, None, None)]
+            ):
+                thread_rows.append((row, scene_id, development))
+        # Major threads first, then newest developments (threads without any last)
+        thread_rows.sort(
+            key=lambda item: (
+                0 if item[0]["importance"] == "major" else 1,
+                item[1] is None,
+                -(item[1] or 0),
+            )
+        )
+        active_threads = [
+            {
+                "name": row["name"],
+                "description": row["description"],
+                "importance": row["importance"],
+                "status": row["status"],
+                "last_development": development,
+            }
+            for row, _, development in thread_rows[:5]
+        ]
+        queries += 1
+
+        characters = []
+        knowledge: dict[int, list[dict[str, Any]]] = {}
+        relationships = []
+        character_locations: dict[int, list[dict[str, Any]]] = {}
+
+        if required_chars:
+            # 5. Required characters, with their latest state from the snapshot
+            placeholders = ",".join("?" * len(required_chars))
+            cursor.execute(
+                f"""
+                SELECT id, identifier, name, role, backstory, personality
+                FROM characters
+                WHERE identifier IN ({placeholders}) OR name IN ({placeholders})
+            """,
+                required_chars + required_chars,
+            )
+            rows = [dict(row) for row in cursor.fetchall()]
+            for row in rows:
+                _, row["emotional_state"] = snapshot.character_states.get(
+                    row["id"], (None, None)
+                )
+            queries += 1
+
+            # Keep the requested order, matching identifiers before names
+            by_identifier = {row["identifier"]: row for row in rows}
+            by_name = {row["name"]: row for row in rows}
+            for char_identifier in required_chars:
+                row = by_identifier.get(char_identifier) or by_name.get(char_identifier)
+                if row:
+                    characters.append(row)
+
+        character_ids = [row["id"] for row in characters]
+        id_placeholders = ",".join("?" * len(character_ids))
+        if character_ids:
+            # Most recent knowledge entries per character
+            for character_id in character_ids:
+                knowledge[character_id] = [
+                    {"content": content, "type": knowledge_type}
+                    for _, _, content, knowledge_type in snapshot.knowledge.get(
+                        character_id, []
+                    )
+                ]
+
+            # 6. Relationships among the required characters
+            if len(character_ids) > 1:
+                cursor.execute(
+                    f"""
+                    SELECT cr.*, c1.name as char1_name, c2.name as char2_name,
+                        cr.character1_id, cr.character2_id, cr.properties
+                    FROM character_relationships cr
+                    JOIN characters c1 ON cr.character1_id = c1.id
+                    JOIN characters c2 ON cr.character2_id = c2.id
+                    WHERE cr.character1_id IN ({id_placeholders})
+                    AND cr.character2_id IN ({id_placeholders})
+                """,
+                    character_ids + character_ids,
+                )
+                relationships = [dict(row) for row in cursor.fetchall()]
+                queries += 1
+
+        # 7. All locations, for matching against the scene description, with
+        # their associations to the required characters
+        cursor.execute(
+            f"""
+            SELECT l.id as location_id, l.identifier, l.name, l.description,
+                cl.character_id, cl.association_type
+            FROM locations l
+            LEFT JOIN character_locations cl ON cl.location_id = l.id
+                AND cl.character_id IN ({id_placeholders})
+            ORDER BY l.id
+        """,
+            character_ids,
+        )
+        locations = []
+        seen_locations = set()
+        for row in cursor.fetchall():
+            if row["location_id"] not in seen_locations:
+                seen_locations.add(row["location_id"])
+                locations.append(
+                    {
+                        "identifier": row["identifier"],
+                        "name": row["name"],
+                        "description": row["description"],
+                    }
+                )
+            if row["character_id"] is not None:
+                character_locations.setdefault(row["character_id"], []).append(
+                    dict(row)
+                )
+        queries += 1
+
+        # 8. Overused content, near-duplicates counted together, from the
+        # registry's near-duplicate index
+        cursor.execute(
+            """
+            SELECT content_text
+            FROM content_clusters
+            WHERE content_type IN ('description', 'metaphor', 'action')
+              AND usage_count > 2
+            ORDER BY usage_count DESC
+            LIMIT 10
+        """
+        )
+        overused_phrases = [row["content_text"] for row in cursor.fetchall()]
+        queries += 1
+
+    logger.debug(
+        f"Loaded scene context data for Chapter {chapter}, Scene {scene} "
+        f"with {queries} queries ({len(characters)} characters)"
+    )
+
+    return SceneContextData(
+        story_config=story_config,
+        chapter=chapter_row,
+        previous_scenes=previous_scenes,
+        previous_scene_content=previous_scene_content,
+        plot_progression_keys=plot_progression_keys,
+        active_threads=active_threads,
+        characters=characters,
+        knowledge=knowledge,
+        relationships=relationships,
+        character_locations=character_locations,
+        locations=locations,
+        overused_phrases=overused_phrases,
+        query_count=queries,
+    )
+
+
 def build_comprehensive_scene_context(
     chapter: int, scene: int, state: StoryState
 ) -> ComprehensiveSceneContext:
@@ -90,21 +675,26 @@ def build_comprehensive_scene_context(
     if not db_manager or not db_manager._db:
         raise RuntimeError("Database manager not available")
 
+    # Get scene specifications from state and bulk-load the database rows
+    scene_specs = _get_scene_specifications(state, chapter, scene)
+    data = load_scene_context_data(
+        db_manager, chapter, scene, scene_specs["required_characters"]
+    )
+
     # 1. Get story-level context (including author style guidance from state)
-    story_context = _get_story_context(db_manager, state)
+    story_context = _get_story_context(data, state)
 
     # 2. Get chapter context
-    chapter_context = _get_chapter_context(db_manager, chapter)
+    chapter_context = _get_chapter_context(data, chapter)
 
-    # 3. Get scene specifications from state
-    scene_specs = _get_scene_specifications(state, chapter, scene)
+    # 3. Scene specifications were loaded above
 
     # 4. Get plot context
-    plot_context = _get_plot_context(db_manager, scene_specs)
+    plot_context = _get_plot_context(data, scene_specs)
 
     # 5. Get character context
     character_context = _get_character_context(
-        db_manager,
+        data,
         scene_specs["required_characters"],
         scene_specs["description"],
         state,
@@ -141,7 +731,7 @@ def build_comprehensive_scene_context(
 
         # Still get basic location data
         world_context = _get_world_context(
-            db_manager, scene_specs["description"], character_context["locations"]
+            data, scene_specs["description"], character_context["locations"]
         )
 
         # Merge intelligent worldbuilding with location data
@@ -159,14 +749,14 @@ def build_comprehensive_scene_context(
         logger.error("Falling back to basic world context")
         # Fallback to basic world context
         world_context = _get_world_context(
-            db_manager, scene_specs["description"], character_context["locations"]
+            data, scene_specs["description"], character_context["locations"]
         )
 
     # 7. Get previous/next scene context
-    sequence_context = _get_sequence_context(db_manager, chapter, scene, state)
+    sequence_context = _get_sequence_context(data, chapter, scene, state)
 
     # 8. Get writing constraints
-    constraints = _get_writing_constraints(db_manager, chapter, scene)
+    constraints = _get_writing_constraints(data, chapter, scene)
 
     # 9. Get style guide
     style_data = _get_comprehensive_style_guide(
@@ -223,77 +813,60 @@ def build_comprehensive_scene_context(
     )
 
 
-def _get_story_context(db_manager, state: StoryState = None) -> dict[str, Any]:
-    """Get story-level context from database and state."""
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT title, genre, tone, author, language, initial_idea, global_story
-            FROM story_config WHERE id = 1
-        """
-        )
-        result = cursor.fetchone()
-
-        if not result:
-            raise RuntimeError("No story configuration found")
-
-        # Extract premise from global story
-        premise = ""
-        if result["global_story"]:
-            # Take first paragraph as premise, or first 500 chars
-            paragraphs = result["global_story"].split("\n\n")
-            premise = paragraphs[0] if paragraphs else result["global_story"][:500]
+def _get_story_context(
+    data: SceneContextData, state: StoryState = None
+) -> dict[str, Any]:
+    """Get story-level context from loaded database rows and state."""
+    result = data.story_config
+    if not result:
+        raise RuntimeError("No story configuration found")
+
+    # Extract premise from global story
+    premise = ""
+    if result["global_story"]:
+        # Take first paragraph as premise, or first 500 chars
+        paragraphs = result["global_story"].split("\n\n")
+        premise = paragraphs[0] if paragraphs else result["global_story"][:500]
+
+    # Get author style guidance from state if available
+    author_style_guidance = ""
+    if state and "author_style_guidance" in state:
+        author_style_guidance = state["author_style_guidance"]
 
-        # Get author style guidance from state if available
-        author_style_guidance = ""
-        if state and "author_style_guidance" in state:
-            author_style_guidance = state["author_style_guidance"]
+    return {
+        "title": result["title"] or "Untitled Story",
+        "genre": result["genre"] or "fantasy",
+        "tone": result["tone"] or "adventurous",
+        "author": result["author"],
+        "language": result["language"] or "english",
+        "initial_idea": result["initial_idea"] or "",
+        "premise": premise,
+        "author_style_guidance": author_style_guidance,
+    }
 
-        return {
-            "title": result["title"] or "Untitled Story",
-            "genre": result["genre"] or "fantasy",
-            "tone": result["tone"] or "adventurous",
-            "author": result["author"],
-            "language": result["language"] or "english",
-            "initial_idea": result["initial_idea"] or "",
-            "premise": premise,
-            "author_style_guidance": author_style_guidance,
-        }
 
+def _get_chapter_context(data: SceneContextData, chapter: int) -> dict[str, Any]:
+    """Get chapter-level context from loaded database rows."""
+    result = data.chapter
+    if not result:
+        logger.warning(f"No chapter {chapter} found in database")
+        return {"title": f"Chapter {chapter}", "outline": "", "themes": []}
 
-def _get_chapter_context(db_manager, chapter: int) -> dict[str, Any]:
-    """Get chapter-level context from database."""
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT title, outline FROM chapters
-            WHERE chapter_number = ?
-        """,
-            (chapter,),
-        )
-        result = cursor.fetchone()
-
-        if not result:
-            logger.warning(f"No chapter {chapter} found in database")
-            return {"title": f"Chapter {chapter}", "outline": "", "themes": []}
-
-        # Extract themes from outline (simple approach)
-        themes = []
-        outline = result["outline"] or ""
-        if "theme" in outline.lower():
-            # Extract themes mentioned in outline
-            lines = outline.split("\n")
-            for line in lines:
-                if "theme" in line.lower():
-                    themes.append(line.strip())
+    # Extract themes from outline (simple approach)
+    themes = []
+    outline = result["outline"] or ""
+    if "theme" in outline.lower():
+        # Extract themes mentioned in outline
+        lines = outline.split("\n")
+        for line in lines:
+            if "theme" in line.lower():
+                themes.append(line.strip())
 
-        return {
-            "title": result["title"] or f"Chapter {chapter}",
-            "outline": outline,
-            "themes": themes[:3],  # Limit to 3 main themes
-        }
+    return {
+        "title": result["title"] or f"Chapter {chapter}",
+        "outline": outline,
+        "themes": themes[:3],  # Limit to 3 main themes
+    }
 
 
 def _get_scene_specifications(
@@ -320,11 +893,11 @@ def _get_scene_specifications(
     }
 
 
-def _get_plot_context(db_manager, scene_specs: dict[str, Any]) -> dict[str, Any]:
+def _get_plot_context(
+    data: SceneContextData, scene_specs: dict[str, Any]
+) -> dict[str, Any]:
     """Get plot-related context."""
-    # Get existing plot progressions
-    existing_progressions = db_manager.get_plot_progressions()
-    existing_keys = [p["progression_key"] for p in existing_progressions]
+    existing_keys = set(data.plot_progression_keys)
 
     # Structure plot progressions with status
     progressions = []
@@ -339,43 +912,25 @@ def _get_plot_context(db_manager, scene_specs: dict[str, Any]) -> dict[str, Any]
 
     # Get active plot threads
     active_threads = []
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT pt.name, pt.description, pt.importance, pt.status,
-                ptd.description as last_development
-            FROM plot_threads pt
-            LEFT JOIN plot_thread_developments ptd ON pt.id = ptd.plot_thread_id
-            WHERE pt.status IN ('introduced', 'developing')
-            AND pt.importance IN ('major', 'minor')
-            ORDER BY
-                CASE pt.importance
-                WHEN 'major' THEN 1
-                WHEN 'minor' THEN 2
-                ELSE 3
-                END,
-                ptd.scene_id DESC
-            LIMIT 5
-        """
+    for row in data.active_threads:
+        active_threads.append(
+            {
+                "name": row["name"],
+                "description": row["description"],
+                "importance": row["importance"],
+                "status": row["status"],
+                "last_development": row["last_development"] or row["description"],
+            }
         )
 
-        for row in cursor.fetchall():
-            active_threads.append(
-                {
-                    "name": row["name"],
-                    "description": row["description"],
-                    "importance": row["importance"],
-                    "status": row["status"],
-                    "last_development": row["last_development"] or row["description"],
-                }
-            )
-
     return {"progressions": progressions, "active_threads": active_threads}
 
 
 def _get_character_context(
-    db_manager, required_chars: list[str], scene_desc: str, state: StoryState = None
+    data: SceneContextData,
+    required_chars: list[str],
+    scene_desc: str,
+    state: StoryState = None,
 ) -> dict[str, Any]:
     """Get comprehensive character context including worldbuilding descriptions."""
     characters = []
@@ -386,278 +941,205 @@ def _get_character_context(
     if state and "characters" in state:
         state_characters = state.get("characters", {})
 
-    # Get required characters first
-    for char_identifier in required_chars:
-        with db_manager._db._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT c.id, c.identifier, c.name, c.role, c.backstory, c.personality,
-                    cs.emotional_state
-                FROM characters c
-                LEFT JOIN character_states cs ON c.id = cs.character_id
-                WHERE c.identifier = ? OR c.name = ?
-                ORDER BY cs.scene_id DESC
-                LIMIT 1
-            """,
-                (char_identifier, char_identifier),
-            )
-
-            result = cursor.fetchone()
-            if result:
-                character_ids.append(result["id"])
-
-                # Parse personality JSON
-                import json
-
-                personality = json.loads(result["personality"] or "{}")
+    # Required characters were loaded in request order with their latest state
+    for result in data.characters:
+        character_ids.append(result["id"])
+
+        # Parse personality JSON
+        personality = json.loads(result["personality"] or "{}")
+
+        # Get emotional state
+        emotional_state = "neutral"
+        if result["emotional_state"]:
+            state_data = json.loads(result["emotional_state"])
+            emotional_state = state_data.get("current", "neutral")
+
+        # Get recent knowledge
+        knowledge = data.knowledge.get(result["id"], [])
+
+        # Check if we have richer character data in state
+        char_data = {
+            "id": result["id"],
+            "identifier": result["identifier"],
+            "name": result["name"],
+            "role": result["role"],
+            "backstory": result["backstory"],
+            "personality": personality,
+            "emotional_state": emotional_state,
+            "motivation": (
+                personality.get("desires", ["Unknown"])[0]
+                if personality.get("desires")
+                else "Unknown"
+            ),
+            "inner_conflicts": personality.get("inner_conflicts", []),
+            "recent_knowledge": knowledge,
+        }
 
-                # Get emotional state
-                emotional_state = "neutral"
-                if result["emotional_state"]:
-                    state_data = json.loads(result["emotional_state"])
-                    emotional_state = state_data.get("current", "neutral")
+        # Enhance with state data if available
+        if state_characters and result["identifier"] in state_characters:
+            state_char = state_characters[result["identifier"]]
+
+            # Add personality details if more comprehensive in state
+            if isinstance(state_char.get("personality"), dict):
+                state_personality = state_char["personality"]
+                # Merge personality data, preferring state data when richer
+                if "traits" in state_personality:
+                    char_data["personality"]["traits"] = state_personality.get(
+                        "traits", []
+                    )
+                if "strengths" in state_personality:
+                    char_data["personality"]["strengths"] = state_personality.get(
+                        "strengths", []
+                    )
+                if "flaws" in state_personality:
+                    char_data["personality"]["flaws"] = state_personality.get(
+                        "flaws", []
+                    )
+                if "fears" in state_personality:
+                    char_data["personality"]["fears"] = state_personality.get(
+                        "fears", []
+                    )
+                if "desires" in state_personality:
+                    char_data["personality"]["desires"] = state_personality.get(
+                        "desires", []
+                    )
+                if "values" in state_personality:
+                    char_data["personality"]["values"] = state_personality.get(
+                        "values", []
+                    )
 
-                # Get recent knowledge
-                cursor.execute(
-                    """
-                SELECT knowledge_content, knowledge_type
-                FROM character_knowledge
-                WHERE character_id = ?
-                ORDER BY scene_id DESC
-                LIMIT 5
-                """,
-                    (result["id"],),
+            # Add emotional journey if available
+            if "emotional_state" in state_char and isinstance(
+                state_char["emotional_state"], dict
+            ):
+                char_data["emotional_journey"] = state_char["emotional_state"].get(
+                    "journey", []
                 )
-
-                knowledge = [
-                    {"content": row["knowledge_content"], "type": row["knowledge_type"]}
-                    for row in cursor.fetchall()
-                ]
-
-                # Check if we have richer character data in state
-                char_data = {
-                    "id": result["id"],
-                    "identifier": result["identifier"],
-                    "name": result["name"],
-                    "role": result["role"],
-                    "backstory": result["backstory"],
-                    "personality": personality,
-                    "emotional_state": emotional_state,
-                    "motivation": (
-                        personality.get("desires", ["Unknown"])[0]
-                        if personality.get("desires")
-                        else "Unknown"
-                    ),
-                    "inner_conflicts": personality.get("inner_conflicts", []),
-                    "recent_knowledge": knowledge,
-                }
-
-                # Enhance with state data if available
-                if state_characters and result["identifier"] in state_characters:
-                    state_char = state_characters[result["identifier"]]
-
-                    # Add personality details if more comprehensive in state
-                    if isinstance(state_char.get("personality"), dict):
-                        state_personality = state_char["personality"]
-                        # Merge personality data, preferring state data when richer
-                        if "traits" in state_personality:
-                            char_data["personality"]["traits"] = state_personality.get(
-                                "traits", []
-                            )
-                        if "strengths" in state_personality:
-                            char_data["personality"]["strengths"] = (
-                                state_personality.get("strengths", [])
-                            )
-                        if "flaws" in state_personality:
-                            char_data["personality"]["flaws"] = state_personality.get(
-                                "flaws", []
-                            )
-                        if "fears" in state_personality:
-                            char_data["personality"]["fears"] = state_personality.get(
-                                "fears", []
-                            )
-                        if "desires" in state_personality:
-                            char_data["personality"]["desires"] = state_personality.get(
-                                "desires", []
-                            )
-                        if "values" in state_personality:
-                            char_data["personality"]["values"] = state_personality.get(
-                                "values", []
-                            )
-
-                    # Add emotional journey if available
-                    if "emotional_state" in state_char and isinstance(
-                        state_char["emotional_state"], dict
-                    ):
-                        char_data["emotional_journey"] = state_char[
-                            "emotional_state"
-                        ].get("journey", [])
-                        char_data["initial_emotional_state"] = state_char[
-                            "emotional_state"
-                        ].get("initial", emotional_state)
-
-                    # Add inner conflicts from state (more detailed than DB)
-                    if "inner_conflicts" in state_char and isinstance(
-                        state_char["inner_conflicts"], list
-                    ):
-                        char_data["inner_conflicts"] = state_char["inner_conflicts"]
-
-                    # Add character arc information
-                    if "character_arc" in state_char and isinstance(
-                        state_char["character_arc"], dict
-                    ):
-                        char_data["character_arc"] = state_char["character_arc"]
-
-                    # Add evolution notes
-                    if "evolution" in state_char and isinstance(
-                        state_char["evolution"], list
-                    ):
-                        char_data["evolution"] = state_char["evolution"]
-
-                    # Extract physical description from key traits if available
-                    if "key_traits" in state_char and isinstance(
-                        state_char["key_traits"], list
-                    ):
-                        char_data["key_traits"] = state_char["key_traits"]
-                        # Look for physical descriptions in key traits
-                        physical_traits = [
-                            trait
-                            for trait in state_char["key_traits"]
-                            if any(
-                                word in trait.lower()
-                                for word in [
-                                    "tall",
-                                    "short",
-                                    "hair",
-                                    "eyes",
-                                    "build",
-                                    "appearance",
-                                    "looks",
-                                ]
-                            )
+                char_data["initial_emotional_state"] = state_char[
+                    "emotional_state"
+                ].get("initial", emotional_state)
+
+            # Add inner conflicts from state (more detailed than DB)
+            if "inner_conflicts" in state_char and isinstance(
+                state_char["inner_conflicts"], list
+            ):
+                char_data["inner_conflicts"] = state_char["inner_conflicts"]
+
+            # Add character arc information
+            if "character_arc" in state_char and isinstance(
+                state_char["character_arc"], dict
+            ):
+                char_data["character_arc"] = state_char["character_arc"]
+
+            # Add evolution notes
+            if "evolution" in state_char and isinstance(state_char["evolution"], list):
+                char_data["evolution"] = state_char["evolution"]
+
+            # Extract physical description from key traits if available
+            if "key_traits" in state_char and isinstance(
+                state_char["key_traits"], list
+            ):
+                char_data["key_traits"] = state_char["key_traits"]
+                # Look for physical descriptions in key traits
+                physical_traits = [
+                    trait
+                    for trait in state_char["key_traits"]
+                    if any(
+                        word in trait.lower()
+                        for word in [
+                            "tall",
+                            "short",
+                            "hair",
+                            "eyes",
+                            "build",
+                            "appearance",
+                            "looks",
                         ]
-                        if physical_traits:
-                            char_data["physical_description"] = ", ".join(
-                                physical_traits
-                            )
+                    )
+                ]
+                if physical_traits:
+                    char_data["physical_description"] = ", ".join(physical_traits)
 
-                characters.append(char_data)
+        characters.append(char_data)
 
     # Get relationships between characters
     relationships = []
-    if len(character_ids) > 1:
-        with db_manager._db._get_connection() as conn:
-            cursor = conn.cursor()
-            placeholders = ",".join("?" * len(character_ids))
-            cursor.execute(
-                f"""
-                SELECT cr.*, c1.name as char1_name, c2.name as char2_name,
-                    cr.character1_id, cr.character2_id, cr.properties
-                FROM character_relationships cr
-                JOIN characters c1 ON cr.character1_id = c1.id
-                JOIN characters c2 ON cr.character2_id = c2.id
-                WHERE cr.character1_id IN ({placeholders})
-                AND cr.character2_id IN ({placeholders})
-            """,
-                character_ids + character_ids,
-            )
-
-            for row in cursor.fetchall():
-                rel_data = {
-                    "character1": row["char1_name"],
-                    "character2": row["char2_name"],
-                    "type": row["relationship_type"],
-                    "description": row["description"],
-                }
+    for row in data.relationships:
+        rel_data = {
+            "character1": row["char1_name"],
+            "character2": row["char2_name"],
+            "type": row["relationship_type"],
+            "description": row["description"],
+        }
 
-                # Parse properties if available for dynamics and evolution
-                if row["properties"]:
-                    try:
-                        properties = json.loads(row["properties"])
-                        if "dynamics" in properties:
-                            rel_data["dynamics"] = properties["dynamics"]
-                        if "evolution" in properties:
-                            rel_data["evolution"] = properties["evolution"]
-                        if "conflicts" in properties:
-                            rel_data["conflicts"] = properties["conflicts"]
-                    except json.JSONDecodeError:
-                        pass
-
-                # Also check state for richer relationship data
-                if state_characters:
-                    # Look for relationship data in state characters
-                    for char_id in [row["character1_id"], row["character2_id"]]:
-                        # Find the character identifier for this ID
-                        char_identifier = None
-                        for char in characters:
-                            if char["id"] == char_id:
-                                char_identifier = char["identifier"]
-                            break
-
-                        if char_identifier and char_identifier in state_characters:
-                            state_char = state_characters[char_identifier]
-                            if "relationships" in state_char and isinstance(
-                                state_char["relationships"], dict
-                            ):
-                                # Look for relationship with the other character
-                                for _rel_key, rel_info in state_char[
-                                    "relationships"
-                                ].items():
-                                    if isinstance(rel_info, dict):
-                                        # Check if this relationship matches
-                                        target_name = rel_info.get(
-                                            "target_character", ""
+        # Parse properties if available for dynamics and evolution
+        if row["properties"]:
+            try:
+                properties = json.loads(row["properties"])
+                if "dynamics" in properties:
+                    rel_data["dynamics"] = properties["dynamics"]
+                if "evolution" in properties:
+                    rel_data["evolution"] = properties["evolution"]
+                if "conflicts" in properties:
+                    rel_data["conflicts"] = properties["conflicts"]
+            except json.JSONDecodeError:
+                pass
+
+        # Also check state for richer relationship data
+        if state_characters:
+            # Look for relationship data in state characters
+            for char_id in [row["character1_id"], row["character2_id"]]:
+                # Find the character identifier for this ID
+                char_identifier = None
+                for char in characters:
+                    if char["id"] == char_id:
+                        char_identifier = char["identifier"]
+                    break
+
+                if char_identifier and char_identifier in state_characters:
+                    state_char = state_characters[char_identifier]
+                    if "relationships" in state_char and isinstance(
+                        state_char["relationships"], dict
+                    ):
+                        # Look for relationship with the other character
+                        for _rel_key, rel_info in state_char["relationships"].items():
+                            if isinstance(rel_info, dict):
+                                # Check if this relationship matches
+                                target_name = rel_info.get("target_character", "")
+                                if target_name in [
+                                    row["char1_name"],
+                                    row["char2_name"],
+                                ]:
+                                    # Enhance with state data
+                                    if "dynamics" in rel_info and not rel_data.get(
+                                        "dynamics"
+                                    ):
+                                        rel_data["dynamics"] = rel_info["dynamics"]
+                                    if "evolution" in rel_info:
+                                        rel_data["evolution"] = rel_info.get(
+                                            "evolution", []
+                                        )
+                                    if "conflicts" in rel_info:
+                                        rel_data["conflicts"] = rel_info.get(
+                                            "conflicts", []
                                         )
-                                        if target_name in [
-                                            row["char1_name"],
-                                            row["char2_name"],
-                                        ]:
-                                            # Enhance with state data
-                                            if (
-                                                "dynamics" in rel_info
-                                                and not rel_data.get("dynamics")
-                                            ):
-                                                rel_data["dynamics"] = rel_info[
-                                                    "dynamics"
-                                                ]
-                                            if "evolution" in rel_info:
-                                                rel_data["evolution"] = rel_info.get(
-                                                    "evolution", []
-                                                )
-                                            if "conflicts" in rel_info:
-                                                rel_data["conflicts"] = rel_info.get(
-                                                    "conflicts", []
-                                                )
-                                            break
-
-                relationships.append(rel_data)
+                                    break
+
+        relationships.append(rel_data)
 
     # Get character locations
     locations = []
     for char_id in character_ids:
-        with db_manager._db._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT l.identifier, l.name, l.description, cl.association_type
-                FROM character_locations cl
-                JOIN locations l ON cl.location_id = l.id
-                WHERE cl.character_id = ?
-            """,
-                (char_id,),
+        for row in data.character_locations.get(char_id, []):
+            locations.append(
+                {
+                    "identifier": row["identifier"],
+                    "name": row["name"],
+                    "description": row["description"],
+                    "association": row["association_type"],
+                }
             )
 
-            for row in cursor.fetchall():
-                locations.append(
-                    {
-                        "identifier": row["identifier"],
-                        "name": row["name"],
-                        "description": row["description"],
-                        "association": row["association_type"],
-                    }
-                )
-
     return {
         "characters": characters,
         "relationships": relationships,
@@ -666,28 +1148,24 @@ def _get_character_context(
 
 
 def _get_world_context(
-    db_manager, scene_desc: str, character_locations: list[dict]
+    data: SceneContextData, scene_desc: str, character_locations: list[dict]
 ) -> dict[str, Any]:
     """Get relevant world elements for the scene using intelligent selection."""
     # Get locations mentioned in scene or associated with characters
     relevant_locations = character_locations.copy()
 
     # Add locations mentioned in scene description
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT identifier, name, description FROM locations")
-
-        for row in cursor.fetchall():
-            if row["name"].lower() in scene_desc.lower():
-                if not any(loc["name"] == row["name"] for loc in relevant_locations):
-                    relevant_locations.append(
-                        {
-                            "identifier": row["identifier"],
-                            "name": row["name"],
-                            "description": row["description"],
-                            "association": "scene_location",
-                        }
-                    )
+    for row in data.locations:
+        if row["name"].lower() in scene_desc.lower():
+            if not any(loc["name"] == row["name"] for loc in relevant_locations):
+                relevant_locations.append(
+                    {
+                        "identifier": row["identifier"],
+                        "name": row["name"],
+                        "description": row["description"],
+                        "association": "scene_location",
+                    }
+                )
 
     # Use intelligent worldbuilding selection instead of keyword matching
     # This will be properly integrated when called from build_comprehensive_scene_context
@@ -739,72 +1217,31 @@ def _extract_world_keywords(text: str) -> list[str]:
 
 
 def _get_sequence_context(
-    db_manager, chapter: int, scene: int, state: StoryState
+    data: SceneContextData, chapter: int, scene: int, state: StoryState
 ) -> dict[str, Any]:
     """Get context from previous and next scenes."""
     # Get previous scene ending
     previous_ending = ""
     previous_summary = ""
 
-    if scene > 1:
-        # Previous scene in same chapter
-        prev_content = db_manager.get_scene_content(chapter, scene - 1)
-        if prev_content:
-            # Get last 300 words for ending
-            words = prev_content.split()
-            previous_ending = (
-                " ".join(words[-300:]) if len(words) > 300 else prev_content
-            )
+    # Previous scene in same chapter, or last scene of the previous chapter
+    prev_content = data.previous_scene_content
+    if prev_content:
+        # Get last 300 words for ending
+        words = prev_content.split()
+        previous_ending = " ".join(words[-300:]) if len(words) > 300 else prev_content
 
+        if scene > 1:
             # Get summary of previous scenes in chapter
-            with db_manager._db._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                SELECT s.scene_number, s.description
-                FROM scenes s
-                JOIN chapters c ON s.chapter_id = c.id
-                WHERE c.chapter_number = ? AND s.scene_number < ?
-                ORDER BY s.scene_number DESC
-                LIMIT 3
-                """,
-                    (chapter, scene),
-                )
-
-                summaries = []
-                for row in cursor.fetchall():
-                    if row["description"]:
-                        summaries.append(
-                            f"Scene {row['scene_number']}: {row['description']}"
-                        )
-
-                previous_summary = "\n".join(reversed(summaries))
-
-    elif chapter > 1:
-        # Get ending of previous chapter
-        with db_manager._db._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT MAX(s.scene_number) as last_scene
-                FROM scenes s
-                JOIN chapters c ON s.chapter_id = c.id
-                WHERE c.chapter_number = ?
-            """,
-                (chapter - 1,),
-            )
-
-            result = cursor.fetchone()
-            if result and result["last_scene"]:
-                prev_content = db_manager.get_scene_content(
-                    chapter - 1, result["last_scene"]
-                )
-                if prev_content:
-                    words = prev_content.split()
-                    previous_ending = (
-                        " ".join(words[-300:]) if len(words) > 300 else prev_content
+            summaries = []
+            for row in data.previous_scenes[-3:]:
+                if row["description"]:
+                    summaries.append(
+                        f"Scene {row['scene_number']}: {row['description']}"
                     )
 
+            previous_summary = "\n".join(summaries)
+
     # Get next scene preview
     next_preview = None
     chapters = state.get("chapters", {})
@@ -820,7 +1257,9 @@ def _get_sequence_context(
     }
 
 
-def _get_writing_constraints(db_manager, chapter: int, scene: int) -> dict[str, Any]:
+def _get_writing_constraints(
+    data: SceneContextData, chapter: int, scene: int
+) -> dict[str, Any]:
     """Get constraints to avoid repetition and maintain variety."""
     constraints = {
         "forbidden_repetitions": [],
@@ -829,42 +1268,14 @@ def _get_writing_constraints(db_manager, chapter: int, scene: int) -> dict[str,
     }
 
     # Get recent scene types
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT s.scene_type
-            FROM scenes s
-            JOIN chapters c ON s.chapter_id = c.id
-            WHERE c.chapter_number = ? AND s.scene_number < ?
-            ORDER BY s.scene_number DESC
-            LIMIT 5
-        """,
-            (chapter, scene),
-        )
-
-        constraints["recent_scene_types"] = [
-            row["scene_type"] for row in cursor.fetchall() if row["scene_type"]
-        ]
+    constraints["recent_scene_types"] = [
+        row["scene_type"]
+        for row in reversed(data.previous_scenes[-5:])
+        if row["scene_type"]
+    ]
 
     # Get overused content from registry
-    with db_manager._db._get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT content_text, COUNT(*) as usage_count
-            FROM used_content_registry
-            WHERE content_type IN ('description', 'metaphor', 'action')
-            GROUP BY content_text
-            HAVING usage_count > 2
-            ORDER BY usage_count DESC
-            LIMIT 10
-        """
-        )
-
-        constraints["overused_phrases"] = [
-            row["content_text"] for row in cursor.fetchall()
-        ]
+    constraints["overused_phrases"] = list(data.overused_phrases)
 
     # Add specific forbidden repetitions based on recent content
     if len(constraints["recent_scene_types"]) >= 3:
@@ -0,0 +1,78 @@
+"""
+StoryCraft Agent - Durable LangGraph checkpoints.
+
+The story graph is compiled with a SQLite checkpointer stored next to the
+story database, so every completed superstep is saved and an interrupted
+run can continue from its last checkpoint instead of starting over.
+"""
+
+# Standard library imports
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Third party imports
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Local imports
+from storyteller_lib.core.config import CHECKPOINT_PATH
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def open_checkpointer(path: str | None = None) -> Iterator[SqliteSaver]:
+    """
+    Open the SQLite checkpointer, closing its connection on exit.
+
+    Args:
+        path: Checkpoint database path (defaults to CHECKPOINT_PATH)
+
+    Yields:
+        A SqliteSaver usable from the graph's worker threads
+    """
+    path = os.path.expanduser(path or CHECKPOINT_PATH)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    try:
+        checkpointer = SqliteSaver(conn)
+        checkpointer.setup()
+        logger.info(f"Using graph checkpoints at {path}")
+        yield checkpointer
+    finally:
+        conn.close()
+
+
+def latest_thread_id(checkpointer: SqliteSaver) -> str | None:
+    """
+    Get the thread with the most recent checkpoint.
+
+    Args:
+        checkpointer: The checkpointer to search
+
+    Returns:
+        The thread ID, or None if there are no checkpoints
+    """
+    for checkpoint in checkpointer.list(None, limit=1):
+        return checkpoint.config["configurable"]["thread_id"]
+    return None
+
+
+def remove_checkpoints(path: str | None = None) -> None:
+    """
+    Delete the checkpoint database, e.g. when the story database is reset.
+
+    Args:
+        path: Checkpoint database path (defaults to CHECKPOINT_PATH)
+    """
+    path = os.path.expanduser(path or CHECKPOINT_PATH)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
@@ -0,0 +1,257 @@
+"""
+StoryCraft Agent - Pooled SQLite connection management.
+
+This module keeps one long-lived SQLite connection per thread and database
+file instead of opening and closing a connection for every query. All
+StoryDatabase instances pointing at the same file share a single
+ConnectionManager, so the database manager, context provider, knowledge
+manager and audiobook tools reuse the same pooled connections.
+"""
+
+# Standard library imports
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Local imports
+from storyteller_lib.core.exceptions import DatabaseConnectionError
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Connection tuning (overridable through the environment)
+SQLITE_SYNCHRONOUS = os.environ.get("STORY_DB_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("STORY_DB_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.environ.get("STORY_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("STORY_DB_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_STATEMENT_CACHE_SIZE = int(os.environ.get("STORY_DB_STATEMENT_CACHE", "512"))
+
+
+class ConnectionManager:
+    """
+    Per-thread pool of persistent SQLite connections for one database file.
+
+    Each thread gets its own connection, created lazily on first use and
+    configured with WAL journaling and tuned pragmas. Nested ``connection()``
+    blocks on the same thread reuse the same connection; when the outermost
+    block exits, any transaction that was left open is rolled back so the
+    pooled connection is always handed out clean.
+
+    Connections are created with ``connection_factory``, which can be set to
+    a sqlite3.Connection subclass (e.g. to instrument queries in benchmarks)
+    before the first connection is opened.
+    """
+
+    connection_factory: type[sqlite3.Connection] = sqlite3.Connection
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the connection manager.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        # Connections inside an outermost connection() block
+        self._busy: set[sqlite3.Connection] = set()
+        # Incremented by close_all; connections of older generations are
+        # replaced when their thread next enters connection()
+        self._generation = 0
+        self.connections_opened = 0
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open and configure a new connection for the current thread."""
+        try:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                cached_statements=SQLITE_STATEMENT_CACHE_SIZE,
+                check_same_thread=False,
+                factory=self.connection_factory,
+            )
+        except sqlite3.Error as e:
+            raise DatabaseConnectionError(
+                f"Failed to connect to database {self.db_path}: {e}",
+                {"db_path": self.db_path},
+            ) from e
+
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        if self.db_path != ":memory:":
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if str(mode).lower() != "wal":
+                logger.warning(f"Could not enable WAL mode for {self.db_path}")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        # Negative cache_size is interpreted by SQLite as KiB
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        with self._lock:
+            self._connections.append(conn)
+            self._busy.add(conn)
+            self._local.generation = self._generation
+            self.connections_opened += 1
+
+        logger.debug(
+            f"Opened pooled connection to {self.db_path} "
+            f"for thread {threading.current_thread().name}"
+        )
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager yielding this thread's pooled connection.
+
+        Yields:
+            sqlite3.Connection: Connection with row factory set
+        """
+        outermost = getattr(self._local, "depth", 0) == 0
+        if outermost:
+            conn = self._checkout()
+            self._local.depth = 0
+        else:
+            conn = self._local.conn
+
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            if outermost and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if outermost and conn.in_transaction:
+                # Match the semantics of closing a connection without commit
+                logger.debug(f"Rolling back uncommitted transaction on {self.db_path}")
+                conn.rollback()
+        finally:
+            self._local.depth -= 1
+            if outermost:
+                self._checkin(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Mark this thread's connection busy, reopening it if it was closed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            with self._lock:
+                if self._local.generation == self._generation:
+                    self._busy.add(conn)
+                    return conn
+            # Closed by close_all while idle
+            self._local.conn = None
+        conn = self._open_connection()
+        self._local.conn = conn
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        """Mark a connection idle, closing it if close_all ran while it was busy."""
+        with self._lock:
+            self._busy.discard(conn)
+            if self._local.generation == self._generation:
+                return
+            if conn in self._connections:
+                self._connections.remove(conn)
+        self._local.conn = None
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+    def close_all(self) -> None:
+        """
+        Close every pooled connection owned by this manager.
+
+        Idle connections are closed right away. A connection inside a
+        connection() block stays usable until the outermost block exits and
+        is closed then. Either way its thread opens a new connection on its
+        next connection() call.
+        """
+        with self._lock:
+            self._generation += 1
+            idle = [conn for conn in self._connections if conn not in self._busy]
+            self._connections = [
+                conn for conn in self._connections if conn in self._busy
+            ]
+
+        for conn in idle:
+            self._close(conn)
+        logger.debug(f"Closed {len(idle)} pooled connection(s) to {self.db_path}")
+
+
+# Registry of connection managers keyed by resolved database path
+_managers: dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def _registry_key(db_path: str) -> str:
+    """Normalize a database path so aliases share one manager."""
+    if db_path == ":memory:":
+        return db_path
+    return str(Path(db_path).expanduser().resolve())
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """
+    Get the shared connection manager for a database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The ConnectionManager shared by all users of this file
+    """
+    key = _registry_key(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is not None and db_path != ":memory:" and not os.path.exists(key):
+            # The file was deleted (e.g. to start a fresh story); connections
+            # still open on it would keep using the deleted file
+            manager.close_all()
+            manager = None
+        if manager is None:
+            manager = ConnectionManager(db_path)
+            _managers[key] = manager
+        return manager
+
+
+def set_connection_factory(factory: type[sqlite3.Connection]) -> None:
+    """
+    Set the connection class used for pooled connections.
+
+    Pooled connections that are already open are closed, so every thread
+    reopens its connection with the new class on next use. Call this while
+    no transaction is in progress, e.g. at startup.
+
+    Args:
+        factory: sqlite3.Connection subclass
+    """
+    ConnectionManager.connection_factory = factory
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
+
+
+def close_connection_manager(db_path: str) -> None:
+    """
+    Close and forget the shared connection manager for a database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+    """
+    with _managers_lock:
+        manager = _managers.pop(_registry_key(db_path), None)
+    if manager:
+        manager.close_all()
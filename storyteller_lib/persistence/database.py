@@ -9,16 +9,29 @@ story generation.
 # Standard library imports
 import json
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 # Local imports
 from storyteller_lib.core.constants import NodeNames
 from storyteller_lib.core.logger import get_logger
-from storyteller_lib.core.models import StoryState
 from storyteller_lib.persistence.models import StoryDatabase
+from storyteller_lib.persistence.unit_of_work import UnitOfWork
+
+# StoryState pulls in LangGraph; it is only needed for type annotations
+if TYPE_CHECKING:
+    from storyteller_lib.core.models import StoryState
 
 logger = get_logger(__name__)
 
+# Scene keys the graph adds while writing; everything else is the scene plan
+SCENE_RUNTIME_KEYS = {
+    "content",
+    "db_stored",
+    "written",
+    "reflection",
+    "reflection_notes",
+}
+
 
 class StoryDatabaseManager:
     """
@@ -28,16 +41,27 @@ class StoryDatabaseManager:
     state after each node execution and track changes incrementally.
     """
 
-    def __init__(self, db_path: str | None = None, enabled: bool = True):
+    def __init__(
+        self,
+        db_path: str | None = None,
+        enabled: bool = True,
+        flush_policy: str | None = None,
+        flush_interval: float | None = None,
+    ):
         """
         Initialize the database manager.
 
         Args:
             db_path: Path to the database file (defaults to story_database.db)
             enabled: Whether database operations are enabled
+            flush_policy: When queued node writes are committed (node, scene, time)
+            flush_interval: Seconds between commits for the time flush policy
         """
         self.enabled = enabled
         self._db: StoryDatabase | None = None
+        self._unit_of_work: UnitOfWork | None = None
+        self._flush_policy = flush_policy
+        self._flush_interval = flush_interval
         self._db_path = db_path or os.environ.get(
             "STORY_DATABASE_PATH", "story_database.db"
         )
@@ -52,14 +76,30 @@ class StoryDatabaseManager:
     def _initialize_database(self) -> None:
         """Initialize database connection."""
         self._db = StoryDatabase(self._db_path)
+        self._unit_of_work = UnitOfWork(
+            self._db, self._flush_policy, self._flush_interval
+        )
         logger.info(f"Database initialized at {self._db_path}")
 
-    def save_node_state(self, node_name: str, state: StoryState) -> None:
+    def flush(self) -> int:
+        """
+        Commit all writes queued by save_node_state.
+
+        Returns:
+            Number of statements written
+        """
+        if not self._unit_of_work:
+            return 0
+        return self._unit_of_work.flush()
+
+    def save_node_state(self, node_name: str, state: "StoryState") -> None:
         """
         Save state after a node execution.
 
         This method performs incremental updates based on the node type,
-        only saving what has changed to avoid full state syncs.
+        only saving what has changed to avoid full state syncs. Writes are
+        queued on the unit of work and committed in a single transaction
+        according to the configured flush policy.
 
         Args:
             node_name: Name of the node that just executed
@@ -114,11 +154,12 @@ class StoryDatabaseManager:
                 self._update_character_states(state)
             # Story outline is saved by the generate_story_outline node itself
 
+            self._unit_of_work.node_completed(node_name)
             logger.debug(f"Saved state after {node_name}")
         except Exception as e:
             logger.error(f"Failed to save state after {node_name}: {e}")
 
-    def _save_initial_state(self, state: StoryState) -> None:
+    def _save_initial_state(self, state: "StoryState") -> None:
         """Initialize context provider for story generation."""
         # Story configuration is already saved by storyteller.py
         # Just ensure context provider is initialized
@@ -130,7 +171,7 @@ class StoryDatabaseManager:
         if not get_context_provider():
             initialize_context_provider(self)
 
-    def _save_world_elements(self, state: StoryState) -> None:
+    def _save_world_elements(self, state: "StoryState") -> None:
         """Save world building elements."""
         world_elements = state.get("world_elements", {})
 
@@ -142,109 +183,126 @@ class StoryDatabaseManager:
 
         # Otherwise save them if they exist
         if isinstance(world_elements, dict):
+            element_rows = []
             for category, elements in world_elements.items():
                 if isinstance(elements, dict):
                     for key, value in elements.items():
-                        self._db.create_world_element(
-                            category=category, element_key=key, element_value=value
-                        )
+                        if isinstance(value, dict | list):
+                            value = json.dumps(value)
+                        element_rows.append((category, key, value))
+            self._unit_of_work.add_many(
+                """
+                INSERT OR REPLACE INTO world_elements
+                (category, element_key, element_value)
+                VALUES (?, ?, ?)
+                """,
+                element_rows,
+            )
 
             # Also save locations if they exist in world elements
             if "locations" in world_elements and isinstance(
                 world_elements["locations"], dict
             ):
+                location_rows = []
                 for loc_id, loc_data in world_elements["locations"].items():
                     if isinstance(loc_data, dict):
-                        self._db.create_location(
-                            identifier=loc_id,
-                            name=loc_data.get("name", loc_id),
-                            description=loc_data.get("description", ""),
-                            location_type=loc_data.get("type", "unknown"),
-                            properties=loc_data.get("properties", {}),
+                        properties = loc_data.get("properties", {})
+                        if isinstance(properties, dict):
+                            properties = json.dumps(properties)
+                        location_rows.append(
+                            (
+                                loc_id,
+                                loc_data.get("name", loc_id),
+                                loc_data.get("description", ""),
+                                loc_data.get("type", "unknown"),
+                                properties,
+                            )
                         )
+                self._unit_of_work.add_many(
+                    """
+                    INSERT OR IGNORE INTO locations
+                    (identifier, name, description, location_type, properties)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    location_rows,
+                )
 
-    def _save_characters(self, state: StoryState) -> None:
+    def _save_characters(self, state: "StoryState") -> None:
         """Save character profiles and relationships."""
         characters = state.get("characters", {})
 
-        # First pass: Create all characters
-        char_id_map = {}
+        # First pass: Queue all characters (existing ones are left untouched)
+        character_rows = []
         for char_id, char_data in characters.items():
-            try:
-                # Serialize any dict fields to JSON strings, ensure all are strings
-                personality = char_data.get("personality", "")
-                if isinstance(personality, dict):
-                    personality = json.dumps(personality)
-                elif personality is None:
-                    personality = ""
-                else:
-                    personality = str(personality)
+            # Serialize any dict fields to JSON strings, ensure all are strings
+            personality = char_data.get("personality", "")
+            if isinstance(personality, dict):
+                personality = json.dumps(personality)
+            elif personality is None:
+                personality = ""
+            else:
+                personality = str(personality)
 
-                backstory = char_data.get("backstory", "")
-                if isinstance(backstory, dict):
-                    backstory = json.dumps(backstory)
-                elif backstory is None:
-                    backstory = ""
-                else:
-                    backstory = str(backstory)
+            backstory = char_data.get("backstory", "")
+            if isinstance(backstory, dict):
+                backstory = json.dumps(backstory)
+            elif backstory is None:
+                backstory = ""
+            else:
+                backstory = str(backstory)
 
-                role = char_data.get("role", "")
-                if isinstance(role, dict):
-                    role = json.dumps(role)
-                elif role is None:
-                    role = ""
-                else:
-                    role = str(role)
+            role = char_data.get("role", "")
+            if isinstance(role, dict):
+                role = json.dumps(role)
+            elif role is None:
+                role = ""
+            else:
+                role = str(role)
 
-                # Debug logging
-                logger.debug(f"Creating character {char_id} with:")
-                logger.debug(
-                    f"  name: {char_data.get('name', char_id)} (type: {type(char_data.get('name', char_id))})"
-                )
-                logger.debug(f"  role: {role} (type: {type(role)})")
-                logger.debug(
-                    f"  backstory: {backstory[:100] if backstory else 'None'}... (type: {type(backstory)})"
-                )
-                logger.debug(
-                    f"  personality: {personality[:100] if personality else 'None'}... (type: {type(personality)})"
-                )
+            logger.debug(f"Queueing character {char_id}")
+            character_rows.append(
+                (char_id, char_data.get("name", char_id), role, backstory, personality)
+            )
 
-                db_char_id = self._db.create_character(
-                    identifier=char_id,
-                    name=char_data.get("name", char_id),
-                    role=role,
-                    backstory=backstory,
-                    personality=personality,
-                )
-                char_id_map[char_id] = db_char_id
-            except Exception as e:
-                # Character might already exist
-                logger.debug(f"Character {char_id} may already exist: {e}")
-                # Try to get existing character ID
-                with self._db._get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT id FROM characters WHERE identifier = ?", (char_id,)
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        char_id_map[char_id] = result["id"]
+        self._unit_of_work.add_many(
+            """
+            INSERT OR IGNORE INTO characters
+            (identifier, name, role, backstory, personality)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            character_rows,
+        )
 
-        # Second pass: Create relationships
+        # Second pass: Queue relationships, resolving database IDs in SQL so
+        # they can be written in the same transaction as the characters
+        relationship_rows = []
         for char_id, char_data in characters.items():
-            if char_id in char_id_map and "relationships" in char_data:
-                for other_char, rel_type in char_data["relationships"].items():
-                    if other_char in char_id_map:
-                        self._db.create_relationship(
-                            char1_id=char_id_map[char_id],
-                            char2_id=char_id_map[other_char],
-                            rel_type=rel_type,
-                        )
+            for other_char, rel_data in char_data.get("relationships", {}).items():
+                if other_char not in characters:
+                    continue
+                rel_type = (
+                    rel_data
+                    if isinstance(rel_data, str)
+                    else rel_data.get("type", "unknown")
+                )
+                relationship_rows.append((rel_type, char_id, other_char))
+
+        self._unit_of_work.add_many(
+            """
+            INSERT OR REPLACE INTO character_relationships
+            (character1_id, character2_id, relationship_type, description, properties)
+            SELECT MIN(a.id, b.id), MAX(a.id, b.id), ?, NULL, '{}'
+            FROM characters a, characters b
+            WHERE a.identifier = ? AND b.identifier = ? AND a.id <> b.id
+            """,
+            relationship_rows,
+        )
 
-    def _save_plot_threads(self, state: StoryState) -> None:
+    def _save_plot_threads(self, state: "StoryState") -> None:
         """Save plot threads."""
         plot_threads = state.get("plot_threads", {})
 
+        thread_rows = []
         for thread_name, thread_data in plot_threads.items():
             # Skip if it's just a marker
             if isinstance(thread_data, dict) and thread_data.get("stored_in_db"):
@@ -252,35 +310,29 @@ class StoryDatabaseManager:
 
             # Handle the PlotThread data structure
             if isinstance(thread_data, dict):
-                try:
-                    # First check if thread already exists
-                    with self._db._get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "SELECT id FROM plot_threads WHERE name = ?", (thread_name,)
-                        )
-                        result = cursor.fetchone()
+                thread_rows.append(
+                    (
+                        thread_name,
+                        thread_data.get("description", ""),
+                        # PlotThread uses 'importance' not 'thread_type'
+                        thread_data.get("importance", "minor"),
+                        thread_data.get("importance", "minor"),
+                        thread_data.get("status", "introduced"),
+                    )
+                )
 
-                        if result:
-                            # Update existing thread
-                            self._db.update_plot_thread_status(
-                                result["id"], thread_data.get("status", "introduced")
-                            )
-                        else:
-                            # Create new thread
-                            self._db.create_plot_thread(
-                                name=thread_name,
-                                description=thread_data.get("description", ""),
-                                thread_type=thread_data.get(
-                                    "importance", "minor"
-                                ),  # PlotThread uses 'importance' not 'thread_type'
-                                importance=thread_data.get("importance", "minor"),
-                                status=thread_data.get("status", "introduced"),
-                            )
-                except Exception as e:
-                    logger.error(f"Failed to save plot thread {thread_name}: {e}")
+        # New threads are created, existing threads only get their status updated
+        self._unit_of_work.add_many(
+            """
+            INSERT INTO plot_threads
+            (name, description, thread_type, importance, status)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET status = excluded.status
+            """,
+            thread_rows,
+        )
 
-    def _save_all_chapters(self, state: StoryState) -> None:
+    def _save_all_chapters(self, state: "StoryState") -> None:
         """Save all chapters after planning."""
         chapters = state.get("chapters", {})
         if not chapters:
@@ -291,6 +343,8 @@ class StoryDatabaseManager:
         logger.info(f"Saving {len(chapters)} chapters to database")
         logger.debug(f"Chapter keys: {list(chapters.keys())}")
 
+        chapter_keys = {}
+        chapter_rows = []
         for chapter_key, chapter_data in chapters.items():
             # Extract chapter number
             try:
@@ -303,36 +357,59 @@ class StoryDatabaseManager:
                 logger.error(f"Could not extract chapter number from: {chapter_key}")
                 continue
 
-            # Check if chapter already exists
-            with self._db._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM chapters WHERE chapter_number = ?", (chapter_num,)
+            chapter_keys[chapter_num] = chapter_key
+            chapter_rows.append(
+                (
+                    chapter_num,
+                    chapter_data.get("title", ""),
+                    chapter_data.get("outline", ""),
                 )
-                result = cursor.fetchone()
+            )
 
-                if not result:
-                    # Create new chapter
-                    try:
-                        chapter_id = self._db.create_chapter(
-                            chapter_num=chapter_num,
-                            title=chapter_data.get("title", ""),
-                            outline=chapter_data.get("outline", ""),
-                        )
-                        self._chapter_id_map[chapter_key] = chapter_id
-                        logger.info(
-                            f"Created chapter {chapter_num}: {chapter_data.get('title', '')}"
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to create chapter {chapter_key}: {e}")
-                else:
-                    # Store existing chapter ID
-                    self._chapter_id_map[chapter_key] = result["id"]
-                    logger.debug(
-                        f"Chapter {chapter_num} already exists with ID {result['id']}"
-                    )
+        # Existing chapters are kept as they are
+        self._unit_of_work.add_many(
+            """
+            INSERT OR IGNORE INTO chapters (chapter_number, title, outline)
+            VALUES (?, ?, ?)
+            """,
+            chapter_rows,
+        )
 
-    def _save_chapter(self, state: StoryState) -> None:
+        # Chapter IDs are needed by later nodes, so commit before reading them back
+        self._unit_of_work.flush()
+        with self._db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, chapter_number FROM chapters")
+            for row in cursor.fetchall():
+                chapter_key = chapter_keys.get(row["chapter_number"])
+                if chapter_key is not None:
+                    self._chapter_id_map[chapter_key] = row["id"]
+
+        # Keep the scene plans, which only exist in the graph state otherwise
+        plan_rows = []
+        for chapter_num, chapter_key in chapter_keys.items():
+            for scene_key, scene_data in chapters[chapter_key].get("scenes", {}).items():
+                if not str(scene_key).isdigit():
+                    continue
+                plan = {
+                    key: value
+                    for key, value in scene_data.items()
+                    if key not in SCENE_RUNTIME_KEYS
+                }
+                plan_rows.append((chapter_num, int(scene_key), json.dumps(plan)))
+        self._unit_of_work.add_many(
+            """
+            INSERT OR REPLACE INTO scene_plans (chapter_number, scene_number, plan)
+            VALUES (?, ?, ?)
+            """,
+            plan_rows,
+        )
+        # Resuming without a checkpoint depends on them, so do not batch them
+        self._unit_of_work.flush()
+
+        logger.info(f"Saved {len(chapter_rows)} chapters")
+
+    def _save_chapter(self, state: "StoryState") -> None:
         """Save current chapter."""
         current_chapter = state.get("current_chapter", "")
         if not current_chapter:
@@ -348,7 +425,8 @@ class StoryDatabaseManager:
             except (ValueError, IndexError):
                 chapter_num = len(chapters)
 
-            # First check if chapter exists
+            # First check if chapter exists (including any queued inserts)
+            self._unit_of_work.flush()
             with self._db._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
@@ -370,7 +448,7 @@ class StoryDatabaseManager:
                     except Exception as e:
                         logger.error(f"Failed to create chapter {current_chapter}: {e}")
 
-    def _save_scene(self, state: StoryState) -> None:
+    def _save_scene(self, state: "StoryState") -> None:
         """Save current scene and its entities."""
         current_chapter = state.get("current_chapter", "")
         current_scene = state.get("current_scene", "")
@@ -417,7 +495,7 @@ class StoryDatabaseManager:
                             self._current_scene_id = result["id"]
 
     def _save_scene_entities(
-        self, state: StoryState, scene_data: dict[str, Any]
+        self, state: "StoryState", scene_data: dict[str, Any]
     ) -> None:
         """Save entities involved in the current scene."""
         if not self._current_scene_id:
@@ -428,79 +506,67 @@ class StoryDatabaseManager:
 
         # Detect and save character involvement
         characters = state.get("characters", {})
+        character_rows = []
         for char_id, char_data in characters.items():
             char_name = char_data.get("name", "")
             if char_name and char_name in content:
-                # Get character database ID
-                with self._db._get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT id FROM characters WHERE identifier = ?", (char_id,)
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        self._db.add_entity_to_scene(
-                            self._current_scene_id, "character", result["id"], "present"
-                        )
+                character_rows.append((self._current_scene_id, char_id))
+
+        self._unit_of_work.add_many(
+            """
+            INSERT OR REPLACE INTO scene_entities
+            (scene_id, entity_type, entity_id, involvement_type)
+            SELECT ?, 'character', id, 'present' FROM characters WHERE identifier = ?
+            """,
+            character_rows,
+        )
 
         # Save location involvement if mentioned
         world_elements = state.get("world_elements", {})
         if "locations" in world_elements:
+            location_rows = []
             for loc_id, loc_data in world_elements["locations"].items():
-                if isinstance(loc_data, dict):
-                    loc_name = loc_data.get("name", "")
+                if not isinstance(loc_data, dict):
+                    continue
+                loc_name = loc_data.get("name", "")
                 if loc_name and loc_name in content:
-                    # Get location database ID
-                    with self._db._get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "SELECT id FROM locations WHERE identifier = ?", (loc_id,)
-                        )
-                        result = cursor.fetchone()
-                        if result:
-                            self._db.add_entity_to_scene(
-                                self._current_scene_id,
-                                "location",
-                                result["id"],
-                                "present",
-                            )
+                    location_rows.append((self._current_scene_id, loc_id))
+
+            self._unit_of_work.add_many(
+                """
+                INSERT OR REPLACE INTO scene_entities
+                (scene_id, entity_type, entity_id, involvement_type)
+                SELECT ?, 'location', id, 'present' FROM locations WHERE identifier = ?
+                """,
+                location_rows,
+            )
 
-    def _update_character_states(self, state: StoryState) -> None:
+    def _update_character_states(self, state: "StoryState") -> None:
         """Update character states for the current scene."""
         if not self._current_scene_id:
             return
 
         characters = state.get("characters", {})
+        state_rows = []
         for char_id, char_data in characters.items():
-            # Get character database ID
-            with self._db._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM characters WHERE identifier = ?", (char_id,)
-                )
-                result = cursor.fetchone()
-                if result:
-                    char_db_id = result["id"]
-
-                    # Build state update
-                    state_update = {}
-
-                    # Check for evolution in current scene
-                    evolution = char_data.get("evolution", [])
-                    if evolution:
-                        # Get the latest evolution entry
-                        latest_evolution = evolution[-1]
-                        state_update["evolution_notes"] = latest_evolution
-
-                    # Note: Character knowledge is now tracked via character_knowledge table
-                    # The old fact fields have been removed from CharacterProfile
-
-                    if state_update:
-                        self._db.update_character_state(
-                            character_id=char_db_id,
-                            scene_id=self._current_scene_id,
-                            state=state_update,
-                        )
+            # Check for evolution in current scene
+            evolution = char_data.get("evolution", [])
+            if evolution:
+                # Get the latest evolution entry
+                state_rows.append((self._current_scene_id, evolution[-1], char_id))
+
+            # Note: Character knowledge is now tracked via character_knowledge table
+            # The old fact fields have been removed from CharacterProfile
+
+        self._unit_of_work.add_many(
+            """
+            INSERT INTO character_states (character_id, scene_id, evolution_notes)
+            SELECT id, ?, ? FROM characters WHERE identifier = ?
+            ON CONFLICT(character_id, scene_id)
+            DO UPDATE SET evolution_notes = excluded.evolution_notes
+            """,
+            state_rows,
+        )
 
     def get_context_for_chapter(self, chapter_num: int) -> dict[str, Any]:
         """
@@ -1039,6 +1105,7 @@ class StoryDatabaseManager:
                 "search_queries",
             }
 
+            element_rows = []
             for category, elements in world_elements.items():
                 if category in metadata_fields:  # Skip metadata
                     continue
@@ -1054,10 +1121,20 @@ class StoryDatabaseManager:
                                 logger.warning(
                                     f"Short worldbuilding content for {category}.{key}: {len(value.strip())} chars"
                                 )
-                            self._db.create_world_element(
-                                category=category, element_key=key, element_value=value
-                            )
-            logger.info("Saved worldbuilding elements")
+                            element_rows.append((category, key, value))
+
+            # Write all elements in one transaction
+            batch = UnitOfWork(self._db)
+            batch.add_many(
+                """
+                INSERT OR REPLACE INTO world_elements
+                (category, element_key, element_value)
+                VALUES (?, ?, ?)
+                """,
+                element_rows,
+            )
+            batch.flush()
+            logger.info(f"Saved {len(element_rows)} worldbuilding elements")
         except Exception as e:
             logger.error(f"Failed to save worldbuilding: {e}")
             raise
@@ -1603,6 +1680,29 @@ class StoryDatabaseManager:
             )
             return None
 
+    def search_memories(
+        self, query: str, namespace: str | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        """
+        Search memory values with the full-text index.
+
+        Args:
+            query: Plain text to search for
+            namespace: Optional namespace the memories must be in
+            limit: Maximum number of results
+
+        Returns:
+            Memories with key, value and namespace, best matches first
+        """
+        if not self.enabled or not self._db:
+            return []
+
+        try:
+            return self._db.search_memories(query, namespace, limit)
+        except Exception as e:
+            logger.error(f"Failed to search memories: {e}")
+            return []
+
     def compile_story(self) -> str:
         """Compile the full story from the database."""
         if not self.enabled or not self._db:
@@ -1661,7 +1761,12 @@ class StoryDatabaseManager:
 
     def close(self) -> None:
         """Close database connections."""
-        # SQLite connections are closed automatically
+        if self._db:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush pending writes on close: {e}")
+            self._db.close()
         self._db = None
         logger.debug("Database manager closed")
 
@@ -1676,7 +1781,9 @@ def get_db_manager() -> StoryDatabaseManager | None:
 
 
 def initialize_db_manager(
-    db_path: str | None = None, enabled: bool = True
+    db_path: str | None = None,
+    enabled: bool = True,
+    flush_policy: str | None = None,
 ) -> StoryDatabaseManager:
     """
     Initialize the global database manager.
@@ -1684,10 +1791,11 @@ def initialize_db_manager(
     Args:
         db_path: Path to the database file
         enabled: Whether database operations are enabled
+        flush_policy: When queued node writes are committed (node, scene, time)
 
     Returns:
         The initialized database manager
     """
     global _db_manager
-    _db_manager = StoryDatabaseManager(db_path, enabled)
+    _db_manager = StoryDatabaseManager(db_path, enabled, flush_policy)
     return _db_manager
@@ -0,0 +1,155 @@
+"""
+StoryCraft Agent - MinHash signatures for near-duplicate content.
+
+Content is reduced to the set of its content words (stopwords removed)
+and summarized by a MinHash signature, whose matching positions estimate
+the Jaccard similarity of two word sets. The signature is split into
+bands, and each band is hashed to a bucket; texts sharing any bucket are
+candidate near-duplicates (locality-sensitive hashing). With 16 bands of
+4 rows, texts with a similarity of 0.6 share a bucket about 90% of the
+time and those above 0.7 almost always do.
+
+Each word is hashed NUM_PERMUTATIONS times by salted BLAKE2b digests
+instead of permuting one hash, which keeps the work in C. The hashes are
+stable across processes, so signatures and buckets can be stored in the
+database.
+
+Text without content words has an empty signature and no buckets: it is
+never a near-duplicate of anything, and only exact repeats are detected.
+"""
+
+# Standard library imports
+import re
+from array import array
+from functools import cache
+from hashlib import blake2b
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Estimated Jaccard similarity from which content counts as a near-duplicate.
+# Short texts sharing all but one content word are at 0.5 or less
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+# Changes whenever shingles() changes; stored signatures of other versions
+# are recomputed
+SIGNATURE_VERSION = 3
+
+_WORD = re.compile(r"\w+")
+
+# A 64-byte digest holds 16 32-bit hashes; one salt per 16 hash functions
+_SALTS = [
+    f"minhash{i}".encode()
+    for i in range(NUM_PERMUTATIONS * 4 // blake2b.MAX_DIGEST_SIZE)
+]
+
+
+def _hashes(shingle: str) -> memoryview:
+    """Hash a shingle with each of the NUM_PERMUTATIONS hash functions."""
+    data = shingle.encode()
+    digests = b"".join(
+        blake2b(data, digest_size=blake2b.MAX_DIGEST_SIZE, salt=salt).digest()
+        for salt in _SALTS
+    )
+    return memoryview(digests).cast("I")
+
+
+@cache
+def _stopwords() -> frozenset[str]:
+    """
+    Stopwords of all languages, as the registry does not record one.
+    """
+    # Imported here, as the analysis package depends on the persistence layer
+    from storyteller_lib.analysis.ngrams import STOPWORDS
+
+    return frozenset().union(*STOPWORDS.values())
+
+
+def shingles(text: str) -> set[str]:
+    """
+    Reduce text to the set of its lowercased content words.
+
+    Word order is ignored, so a description that was reworded or
+    rearranged stays close to the original. Stopwords are dropped, as
+    they would make unrelated short sentences look alike.
+
+    Args:
+        text: The content text
+
+    Returns:
+        The set of words
+    """
+    return set(_WORD.findall(text.lower())) - _stopwords()
+
+
+def signature(text: str) -> list[int]:
+    """
+    Compute the MinHash signature of a text.
+
+    Args:
+        text: The content text
+
+    Returns:
+        NUM_PERMUTATIONS minimum hash values, or none if the text has no
+        content words
+    """
+    hashes = [_hashes(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return []
+    return list(map(min, zip(*hashes, strict=True)))
+
+
+def lsh_buckets(sig: list[int]) -> list[int]:
+    """
+    Hash each band of a signature to a bucket.
+
+    Args:
+        sig: A MinHash signature
+
+    Returns:
+        One signed 64-bit bucket per band, unique across bands; none for an
+        empty signature
+    """
+    if not sig:
+        return []
+    data = pack(sig)
+    band_size = len(data) // BANDS
+    return [
+        int.from_bytes(
+            blake2b(
+                data[band * band_size : (band + 1) * band_size],
+                digest_size=8,
+                salt=band.to_bytes(2, "little"),
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    """
+    Estimate the Jaccard similarity of two texts from their signatures.
+
+    Args:
+        sig_a: Signature of the first text
+        sig_b: Signature of the second text
+
+    Returns:
+        The share of matching signature values
+    """
+    return sum(a == b for a, b in zip(sig_a, sig_b, strict=True)) / len(sig_a)
+
+
+def pack(sig: list[int]) -> bytes:
+    """Serialize a signature for storage."""
+    return array("I", sig).tobytes()
+
+
+def unpack(data: bytes) -> list[int]:
+    """Deserialize a stored signature."""
+    values = array("I")
+    values.frombytes(data)
+    return values.tolist()
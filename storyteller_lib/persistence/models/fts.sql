@@ -0,0 +1,120 @@
+-- StoryCraft Agent Full-Text Search Index
+-- FTS5 indexes over the text columns of the story database. They are
+-- external-content tables: the text stays in the indexed table and the
+-- triggers below keep the index in sync with every insert, update and
+-- delete. Applied after schema.sql, and skipped when SQLite was built
+-- without FTS5.
+
+-- 1. Scene content and summaries
+CREATE VIRTUAL TABLE IF NOT EXISTS scenes_fts USING fts5(
+    content, summary,
+    content='scenes', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_insert AFTER INSERT ON scenes BEGIN
+    INSERT INTO scenes_fts(rowid, content, summary)
+    VALUES (new.id, new.content, new.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_delete AFTER DELETE ON scenes BEGIN
+    INSERT INTO scenes_fts(scenes_fts, rowid, content, summary)
+    VALUES ('delete', old.id, old.content, old.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_update AFTER UPDATE OF content, summary ON scenes BEGIN
+    INSERT INTO scenes_fts(scenes_fts, rowid, content, summary)
+    VALUES ('delete', old.id, old.content, old.summary);
+    INSERT INTO scenes_fts(rowid, content, summary)
+    VALUES (new.id, new.content, new.summary);
+END;
+
+-- 2. Memories
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    value,
+    content='memories', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+-- INSERT OR REPLACE does not fire delete triggers, so replaced rows are
+-- removed from the index before the insert. Only rows UNIQUE(key, namespace)
+-- conflicts with are replaced, and it never conflicts on a NULL namespace,
+-- so the match must not use IS (replaced on startup, as IF NOT EXISTS kept
+-- an earlier version that did)
+DROP TRIGGER IF EXISTS memories_fts_replace;
+CREATE TRIGGER memories_fts_replace BEFORE INSERT ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, value)
+    SELECT 'delete', id, value FROM memories
+    WHERE key = new.key AND namespace = new.namespace;
+END;
+
+CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, value) VALUES (new.id, new.value);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, value)
+    VALUES ('delete', old.id, old.value);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF value ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, value)
+    VALUES ('delete', old.id, old.value);
+    INSERT INTO memories_fts(rowid, value) VALUES (new.id, new.value);
+END;
+
+-- 3. World elements
+CREATE VIRTUAL TABLE IF NOT EXISTS world_elements_fts USING fts5(
+    element_key, element_value,
+    content='world_elements', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Same as memories_fts_replace; category and element_key are NOT NULL, so
+-- the match finds exactly the row UNIQUE(category, element_key) replaces
+CREATE TRIGGER IF NOT EXISTS world_elements_fts_replace BEFORE INSERT ON world_elements BEGIN
+    INSERT INTO world_elements_fts(world_elements_fts, rowid, element_key, element_value)
+    SELECT 'delete', id, element_key, element_value FROM world_elements
+    WHERE category = new.category AND element_key = new.element_key;
+END;
+
+CREATE TRIGGER IF NOT EXISTS world_elements_fts_insert AFTER INSERT ON world_elements BEGIN
+    INSERT INTO world_elements_fts(rowid, element_key, element_value)
+    VALUES (new.id, new.element_key, new.element_value);
+END;
+
+CREATE TRIGGER IF NOT EXISTS world_elements_fts_delete AFTER DELETE ON world_elements BEGIN
+    INSERT INTO world_elements_fts(world_elements_fts, rowid, element_key, element_value)
+    VALUES ('delete', old.id, old.element_key, old.element_value);
+END;
+
+CREATE TRIGGER IF NOT EXISTS world_elements_fts_update AFTER UPDATE OF element_key, element_value ON world_elements BEGIN
+    INSERT INTO world_elements_fts(world_elements_fts, rowid, element_key, element_value)
+    VALUES ('delete', old.id, old.element_key, old.element_value);
+    INSERT INTO world_elements_fts(rowid, element_key, element_value)
+    VALUES (new.id, new.element_key, new.element_value);
+END;
+
+-- 4. Character knowledge
+CREATE VIRTUAL TABLE IF NOT EXISTS character_knowledge_fts USING fts5(
+    knowledge_content,
+    content='character_knowledge', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS character_knowledge_fts_insert AFTER INSERT ON character_knowledge BEGIN
+    INSERT INTO character_knowledge_fts(rowid, knowledge_content)
+    VALUES (new.id, new.knowledge_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS character_knowledge_fts_delete AFTER DELETE ON character_knowledge BEGIN
+    INSERT INTO character_knowledge_fts(character_knowledge_fts, rowid, knowledge_content)
+    VALUES ('delete', old.id, old.knowledge_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS character_knowledge_fts_update AFTER UPDATE OF knowledge_content ON character_knowledge BEGIN
+    INSERT INTO character_knowledge_fts(character_knowledge_fts, rowid, knowledge_content)
+    VALUES ('delete', old.id, old.knowledge_content);
+    INSERT INTO character_knowledge_fts(rowid, knowledge_content)
+    VALUES (new.id, new.knowledge_content);
+END;
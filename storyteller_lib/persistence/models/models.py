@@ -9,18 +9,60 @@ This module provides the core database functionality including:
 
 # Standard library imports
 import json
+import re
 import sqlite3
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 # Local imports
 from storyteller_lib.core.exceptions import DatabaseError
 from storyteller_lib.core.logger import get_logger
-from storyteller_lib.core.models import StoryState
+from storyteller_lib.persistence.connection import (
+    close_connection_manager,
+    get_connection_manager,
+)
+from storyteller_lib.persistence.minhash import (
+    NEAR_DUPLICATE_THRESHOLD,
+    SIGNATURE_VERSION,
+    lsh_buckets,
+    pack,
+    signature,
+    similarity,
+    unpack,
+)
+
+# StoryState pulls in LangGraph; it is only needed for type annotations
+if TYPE_CHECKING:
+    from storyteller_lib.core.models import StoryState
 
 logger = get_logger(__name__)
 
+# Words of a plain-text search query
+_SEARCH_WORD = re.compile(r"\w+")
+
+
+def fts_query(text: str, mode: str = "all") -> str:
+    """
+    Build a full-text query that matches the words of plain text.
+
+    Every word is quoted, so FTS5 syntax in the text is searched literally.
+
+    Args:
+        text: Plain text to search for
+        mode: "all" words, "any" word (ranked by how well they match), or
+            the words as a "phrase"
+
+    Returns:
+        The FTS5 MATCH expression, empty if the text has no words
+    """
+    words = _SEARCH_WORD.findall(text)
+    if not words:
+        return ""
+    if mode == "phrase":
+        return '"' + " ".join(words) + '"'
+    return (" OR " if mode == "any" else " ").join(f'"{word}"' for word in words)
+
 
 class StoryDatabase:
     """
@@ -31,6 +73,13 @@ class StoryDatabase:
     relationships and state tracking.
     """
 
+    # Columns added to schema.sql tables after their creation, which
+    # CREATE TABLE IF NOT EXISTS does not add to existing databases
+    ADDED_COLUMNS: dict[str, dict[str, str]] = {
+        "ssml_repair_log": {"repair_method": "TEXT"},
+        "content_signatures": {"version": "INTEGER NOT NULL DEFAULT 1"},
+    }
+
     def __init__(self, db_path: str = "story_database.db"):
         """
         Initialize database connection and create tables if needed.
@@ -39,6 +88,7 @@ class StoryDatabase:
                 db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._pool = get_connection_manager(db_path)
         self._init_database()
 
     def _init_database(self) -> None:
@@ -57,26 +107,135 @@ class StoryDatabase:
 
             with self._get_connection() as conn:
                 conn.executescript(schema_sql)
+                self._add_missing_columns(conn)
+                self._index_content_registry(conn)
+                self.fts_enabled = self._init_search_index(conn)
                 logger.info(f"Database initialized at {self.db_path}")
         except Exception as e:
             raise DatabaseError(f"Failed to initialize database: {str(e)}")
 
+    def _add_missing_columns(self, conn: sqlite3.Connection) -> None:
+        """Add the ADDED_COLUMNS missing from tables of an existing database."""
+        for table, columns in self.ADDED_COLUMNS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                    )
+        conn.commit()
+
+    def _index_content_registry(self, conn: sqlite3.Connection) -> None:
+        """
+        Bring the near-duplicate index up to date with the content registry.
+
+        Registry rows from before the index existed are added to it, and
+        signatures computed by an older SIGNATURE_VERSION are recomputed in
+        place, keeping their clusters.
+        """
+        cursor = conn.cursor()
+        stale = cursor.execute(
+            """
+            SELECT r.id, r.content_type, r.content_text
+            FROM content_signatures s
+            JOIN used_content_registry r ON r.id = s.registry_id
+            WHERE s.version != ?
+            """,
+            (SIGNATURE_VERSION,),
+        ).fetchall()
+        if stale:
+            cursor.execute(
+                "DELETE FROM content_lsh_buckets WHERE registry_id IN "
+                "(SELECT registry_id FROM content_signatures WHERE version != ?)",
+                (SIGNATURE_VERSION,),
+            )
+            for row in stale:
+                content_signature = signature(row["content_text"])
+                cursor.execute(
+                    "UPDATE content_signatures SET signature = ?, version = ? "
+                    "WHERE registry_id = ?",
+                    (pack(content_signature), SIGNATURE_VERSION, row["id"]),
+                )
+                self._add_lsh_buckets(
+                    cursor, row["id"], row["content_type"], content_signature
+                )
+
+        unindexed = cursor.execute(
+            """
+            SELECT r.id, r.content_type, r.content_text
+            FROM used_content_registry r
+            LEFT JOIN content_signatures s ON s.registry_id = r.id
+            WHERE s.registry_id IS NULL
+            ORDER BY r.id
+            """
+        ).fetchall()
+        for row in unindexed:
+            self._add_to_index(
+                cursor, row["id"], row["content_type"], row["content_text"]
+            )
+
+        if stale or unindexed:
+            logger.info(
+                f"Indexed {len(unindexed)} and re-signed {len(stale)} "
+                "registered content entries"
+            )
+        conn.commit()
+
+    def _init_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the full-text search index from fts.sql.
+
+        Indexes added to an existing database are built from its rows, and
+        existing indexes that no longer match their table are rebuilt.
+
+        Returns:
+            False if SQLite was built without FTS5; searches then scan the
+            tables with LIKE
+        """
+        existing = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE name LIKE '%\\_fts' ESCAPE '\\'"
+            )
+        }
+        try:
+            conn.executescript((Path(__file__).parent / "fts.sql").read_text())
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search unavailable, using table scans: {e}")
+            return False
+        for table in self.SEARCH_TABLES.values():
+            fts = table["fts"]
+            if fts in existing:
+                try:
+                    conn.execute(
+                        f"INSERT INTO {fts}({fts}, rank) VALUES ('integrity-check', 1)"
+                    )
+                    continue
+                except sqlite3.DatabaseError as e:
+                    logger.warning(
+                        f"Rebuilding {fts}, it does not match its table: {e}"
+                    )
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        conn.commit()
+        return True
+
     @contextmanager
     def _get_connection(self):
         """
         Context manager for database connections.
 
+        Connections come from a per-thread pool shared by every
+        StoryDatabase instance using the same file.
+
         Yields:
                 sqlite3.Connection: Database connection with row factory set
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+        with self._pool.connection() as conn:
             yield conn
-        finally:
-            if conn:
-                conn.close()
+
+    def close(self) -> None:
+        """Close the pooled connections for this database file."""
+        close_connection_manager(self.db_path)
 
     # Story Management
     def initialize_story_config(
@@ -686,6 +845,99 @@ class StoryDatabase:
             conn.commit()
             logger.info(f"Updated SSML content for scene {scene_id}")
 
+    def save_scene_ssml_conversion(
+        self, scene_id: int, content_ssml: str, content_hash: str | None
+    ) -> None:
+        """
+        Store the SSML converted from a scene with the hash of its inputs.
+
+        Args:
+                scene_id: The scene ID
+            content_ssml: The SSML formatted content
+            content_hash: Hash of the scene inputs the SSML was converted
+                from, or None if it is a fallback to convert again
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE scenes SET content_ssml = ? WHERE id = ?",
+                (content_ssml, scene_id),
+            )
+            if content_hash is None:
+                cursor.execute(
+                    "DELETE FROM scene_ssml_sources WHERE scene_id = ?", (scene_id,)
+                )
+            else:
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO scene_ssml_sources (scene_id, content_hash)
+                    VALUES (?, ?)
+                """,
+                    (scene_id, content_hash),
+                )
+            conn.commit()
+
+    def get_scene_ssml_hashes(self) -> dict[int, str]:
+        """
+        Get the input hashes of the scenes converted to SSML.
+
+        Returns:
+                Content hash by scene ID
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT scene_id, content_hash FROM scene_ssml_sources")
+            return {row["scene_id"]: row["content_hash"] for row in cursor.fetchall()}
+
+    def get_scene_audio(self, scene_id: int) -> dict[str, Any] | None:
+        """
+        Get the recorded audio build of a scene.
+
+        Args:
+                scene_id: The scene ID
+
+        Returns:
+                The ssml_hash, voice, output_format, audio_path and size_bytes
+                the audio was built with, or None if it was never built
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM scene_audio WHERE scene_id = ?", (scene_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def save_scene_audio(
+        self,
+        scene_id: int,
+        ssml_hash: str,
+        voice: str,
+        output_format: str,
+        audio_path: str,
+        size_bytes: int,
+    ) -> None:
+        """
+        Record what a scene's audio file was built from.
+
+        Args:
+                scene_id: The scene ID
+            ssml_hash: SHA-256 of the synthesized SSML
+            voice: The synthesis voice
+            output_format: Audio format (mp3, wav)
+            audio_path: Path of the audio file
+            size_bytes: Size of the audio file
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO scene_audio
+                (scene_id, ssml_hash, voice, output_format, audio_path, size_bytes)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (scene_id, ssml_hash, voice, output_format, audio_path, size_bytes),
+            )
+            conn.commit()
+
     def add_entity_to_scene(
         self,
         scene_id: int,
@@ -1090,6 +1342,10 @@ class StoryDatabase:
         """
         Register content in the used content registry to prevent repetition.
 
+        The content is also added to the near-duplicate index: a paraphrase
+        of registered content joins its cluster, and every registration,
+        repeated ones included, counts as a use of the cluster.
+
         Args:
                 content_type: Type of content (description, event, action, etc.)
             content_text: The actual content text
@@ -1097,7 +1353,8 @@ class StoryDatabase:
             scene_id: Optional scene ID
 
         Returns:
-                True if content was new and registered, False if already exists
+                True if content was new and registered, False if it or a
+                near-duplicate already exists
         """
         import hashlib
 
@@ -1107,6 +1364,31 @@ class StoryDatabase:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
+            cursor.execute(
+                """
+                SELECT r.id, s.cluster_id FROM used_content_registry r
+                LEFT JOIN content_signatures s ON s.registry_id = r.id
+                WHERE r.content_type = ? AND r.content_hash = ?
+                """,
+                (content_type, content_hash),
+            )
+            existing = cursor.fetchone()
+            if existing:
+                cluster_id = existing["cluster_id"]
+                if cluster_id is None:
+                    # Registered by a process that did not index it yet
+                    cluster_id, _ = self._add_to_index(
+                        cursor, existing["id"], content_type, content_text
+                    )
+                # Exact repeat: count another use of its cluster
+                cursor.execute(
+                    "UPDATE content_clusters SET usage_count = usage_count + 1 "
+                    "WHERE id = ?",
+                    (cluster_id,),
+                )
+                conn.commit()
+                return False
+
             try:
                 cursor.execute(
                     """
@@ -1116,19 +1398,84 @@ class StoryDatabase:
                     """,
                     (content_type, content_hash, content_text, chapter_id, scene_id),
                 )
-                conn.commit()
-                return True
             except sqlite3.IntegrityError:
                 # Content already exists
                 return False
+            _, is_new = self._add_to_index(
+                cursor, cursor.lastrowid, content_type, content_text
+            )
+            conn.commit()
+            return is_new
+
+    def _add_to_index(
+        self,
+        cursor: sqlite3.Cursor,
+        registry_id: int,
+        content_type: str,
+        content_text: str,
+    ) -> tuple[int, bool]:
+        """
+        Add a registry row to the near-duplicate index.
 
-    def check_content_exists(self, content_type: str, content_text: str) -> bool:
+        The row joins the cluster of its most similar registered content,
+        counting a use of it, or starts a new cluster.
+
+        Returns:
+            The cluster ID, and whether the cluster is new
+        """
+        content_signature = signature(content_text)
+        matches = self._find_similar(
+            cursor, content_type, content_signature, lsh_buckets(content_signature)
+        )
+        if matches:
+            cluster_id = matches[0]["cluster_id"]
+            cursor.execute(
+                "UPDATE content_clusters SET usage_count = usage_count + 1 "
+                "WHERE id = ?",
+                (cluster_id,),
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO content_clusters (content_type, content_text) "
+                "VALUES (?, ?)",
+                (content_type, content_text),
+            )
+            cluster_id = cursor.lastrowid
+        cursor.execute(
+            "INSERT INTO content_signatures "
+            "(registry_id, cluster_id, signature, version) VALUES (?, ?, ?, ?)",
+            (registry_id, cluster_id, pack(content_signature), SIGNATURE_VERSION),
+        )
+        self._add_lsh_buckets(cursor, registry_id, content_type, content_signature)
+        return cluster_id, not matches
+
+    def _add_lsh_buckets(
+        self,
+        cursor: sqlite3.Cursor,
+        registry_id: int,
+        content_type: str,
+        content_signature: list[int],
+    ) -> None:
+        """Store the LSH buckets of a registry row's signature."""
+        cursor.executemany(
+            "INSERT INTO content_lsh_buckets (content_type, bucket, registry_id) "
+            "VALUES (?, ?, ?)",
+            [
+                (content_type, bucket, registry_id)
+                for bucket in lsh_buckets(content_signature)
+            ],
+        )
+
+    def check_content_exists(
+        self, content_type: str, content_text: str, near_duplicates: bool = True
+    ) -> bool:
         """
         Check if content already exists in the registry.
 
         Args:
                 content_type: Type of content
             content_text: The content to check
+            near_duplicates: Whether paraphrases of registered content count
 
         Returns:
                 True if content exists, False otherwise
@@ -1146,7 +1493,115 @@ class StoryDatabase:
                 """,
                 (content_type, content_hash),
             )
-            return cursor.fetchone()["count"] > 0
+            if cursor.fetchone()["count"] > 0:
+                return True
+            if not near_duplicates:
+                return False
+
+            content_signature = signature(content_text)
+            return bool(
+                self._find_similar(
+                    cursor,
+                    content_type,
+                    content_signature,
+                    lsh_buckets(content_signature),
+                )
+            )
+
+    def find_similar_content(
+        self,
+        content_type: str,
+        content_text: str,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    ) -> list[dict[str, Any]]:
+        """
+        Find registered content that is a near-duplicate of a text.
+
+        Args:
+                content_type: Type of content
+            content_text: The content to look up
+            threshold: Minimum estimated Jaccard similarity of the words
+
+        Returns:
+                Matches with content_text, cluster_id and similarity, most
+                similar first
+        """
+        content_signature = signature(content_text)
+        with self._get_connection() as conn:
+            return self._find_similar(
+                conn.cursor(),
+                content_type,
+                content_signature,
+                lsh_buckets(content_signature),
+                threshold,
+            )
+
+    def _find_similar(
+        self,
+        cursor: sqlite3.Cursor,
+        content_type: str,
+        content_signature: list[int],
+        buckets: list[int],
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    ) -> list[dict[str, Any]]:
+        """Compare the content sharing an LSH bucket with a signature."""
+        if not buckets:
+            # No content words to compare
+            return []
+        placeholders = ",".join("?" * len(buckets))
+        cursor.execute(
+            f"""
+            SELECT r.id, r.content_text, s.cluster_id, s.signature
+            FROM content_signatures s
+            JOIN used_content_registry r ON r.id = s.registry_id
+            WHERE s.registry_id IN (
+                SELECT registry_id FROM content_lsh_buckets
+                WHERE content_type = ? AND bucket IN ({placeholders})
+            )
+            """,
+            (content_type, *buckets),
+        )
+        matches = []
+        for row in cursor.fetchall():
+            score = similarity(content_signature, unpack(row["signature"]))
+            if score >= threshold:
+                matches.append(
+                    {
+                        "id": row["id"],
+                        "content_text": row["content_text"],
+                        "cluster_id": row["cluster_id"],
+                        "similarity": score,
+                    }
+                )
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        return matches
+
+    def get_overused_content(
+        self, content_types: list[str] | None = None, min_uses: int = 3, limit: int = 10
+    ) -> list[str]:
+        """
+        Get the content used most often, counting near-duplicates together.
+
+        Args:
+                content_types: Optional filter by content types
+            min_uses: Minimum uses of a cluster to count as overused
+            limit: Maximum number of items to return
+
+        Returns:
+                The first wording of each overused cluster, most used first
+        """
+        query = "SELECT content_text FROM content_clusters WHERE usage_count >= ?"
+        params: list[Any] = [min_uses]
+        if content_types:
+            query += f" AND content_type IN ({','.join('?' * len(content_types))})"
+            params.extend(content_types)
+        query += " ORDER BY usage_count DESC LIMIT ?"
+        params.append(limit)
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [row["content_text"] for row in cursor.fetchall()]
 
     def get_used_content(
         self, content_type: str | None = None, limit: int = 100
@@ -1186,6 +1641,172 @@ class StoryDatabase:
 
             return [row["content_text"] for row in cursor.fetchall()]
 
+    # Full-Text Search
+    SEARCH_TABLES: dict[str, dict[str, Any]] = {
+        "scenes": {
+            "fts": "scenes_fts",
+            "columns": ["content", "summary"],
+        },
+        "memories": {
+            "fts": "memories_fts",
+            "columns": ["value"],
+        },
+        "world_elements": {
+            "fts": "world_elements_fts",
+            "columns": ["element_key", "element_value"],
+        },
+        "character_knowledge": {
+            "fts": "character_knowledge_fts",
+            "columns": ["knowledge_content"],
+        },
+    }
+
+    def search(
+        self,
+        table: str,
+        query: str,
+        limit: int = 10,
+        mode: str = "all",
+        filters: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search the text of a table, best matches first.
+
+        Args:
+                table: One of SEARCH_TABLES (scenes, memories, world_elements,
+                character_knowledge)
+            query: Plain text to search for
+            limit: Maximum number of results
+            mode: "all" words, "any" word, or the exact "phrase"
+            filters: Column values the rows must have, e.g. {"character_id": 3}
+
+        Returns:
+                The matching rows with a "rank" (lower is better) and a
+                "snippet" of the matching text
+        """
+        search_table = self.SEARCH_TABLES[table]
+        match = fts_query(query, mode)
+        if not match:
+            return []
+
+        conditions = []
+        params: list[Any] = []
+        for column, value in (filters or {}).items():
+            conditions.append(f"t.{column} IS ?")
+            params.append(value)
+
+        if self.fts_enabled:
+            fts = search_table["fts"]
+            sql = f"""
+                SELECT t.*, bm25({fts}) AS rank,
+                    snippet({fts}, -1, '[', ']', '...', 16) AS snippet
+                FROM {fts} JOIN {table} t ON t.id = {fts}.rowid
+                WHERE {fts} MATCH ? {"".join(f" AND {c}" for c in conditions)}
+                ORDER BY rank
+                LIMIT ?
+            """
+            params = [match, *params, limit]
+        else:
+            sql, params = self._scan_search(table, query, mode, conditions, params)
+            params.append(limit)
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _scan_search(
+        self,
+        table: str,
+        query: str,
+        mode: str,
+        conditions: list[str],
+        params: list[Any],
+    ) -> tuple[str, list[Any]]:
+        """Build the LIKE scan used when SQLite has no FTS5."""
+        columns = self.SEARCH_TABLES[table]["columns"]
+        terms = (
+            [" ".join(_SEARCH_WORD.findall(query))]
+            if mode == "phrase"
+            else _SEARCH_WORD.findall(query)
+        )
+        term_conditions = []
+        term_params: list[Any] = []
+        for term in terms:
+            term_conditions.append(
+                "(" + " OR ".join(f"t.{column} LIKE ?" for column in columns) + ")"
+            )
+            term_params.extend([f"%{term}%"] * len(columns))
+        joiner = " OR " if mode == "any" else " AND "
+        sql = f"""
+            SELECT t.*, 0 AS rank, substr(t.{columns[-1]}, 1, 200) AS snippet
+            FROM {table} t
+            WHERE ({joiner.join(term_conditions)})
+                {"".join(f" AND {c}" for c in conditions)}
+            LIMIT ?
+        """
+        return sql, [*term_params, *params]
+
+    def search_scenes(
+        self, query: str, limit: int = 10, mode: str = "all"
+    ) -> list[dict[str, Any]]:
+        """
+        Search the content and summaries of the written scenes.
+
+        Args:
+                query: Plain text to search for
+            limit: Maximum number of results
+            mode: "all" words, "any" word, or the exact "phrase"
+
+        Returns:
+                Scenes with chapter_number, scene_number, summary, rank and
+                snippet, best matches first
+        """
+        results = self.search("scenes", query, limit, mode)
+        if not results:
+            return []
+
+        chapter_ids = {row["chapter_id"] for row in results}
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, chapter_number FROM chapters "
+                f"WHERE id IN ({','.join('?' * len(chapter_ids))})",
+                list(chapter_ids),
+            )
+            chapter_numbers = {row["id"]: row["chapter_number"] for row in cursor}
+        return [
+            {
+                "scene_id": row["id"],
+                "chapter_number": chapter_numbers.get(row["chapter_id"]),
+                "scene_number": row["scene_number"],
+                "summary": row["summary"],
+                "rank": row["rank"],
+                "snippet": row["snippet"],
+            }
+            for row in results
+        ]
+
+    def search_memories(
+        self, query: str, namespace: str | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        """
+        Search memory values.
+
+        Args:
+                query: Plain text to search for
+            namespace: Optional namespace the memories must be in
+            limit: Maximum number of results
+
+        Returns:
+                Memories with key, value and namespace, best matches first
+        """
+        filters = {"namespace": namespace} if namespace else None
+        return [
+            {"key": row["key"], "value": row["value"], "namespace": row["namespace"]}
+            for row in self.search("memories", query, limit, filters=filters)
+        ]
+
     # LLM Evaluation Management
     def save_llm_evaluation(
         self,
@@ -1234,6 +1855,30 @@ class StoryDatabase:
             conn.commit()
             return cursor.lastrowid
 
+    def save_llm_usage(self, entries: list[dict[str, Any]]) -> None:
+        """
+        Append LLM requests to the usage ledger.
+
+        Args:
+            entries: Ledger entries with node, chapter_number, scene_number,
+                model, input_tokens, output_tokens, tokens_estimated,
+                cache_hit, cost_usd, saved_usd and latency
+        """
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO llm_usage
+                (node, chapter_number, scene_number, model, input_tokens,
+                output_tokens, tokens_estimated, cache_hit, cost_usd, saved_usd,
+                latency)
+                VALUES (:node, :chapter_number, :scene_number, :model,
+                :input_tokens, :output_tokens, :tokens_estimated, :cache_hit,
+                :cost_usd, :saved_usd, :latency)
+                """,
+                entries,
+            )
+            conn.commit()
+
     def get_llm_evaluations(
         self, evaluation_type: str | None = None, scene_id: int | None = None
     ) -> list[dict[str, Any]]:
@@ -1593,7 +2238,7 @@ class DatabaseStateAdapter:
         """
         self.db = db
 
-    def sync_to_database(self, state: StoryState) -> None:
+    def sync_to_database(self, state: "StoryState") -> None:
         """
         Sync current state to database.
 
@@ -1742,10 +2387,16 @@ class DatabaseStateAdapter:
 
         logger.info("Synced state to database")
 
-    def load_from_database(self) -> StoryState:
+    def load_from_database(self) -> "StoryState":
         """
         Load state from database.
 
+        Chapters and scenes are keyed by number, as the story graph expects,
+        and the current position is set to the first unfinished scene (see
+        resume_position), so the graph can continue writing from there.
+        Scenes get their plan from chapter planning (required characters,
+        plot progressions, ...) if it is stored in scene_plans.
+
         Returns:
                 StoryState: The loaded state
         """
@@ -1763,6 +2414,7 @@ class DatabaseStateAdapter:
             "initial_idea": story.get("initial_idea", ""),
             "initial_idea_elements": {},
             "global_story": story.get("global_story", ""),
+            "book_level_instructions": story.get("book_level_instructions") or "",
             "chapters": {},
             "characters": {},
             "revelations": {},
@@ -1819,19 +2471,37 @@ class DatabaseStateAdapter:
                     "development_history": [],
                 }
 
-        # Load chapters and scenes
+        # Load chapters and scenes, starting from the planned scenes
         with self.db._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT * FROM scene_plans")
+            plans: dict[int, dict[str, dict[str, Any]]] = {}
+            for row in cursor.fetchall():
+                plans.setdefault(row["chapter_number"], {})[
+                    str(row["scene_number"])
+                ] = json.loads(row["plan"])
+
             cursor.execute("SELECT * FROM chapters ORDER BY chapter_number")
 
             for chapter_row in cursor.fetchall():
                 chapter = dict(chapter_row)
-                chapter_key = f"Chapter {chapter['chapter_number']}"
+                chapter_key = str(chapter["chapter_number"])
 
+                scenes = {
+                    scene_key: {
+                        **plan,
+                        "db_stored": False,
+                        "written": False,
+                        "reflection_notes": [],
+                    }
+                    for scene_key, plan in plans.get(
+                        chapter["chapter_number"], {}
+                    ).items()
+                }
                 state["chapters"][chapter_key] = {
                     "title": chapter.get("title", ""),
                     "outline": chapter.get("outline", ""),
-                    "scenes": {},
+                    "scenes": scenes,
                     "reflection_notes": [],
                 }
 
@@ -1843,17 +2513,101 @@ class DatabaseStateAdapter:
 
                 for scene_row in cursor.fetchall():
                     scene = dict(scene_row)
-                    scene_key = f"Scene {scene['scene_number']}"
-
-                    state["chapters"][chapter_key]["scenes"][scene_key] = {
-                        "content": scene.get("content", ""),
+                    written = bool(scene.get("content"))
+                    scene_key = str(scene["scene_number"])
+                    plan = scenes.get(scene_key, {})
+
+                    scenes[scene_key] = {
+                        **plan,
+                        "description": scene.get("description")
+                        or plan.get("description", ""),
+                        "scene_type": plan.get("scene_type")
+                        or scene.get("scene_type")
+                        or "exploration",
+                        "db_stored": written,
+                        "written": written,
                         "reflection_notes": [],
                     }
 
+        # Continue from the first unfinished scene
+        position = self.resume_position()
+        if position:
+            state["current_chapter"], state["current_scene"] = map(str, position)
+        else:
+            state["completed"] = bool(state["chapters"])
+
         logger.info("Loaded state from database")
         return state
 
-    def update_scene_entities(self, state: StoryState, scene_id: int) -> None:
+    def resume_position(self) -> tuple[int, int] | None:
+        """
+        Find the scene story generation should continue from.
+
+        This is the first written or planned scene without content, or the
+        scene before it if that one has no summary yet (its post-scene steps
+        may not have run).
+
+        Returns:
+                (chapter, scene) numbers, or None if every scene is finished
+        """
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT c.chapter_number, s.scene_number,
+                       COALESCE(s.content, '') != '' AS has_content,
+                       COALESCE(s.summary, '') != '' AS has_summary
+                FROM scenes s
+                JOIN chapters c ON s.chapter_id = c.id
+                UNION ALL
+                SELECT p.chapter_number, p.scene_number, 0, 0
+                FROM scene_plans p
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM scenes s
+                    JOIN chapters c ON s.chapter_id = c.id
+                    WHERE c.chapter_number = p.chapter_number
+                    AND s.scene_number = p.scene_number
+                )
+                ORDER BY 1, 2
+                """
+            )
+            previous = None
+            for row in cursor.fetchall():
+                if not row["has_content"]:
+                    if previous is not None and not previous["has_summary"]:
+                        return previous["chapter_number"], previous["scene_number"]
+                    return row["chapter_number"], row["scene_number"]
+                previous = row
+
+            if previous is not None and not previous["has_summary"]:
+                return previous["chapter_number"], previous["scene_number"]
+            return None
+
+    def has_scene_plan(
+        self, chapter_num: int | None = None, scene_num: int | None = None
+    ) -> bool:
+        """
+        Check whether the plan of a scene is stored in scene_plans.
+
+        Args:
+            chapter_num: Chapter number (default: any scene)
+            scene_num: Scene number (default: any scene)
+
+        Returns:
+            True if the scene can be written from the database alone
+        """
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            if chapter_num is None:
+                cursor.execute("SELECT 1 FROM scene_plans LIMIT 1")
+            else:
+                cursor.execute(
+                    "SELECT 1 FROM scene_plans WHERE chapter_number = ? AND scene_number = ?",
+                    (chapter_num, scene_num),
+                )
+            return cursor.fetchone() is not None
+
+    def update_scene_entities(self, state: "StoryState", scene_id: int) -> None:
         """
         Update database with entities involved in current scene.
 
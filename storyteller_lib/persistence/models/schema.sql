@@ -122,6 +122,16 @@ CREATE TABLE IF NOT EXISTS scenes (
     UNIQUE(chapter_id, scene_number)
 );
 
+-- 9b. Scene plans (the scene specifications from chapter planning, kept so a
+-- story can be resumed from the database without a graph checkpoint; scenes
+-- only get a row in the scenes table once they are written)
+CREATE TABLE IF NOT EXISTS scene_plans (
+    chapter_number INTEGER NOT NULL,
+    scene_number INTEGER NOT NULL,
+    plan TEXT NOT NULL, -- JSON: description, scene_type, required_characters, ...
+    PRIMARY KEY (chapter_number, scene_number)
+);
+
 -- 10. Character states by scene
 CREATE TABLE IF NOT EXISTS character_states (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -202,6 +212,8 @@ CREATE INDEX IF NOT EXISTS idx_character_knowledge_scene_id ON character_knowled
 CREATE INDEX IF NOT EXISTS idx_entity_changes_scene_id ON entity_changes(scene_id);
 CREATE INDEX IF NOT EXISTS idx_scene_entities_scene_id ON scene_entities(scene_id);
 CREATE INDEX IF NOT EXISTS idx_plot_thread_developments_scene_id ON plot_thread_developments(scene_id);
+CREATE INDEX IF NOT EXISTS idx_character_states_character_scene ON character_states(character_id, scene_id);
+CREATE INDEX IF NOT EXISTS idx_character_knowledge_character_scene ON character_knowledge(character_id, scene_id);
 
 -- 16. Used Content Registry (for preventing repetition)
 CREATE TABLE IF NOT EXISTS used_content_registry (
@@ -221,6 +233,35 @@ CREATE TABLE IF NOT EXISTS used_content_registry (
 CREATE INDEX IF NOT EXISTS idx_registry_content_type ON used_content_registry(content_type);
 CREATE INDEX IF NOT EXISTS idx_registry_scene_id ON used_content_registry(scene_id);
 
+-- 16b. Near-duplicate index of the registry (see persistence/minhash.py)
+-- Near-duplicate registrations form a cluster that counts their uses
+CREATE TABLE IF NOT EXISTS content_clusters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_type TEXT NOT NULL,
+    content_text TEXT NOT NULL, -- first registered wording
+    usage_count INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS content_signatures (
+    registry_id INTEGER PRIMARY KEY,
+    cluster_id INTEGER NOT NULL,
+    signature BLOB NOT NULL, -- MinHash signature
+    version INTEGER NOT NULL DEFAULT 1, -- minhash.SIGNATURE_VERSION of the signature
+    FOREIGN KEY (registry_id) REFERENCES used_content_registry(id) ON DELETE CASCADE,
+    FOREIGN KEY (cluster_id) REFERENCES content_clusters(id) ON DELETE CASCADE
+);
+
+-- One row per LSH band of each signature
+CREATE TABLE IF NOT EXISTS content_lsh_buckets (
+    content_type TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    registry_id INTEGER NOT NULL,
+    FOREIGN KEY (registry_id) REFERENCES used_content_registry(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_content_clusters_usage ON content_clusters(content_type, usage_count);
+CREATE INDEX IF NOT EXISTS idx_content_lsh_buckets ON content_lsh_buckets(content_type, bucket);
+
 -- 17. Memories table (generic key-value storage)
 CREATE TABLE IF NOT EXISTS memories (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -265,6 +306,27 @@ CREATE TABLE IF NOT EXISTS llm_evaluations (
     FOREIGN KEY (chapter_id) REFERENCES chapters(id) ON DELETE CASCADE
 );
 
+-- 18b. LLM usage ledger (one row per LLM request, attributed to the node and
+-- story position that issued it; see storyteller_lib.core.ledger)
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node TEXT, -- graph node that made the request (NULL outside nodes)
+    chapter_number INTEGER, -- story position when the request was made
+    scene_number INTEGER,
+    model TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    tokens_estimated BOOLEAN DEFAULT 0, -- provider reported no usage; estimated from text length
+    cache_hit BOOLEAN DEFAULT 0,
+    cost_usd REAL, -- NULL if the model has no known price
+    saved_usd REAL, -- cost a cache hit avoided
+    latency REAL, -- seconds
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_usage_position ON llm_usage(chapter_number, scene_number);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_node ON llm_usage(node);
+
 -- 19. Character promises table
 CREATE TABLE IF NOT EXISTS character_promises (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -357,10 +419,131 @@ CREATE TABLE IF NOT EXISTS ssml_repair_log (
     original_ssml TEXT,
     repaired_ssml TEXT,
     repair_successful BOOLEAN,
+    repair_method TEXT, -- rules, llm
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (scene_id) REFERENCES scenes(id) ON DELETE CASCADE
 );
 
 -- Create indexes for SSML repair log
 CREATE INDEX IF NOT EXISTS idx_repair_log_scene_id ON ssml_repair_log(scene_id);
-CREATE INDEX IF NOT EXISTS idx_repair_log_error_code ON ssml_repair_log(error_code);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_repair_log_error_code ON ssml_repair_log(error_code);
+
+-- 24b. Scene audio builds (what each scene's audio file was synthesized from;
+-- generate_audiobook.py only re-synthesizes scenes whose SSML, voice or format changed)
+CREATE TABLE IF NOT EXISTS scene_audio (
+    scene_id INTEGER PRIMARY KEY,
+    ssml_hash TEXT NOT NULL, -- SHA-256 of the synthesized SSML
+    voice TEXT NOT NULL,
+    output_format TEXT NOT NULL, -- mp3, wav
+    audio_path TEXT NOT NULL,
+    size_bytes INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (scene_id) REFERENCES scenes(id) ON DELETE CASCADE
+);
+
+-- 24c. SSML conversions (hash of the scene inputs content_ssml was converted from;
+-- the SSML converter skips scenes whose inputs are unchanged)
+CREATE TABLE IF NOT EXISTS scene_ssml_sources (
+    scene_id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (scene_id) REFERENCES scenes(id) ON DELETE CASCADE
+);
+
+-- 25. Context revisions (rows of scene-level tables changed after they were written;
+-- used to invalidate cached scene-context snapshots that already contain them;
+-- SceneContextCache deletes the entries it has applied except the newest)
+CREATE TABLE IF NOT EXISTS context_revisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    scene_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS revise_character_states
+AFTER UPDATE ON character_states
+WHEN OLD.emotional_state IS NOT NEW.emotional_state
+    OR OLD.character_id IS NOT NEW.character_id
+    OR OLD.scene_id IS NOT NEW.scene_id
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('character_states', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS delete_character_states
+AFTER DELETE ON character_states
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('character_states', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS revise_character_knowledge
+AFTER UPDATE ON character_knowledge
+WHEN OLD.knowledge_content IS NOT NEW.knowledge_content
+    OR OLD.knowledge_type IS NOT NEW.knowledge_type
+    OR OLD.character_id IS NOT NEW.character_id
+    OR OLD.scene_id IS NOT NEW.scene_id
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('character_knowledge', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS delete_character_knowledge
+AFTER DELETE ON character_knowledge
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('character_knowledge', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS revise_plot_thread_developments
+AFTER UPDATE ON plot_thread_developments
+WHEN OLD.description IS NOT NEW.description
+    OR OLD.plot_thread_id IS NOT NEW.plot_thread_id
+    OR OLD.scene_id IS NOT NEW.scene_id
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('plot_thread_developments', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS delete_plot_thread_developments
+AFTER DELETE ON plot_thread_developments
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id, scene_id)
+    VALUES ('plot_thread_developments', OLD.id, OLD.scene_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS revise_plot_progressions
+AFTER UPDATE OF progression_key ON plot_progressions
+WHEN OLD.progression_key IS NOT NEW.progression_key
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id)
+    VALUES ('plot_progressions', OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS delete_plot_progressions
+AFTER DELETE ON plot_progressions
+BEGIN
+    INSERT INTO context_revisions (table_name, row_id)
+    VALUES ('plot_progressions', OLD.id);
+END;
+
+-- 26. Telemetry (spans recorded by storyteller_lib.core.tracing when tracing is enabled)
+CREATE TABLE IF NOT EXISTS telemetry (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL, -- one generation run
+    span_id INTEGER NOT NULL,
+    parent_id INTEGER, -- enclosing span (e.g. the node of an LLM call)
+    kind TEXT NOT NULL, -- node, llm, db
+    name TEXT NOT NULL,
+    thread TEXT,
+    start_time REAL NOT NULL, -- Unix time in seconds
+    duration REAL NOT NULL, -- seconds
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cache_hit BOOLEAN,
+    attributes TEXT, -- JSON
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_telemetry_run ON telemetry(run_id, kind, name);
@@ -0,0 +1,174 @@
+"""
+StoryCraft Agent - Unit-of-work write batching.
+
+This module collects the database writes produced while saving graph node
+state and flushes them in a single transaction, grouping consecutive
+statements with identical SQL into one ``executemany`` call. The flush
+policy decides how often that transaction is committed:
+
+- ``node``: after every saved node (default)
+- ``scene``: once per scene, when a scene-boundary node has been saved
+- ``time``: whenever the configured interval has elapsed
+
+Queued writes are not visible to readers until they are flushed, so the
+``scene`` and ``time`` policies trade read-your-writes visibility between
+nodes for fewer commits (and fsyncs).
+"""
+
+# Standard library imports
+import os
+import threading
+import time
+from typing import Any
+
+# Local imports
+from storyteller_lib.core.exceptions import DatabaseQueryError
+from storyteller_lib.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FLUSH_POLICIES = ["node", "scene", "time"]
+DEFAULT_FLUSH_POLICY = os.environ.get("STORY_DB_FLUSH_POLICY", "node")
+DEFAULT_FLUSH_INTERVAL = float(os.environ.get("STORY_DB_FLUSH_INTERVAL", "5.0"))
+
+# Nodes that close out a scene; the "scene" policy flushes after these
+SCENE_BOUNDARY_NODES = {
+    "join_scene_analysis",
+    "advance_to_next_scene_or_chapter",
+    "plan_chapters",
+    "review_and_polish_manuscript",
+}
+
+
+class UnitOfWork:
+    """
+    Collects pending writes and commits them in one transaction.
+
+    Writes are queued as (sql, params) pairs in the order they were issued.
+    On flush, consecutive writes sharing the same SQL are executed with a
+    single ``executemany`` and the whole batch is committed once.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        policy: str | None = None,
+        flush_interval: float | None = None,
+    ):
+        """
+        Initialize the unit of work.
+
+        Args:
+            db: StoryDatabase instance the writes are flushed to
+            policy: Flush policy (node, scene or time)
+            flush_interval: Seconds between flushes for the time policy
+        """
+        policy = (policy or DEFAULT_FLUSH_POLICY).lower()
+        if policy not in FLUSH_POLICIES:
+            logger.warning(f"Invalid flush policy '{policy}'. Falling back to node.")
+            policy = "node"
+
+        self.db = db
+        self.policy = policy
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else DEFAULT_FLUSH_INTERVAL
+        )
+        self._pending: list[tuple[str, tuple]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.flush_count = 0
+        self.statement_count = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of queued writes."""
+        return len(self._pending)
+
+    def add(self, sql: str, params: tuple | list = ()) -> None:
+        """
+        Queue a single write.
+
+        Args:
+            sql: SQL statement
+            params: Statement parameters
+        """
+        with self._lock:
+            self._pending.append((sql, tuple(params)))
+
+    def add_many(self, sql: str, rows: list[tuple] | list[list]) -> None:
+        """
+        Queue the same statement for several parameter rows.
+
+        Args:
+            sql: SQL statement
+            rows: Parameter rows
+        """
+        with self._lock:
+            self._pending.extend((sql, tuple(row)) for row in rows)
+
+    def flush(self) -> int:
+        """
+        Write all queued statements in a single transaction.
+
+        Returns:
+            Number of statements written
+
+        Raises:
+            DatabaseQueryError: If the batch fails; nothing from it is committed
+                and its writes stay queued for the next flush
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        # Group consecutive identical statements so ordering is preserved
+        groups: list[tuple[str, list[tuple]]] = []
+        for sql, params in pending:
+            if groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+
+        with self.db._get_connection() as conn:
+            try:
+                for sql, rows in groups:
+                    if len(rows) == 1:
+                        conn.execute(sql, rows[0])
+                    else:
+                        conn.executemany(sql, rows)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                # Requeue ahead of anything added meanwhile so the batch is
+                # retried, in order, by the next flush
+                with self._lock:
+                    self._pending[:0] = pending
+                raise DatabaseQueryError(
+                    f"Failed to flush {len(pending)} queued writes: {e}",
+                    {"statements": len(pending)},
+                ) from e
+
+        self.flush_count += 1
+        self.statement_count += len(pending)
+        logger.debug(
+            f"Flushed {len(pending)} writes in {len(groups)} batches (policy={self.policy})"
+        )
+        return len(pending)
+
+    def node_completed(self, node_name: str) -> None:
+        """
+        Apply the flush policy after a node's writes have been queued.
+
+        Args:
+            node_name: Name of the node that was just saved
+        """
+        if self.policy == "node":
+            self.flush()
+        elif self.policy == "scene":
+            if node_name in SCENE_BOUNDARY_NODES:
+                self.flush()
+        elif time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
@@ -115,16 +115,20 @@ def generate_scene_level_instructions(
         _get_story_context,
         _get_world_context,
         _get_writing_constraints,
+        load_scene_context_data,
     )
 
-    # 1. Get story context
-    story_context = _get_story_context(db_manager, state)
+    # 1. Get scene specifications and bulk-load the scene's database rows
+    scene_specs = _get_scene_specifications(state, chapter, scene)
+    data = load_scene_context_data(
+        db_manager, chapter, scene, scene_specs["required_characters"]
+    )
 
-    # 2. Get chapter context
-    chapter_context = _get_chapter_context(db_manager, chapter)
+    # 2. Get story context
+    story_context = _get_story_context(data, state)
 
-    # 3. Get scene specifications
-    scene_specs = _get_scene_specifications(state, chapter, scene)
+    # 3. Get chapter context
+    chapter_context = _get_chapter_context(data, chapter)
 
     # Debug: Log POV character
     logger.debug(
@@ -132,11 +136,11 @@ def generate_scene_level_instructions(
     )
 
     # 4. Get plot context
-    plot_context = _get_plot_context(db_manager, scene_specs)
+    plot_context = _get_plot_context(data, scene_specs)
 
     # 5. Get character context
     character_context = _get_character_context(
-        db_manager,
+        data,
         scene_specs["required_characters"],
         scene_specs["description"],
         state,
@@ -174,7 +178,7 @@ def generate_scene_level_instructions(
 
         # Still get basic location data
         world_context = _get_world_context(
-            db_manager, scene_specs["description"], character_context["locations"]
+            data, scene_specs["description"], character_context["locations"]
         )
 
         # Merge intelligent worldbuilding with location data
@@ -189,14 +193,14 @@ def generate_scene_level_instructions(
         logger.error("Falling back to basic world context")
         # Fallback to basic world context
         world_context = _get_world_context(
-            db_manager, scene_specs["description"], character_context["locations"]
+            data, scene_specs["description"], character_context["locations"]
         )
 
     # 7. Get sequence context
-    sequence_context = _get_sequence_context(db_manager, chapter, scene, state)
+    sequence_context = _get_sequence_context(data, chapter, scene, state)
 
     # 8. Get writing constraints
-    constraints = _get_writing_constraints(db_manager, chapter, scene)
+    constraints = _get_writing_constraints(data, chapter, scene)
 
     # 9. Get story so far (previous summaries)
     from storyteller_lib.output.summary import get_story_so_far
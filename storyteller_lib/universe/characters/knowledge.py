@@ -254,32 +254,33 @@ class CharacterKnowledgeManager:
         Args:
             character_id: Database ID of the character
             knowledge: The knowledge to check for
-            exact_match: If True, check exact match; if False, check substring
+            exact_match: If True, check exact match; if False, check for the words as a phrase
 
         Returns:
             True if character has this knowledge, False otherwise
         """
         try:
-            with self.db_manager._db._get_connection() as conn:
-                cursor = conn.cursor()
-
-                if exact_match:
-                    cursor.execute(
-                        """
-                        SELECT id FROM character_knowledge
-                        WHERE character_id = ? AND knowledge_content = ?
-                    """,
-                        (character_id, knowledge),
-                    )
-                else:
-                    cursor.execute(
-                        """
-                        SELECT id FROM character_knowledge
-                        WHERE character_id = ? AND knowledge_content LIKE ?
-                    """,
-                        (character_id, f"%{knowledge}%"),
+            if not exact_match:
+                # Phrase match on the full-text index instead of a LIKE scan
+                return bool(
+                    self.db_manager._db.search(
+                        "character_knowledge",
+                        knowledge,
+                        limit=1,
+                        mode="phrase",
+                        filters={"character_id": character_id},
                     )
+                )
 
+            with self.db_manager._db._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id FROM character_knowledge
+                    WHERE character_id = ? AND knowledge_content = ?
+                """,
+                    (character_id, knowledge),
+                )
                 return cursor.fetchone() is not None
 
         except Exception as e:
@@ -2,6 +2,7 @@
 StoryCraft Agent - Character creation and management.
 """
 
+import os
 from typing import Any
 
 from langchain_core.messages import AIMessage, RemoveMessage
@@ -10,13 +11,19 @@ from pydantic import BaseModel, Field
 from storyteller_lib import track_progress
 from storyteller_lib.core.config import (
     DEFAULT_LANGUAGE,
-    llm,
 )
+from storyteller_lib.core.llm_engine import get_llm_engine
 
 # Memory manager imports removed - using state and database instead
 from storyteller_lib.core.models import (
     StoryState,
 )
+from storyteller_lib.utils.concurrency import map_bounded
+
+# Number of characters (and relationship pairs) generated concurrently;
+# 1 generates them one after another. LLM calls are additionally bounded
+# by the shared engine's per-provider limits.
+CHARACTER_GENERATION_WORKERS = int(os.environ.get("CHARACTER_GENERATION_WORKERS", "4"))
 
 # Default character data - simplified for fallback only
 DEFAULT_CHARACTERS = {
@@ -361,8 +368,7 @@ def generate_character_roles(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(CharacterRoles)
-    result = structured_output_llm.invoke(prompt)
+    result = get_llm_engine().invoke(prompt, response_schema=CharacterRoles)
     return result.roles
 
 
@@ -420,8 +426,7 @@ def generate_basic_character(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(BasicCharacterInfo)
-    return structured_output_llm.invoke(prompt)
+    return get_llm_engine().invoke(prompt, response_schema=BasicCharacterInfo)
 
 
 def generate_personality_traits(
@@ -454,8 +459,7 @@ def generate_personality_traits(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(PersonalityTraits)
-    return structured_output_llm.invoke(prompt)
+    return get_llm_engine().invoke(prompt, response_schema=PersonalityTraits)
 
 
 def generate_emotional_state(
@@ -494,8 +498,7 @@ def generate_emotional_state(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(EmotionalState)
-    return structured_output_llm.invoke(prompt)
+    return get_llm_engine().invoke(prompt, response_schema=EmotionalState)
 
 
 def generate_inner_conflicts(
@@ -538,8 +541,7 @@ def generate_inner_conflicts(
         conflicts: list[InnerConflict]
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(InnerConflicts)
-    result = structured_output_llm.invoke(prompt)
+    result = get_llm_engine().invoke(prompt, response_schema=InnerConflicts)
     return result.conflicts
 
 
@@ -576,8 +578,7 @@ def generate_character_arc(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(CharacterArc)
-    return structured_output_llm.invoke(prompt)
+    return get_llm_engine().invoke(prompt, response_schema=CharacterArc)
 
 
 def generate_character_facts(
@@ -613,8 +614,7 @@ def generate_character_facts(
         evolution: list[str]
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(CharacterEvolution)
-    result = structured_output_llm.invoke(prompt)
+    result = get_llm_engine().invoke(prompt, response_schema=CharacterEvolution)
     return {"evolution": result.evolution}
 
 
@@ -664,8 +664,86 @@ def generate_single_relationship(
     )
 
     # Use structured output with Pydantic
-    structured_output_llm = llm.with_structured_output(SingleRelationship)
-    return structured_output_llm.invoke(prompt)
+    return get_llm_engine().invoke(prompt, response_schema=SingleRelationship)
+
+
+def generate_character_profile(
+    role: CharacterRole,
+    story_outline: str,
+    genre: str,
+    tone: str,
+    author_style_guidance: str = "",
+    language: str = DEFAULT_LANGUAGE,
+) -> dict[str, Any]:
+    """
+    Generate the full profile of one character, step by step.
+
+    Args:
+        role: The character's role information
+        story_outline: The story outline
+        genre: The story genre
+        tone: The story tone
+        author_style_guidance: Guidance on author's style
+        language: Target language for generation
+
+    Returns:
+        Character dictionary without relationships
+    """
+    # Generate basic character info
+    basic_info = generate_basic_character(
+        role=role,
+        story_outline=story_outline,
+        genre=genre,
+        tone=tone,
+        author_style_guidance=author_style_guidance,
+        language=language,
+    )
+
+    # Initialize the character with basic info
+    character = {
+        "name": basic_info.name,
+        "role": basic_info.role,
+        "backstory": basic_info.backstory,
+        "evolution": [],
+        "relationships": {},
+    }
+
+    # Step 3a: Generate personality traits
+    print(f"Step 3a: Generating personality traits for {basic_info.name}...")
+    personality = generate_personality_traits(
+        character=basic_info, story_outline=story_outline, language=language
+    )
+    character["personality"] = personality.dict()
+
+    # Step 3b: Generate emotional state
+    print(f"Step 3b: Generating emotional state for {basic_info.name}...")
+    emotional_state = generate_emotional_state(
+        character=basic_info, personality=personality, language=language
+    )
+    character["emotional_state"] = emotional_state.dict()
+
+    # Step 3c: Generate inner conflicts
+    print(f"Step 3c: Generating inner conflicts for {basic_info.name}...")
+    inner_conflicts = generate_inner_conflicts(
+        character=basic_info, personality=personality, language=language
+    )
+    character["inner_conflicts"] = [conflict.dict() for conflict in inner_conflicts]
+
+    # Step 3d: Generate character arc
+    print(f"Step 3d: Generating character arc for {basic_info.name}...")
+    character_arc = generate_character_arc(
+        character=basic_info, inner_conflicts=inner_conflicts, language=language
+    )
+    character["character_arc"] = character_arc.dict()
+
+    # Step 3e: Generate character facts
+    print(f"Step 3e: Generating character facts for {basic_info.name}...")
+    facts = generate_character_facts(
+        character=basic_info, story_outline=story_outline, language=language
+    )
+    character["evolution"] = facts["evolution"]
+
+    return character
 
 
 def establish_character_relationships(
@@ -674,7 +752,7 @@ def establish_character_relationships(
     language: str = DEFAULT_LANGUAGE,
 ) -> dict[str, dict[str, Any]]:
     """
-    Establish relationships between characters one pair at a time.
+    Establish relationships between characters, generating the pairs concurrently.
 
     Args:
         characters: Dictionary of characters
@@ -688,36 +766,43 @@ def establish_character_relationships(
     if len(characters) <= 1:
         return characters
 
-    # Process each character
-    updated_characters = {}
-
-    for char_id, char_data in characters.items():
-        # Get other characters
-        other_characters = {k: v for k, v in characters.items() if k != char_id}
-
-        # Create a dictionary for this character's relationships
-        relationships = {}
-
-        # Generate a relationship with each other character individually
-        for other_id, other_data in other_characters.items():
-            print(
-                f"Generating relationship between {char_data['name']} and {other_data['name']}..."
-            )
+    # Generate each directed pair independently and merge in character order
+    pairs = [
+        (char_id, other_id)
+        for char_id in characters
+        for other_id in characters
+        if other_id != char_id
+    ]
 
-            # Generate the relationship
-            relationship = generate_single_relationship(
-                character=char_data,
-                other_character=other_data,
-                story_outline=story_outline,
-                language=language,
-            )
+    def generate_pair(pair: tuple[str, str]) -> SingleRelationship:
+        char_data, other_data = characters[pair[0]], characters[pair[1]]
+        print(
+            f"Generating relationship between {char_data['name']} and {other_data['name']}..."
+        )
+        return generate_single_relationship(
+            character=char_data,
+            other_character=other_data,
+            story_outline=story_outline,
+            language=language,
+        )
 
-            # Add the relationship to the dictionary
-            relationships[other_id] = relationship.dict()
+    relationships = dict(
+        zip(
+            pairs,
+            map_bounded(generate_pair, pairs, CHARACTER_GENERATION_WORKERS),
+            strict=True,
+        )
+    )
 
-        # Update the character with the relationships
+    # Update each character with its relationships
+    updated_characters = {}
+    for char_id, char_data in characters.items():
         char_data_copy = char_data.copy()
-        char_data_copy["relationships"] = relationships
+        char_data_copy["relationships"] = {
+            other_id: relationships[(char_id, other_id)].dict()
+            for other_id in characters
+            if other_id != char_id
+        }
         updated_characters[char_id] = char_data_copy
 
     return updated_characters
@@ -794,26 +879,29 @@ def generate_characters(state: StoryState) -> dict:
         language=language,
     )
 
-    # Step 2: Generate basic information for each character
-    print("Step 2: Generating basic character information...")
-    characters_dict = {}
-
-    for role in character_roles:
-        # Generate basic character info
-        basic_info = generate_basic_character(
+    # Steps 2-3: Generate each character's profile; characters are independent
+    print("Step 2: Generating character profiles...")
+    profiles = map_bounded(
+        lambda role: generate_character_profile(
             role=role,
             story_outline=global_story,
             genre=genre,
             tone=tone,
             author_style_guidance=author_style_guidance,
             language=language,
-        )
+        ),
+        character_roles,
+        CHARACTER_GENERATION_WORKERS,
+    )
 
+    # Merge in role order so character IDs are assigned deterministically
+    characters_dict = {}
+    for profile in profiles:
         # Create a character ID from the name
         # Remove special characters and normalize for database compatibility
         import unicodedata
 
-        normalized_name = unicodedata.normalize("NFKD", basic_info.name)
+        normalized_name = unicodedata.normalize("NFKD", profile["name"])
         # Keep only ASCII characters
         ascii_name = normalized_name.encode("ascii", "ignore").decode("ascii")
         # Replace spaces with underscores and convert to lowercase
@@ -822,51 +910,7 @@ def generate_characters(state: StoryState) -> dict:
         if not char_id:
             char_id = f"character_{len(characters_dict) + 1}"
 
-        # Initialize the character with basic info
-        characters_dict[char_id] = {
-            "name": basic_info.name,
-            "role": basic_info.role,
-            "backstory": basic_info.backstory,
-            "evolution": [],
-            "relationships": {},
-        }
-
-        # Step 3a: Generate personality traits
-        print(f"Step 3a: Generating personality traits for {basic_info.name}...")
-        personality = generate_personality_traits(
-            character=basic_info, story_outline=global_story, language=language
-        )
-        characters_dict[char_id]["personality"] = personality.dict()
-
-        # Step 3b: Generate emotional state
-        print(f"Step 3b: Generating emotional state for {basic_info.name}...")
-        emotional_state = generate_emotional_state(
-            character=basic_info, personality=personality, language=language
-        )
-        characters_dict[char_id]["emotional_state"] = emotional_state.dict()
-
-        # Step 3c: Generate inner conflicts
-        print(f"Step 3c: Generating inner conflicts for {basic_info.name}...")
-        inner_conflicts = generate_inner_conflicts(
-            character=basic_info, personality=personality, language=language
-        )
-        characters_dict[char_id]["inner_conflicts"] = [
-            conflict.dict() for conflict in inner_conflicts
-        ]
-
-        # Step 3d: Generate character arc
-        print(f"Step 3d: Generating character arc for {basic_info.name}...")
-        character_arc = generate_character_arc(
-            character=basic_info, inner_conflicts=inner_conflicts, language=language
-        )
-        characters_dict[char_id]["character_arc"] = character_arc.dict()
-
-        # Step 3e: Generate character facts
-        print(f"Step 3e: Generating character facts for {basic_info.name}...")
-        facts = generate_character_facts(
-            character=basic_info, story_outline=global_story, language=language
-        )
-        characters_dict[char_id]["evolution"] = facts["evolution"]
+        characters_dict[char_id] = profile
 
     # Step 4: Establish relationships between characters
     print("Step 4: Establishing relationships between characters...")
@@ -6,6 +6,7 @@ based on the story parameters (genre, tone, author style, and initial idea).
 It uses Pydantic models for structured data extraction and validation.
 """
 
+import os
 from typing import Any
 
 from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
@@ -18,11 +19,18 @@ from storyteller_lib.core.config import (
     SUPPORTED_LANGUAGES,
     llm,
 )
+from storyteller_lib.core.llm_engine import get_llm_engine
 from storyteller_lib.core.logger import get_logger
 from storyteller_lib.core.models import StoryState
+from storyteller_lib.utils.concurrency import map_bounded
 
 logger = get_logger(__name__)
 
+# Number of worldbuilding categories generated concurrently; 1 generates
+# them one after another. LLM calls are additionally bounded by the shared
+# engine's per-provider limits.
+WORLDBUILDING_WORKERS = int(os.environ.get("WORLDBUILDING_WORKERS", "8"))
+
 # Simple, focused Pydantic models for worldbuilding elements
 
 
@@ -694,9 +702,6 @@ def generate_category(
     Returns:
         Dictionary containing the generated category data
     """
-    # Use structured output only - no fallback
-    structured_llm = llm.with_structured_output(model)
-
     # Extract field-specific instructions from the Pydantic model
     field_instructions = []
     for field_name, field_info in model.model_fields.items():
@@ -747,7 +752,8 @@ SPECIFIC FIELD REQUIREMENTS:
     # Combine pre-instructions with the base prompt
     full_prompt = pre_instructions + base_prompt
 
-    result = structured_llm.invoke(full_prompt)
+    # Use structured output only - no fallback
+    result = get_llm_engine().invoke(full_prompt, response_schema=model)
     return result.model_dump()
 
 
@@ -1107,11 +1113,11 @@ def generate_worldbuilding(state: StoryState) -> dict:
         "daily_life": DailyLife,
     }
 
-    # Generate each category separately
-    world_elements = {}
-    for category_name, model in category_models.items():
+    # Generate the categories concurrently; they only depend on the story setup
+    def generate(category: tuple[str, type[BaseModel]]) -> dict[str, Any]:
+        category_name, model = category
         print(f"Generating {category_name} elements...")
-        category_data = generate_category(
+        return generate_category(
             category_name,
             model,
             genre,
@@ -1122,7 +1128,15 @@ def generate_worldbuilding(state: StoryState) -> dict:
             language,
             language_guidance,
         )
-        world_elements[category_name] = category_data
+
+    categories = list(category_models.items())
+    results = map_bounded(generate, categories, WORLDBUILDING_WORKERS)
+
+    # Keep the category order of category_models
+    world_elements = {
+        category_name: category_data
+        for (category_name, _), category_data in zip(categories, results, strict=True)
+    }
 
     # World elements are now stored in database via database_integration
     # Memory tool has been removed - metadata is tracked in the database
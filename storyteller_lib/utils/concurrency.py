@@ -0,0 +1,40 @@
+"""
+StoryCraft Agent - Bounded concurrent mapping.
+
+Generation steps whose items are independent of each other (characters,
+relationship pairs, worldbuilding categories) fan their LLM requests out
+over a small thread pool with this helper.
+"""
+
+# Standard library imports
+import contextvars
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def map_bounded(
+    func: Callable[[Any], Any], items: list[Any], max_workers: int
+) -> list[Any]:
+    """
+    Apply a function to items on a bounded worker pool.
+
+    Args:
+        func: Function to apply to each item
+        items: Items to process
+        max_workers: Upper bound on concurrent calls; 1 runs serially
+
+    Returns:
+        Results in the order of ``items``
+    """
+    workers = min(max_workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    # Workers run in copies of the caller's context, so their LLM requests
+    # are attributed to the calling node
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, func, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
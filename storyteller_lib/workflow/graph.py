@@ -49,6 +49,16 @@ except ImportError:
     logger.warning("Research-based worldbuilding not available")
 
 
+# Post-scene analysis nodes; each only reads the finalized scene and writes
+# its own tables, so they run in parallel and join before advancing
+SCENE_ANALYSIS_NODES = [
+    "update_world_elements",
+    "update_character_knowledge",
+    "check_plot_threads",
+    "generate_summaries",
+]
+
+
 # Simplified condition functions
 
 
@@ -73,6 +83,13 @@ def needs_revision_check(state: StoryState) -> str:
         return "continue"
 
 
+def route_after_reflection(state: StoryState) -> str | list[str]:
+    """Route to revision, or fan out to the post-scene analysis nodes."""
+    if needs_revision_check(state) == "revise":
+        return "revise_scene_if_needed"
+    return SCENE_ANALYSIS_NODES
+
+
 def is_story_complete(state: StoryState) -> str:
     """Check if all chapters and scenes are complete."""
     # First check if the advancement logic has marked the story as complete
@@ -138,6 +155,16 @@ def advance_to_next_scene_or_chapter(state: StoryState) -> dict:
             return {"completed": True}
 
 
+@track_progress
+def join_scene_analysis(state: StoryState) -> dict:
+    """Wait for all post-scene analysis nodes before advancing."""
+    logger.debug(
+        f"Post-scene analysis complete for Ch:{state.get('current_chapter', '')}"
+        f"/Sc:{state.get('current_scene', '')}"
+    )
+    return {}
+
+
 def create_simplified_graph(checkpointer=None) -> StateGraph:
     """
     Create a simplified story generation graph.
@@ -196,6 +223,7 @@ def create_simplified_graph(checkpointer=None) -> StateGraph:
     graph_builder.add_node("update_character_knowledge", update_character_knowledge)
     graph_builder.add_node("check_plot_threads", check_plot_threads)
     graph_builder.add_node("generate_summaries", generate_summaries)
+    graph_builder.add_node("join_scene_analysis", join_scene_analysis)
     graph_builder.add_node(
         "advance_to_next_scene_or_chapter", advance_to_next_scene_or_chapter
     )
@@ -216,16 +244,15 @@ def create_simplified_graph(checkpointer=None) -> StateGraph:
     # Conditional routing: full revision or continue (style corrections handled in reflect_on_scene)
     graph_builder.add_conditional_edges(
         "reflect_on_scene",
-        needs_revision_check,
-        {"revise": "revise_scene_if_needed", "continue": "update_world_elements"},
+        route_after_reflection,
+        ["revise_scene_if_needed", *SCENE_ANALYSIS_NODES],
     )
 
-    # Continue flow after revision
-    graph_builder.add_edge("revise_scene_if_needed", "update_world_elements")
-    graph_builder.add_edge("update_world_elements", "update_character_knowledge")
-    graph_builder.add_edge("update_character_knowledge", "check_plot_threads")
-    graph_builder.add_edge("check_plot_threads", "generate_summaries")
-    graph_builder.add_edge("generate_summaries", "advance_to_next_scene_or_chapter")
+    # Fan out the post-scene analysis after revision, then join before advancing
+    for node_name in SCENE_ANALYSIS_NODES:
+        graph_builder.add_edge("revise_scene_if_needed", node_name)
+    graph_builder.add_edge(SCENE_ANALYSIS_NODES, "join_scene_analysis")
+    graph_builder.add_edge("join_scene_analysis", "advance_to_next_scene_or_chapter")
 
     # Check if story is complete
     graph_builder.add_conditional_edges(
@@ -10,6 +10,7 @@ A cleaner, more robust replacement for the shell script version.
 
 import argparse
 import os
+import re
 import sqlite3
 import sys
 import textwrap
@@ -78,6 +79,47 @@ def get_worldbuilding_data(
     return cursor.fetchall()
 
 
+def search_worldbuilding_data(
+    conn: sqlite3.Connection, search: str, category: str | None = None
+) -> list[tuple[str, str, str]]:
+    """Get the world elements containing all words of a search, best first."""
+    words = re.findall(r"\w+", search)
+    if not words:
+        return []
+    cursor = conn.cursor()
+    category_filter = "AND w.category = ?" if category else ""
+    params = [category] if category else []
+
+    try:
+        # Ranked search with the full-text index kept by the story database
+        cursor.execute(
+            f"""
+            SELECT w.category, w.element_key, w.element_value
+            FROM world_elements_fts
+            JOIN world_elements w ON w.id = world_elements_fts.rowid
+            WHERE world_elements_fts MATCH ? {category_filter}
+            ORDER BY bm25(world_elements_fts)
+            """,
+            [" ".join(f'"{word}"' for word in words), *params],
+        )
+    except sqlite3.OperationalError:
+        # Databases created before the index existed
+        conditions = " AND ".join(
+            "(w.element_key LIKE ? OR w.element_value LIKE ?)" for _ in words
+        )
+        cursor.execute(
+            f"""
+            SELECT w.category, w.element_key, w.element_value
+            FROM world_elements w
+            WHERE {conditions} {category_filter}
+            ORDER BY w.category, w.element_key
+            """,
+            [f"%{word}%" for word in words for _ in range(2)] + params,
+        )
+
+    return cursor.fetchall()
+
+
 def format_content(content: str, width: int = 80, indent: str = "  ") -> str:
     """Format content with proper word wrapping and indentation."""
     if not content or len(content.strip()) < 2:
@@ -249,6 +291,7 @@ Examples:
   %(prog)s                        # Show all worldbuilding data
   %(prog)s -s                     # Show summary only
   %(prog)s -c geography           # Show only geography
+  %(prog)s -q "river trade"       # Show elements mentioning river and trade
   %(prog)s -e worldbuilding.txt   # Export to text file
   %(prog)s -e worldbuilding.csv   # Export to CSV
         """,
@@ -266,6 +309,12 @@ Examples:
     parser.add_argument(
         "-c", "--category", type=str, help="Show only specific category"
     )
+    parser.add_argument(
+        "-q",
+        "--search",
+        type=str,
+        help="Show only elements containing these words, best matches first",
+    )
     parser.add_argument("-e", "--export", type=str, help="Export to file (txt or csv)")
     parser.add_argument("-d", "--database", type=str, help="Use specific database file")
 
@@ -305,7 +354,10 @@ Examples:
                 sys.exit(1)
 
         # Get data
-        data = get_worldbuilding_data(conn, args.category)
+        if args.search:
+            data = search_worldbuilding_data(conn, args.search, args.category)
+        else:
+            data = get_worldbuilding_data(conn, args.category)
 
         if not data:
             print(f"{Colors.YELLOW}No worldbuilding data found{Colors.NC}")
@@ -328,7 +380,7 @@ Examples:
                 sys.exit(1)
         else:
             # Display to terminal
-            if args.summary:
+            if args.summary and not args.search:
                 display_summary(conn, args.category)
             else:
                 display_full(data)